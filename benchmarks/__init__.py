@@ -0,0 +1,29 @@
+# benchmarks/__init__.py
+"""
+Benchmarks locales. Cada módulo se corre con ``python -m benchmarks.<nombre>``
+desde la raíz del proyecto y trabaja sobre una base de datos de pruebas
+desechable, nunca sobre ``db.sqlite3``.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+def setup_django(database_file: str | None = None) -> None:
+    """Configura django y crea una base de pruebas migrada (en memoria o en ``database_file``)."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.settings')
+    import django
+    django.setup()
+    from django.db import connection
+    if database_file:
+        connection.settings_dict['TEST']['NAME'] = database_file
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+
+@contextmanager
+def timed(label: str, operations: int = 0):
+    started = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - started
+    rate = f' ({operations / elapsed:,.0f} op/s)' if operations and elapsed else ''
+    print(f'{label:<45} {elapsed * 1000:>10.1f} ms{rate}')
@@ -0,0 +1,40 @@
+# benchmarks/generate_polls.py
+"""
+Tiempo de ``manage.py generate_polls`` sobre una base desechable. Con el
+default de 2 a 5 opciones por pregunta, 2.86M preguntas son ~10M opciones.
+
+    python -m benchmarks.generate_polls --questions 2860000
+"""
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=286_000)
+    parser.add_argument('--batch-size', type=int, default=10_000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_generate_polls.sqlite3'))
+
+    from django.core.management import call_command
+    from polls.models import Choice
+
+    with timed(f'generate_polls --questions {args.questions:,}', args.questions):
+        call_command('generate_polls', questions=args.questions, batch_size=args.batch_size)
+    choices = Choice.objects.count()
+    print(f'  {choices:,} opciones')
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
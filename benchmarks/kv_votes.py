@@ -0,0 +1,70 @@
+# benchmarks/kv_votes.py
+"""
+Votos con DjangoChoiceRepository.update_votes (un UPDATE en autocommit por
+voto sobre SQLite en disco) contra KeyValueChoiceRepository (un registro de 16
+bytes en el log), con y sin fsync por voto. También mide cuánto tarda un
+proceso nuevo en recuperar los conteos reproduciendo el log.
+
+    python -m benchmarks.kv_votes --votes 20000
+"""
+import argparse
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes', type=int, default=20_000)
+    parser.add_argument('--choices', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_kv_votes.sqlite3'))
+
+    from django.utils.timezone import now
+    from polls.choice_service import DjangoChoiceRepository
+    from polls.kv_votes import (
+        KeyValueChoiceRepository,
+        KeyValueVoteStore,
+    )
+    from polls.models import Choice, Question
+
+    question = Question.objects.create(question_text='benchmark', pub_date=now())
+    Choice.objects.bulk_create(Choice(question=question, choice_text=f'opción {i}') for i in range(args.choices))
+    choice_ids = list(Choice.objects.values_list('id', flat=True))
+    rng = random.Random(args.seed)
+    votes = [rng.choice(choice_ids) for _ in range(args.votes)]
+
+    django_repo = DjangoChoiceRepository()
+    with timed('DjangoChoiceRepository.update_votes', args.votes):
+        for choice_id in votes:
+            django_repo.update_votes(choice_id)
+
+    for fsync in (False, True):
+        path = workdir / f'kv_fsync_{fsync}'
+        repo = KeyValueChoiceRepository(store=KeyValueVoteStore(path, fsync=fsync))
+        with timed(f'KeyValueChoiceRepository fsync={fsync}', args.votes):
+            for choice_id in votes:
+                repo.update_votes(choice_id)
+        with timed('  recuperación (snapshot + log)', args.votes):
+            recovered = KeyValueVoteStore(path)
+            total = sum(recovered.get_many(choice_ids).values())
+        assert total == args.votes, total
+        with timed('  compactación', args.votes):
+            recovered.compact()
+        recovered.close()
+        repo.close()
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
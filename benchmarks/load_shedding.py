@@ -0,0 +1,101 @@
+# benchmarks/load_shedding.py
+"""
+Una avalancha de votos (POST a QuestionDetailView) desde muchos hilos contra
+SQLite en disco, mientras otros hilos leen los resultados; con y sin
+ConcurrencyLimitMiddleware. Reporta votos aceptados, 503, errores 5xx y la
+latencia (p50/p99) de los votos aceptados y de las lecturas.
+
+    python -m benchmarks.load_shedding --writers 32 --readers 4 --seconds 5
+"""
+import argparse
+import logging
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from benchmarks import setup_django
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=32)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_load_shedding.sqlite3'))
+    # los 500 por 'database is locked' se cuentan abajo, no hace falta su traceback
+    logging.getLogger('django.request').setLevel(logging.CRITICAL)
+
+    from django.conf import settings
+    from django.db import connection
+    from django.test import (
+        Client,
+        override_settings,
+    )
+    from django.test.client import ClientHandler
+    from django.urls import reverse
+    from django.utils.timezone import now
+    from polls.models import Choice, Question
+
+    question = Question.objects.create(question_text='¿Avalancha?', pub_date=now())
+    choices = Choice.objects.bulk_create(Choice(question=question, choice_text=f'opción {i}') for i in range(4))
+    vote_url = reverse('polls:detail', kwargs={'pk': question.id})
+    results_url = reverse('polls:results', kwargs={'pk': question.id})
+    without_limiter = [name for name in settings.MIDDLEWARE if not name.startswith('polls.load_shedding')]
+
+    for label, middleware in (('sin límite', without_limiter), ('ConcurrencyLimitMiddleware', settings.MIDDLEWARE)):
+        with override_settings(MIDDLEWARE=middleware, ALLOWED_HOSTS=['testserver']):
+            # un solo handler (y un solo juego de limitadores) para todos los hilos
+            handler = ClientHandler(enforce_csrf_checks=False)
+            stop = time.monotonic() + args.seconds
+            latencies = defaultdict(list)
+            statuses = defaultdict(int)
+            lock = threading.Lock()
+
+            def worker(url, data, kind):
+                client = Client(raise_request_exception=False)
+                client.handler = handler
+                while time.monotonic() < stop:
+                    started = time.perf_counter()
+                    response = client.post(url, data) if data else client.get(url)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        statuses[(kind, response.status_code)] += 1
+                        if response.status_code < 500:
+                            latencies[kind].append(elapsed)
+                connection.close()
+
+            threads = [
+                threading.Thread(target=worker, args=(vote_url, {'choice_text': choices[i % 4].id}, 'voto'))
+                for i in range(args.writers)
+            ] + [threading.Thread(target=worker, args=(results_url, None, 'lectura')) for _ in range(args.readers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        print(label)
+        for (kind, status), count in sorted(statuses.items()):
+            print(f'  {kind:<8} HTTP {status}: {count:>7,} ({count / args.seconds:,.0f}/s)')
+        for kind, values in sorted(latencies.items()):
+            print(f'  {kind:<8} p50 {percentile(values, 0.5):8.1f} ms  p99 {percentile(values, 0.99):8.1f} ms'
+                  f'  media {statistics.fmean(values) * 1000:8.1f} ms')
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/profiling.py
+"""
+Costo del perfilado sobre la página de resultados (Client, un hilo): sin
+muestreo, con el muestreo continuo a ``--interval`` segundos y con cProfile
+por petición (token en X-Polls-Profile, escribe un .pstats por petición).
+
+    python -m benchmarks.profiling --requests 2000 --interval 0.01
+"""
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--interval', type=float, default=0.01)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_profiling.sqlite3'))
+
+    from django.test import (
+        Client,
+        override_settings,
+    )
+    from django.urls import reverse
+    from django.utils.timezone import now
+    from polls.models import Choice, Question
+    from polls.profiling import issue_profile_token, sampler
+
+    question = Question.objects.create(question_text='¿Dónde se va el tiempo?', pub_date=now())
+    Choice.objects.bulk_create(Choice(question=question, choice_text=f'opción {i}') for i in range(5))
+    url = reverse('polls:results', args=[question.id])
+    client = Client()
+
+    with override_settings(ALLOWED_HOSTS=['testserver'], POLLS_PROFILING={'DIR': workdir / 'profiles', 'KEEP': 100}):
+        client.get(url)  # templates compilados antes de medir
+        with timed('sin muestreo', args.requests):
+            for _ in range(args.requests):
+                client.get(url)
+
+        sampler.interval = args.interval
+        sampler.start()
+        with timed(f'muestreo cada {args.interval * 1000:g} ms', args.requests):
+            for _ in range(args.requests):
+                client.get(url)
+        sampler.stop()
+        print(f'  {sampler.samples:,} muestras, {len(sampler.counts):,} stacks distintos')
+
+        token = issue_profile_token()
+        profiled = max(1, args.requests // 10)
+        with timed('cProfile por petición', profiled):
+            for _ in range(profiled):
+                assert 'X-Polls-Profile-Name' in client.get(url, HTTP_X_POLLS_PROFILE=token)
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
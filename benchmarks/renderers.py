@@ -0,0 +1,62 @@
+# benchmarks/renderers.py
+"""
+Costo de serializar y renderizar una respuesta de lectura con N QuestionDTO
+o ChoiceDTO: Serializer(many=True).data + JSONRenderer contra el camino
+rápido de polls/renderers.py (DTOJSONRenderer). Verifica que los bytes sean
+los mismos antes de medir.
+
+    python -m benchmarks.renderers --items 1000 --repetitions 200
+"""
+import argparse
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--repetitions', type=int, default=200)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from rest_framework.renderers import JSONRenderer
+    from business_logic.dtos import ChoiceDTO, QuestionDTO
+    from polls.renderers import DTOJSONRenderer
+    from polls.serializers import ChoiceBatchSerializer, QuestionSearchSerializer
+
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    payloads = {
+        'QuestionDTO': (QuestionSearchSerializer, [
+            QuestionDTO(id=i, question_text=f'¿Pregunta número {i}?', pub_date=start + timedelta(minutes=i),
+                        version=1, status='open')
+            for i in range(args.items)
+        ]),
+        'ChoiceDTO': (ChoiceBatchSerializer, [
+            ChoiceDTO(id=i + 1, question_id=i // 10 + 1, text=f'opción {i}', votes=i * 7) for i in range(args.items)
+        ]),
+    }
+    json_renderer, fast_renderer = JSONRenderer(), DTOJSONRenderer()
+    for label, (serializer_class, items) in payloads.items():
+        expected = json_renderer.render(serializer_class(items, many=True).data)
+        assert fast_renderer.render(items) == expected
+        print(f'{args.items:,} {label} ({len(expected):,} bytes)')
+        operations = args.items * args.repetitions
+        with timed('  Serializer + JSONRenderer', operations):
+            for _ in range(args.repetitions):
+                json_renderer.render(serializer_class(items, many=True).data)
+        with timed('  DTOJSONRenderer', operations):
+            for _ in range(args.repetitions):
+                fast_renderer.render(items)
+
+
+if __name__ == '__main__':
+    main()
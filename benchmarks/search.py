@@ -0,0 +1,93 @@
+# benchmarks/search.py
+"""
+Latencia de una página de búsqueda (20 resultados) con el índice FTS5 de
+polls/search.py contra ``question_text LIKE '%término%'``, para varios
+tamaños de tabla. Las preguntas se generan con un vocabulario sintético (un
+término frecuente, uno raro y dos términos a la vez) y sin opciones, para
+que la carga no domine la corrida; también se mide ``rebuild_search_index``.
+
+    python -m benchmarks.search --rows 1000000 10000000
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import time
+from itertools import accumulate
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+# vocabulario sintético con frecuencias tipo Zipf
+WORDS = [f'w{i:04d}' for i in range(5000)]
+CUM_WEIGHTS = list(accumulate(1 / (rank + 1) for rank in range(len(WORDS))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--queries', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_search.sqlite3'))
+
+    from django.db import (
+        connection,
+        transaction,
+    )
+    from django.utils.timezone import now
+    from polls.models import Question
+    from polls.question_service import DjangoQuestionRepository
+    from polls.search import DjangoSearchIndex
+
+    rng = random.Random(args.seed)
+    repository = DjangoQuestionRepository()
+    index = DjangoSearchIndex()
+    table = Question._meta.db_table
+    created = 0
+    for rows in sorted(args.rows):
+        with timed(f'carga hasta {rows:,} preguntas', rows - created), \
+                transaction.atomic(), connection.cursor() as cursor:
+            pub_date = now()
+            while created < rows:
+                batch = min(50_000, rows - created)
+                cursor.executemany(
+                    f'INSERT INTO {table} (question_text, pub_date, version, status) VALUES (%s, %s, 1, %s)',
+                    [(' '.join(rng.choices(WORDS, cum_weights=CUM_WEIGHTS, k=6)), pub_date, Question.OPEN) for _ in range(batch)],
+                )
+                created += batch
+        with timed(f'rebuild_search_index ({rows:,})', rows):
+            index.rebuild(batch_size=10_000)
+
+        queries = {
+            'frecuente': 'w0000',  # en ~40% de las preguntas
+            'raro': 'w4999',
+            'dos términos': 'w0012 w0345',
+        }
+        for label, query in queries.items():
+            like_terms = query.split()
+            for name, run in (
+                ('FTS5', lambda: repository.search(query)),
+                ('LIKE', lambda: list(
+                    Question.objects.filter(**{'question_text__contains': like_terms[0]})
+                    .filter(question_text__contains=like_terms[-1])
+                    .order_by('-id')[:20]
+                )),
+            ):
+                repetitions = args.queries if name == 'FTS5' else max(1, args.queries // 10)
+                started = time.perf_counter()
+                for _ in range(repetitions):
+                    run()
+                elapsed = (time.perf_counter() - started) / repetitions
+                print(f'  {rows:>12,} {label:<14} {name:<5} {elapsed * 1000:>10.2f} ms por página')
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
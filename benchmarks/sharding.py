@@ -0,0 +1,94 @@
+# benchmarks/sharding.py
+"""
+Escrituras de votos con un solo SQLite contra las encuestas repartidas en los
+tres alias de DATABASES (default, shard1, shard2), con varios hilos votando a
+la vez: cada voto es una transacción de ShardedChoiceRepository.update_votes.
+Con un solo archivo todos los hilos se turnan el lock de escritura y el fsync;
+con varios shards sólo compiten los votos de encuestas del mismo shard.
+También mide el costo del scatter-gather de get_recent.
+
+    python -m benchmarks.sharding --votes 3000 --threads 12
+"""
+import argparse
+import random
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes', type=int, default=3000)
+    parser.add_argument('--threads', type=int, default=12)
+    parser.add_argument('--polls', type=int, default=60)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_sharding_default.sqlite3'))
+
+    from django.db import connections
+    from django.db.models import Sum
+    from django.test import override_settings
+    from business_logic.dtos import ChoiceDTO, QuestionDTO
+    from polls.models import Choice
+    from polls.sharding import (
+        ShardedChoiceRepository,
+        ShardedQuestionRepository,
+    )
+
+    for alias in ('shard1', 'shard2'):
+        connections[alias].settings_dict['TEST']['NAME'] = str(workdir / f'bench_sharding_{alias}.sqlite3')
+        connections[alias].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+    rng = random.Random(args.seed)
+    configurations = (
+        ('1 shard', ('default',)),
+        ('3 shards', ('default', 'shard1', 'shard2')),
+    )
+    for label, shards in configurations:
+        # las tareas posteriores al voto no corren en estos hilos: sólo se mide el UPDATE
+        with override_settings(POLLS_SHARDING={'SHARDS': shards}, POLLS_TASK_QUEUE={'IN_PROCESS': False}):
+            questions, choices = ShardedQuestionRepository(), ShardedChoiceRepository()
+            choice_ids = []
+            for i in range(args.polls):
+                question = questions.create(QuestionDTO(question_text=f'¿{label} {i}?'))
+                choice_ids += [choice.id for choice in choices.bulk_create(
+                    [ChoiceDTO(question_id=question.id, text=text) for text in ('sí', 'no')]
+                )]
+            votes = [rng.choice(choice_ids) for _ in range(args.votes)]
+            chunks = [votes[index::args.threads] for index in range(args.threads)]
+
+            def vote(chunk):
+                for choice_id in chunk:
+                    choices.update_votes(choice_id)
+                connections.close_all()
+
+            print(f'{label}: {args.polls} encuestas, {args.threads} hilos')
+            with timed('  un voto por transacción', args.votes):
+                workers = [threading.Thread(target=vote, args=(chunk,)) for chunk in chunks]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            total = sum(
+                Choice.objects.using(alias).filter(id__in=choice_ids).aggregate(total=Sum('votes'))['total'] or 0
+                for alias in shards
+            )
+            assert total == args.votes, total
+            with timed('  get_recent(20)', 1000):
+                for _ in range(1000):
+                    questions.get_recent(20)
+
+    connections.close_all()
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# benchmarks/simulate.py
+"""
+Simulación de la capa de negocio sin base de datos.
+
+Reproduce ``--operations`` operaciones sintéticas (votos con sesgo Zipf,
+creación de opciones y de preguntas) con los casos de uso reales sobre los
+repositorios en memoria, y verifica al final que no se perdió ningún voto.
+Con ``--profile`` muestra dónde se va el tiempo de los casos de uso.
+
+    python -m benchmarks.simulate --operations 1000000 --profile
+"""
+import argparse
+import cProfile
+import pstats
+import random
+import threading
+
+from benchmarks import timed
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.in_memory import (
+    InMemoryChoiceRepository,
+    InMemoryQuestionRepository,
+)
+from business_logic.use_cases import (
+    CreateChoice,
+    CreateQuestionWithChoices,
+    Vote,
+)
+
+# proporción de cada operación en la mezcla
+MIX = {
+    'vote': 0.95,
+    'create_choice': 0.04,
+    'create_question': 0.01,
+}
+
+
+def run(questions: InMemoryQuestionRepository, choices: InMemoryChoiceRepository,
+        operations: int, seed: int) -> int:
+    """Corre la mezcla de operaciones y retorna cuántos votos emitió."""
+    rng = random.Random(seed)
+    kinds = rng.choices(list(MIX), list(MIX.values()), k=operations)
+    question_ids = [question.id for question in questions.get_recent(limit=10**9)]
+    # los votantes ya conocen los IDs de las opciones, como en la página de detalle
+    choice_ids = [choice.id for choice in choices.get_all()]
+    votes = 0
+    for kind in kinds:
+        if kind == 'vote':
+            # Zipf aproximado: las opciones con ID bajo concentran los votos
+            Vote(choices, choice_ids[int(len(choice_ids) ** rng.random()) - 1]).execute()
+            votes += 1
+        elif kind == 'create_choice':
+            question_id = rng.choice(question_ids)
+            choice = CreateChoice(choices, ChoiceDTO(question_id=question_id, text=f'opción {rng.random():.6f}')).execute()
+            choice_ids.append(choice.id)
+        else:
+            question, created = CreateQuestionWithChoices(
+                questions, choices, QuestionDTO(question_text='¿simulada?'), ['sí', 'no'],
+            ).execute()
+            question_ids.append(question.id)
+            choice_ids.extend(choice.id for choice in created)
+    return votes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=1_000_000)
+    parser.add_argument('--questions', type=int, default=100, help='preguntas iniciales')
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--profile', action='store_true', help='perfila con cProfile (sólo con --threads 1)')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    questions = InMemoryQuestionRepository()
+    choices = InMemoryChoiceRepository()
+    for _ in range(args.questions):
+        CreateQuestionWithChoices(questions, choices, QuestionDTO(question_text='¿inicial?'), ['sí', 'no', 'tal vez']).execute()
+
+    per_thread = args.operations // args.threads
+    emitted = [0] * args.threads
+
+    def worker(index: int) -> None:
+        emitted[index] = run(questions, choices, per_thread, args.seed + index)
+
+    profiler = cProfile.Profile() if args.profile and args.threads == 1 else None
+    with timed(f'{per_thread * args.threads:,} operaciones, {args.threads} hilo(s)', per_thread * args.threads):
+        if profiler:
+            profiler.runcall(worker, 0)
+        else:
+            threads = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    counted = sum(choice.votes for choice in choices.get_all())
+    print(f'votos emitidos {sum(emitted):,}, contados {counted:,}')
+    if counted != sum(emitted):
+        raise SystemExit('se perdieron votos')
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(args.top)
+
+
+if __name__ == '__main__':
+    main()
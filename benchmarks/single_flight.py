@@ -0,0 +1,115 @@
+# benchmarks/single_flight.py
+"""
+Carga sobre la base de datos cuando N lectores concurrentes piden los
+resultados de la misma pregunta (``get_by_id`` + ``get_by_question``, lo que
+lee ResultsView), con los repositorios de Django directos y con los de
+polls/single_flight.py. Se mide en un pool de hilos y con corrutinas.
+
+    python -m benchmarks.single_flight --readers 500
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=500)
+    parser.add_argument('--choices', type=int, default=50)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_single_flight.sqlite3'))
+
+    from asgiref.sync import sync_to_async
+    from django.db import connection
+    from django.utils.timezone import now
+    from polls.choice_service import DjangoChoiceRepository
+    from polls.models import Choice, Question
+    from polls.question_service import DjangoQuestionRepository
+    from polls.single_flight import (
+        SingleFlight,
+        SingleFlightChoiceRepository,
+        SingleFlightQuestionRepository,
+    )
+
+    question = Question.objects.create(question_text='¿Viral?', pub_date=now())
+    Choice.objects.bulk_create(Choice(question=question, choice_text=f'opción {i}') for i in range(args.choices))
+
+    queries = 0
+    lock = threading.Lock()
+
+    def count_queries(execute, sql, params, many, context):
+        nonlocal queries
+        with lock:
+            queries += 1
+        return execute(sql, params, many, context)
+
+    def results_reader(question_repo, choice_repo):
+        def read():
+            with connection.execute_wrapper(count_queries):
+                question_repo.get_by_id(question.id)
+                choice_repo.get_by_question(question.id)
+        return read
+
+    flight = SingleFlight()
+    variants = {
+        'repositorios de Django': (DjangoQuestionRepository(), DjangoChoiceRepository()),
+        'single-flight': (
+            SingleFlightQuestionRepository(DjangoQuestionRepository(), flight),
+            SingleFlightChoiceRepository(DjangoChoiceRepository(), flight),
+        ),
+    }
+    total = args.readers * args.rounds
+
+    with ThreadPoolExecutor(max_workers=args.readers) as pool:
+        # que cada hilo del pool abra su conexión antes de medir
+        warm_up = threading.Barrier(args.readers)
+        list(pool.map(lambda _: (warm_up.wait(), connection.ensure_connection()), range(args.readers)))
+        for label, repositories in variants.items():
+            read = results_reader(*repositories)
+            barrier = threading.Barrier(args.readers)
+
+            def reader():
+                barrier.wait()
+                read()
+
+            queries = 0
+            with timed(f'hilos, {label}', total):
+                for _ in range(args.rounds):
+                    for future in [pool.submit(reader) for _ in range(args.readers)]:
+                        future.result()
+            print(f'  {queries:,} consultas para {total:,} lecturas')
+    print(f'  {flight.stats()}')
+
+    async def read_concurrently(read):
+        await asyncio.gather(*(read() for _ in range(args.readers)))
+
+    async_flight = SingleFlight()
+    plain = sync_to_async(results_reader(DjangoQuestionRepository(), DjangoChoiceRepository()))
+    for label, read in (
+        ('corrutinas, repositorios de Django', plain),
+        ('corrutinas, single-flight', lambda: async_flight.ado(('results', question.id), plain)),
+    ):
+        queries = 0
+        with timed(label, total):
+            for _ in range(args.rounds):
+                asyncio.run(read_concurrently(read))
+        print(f'  {queries:,} consultas para {total:,} lecturas')
+    print(f'  {async_flight.stats()}')
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/templates.py
+"""
+Costo de renderizar los templates de polls.
+
+Compara, por template: sin loader cacheado (se compila en cada request), con el
+loader cacheado y con el loader cacheado más los fragmentos ``{% prerender %}``.
+
+    python -m benchmarks.templates --iterations 2000
+"""
+import argparse
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--choices', type=int, default=10)
+    args = parser.parse_args()
+    setup_django()
+
+    from django.template import (
+        Context,
+        Engine,
+    )
+    from django.test import override_settings
+    from django.utils.timezone import now
+    from polls.forms import FormAnswers, FormQuestion
+    from polls.models import Choice, Question
+    from polls.question_service import DjangoQuestionRepository
+
+    question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+    Choice.objects.bulk_create(
+        Choice(question=question, choice_text=f'opción {i}', votes=i) for i in range(args.choices)
+    )
+
+    class View:
+        def get_object(self):
+            return question
+
+    contexts = {
+        'polls/index.html': {
+            'latest_question_list': DjangoQuestionRepository().get_recent(),
+            'form': FormQuestion(),
+        },
+        'polls/detail.html': {'question': question, 'form': FormAnswers(context={'view': View()})},
+        'polls/results.html': {'question': question},
+    }
+    base_loaders = [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]
+    uncached = Engine(loaders=base_loaders, libraries={'polls_fragments': 'polls.templatetags.polls_fragments'})
+    cached = Engine(
+        loaders=[('django.template.loaders.cached.Loader', base_loaders)],
+        libraries={'polls_fragments': 'polls.templatetags.polls_fragments'},
+    )
+
+    def run(engine, template_name, data):
+        for _ in range(args.iterations):
+            # el queryset de choice_set se evalúa igual en todas las variantes
+            engine.get_template(template_name).render(Context({**data, 'csrf_token': 'x' * 64}))
+
+    for template_name, data in contexts.items():
+        print(template_name)
+        with override_settings(POLLS_TEMPLATES={'PRERENDER': False}):
+            with timed('  sin cache', args.iterations):
+                run(uncached, template_name, data)
+            run(cached, template_name, data)  # calentamiento
+            with timed('  loader cacheado', args.iterations):
+                run(cached, template_name, data)
+        run(cached, template_name, data)
+        with timed('  loader cacheado + prerender', args.iterations):
+            run(cached, template_name, data)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# benchmarks/vote_journal.py
+"""
+Costo del acuse durable de un voto: una transacción de SQLite por voto
+(DjangoChoiceRepository.update_votes) contra el diario de votos con group
+commit, con varios hilos votando a la vez. Reporta también cuántos fsync hizo
+el diario y cuánto tarda el replayer en llevar los votos a la base de datos.
+
+    python -m benchmarks.vote_journal --votes 20000 --threads 1 8 32
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes', type=int, default=20_000)
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--choices', type=int, default=100)
+    parser.add_argument('--group-commit-delay', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_vote_journal.sqlite3'))
+
+    from django.db.models import Sum
+    from django.utils.timezone import now
+    from polls.choice_service import DjangoChoiceRepository
+    from polls.models import Choice, Question
+    from polls.vote_journal import (
+        VoteJournal,
+        VoteJournalReplayer,
+    )
+
+    question = Question.objects.create(question_text='benchmark', pub_date=now())
+    Choice.objects.bulk_create(Choice(question=question, choice_text=f'opción {i}') for i in range(args.choices))
+    choice_ids = list(Choice.objects.values_list('id', flat=True))
+    rng = random.Random(args.seed)
+    votes = [rng.choice(choice_ids) for _ in range(args.votes)]
+
+    django_repo = DjangoChoiceRepository()
+    baseline = votes[:max(1, args.votes // 10)]  # cada voto es un fsync de SQLite: se mide una muestra
+    with timed('una transacción por voto (1 hilo)', len(baseline)):
+        for choice_id in baseline:
+            django_repo.update_votes(choice_id)
+
+    replayer = VoteJournalReplayer(workdir / 'journal', django_repo)
+    for threads in args.threads:
+        journal = VoteJournal(workdir / 'journal', group_commit_delay=args.group_commit_delay,
+                              segment_seconds=float('inf'))
+        chunks = [votes[index::threads] for index in range(threads)]
+
+        def vote(chunk):
+            for choice_id in chunk:
+                journal.append(choice_id)
+
+        with mock.patch('polls.vote_journal.os.fsync', wraps=os.fsync) as fsync:
+            with timed(f'diario con group commit ({threads} hilos)', args.votes):
+                workers = [threading.Thread(target=vote, args=(chunk,)) for chunk in chunks]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            journal.close()
+        print(f'  {fsync.call_count:,} fsync, {args.votes / max(fsync.call_count, 1):.1f} votos por fsync')
+        before = Choice.objects.aggregate(total=Sum('votes'))['total']
+        with timed('  replay a la base de datos', args.votes):
+            replayer.replay(blocking=True)
+        assert Choice.objects.aggregate(total=Sum('votes'))['total'] - before == args.votes
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/vote_series.py
+"""
+Crecimiento del almacenamiento de la serie de votos.
+
+Simula ``--votes-per-day`` votos diarios repartidos (con sesgo) entre
+``--choices`` opciones, los escribe con BufferedVoteSeriesWriter y compacta al
+final de cada día simulado. Reporta filas por capa y páginas usadas de SQLite:
+con la compactación el crecimiento diario queda acotado por número de opciones
+activas, no por número de votos.
+
+    python -m benchmarks.vote_series --votes-per-day 10000000 --days 4
+"""
+import argparse
+import random
+import tempfile
+from collections import Counter
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes-per-day', type=int, default=10_000_000)
+    parser.add_argument('--days', type=int, default=4)
+    parser.add_argument('--choices', type=int, default=500)
+    parser.add_argument('--flush-every', type=int, default=5, help='minutos simulados entre escrituras')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    database_file = str(Path(tempfile.mkdtemp()) / 'bench_vote_series.sqlite3')
+    setup_django(database_file)
+
+    from django.db import connection
+    from django.utils.timezone import now
+    from polls.models import Choice, Question, VoteBucket
+    from polls.vote_series import BufferedVoteSeriesWriter, DjangoVoteSeriesRepository
+
+    with connection.cursor() as cursor:
+        # se mide crecimiento del almacenamiento, no el costo de fsync del disco
+        cursor.execute('PRAGMA synchronous = OFF')
+    question = Question.objects.create(question_text='benchmark', pub_date=now())
+    Choice.objects.bulk_create(Choice(question=question, choice_text=f'opción {i}') for i in range(args.choices))
+    choice_ids = list(Choice.objects.values_list('id', flat=True))
+    weights = [1 / rank for rank in range(1, len(choice_ids) + 1)]  # Zipf s=1
+
+    repository = DjangoVoteSeriesRepository()
+    writer = BufferedVoteSeriesWriter(repository, flush_interval=float('inf'), max_buffered=10**9)
+    rng = random.Random(args.seed)
+    votes_per_minute = args.votes_per_day // 1440
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def used_bytes() -> int:
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA page_size')
+            page_size = cursor.fetchone()[0]
+            cursor.execute('PRAGMA page_count')
+            pages = cursor.fetchone()[0]
+            cursor.execute('PRAGMA freelist_count')
+            free = cursor.fetchone()[0]
+        return (pages - free) * page_size
+
+    print(f'{args.votes_per_day:,} votos/día, {args.choices} opciones, {votes_per_minute:,} votos/minuto')
+    print(f'{"día":>4} {"minutos":>10} {"horas":>8} {"días":>6} {"MB usados":>10}')
+    for day in range(args.days):
+        day_start = start + timedelta(days=day)
+        with timed(f'  día {day + 1}: escritura', args.votes_per_day):
+            for minute in range(1440):
+                at = day_start + timedelta(minutes=minute)
+                for choice_id, votes in Counter(rng.choices(choice_ids, weights, k=votes_per_minute)).items():
+                    writer.record(choice_id, at=at, count=votes)
+                if minute % args.flush_every == args.flush_every - 1:
+                    writer.flush()
+            writer.flush()
+        end_of_day = int((day_start + timedelta(days=1)).timestamp())
+        with timed(f'  día {day + 1}: compactación'):
+            repository.compact(VoteBucket.MINUTE, VoteBucket.HOUR, end_of_day - 2 * VoteBucket.DAY)
+            repository.compact(VoteBucket.HOUR, VoteBucket.DAY, end_of_day - 90 * VoteBucket.DAY)
+        tiers = Counter(VoteBucket.objects.values_list('resolution', flat=True))
+        print(
+            f'{day + 1:>4} {tiers[VoteBucket.MINUTE]:>10,} {tiers[VoteBucket.HOUR]:>8,} '
+            f'{tiers[VoteBucket.DAY]:>6,} {used_bytes() / 2**20:>10.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
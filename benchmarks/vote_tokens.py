@@ -0,0 +1,82 @@
+# benchmarks/vote_tokens.py
+"""
+Costo por voto de la ruta con token (POST /polls/<id>/vote/, atendida por
+StatelessRoutesMiddleware) contra el formulario de QuestionDetailView con el
+stack completo y CSRF activo, en un solo hilo sobre SQLite en disco sin fsync
+(``synchronous=OFF``, para que el disco no tape el costo del stack). Reporta
+votos por segundo y consultas por voto; también cuánto cuesta verificar un token.
+
+    python -m benchmarks.vote_tokens --votes 2000
+"""
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes', type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_vote_tokens.sqlite3'))
+
+    from django.db import connection
+    from django.test import (
+        Client,
+        override_settings,
+    )
+    from django.urls import reverse
+    from django.utils.timezone import now
+    from polls.models import Choice, Question
+    from polls.vote_tokens import (
+        issue_vote_token,
+        verify_vote_token,
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous=OFF')
+    queries = []
+    connection.execute_wrappers.append(lambda execute, sql, params, many, context: (
+        queries.append(sql), execute(sql, params, many, context))[1])
+    question = Question.objects.create(question_text='¿Formulario o token?', pub_date=now())
+    choice = Choice.objects.create(question=question, choice_text='token')
+    token = issue_vote_token('benchmark', question.id)
+
+    with timed('verify_vote_token', args.votes):
+        for _ in range(args.votes):
+            verify_vote_token(token, question.id)
+
+    # las tareas posteriores al voto quedan en el outbox: sus hilos competirían por la base con la medición
+    with override_settings(ALLOWED_HOSTS=['testserver'], POLLS_TASK_QUEUE={'IN_PROCESS': False}):
+        form_client = Client(enforce_csrf_checks=True)
+        detail_url = reverse('polls:detail', kwargs={'pk': question.id})
+        form_client.get(detail_url)  # cookie csrftoken, como un navegador
+        form_data = {'choice_text': choice.id, 'csrfmiddlewaretoken': form_client.cookies['csrftoken'].value}
+        token_client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        vote_url = reverse('polls:vote', kwargs={'pk': question.id})
+
+        paths = (
+            ('formulario (stack completo + CSRF)', lambda: form_client.post(detail_url, form_data), 302),
+            ('ruta con token', lambda: token_client.post(vote_url, {'choice': choice.id}), 204),
+        )
+        for label, vote, expected in paths:
+            queries.clear()
+            with timed(label, args.votes):
+                for _ in range(args.votes):
+                    assert vote().status_code == expected
+            print(f'  {len(queries) / args.votes:.1f} consultas por voto')
+
+    choice.refresh_from_db()
+    assert choice.votes == 2 * args.votes
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/vote_uploads.py
+"""
+Un kiosco sube ``--votes`` votos repartidos en ``--choices`` opciones: uno
+por uno por la ruta con token (POST /polls/<id>/vote/) contra una sola subida
+a /polls/uploads/<id>/ como mapa JSON y como eventos comprimidos con gzip.
+Corre en un solo hilo sobre SQLite en disco sin fsync, igual que
+benchmarks/vote_tokens.py. Reporta el tiempo, los votos por segundo y las
+consultas de cada camino.
+
+    python -m benchmarks.vote_uploads --votes 5000 --choices 50
+"""
+import argparse
+import gzip
+import json
+import random
+import shutil
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--votes', type=int, default=5000)
+    parser.add_argument('--choices', type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_vote_uploads.sqlite3'))
+
+    from django.db import connection
+    from django.db.models import Sum
+    from django.test import (
+        Client,
+        override_settings,
+    )
+    from django.urls import reverse
+    from django.utils.timezone import now
+    from polls.container import container
+    from polls.models import Choice, Question
+    from polls.vote_tokens import issue_vote_token
+
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous=OFF')
+    queries = []
+    connection.execute_wrappers.append(lambda execute, sql, params, many, context: (
+        queries.append(sql), execute(sql, params, many, context))[1])
+    question = Question.objects.create(question_text='¿Uno por uno o en lote?', pub_date=now())
+    choices = Choice.objects.bulk_create(
+        Choice(question=question, choice_text=f'opción {i}') for i in range(args.choices)
+    )
+    events = [random.choice(choices).id for _ in range(args.votes)]
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {issue_vote_token("kiosco", question.id)}')
+    vote_url = reverse('polls:vote', kwargs={'pk': question.id})
+
+    def upload(upload_id, body, content_type, **extra):
+        url = reverse('polls:vote_upload', args=[upload_id])
+        response = client.post(url, body, content_type=content_type, **extra)
+        assert response.json()['applied'], response.content
+
+    votes_map = json.dumps({'votes': {str(choice_id): count for choice_id, count in Counter(events).items()}})
+    compressed = gzip.compress('\n'.join(map(str, events)).encode())
+    print(f'mapa JSON: {len(votes_map):,} bytes, eventos con gzip: {len(compressed):,} bytes')
+
+    with override_settings(ALLOWED_HOSTS=['testserver'], POLLS_TASK_QUEUE={'IN_PROCESS': False}):
+        paths = (
+            ('uno por uno, ruta con token', lambda: [
+                client.post(vote_url, {'choice': choice_id}) for choice_id in events
+            ]),
+            ('una subida, mapa JSON', lambda: upload('mapa', votes_map, 'application/json')),
+            ('una subida, eventos con gzip', lambda: upload(
+                'eventos', compressed, 'text/plain', HTTP_CONTENT_ENCODING='gzip',
+            )),
+        )
+        for label, run in paths:
+            queries.clear()
+            with timed(label, args.votes):
+                run()
+            print(f'  {len(queries):,} consultas')
+
+    assert Choice.objects.aggregate(total=Sum('votes'))['total'] == 3 * args.votes
+    container.reset()  # escribe la serie de votos pendiente antes de borrar la base
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
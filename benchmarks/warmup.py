@@ -0,0 +1,82 @@
+# benchmarks/warmup.py
+"""
+Las primeras peticiones de un worker recién arrancado (portada y resultados de
+las encuestas más votadas) en frío contra después de ``warm_cache``, con los
+repositorios de polls/read_cache.py. Cada ronda empieza con el caché vacío y
+los templates sin compilar, como un proceso nuevo; reporta tiempo y consultas.
+
+    python -m benchmarks.warmup --polls 2000 --top 20
+"""
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks import (
+    setup_django,
+    timed,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--polls', type=int, default=2000)
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp())
+    setup_django(str(workdir / 'bench_warmup.sqlite3'))
+
+    from django.core.cache import cache
+    from django.db import connection
+    from django.template import engines
+    from django.test import (
+        Client,
+        override_settings,
+    )
+    from django.urls import reverse
+    from django.utils.timezone import now
+    from polls.container import container
+    from polls.models import Choice, Question, VoteBucket
+    from polls.read_cache import cached_choice_repository, cached_question_repository
+    from polls.vote_series import DjangoVoteSeriesRepository, to_bucket
+    from polls.warmup import warm_cache
+
+    questions = Question.objects.bulk_create(
+        Question(question_text=f'¿Pregunta {i}?', pub_date=now()) for i in range(args.polls)
+    )
+    choices = Choice.objects.bulk_create(
+        Choice(question=question, choice_text=text) for question in questions for text in ('sí', 'no')
+    )
+    minute = to_bucket(now(), VoteBucket.MINUTE)
+    DjangoVoteSeriesRepository().add_buckets({(choice.id, minute): i for i, choice in enumerate(choices)}, VoteBucket.MINUTE)
+    top = [question.id for question in questions[-args.top:]]
+
+    queries = []
+    connection.execute_wrappers.append(lambda execute, sql, params, many, context: (
+        queries.append(sql), execute(sql, params, many, context))[1])
+    client = Client()
+    urls = [reverse('polls:index'), *(reverse('polls:results', args=[question_id]) for question_id in top)]
+
+    with override_settings(ALLOWED_HOSTS=['testserver'], POLLS_TASK_QUEUE={'IN_PROCESS': False}), \
+            container.override('question_repository', cached_question_repository), \
+            container.override('choice_repository', cached_choice_repository):
+        for label, warm in (('en frío', False), ('después de warm_cache', True)):
+            cache.clear()
+            engines['django'].engine.template_loaders[0].reset()
+            if warm:
+                queries.clear()
+                with timed('warm_cache (fuera de las peticiones)'):
+                    report = warm_cache(budget=30)
+                print(f'  {report}, {len(queries)} consultas')
+            queries.clear()
+            with timed(f'primeras {len(urls)} peticiones, {label}', len(urls)):
+                for url in urls:
+                    assert client.get(url).status_code == 200
+            print(f'  {len(queries)} consultas')
+
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
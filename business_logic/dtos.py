@@ -1,5 +1,9 @@
 # business_logic/dtos.py
-from dataclasses import dataclass
+from array import array
+from dataclasses import (
+    dataclass,
+    field,
+)
 from datetime import datetime
 from typing import Optional
 
@@ -12,6 +16,8 @@ class QuestionDTO:
     question_text: str
     id: Optional[int] = None
     pub_date: Optional[datetime] = None
+    version: Optional[int] = None
+    status: Optional[str] = None  # 'open' o 'closed'
 
 
 @dataclass
@@ -21,6 +27,7 @@ class ChoiceDTO:
     question_id: Optional[int] = None
     id: Optional[int] = None
     votes: Optional[int] = None
+    version: Optional[int] = None  # si viene, las actualizaciones sólo aplican sobre esa versión
 
     def __post_init__(self):
         no_ingresaron_votos_iniciales = self.votes is None
@@ -29,3 +36,19 @@ class ChoiceDTO:
         es_un_dto_para_creacion = not self.id and not self.question_id
         if es_un_dto_para_creacion:
             raise ChoiceDataError('es necesario el campo question_id para la creacion de un Choice')
+
+
+@dataclass
+class QuestionPageDTO:
+    """Una página de resultados; ``next_cursor`` se pasa tal cual para pedir la siguiente"""
+    questions: list[QuestionDTO]
+    next_cursor: Optional[int] = None
+
+
+@dataclass
+class VoteSeriesDTO:
+    """Serie de votos de un Choice: inicios de intervalo (segundos epoch) y votos, en arreglos compactos"""
+    choice_id: int
+    resolution: int
+    buckets: array = field(default_factory=lambda: array('q'))
+    votes: array = field(default_factory=lambda: array('q'))
@@ -12,6 +12,16 @@ class QuestionNotFound(RepositoryError):
         super().__init__(message)
 
 
+class ConcurrentModificationError(RepositoryError):
+    """
+    Se lanza cuando una actualización condicionada a una versión no aplica
+    porque el registro cambió después de leerlo.
+    """
+    def __init__(self, message: str, current_version: int | None = None):
+        super().__init__(message)
+        self.current_version = current_version
+
+
 class ModelError(Exception):
     """Excepción base para errores de llenado en el modelo"""
     ...
@@ -22,9 +32,28 @@ class ChoiceDataError(ModelError):
     ...
 
 
+class InvalidVoteBatch(ModelError):
+    """
+    Se lanza cuando un lote de votos trae opciones que no existen, que son de
+    otra pregunta que la permitida o de una pregunta cerrada. ``choice_ids``
+    son las opciones rechazadas; del lote no se aplica nada.
+    """
+    def __init__(self, message: str, choice_ids: list[int]):
+        super().__init__(message)
+        self.choice_ids = choice_ids
+
+
 class ChoiceNotFound(RepositoryError):
     """
     Se lanza cuando un Choice con el ID especificado no puede ser encontrado.
     """
     def __init__(self, message: str):
         super().__init__(message)
+
+
+class TaskQueueFull(Exception):
+    """
+    Se lanza cuando la cola de tareas en segundo plano no acepta más trabajo
+    (backpressure) y no hay a dónde desbordar la tarea.
+    """
+    ...
@@ -0,0 +1,305 @@
+# business_logic/in_memory.py
+"""
+Repositorios en memoria que cumplen IQuestionRepository e IChoiceRepository
+sin tocar la base de datos. Sirven para probar los casos de uso y simular
+carga dentro del proceso; también se pueden activar por entorno con
+``POLLS_PROVIDERS``.
+"""
+import threading
+from bisect import (
+    bisect_left,
+    insort,
+)
+from dataclasses import replace
+from datetime import (
+    datetime,
+    timezone,
+)
+from itertools import count
+
+from .dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+    QuestionPageDTO,
+)
+from .exceptions import (
+    ChoiceDataError,
+    ChoiceNotFound,
+    ConcurrentModificationError,
+    QuestionNotFound,
+)
+from .search import (
+    query_terms,
+    search_terms,
+)
+
+
+def _copy_question(question: QuestionDTO) -> QuestionDTO:
+    # más barato que dataclasses.replace, que domina el perfil de la simulación
+    return QuestionDTO(question.question_text, question.id, question.pub_date, question.version, question.status)
+
+
+def _copy_choice(choice: ChoiceDTO) -> ChoiceDTO:
+    return ChoiceDTO(choice.text, choice.question_id, choice.id, choice.votes, choice.version)
+
+
+OPEN = 'open'
+CLOSED = 'closed'
+
+
+class InMemoryQuestionRepository:
+    """
+    Preguntas en un dict por ID más un índice ordenado por ``(pub_date, id)``
+    para ``get_recent``. También es su propio ISearchIndex: guarda las
+    palabras de cada pregunta y de sus opciones y ``search`` las recorre.
+
+        >>> repo = InMemoryQuestionRepository()
+        >>> for text, day in [('vieja', 1), ('nueva', 3), ('media', 2)]:
+        ...     _ = repo.create(QuestionDTO(question_text=text, pub_date=datetime(2024, 1, day, tzinfo=timezone.utc)))
+        >>> [question.question_text for question in repo.get_recent(2)]
+        ['nueva', 'media']
+    """
+
+    def __init__(self):
+        self._questions: dict[int, QuestionDTO] = {}
+        self._by_pub_date: list[tuple[datetime, int]] = []
+        self._question_terms: dict[int, list[str]] = {}
+        self._choice_terms: dict[int, dict[int, list[str]]] = {}
+        self._ids = count(1)
+        self._lock = threading.RLock()
+
+    def create(self, question: QuestionDTO) -> QuestionDTO:
+        with self._lock:
+            stored = replace(
+                question,
+                id=next(self._ids),
+                pub_date=question.pub_date or datetime.now(timezone.utc),
+                version=1,
+                status=OPEN,
+            )
+            self._questions[stored.id] = stored
+            insort(self._by_pub_date, (stored.pub_date, stored.id))
+            return _copy_question(stored)
+
+    def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound:
+        with self._lock:
+            try:
+                return _copy_question(self._questions[question_id])
+            except KeyError:
+                raise QuestionNotFound(f"El 'Question' con ID {question_id} no existe.")
+
+    def get_recent(self, limit: int=5) -> list[QuestionDTO]:
+        with self._lock:
+            keys = self._by_pub_date[-limit:] if limit > 0 else []
+            return [_copy_question(self._questions[question_id]) for _, question_id in reversed(keys)]
+
+    def update(self, question: QuestionDTO) -> QuestionDTO:
+        with self._lock:
+            current = self._questions.get(question.id)
+            if current is None:
+                raise QuestionNotFound(f"El 'Question' con ID {question.id} no existe.")
+            if question.version is not None and question.version != current.version:
+                raise ConcurrentModificationError(
+                    f"El 'Question' {question.id} cambió: versión {current.version}, se esperaba {question.version}.",
+                    current_version=current.version,
+                )
+            updated = replace(
+                current,
+                question_text=question.question_text,
+                pub_date=question.pub_date or current.pub_date,
+                version=current.version + 1,
+            )
+            if updated.pub_date != current.pub_date:
+                del self._by_pub_date[bisect_left(self._by_pub_date, (current.pub_date, current.id))]
+                insort(self._by_pub_date, (updated.pub_date, updated.id))
+            self._questions[updated.id] = updated
+            return _copy_question(updated)
+
+    def bulk_close(self, question_ids: list[int]) -> int:
+        with self._lock:
+            closed = 0
+            for question_id in question_ids:
+                question = self._questions.get(question_id)
+                if question is not None and question.status == OPEN:
+                    question.status = CLOSED
+                    question.version += 1
+                    closed += 1
+            return closed
+
+    def bulk_delete(self, question_ids: list[int]) -> int:
+        with self._lock:
+            deleted = 0
+            for question_id in set(question_ids):
+                question = self._questions.pop(question_id, None)
+                if question is not None:
+                    del self._by_pub_date[bisect_left(self._by_pub_date, (question.pub_date, question.id))]
+                    self._question_terms.pop(question_id, None)
+                    self._choice_terms.pop(question_id, None)
+                    deleted += 1
+            return deleted
+
+    def index_question(self, question: QuestionDTO) -> None:
+        with self._lock:
+            if question.id in self._questions:
+                self._question_terms[question.id] = search_terms(question.question_text)
+
+    def index_choices(self, choices: list[ChoiceDTO]) -> None:
+        with self._lock:
+            for choice in choices:
+                if choice.question_id in self._questions:
+                    self._choice_terms.setdefault(choice.question_id, {})[choice.id] = search_terms(choice.text)
+
+    def search(self, query: str, limit: int = 20, cursor: int | None = None) -> QuestionPageDTO:
+        terms = query_terms(query)
+        found: list[QuestionDTO] = []
+        if not terms or limit < 1:
+            return QuestionPageDTO(questions=found)
+        with self._lock:
+            for question_id in sorted(self._question_terms, reverse=True):
+                if cursor is not None and question_id >= cursor:
+                    continue
+                words = set(self._question_terms[question_id])
+                for choice_words in self._choice_terms.get(question_id, {}).values():
+                    words.update(choice_words)
+                if words.issuperset(terms):
+                    found.append(_copy_question(self._questions[question_id]))
+                    if len(found) == limit:
+                        return QuestionPageDTO(questions=found, next_cursor=question_id)
+        return QuestionPageDTO(questions=found)
+
+
+class InMemoryChoiceRepository:
+    """
+    Opciones en un dict por ID más un índice por pregunta. Los DTOs que se
+    entregan son copias: modificarlos no cambia lo guardado.
+
+        >>> repo = InMemoryChoiceRepository()
+        >>> choice = repo.create(ChoiceDTO(question_id=1, text='sí'))
+        >>> repo.update_votes(choice.id), repo.update_votes(999)
+        (1, 0)
+        >>> repo.get_by_id(choice.id)
+        ChoiceDTO(text='sí', question_id=1, id=1, votes=1, version=2)
+    """
+
+    def __init__(self):
+        self._choices: dict[int, ChoiceDTO] = {}
+        self._by_question: dict[int, list[int]] = {}
+        self._applied_batches: set[tuple[str, str]] = set()
+        self._ids = count(1)
+        self._lock = threading.RLock()
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
+        with self._lock:
+            choice = self._choices.get(choice_id)
+            return _copy_choice(choice) if choice else None
+
+    def get_all(self) -> list[ChoiceDTO]:
+        with self._lock:
+            return [_copy_choice(choice) for choice in self._choices.values()]
+
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        with self._lock:
+            return [_copy_choice(self._choices[choice_id]) for choice_id in self._by_question.get(question_id, ())]
+
+    def get_question_ids(self, choice_ids: list[int]) -> dict[int, int]:
+        with self._lock:
+            return {
+                choice_id: self._choices[choice_id].question_id
+                for choice_id in choice_ids if choice_id in self._choices
+            }
+
+    def _add_votes(self, choice_id: int, delta: int) -> int:
+        choice = self._choices.get(choice_id)
+        if choice is None:
+            return 0
+        choice.votes += delta
+        choice.version += 1
+        return 1
+
+    def update_votes(self, choice_id: int) -> int:
+        with self._lock:
+            return self._add_votes(choice_id, 1)
+
+    def bulk_update_votes(self, deltas: dict[int, int]) -> int:
+        with self._lock:
+            return sum(self._add_votes(choice_id, delta) for choice_id, delta in deltas.items() if delta)
+
+    def apply_vote_batch(self, source: str, batch_key: str, deltas: dict[int, int]) -> bool:
+        with self._lock:
+            if (source, batch_key) in self._applied_batches:
+                return False
+            self._applied_batches.add((source, batch_key))
+            self.bulk_update_votes(deltas)
+            return True
+
+    def bulk_reset_votes(self, choice_ids: list[int]) -> int:
+        with self._lock:
+            return sum(self._reset_votes(choice_id) for choice_id in set(choice_ids))
+
+    def reset_votes_by_question(self, question_ids: list[int]) -> int:
+        with self._lock:
+            return sum(
+                self._reset_votes(choice_id)
+                for question_id in set(question_ids)
+                for choice_id in self._by_question.get(question_id, ())
+            )
+
+    def _reset_votes(self, choice_id: int) -> int:
+        choice = self._choices.get(choice_id)
+        if choice is None:
+            return 0
+        choice.votes = 0
+        choice.version += 1
+        return 1
+
+    def create(self, choice: ChoiceDTO) -> ChoiceDTO:
+        if not choice.question_id:
+            raise ChoiceDataError('es necesario el campo question_id para la creacion de un Choice')
+        with self._lock:
+            choice.id = next(self._ids)
+            choice.version = 1
+            choice.votes = choice.votes or 0
+            self._choices[choice.id] = _copy_choice(choice)
+            # los IDs son crecientes, así el índice queda ordenado con append
+            self._by_question.setdefault(choice.question_id, []).append(choice.id)
+            return choice
+
+    def bulk_create(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        if any(not choice.question_id for choice in choices):
+            raise ChoiceDataError('es necesario el campo question_id para la creacion de un Choice')
+        with self._lock:
+            return [self.create(choice) for choice in choices]
+
+    def update(self, choice: ChoiceDTO) -> ChoiceDTO | None:
+        if choice.id is None:
+            return None
+        with self._lock:
+            current = self._choices.get(choice.id)
+            if current is None:
+                raise ChoiceNotFound(f"El 'Choice' con ID {choice.id} no existe.")
+            if choice.version is not None and choice.version != current.version:
+                raise ConcurrentModificationError(
+                    f"El 'Choice' {choice.id} cambió: versión {current.version}, se esperaba {choice.version}.",
+                    current_version=current.version,
+                )
+            if choice.text is not None:
+                current.text = choice.text
+            if choice.votes is not None:
+                current.votes = choice.votes
+            current.version += 1
+            return _copy_choice(current)
+
+    def delete(self, choice_id: int) -> None:
+        with self._lock:
+            choice = self._choices.pop(choice_id, None)
+            if choice is not None:
+                self._by_question[choice.question_id].remove(choice_id)
+
+    def bulk_delete(self, choice_ids: list[int]) -> int:
+        with self._lock:
+            deleted = 0
+            for choice_id in set(choice_ids):
+                if choice_id in self._choices:
+                    self.delete(choice_id)
+                    deleted += 1
+            return deleted
@@ -1,4 +1,5 @@
 # business_logic/interfaces.py
+from datetime import datetime
 from typing import (
     Any,
     Protocol,
@@ -11,6 +12,8 @@ from . exceptions import (
 from .dtos import (
     ChoiceDTO,
     QuestionDTO,
+    QuestionPageDTO,
+    VoteSeriesDTO,
 )
 
 
@@ -18,6 +21,31 @@ class IQuestionRepository(Protocol):
     def create(self, question: QuestionDTO) -> QuestionDTO: ...
     def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound: ...
     def get_recent(self, limit: int=5) -> list[QuestionDTO]: ...
+    def update(self, question: QuestionDTO) -> QuestionDTO:
+        """
+        Actualiza un Question existente. Si ``question.version`` viene, sólo
+        aplica sobre esa versión o lanza ConcurrentModificationError.
+        """
+        ...
+    def bulk_close(self, question_ids: list[int]) -> int:
+        """Cierra las preguntas abiertas indicadas; retorna cuántas cerró."""
+        ...
+    def bulk_delete(self, question_ids: list[int]) -> int:
+        """Borra las preguntas indicadas (y sus Choice); retorna cuántas borró."""
+        ...
+    def search(self, query: str, limit: int = 20, cursor: int | None = None) -> QuestionPageDTO:
+        """
+        Preguntas cuyo texto o el de sus Choice contienen todas las palabras de
+        ``query`` (sin distinguir mayúsculas ni acentos), de la más nueva a la más vieja. ``cursor`` es
+        el ``next_cursor`` de la página anterior.
+        """
+        ...
+
+
+class ISearchIndex(Protocol):
+    """Mantiene al día el índice de búsqueda a medida que se crean o editan preguntas y opciones."""
+    def index_question(self, question: QuestionDTO) -> None: ...
+    def index_choices(self, choices: list[ChoiceDTO]) -> None: ...
 
 
 class IChoiceRepository(Protocol):
@@ -33,10 +61,37 @@ class IChoiceRepository(Protocol):
         """Obtiene una lista de todos los DTOs de Choice."""
         ...
 
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        """Obtiene los DTOs de los Choice de una pregunta."""
+        ...
+
+    def get_question_ids(self, choice_ids: list[int]) -> dict[int, int]:
+        """La pregunta de cada Choice de ``choice_ids`` que existe; los que no existen no aparecen."""
+        ...
+
     def update_votes(self, choice_id: int) -> int:
         """Actualiza el número de votos para un Choice específico."""
         ...
 
+    def bulk_update_votes(self, deltas: dict[int, int]) -> int:
+        """Suma ``delta`` votos a cada Choice de ``deltas`` en una sola operación."""
+        ...
+
+    def apply_vote_batch(self, source: str, batch_key: str, deltas: dict[int, int]) -> bool:
+        """
+        Aplica un lote de votos sólo si ``(source, batch_key)`` no se aplicó antes.
+        Retorna False si el lote ya estaba aplicado.
+        """
+        ...
+
+    def bulk_reset_votes(self, choice_ids: list[int]) -> int:
+        """Pone en cero los votos de los Choice indicados en una sola operación."""
+        ...
+
+    def reset_votes_by_question(self, question_ids: list[int]) -> int:
+        """Pone en cero los votos de todos los Choice de las preguntas indicadas."""
+        ...
+
     def create(self, choice: ChoiceDTO) -> ChoiceDTO:
         """
         Crea un nuevo Choice.
@@ -44,10 +99,20 @@ class IChoiceRepository(Protocol):
         """
         ...
 
+    def bulk_create(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        """
+        Crea varios Choice en una sola operación.
+        Retorna los DTOs con su ID asignado, en el mismo orden.
+        """
+        ...
+
     def update(self, choice: ChoiceDTO) -> ChoiceDTO | None:
         """
         Actualiza un Choice existente.
         Retorna el DTO del Choice actualizado.
+        Si ``choice.version`` viene, sólo aplica sobre esa versión o lanza
+        ConcurrentModificationError; los votos también cambian la versión.
+        Lanza ChoiceNotFound si no existe.
         """
         ...
 
@@ -57,6 +122,40 @@ class IChoiceRepository(Protocol):
         """
         ...
 
+    def bulk_delete(self, choice_ids: list[int]) -> int:
+        """Elimina varios Choice en una sola operación; retorna cuántos eliminó."""
+        ...
+
+
+class IVoteSeriesRecorder(Protocol):
+    """Registra votos en la serie de tiempo; puede acumularlos antes de escribir."""
+
+    def record(self, choice_id: int, at: datetime | None = None, count: int = 1) -> None: ...
+
+
+class IVoteSeriesRepository(Protocol):
+    def add_buckets(self, rows: dict[tuple[int, int], int], resolution: int) -> None:
+        """Suma votos a los intervalos ``(choice_id, bucket)`` de una resolución."""
+        ...
+
+    def get_range(self, choice_id: int, start: datetime, end: datetime, resolution: int) -> VoteSeriesDTO:
+        """
+        Serie de votos de ``start`` (incluido) a ``end`` (excluido) agrupada por
+        ``resolution``; lo ya compactado a una resolución más gruesa sale con la suya.
+        """
+        ...
+
+
+class ITaskQueue(Protocol):
+    """
+    Cola de trabajo posterior a un caso de uso (agregados, caches, notificaciones).
+    La implementación decide cuándo se despacha, p.ej. al confirmar la transacción.
+    """
+
+    def enqueue(self, name: str, payload: dict[str, Any]) -> None:
+        """Encola la tarea ``name`` con su ``payload`` serializable."""
+        ...
+
 
 class IServiceExecutor(Protocol):
     def execute(self) -> Any:
@@ -0,0 +1,35 @@
+# business_logic/search.py
+"""
+Normalización de textos y consultas de búsqueda compartida por los índices
+(FTS5, tsvector y el de memoria), para que todos entiendan igual una consulta.
+"""
+import re
+import unicodedata
+
+MAX_SEARCH_TERMS = 8
+
+_WORD = re.compile(r'\w+')
+
+
+def search_terms(text: str) -> list[str]:
+    """
+    Palabras en minúsculas y sin acentos, en el orden en que aparecen.
+
+        >>> search_terms('¿Cuál es tu canción FAVORITA?')
+        ['cual', 'es', 'tu', 'cancion', 'favorita']
+    """
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return _WORD.findall(''.join(char for char in decomposed if not unicodedata.combining(char)))
+
+
+def query_terms(query: str) -> list[str]:
+    """
+    Términos de una consulta sin repetidos; se buscan como palabras completas
+    y deben aparecer todos. No se buscan prefijos: en FTS5 un prefijo frecuente
+    obliga a juntar la lista completa de coincidencias antes de devolver la
+    primera página. Se limitan a MAX_SEARCH_TERMS para acotar el costo.
+
+        >>> query_terms('color color fav')
+        ['color', 'fav']
+    """
+    return list(dict.fromkeys(search_terms(query)))[:MAX_SEARCH_TERMS]
@@ -1,44 +1,241 @@
 # business_logic/use_cases.py
 
 # como ven nos faltan los test de integración para esta logica de negocio
-from dataclasses import dataclass
+from dataclasses import (
+    dataclass,
+    replace,
+)
+from typing import (
+    Callable,
+    TypeVar,
+)
 
 from .dtos import (
     ChoiceDTO,
     QuestionDTO,
 )
-from .exceptions import ChoiceNotFound
+from .exceptions import (
+    ChoiceNotFound,
+    ConcurrentModificationError,
+    InvalidVoteBatch,
+    QuestionNotFound,
+)
 from .interfaces import (
     IChoiceRepository,
     IQuestionRepository,
+    ISearchIndex,
     IServiceExecutor, # esta se usa aunque no se vea
+    ITaskQueue,
+    IVoteSeriesRecorder,
 )
 
+T = TypeVar('T')
+
+DEFAULT_CONFLICT_ATTEMPTS = 5
+
+
+def retry_on_conflict(operation: Callable[[], T], attempts: int = DEFAULT_CONFLICT_ATTEMPTS) -> T:
+    """
+    Ejecuta ``operation`` (que debe leer, decidir y escribir condicionado a la
+    versión leída) y la repite mientras falle por ConcurrentModificationError.
+    No se toman locks: cada intento vuelve a leer el estado actual.
+
+        >>> intentos = []
+        >>> def operacion():
+        ...     intentos.append(1)
+        ...     if len(intentos) < 3:
+        ...         raise ConcurrentModificationError('cambió')
+        ...     return 'listo'
+        >>> retry_on_conflict(operacion), len(intentos)
+        ('listo', 3)
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except ConcurrentModificationError:
+            if attempt == attempts:
+                raise
+    raise ValueError('attempts debe ser al menos 1')
+
 
 @dataclass
 class CreateQuestion:
     question_repository: IQuestionRepository
     question: QuestionDTO
+    search_index: ISearchIndex | None = None
     
     def execute(self) -> QuestionDTO:
-        return self.question_repository.create(self.question)
+        question = self.question_repository.create(self.question)
+        if self.search_index is not None:
+            self.search_index.index_question(question)
+        return question
 
 
 @dataclass
 class CreateChoice:
     choice_repository: IChoiceRepository
     choice_data: ChoiceDTO
+    search_index: ISearchIndex | None = None
 
     def execute(self) -> ChoiceDTO:
-        return self.choice_repository.create(self.choice_data)
+        choice = self.choice_repository.create(self.choice_data)
+        if self.search_index is not None:
+            self.search_index.index_choices([choice])
+        return choice
+
+
+@dataclass
+class CreateChoices:
+    choice_repository: IChoiceRepository
+    choices_data: list[ChoiceDTO]
+    search_index: ISearchIndex | None = None
+
+    def execute(self) -> list[ChoiceDTO]:
+        if not self.choices_data:
+            return []
+        choices = self.choice_repository.bulk_create(self.choices_data)
+        if self.search_index is not None:
+            self.search_index.index_choices(choices)
+        return choices
+
+
+@dataclass
+class CreateQuestionWithChoices:
+    question_repository: IQuestionRepository
+    choice_repository: IChoiceRepository
+    question: QuestionDTO
+    choice_texts: list[str]
+    search_index: ISearchIndex | None = None
+
+    def execute(self) -> tuple[QuestionDTO, list[ChoiceDTO]]:
+        question = CreateQuestion(self.question_repository, self.question, self.search_index).execute()
+        choices = [
+            ChoiceDTO(question_id=question.id, text=text)
+            for text in self.choice_texts
+        ]
+        return question, CreateChoices(self.choice_repository, choices, self.search_index).execute()
+
+
+@dataclass
+class UpdateChoice:
+    """
+    Aplica ``changes`` sobre la versión actual del Choice y la guarda de forma
+    condicional; si otro proceso (p.ej. un voto) lo modificó entre la lectura
+    y la escritura, se vuelve a leer y se reintenta.
+    """
+    choice_repository: IChoiceRepository
+    choice_id: int
+    changes: Callable[[ChoiceDTO], ChoiceDTO]
+    attempts: int = DEFAULT_CONFLICT_ATTEMPTS
+    search_index: ISearchIndex | None = None
+
+    def execute(self) -> ChoiceDTO | None:
+        choice = retry_on_conflict(self._attempt, self.attempts)
+        if self.search_index is not None and choice is not None:
+            self.search_index.index_choices([choice])
+        return choice
+
+    def _attempt(self) -> ChoiceDTO | None:
+        current = self.choice_repository.get_by_id(self.choice_id)
+        if not isinstance(current, ChoiceDTO):
+            return None
+        updated = self.changes(replace(current))
+        return self.choice_repository.update(replace(updated, id=current.id, version=current.version))
+
+
+@dataclass
+class UpdateQuestion:
+    """Igual que UpdateChoice, para el texto o la fecha de un Question."""
+    question_repository: IQuestionRepository
+    question_id: int
+    changes: Callable[[QuestionDTO], QuestionDTO]
+    attempts: int = DEFAULT_CONFLICT_ATTEMPTS
+    search_index: ISearchIndex | None = None
+
+    def execute(self) -> QuestionDTO:
+        question = retry_on_conflict(self._attempt, self.attempts)
+        if self.search_index is not None:
+            self.search_index.index_question(question)
+        return question
+
+    def _attempt(self) -> QuestionDTO:
+        current = self.question_repository.get_by_id(self.question_id)
+        updated = self.changes(replace(current))
+        return self.question_repository.update(replace(updated, id=current.id, version=current.version))
 
 
 @dataclass
 class Vote:
     choice_repository: IChoiceRepository
     choice_id: int
+    task_queue: ITaskQueue | None = None
+    vote_series: IVoteSeriesRecorder | None = None
 
     def execute(self) -> ChoiceDTO | None | ChoiceNotFound:
         choice = self.choice_repository.get_by_id(self.choice_id)
         self.choice_repository.update_votes(self.choice_id)
+        if self.vote_series is not None and choice is not None:
+            self.vote_series.record(self.choice_id)
+        if self.task_queue is not None and choice is not None:
+            # el trabajo pesado posterior al voto no forma parte de la latencia del voto
+            self.task_queue.enqueue(
+                'vote_registered',
+                {'choice_id': self.choice_id, 'question_id': choice.question_id},
+            )
         return choice
+
+
+@dataclass
+class VoteBatch:
+    """
+    Aplica de una vez los votos que un agregador juntó fuera de línea
+    (``{choice_id: votos}``), una sola vez por ``(source, upload_id)``:
+    reenviar la misma subida no vuelve a sumar. Antes de escribir revisa a
+    qué pregunta pertenece cada opción con una sola lectura; si alguna no
+    existe, es de otra pregunta que ``question_id`` (cuando viene) o de una
+    pregunta cerrada, lanza InvalidVoteBatch y no aplica nada.
+
+    Retorna False si la subida ya estaba aplicada.
+    """
+    choice_repository: IChoiceRepository
+    question_repository: IQuestionRepository
+    source: str
+    upload_id: str
+    deltas: dict[int, int]
+    question_id: int | None = None
+    task_queue: ITaskQueue | None = None
+    vote_series: IVoteSeriesRecorder | None = None
+
+    def execute(self) -> bool:
+        deltas = {choice_id: votes for choice_id, votes in self.deltas.items() if votes}
+        owners = self.choice_repository.get_question_ids(list(deltas))
+        rejected = [
+            choice_id for choice_id in deltas
+            if choice_id not in owners or self.question_id not in (None, owners[choice_id])
+        ]
+        if rejected:
+            raise InvalidVoteBatch('unknown choices or choices from another question', sorted(rejected))
+        closed = {question_id for question_id in set(owners.values()) if not self._is_open(question_id)}
+        if closed:
+            raise InvalidVoteBatch(
+                'choices from a closed poll',
+                sorted(choice_id for choice_id, question_id in owners.items() if question_id in closed),
+            )
+        if not self.choice_repository.apply_vote_batch(self.source, self.upload_id, deltas):
+            return False
+        if self.vote_series is not None:
+            for choice_id, votes in deltas.items():
+                self.vote_series.record(choice_id, count=votes)
+        if self.task_queue is not None:
+            # una tarea por subida, no una por opción: cada una es un INSERT en el outbox
+            self.task_queue.enqueue('vote_batch_applied', {
+                'votes': [[owners[choice_id], choice_id, votes] for choice_id, votes in deltas.items()],
+            })
+        return True
+
+    def _is_open(self, question_id: int) -> bool:
+        try:
+            question = self.question_repository.get_by_id(question_id)
+        except QuestionNotFound:
+            return False  # borrada después de leer sus opciones
+        return question is not None and question.status != 'closed'
@@ -1,4 +1,190 @@
 # polls/admin.py
-from django.contrib import admin
+from django.contrib import (
+    admin,
+    messages,
+)
+from django.contrib.admin import helpers
+from django.db.models import (
+    CASCADE,
+    Count,
+    OuterRef,
+    Subquery,
+    Sum,
+)
+from django.db.transaction import atomic
+from django.template.response import TemplateResponse
+from django.utils.translation import gettext_lazy as _
 
-# Register your models here.
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+
+from .container import container
+from .models import (
+    Choice,
+    Question,
+)
+from .services import (
+    create_choice_service,
+    create_question_service,
+)
+
+
+class BulkDeleteMixin:
+    """
+    Reemplaza ``delete_selected`` por un borrado con DELETE directos a través
+    del repositorio (``bulk_delete``). La confirmación sólo muestra cuántos
+    objetos se van a borrar en lugar de listar cada objeto relacionado; el
+    permiso de borrar los modelos de la cascada se sigue exigiendo como en
+    Django.
+    """
+    repository_name: str
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    def get_deleted_objects(self, objs, request):
+        # la página de borrado de un objeto tampoco recorre la cascada completa
+        deleted_objects = [str(obj) for obj in objs]
+        perms_needed = self.perms_needed(request, [obj.pk for obj in objs])
+        return deleted_objects, {self.model._meta.verbose_name_plural: len(deleted_objects)}, perms_needed, []
+
+    def perms_needed(self, request, ids: list[int]) -> set[str]:
+        """
+        Los modelos registrados en el admin que el borrado arrastra en cascada,
+        tienen filas de ``ids`` y el usuario no puede borrar (lo mismo que
+        ``perms_needed`` de Django, con un EXISTS por modelo en lugar de
+        recorrer cada objeto).
+        """
+        needed = set()
+        pending = [(self.model, 'pk')]
+        while pending:
+            model, path = pending.pop()
+            for relation in model._meta.related_objects:
+                if relation.on_delete is not CASCADE:
+                    continue
+                related, lookup = relation.related_model, f'{relation.field.name}__{path}'
+                pending.append((related, lookup))
+                model_admin = self.admin_site._registry.get(related)
+                if (
+                    model_admin is not None
+                    and not model_admin.has_delete_permission(request)
+                    and related._default_manager.filter(**{f'{lookup}__in': ids}).exists()
+                ):
+                    needed.add(related._meta.verbose_name)
+        return needed
+
+    def delete_model(self, request, obj):
+        container.resolve(self.repository_name).bulk_delete([obj.pk])
+
+    def delete_queryset(self, request, queryset):
+        container.resolve(self.repository_name).bulk_delete(list(queryset.values_list('pk', flat=True)))
+
+    def related_counts(self, ids: list[int]) -> dict:
+        return {}
+
+    @admin.action(description=_('Delete selected %(verbose_name_plural)s'), permissions=['delete'])
+    def bulk_delete_selected(self, request, queryset):
+        ids = list(queryset.values_list('pk', flat=True))
+        perms_needed = self.perms_needed(request, ids)
+        if request.POST.get('post') == 'yes' and not perms_needed:
+            with atomic():
+                deleted = container.resolve(self.repository_name).bulk_delete(ids)
+            self.message_user(request, _('%(count)d objects deleted.') % {'count': deleted}, messages.SUCCESS)
+            return None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('Are you sure?'),
+            'opts': self.model._meta,
+            'ids': ids,
+            'count': len(ids),
+            'related_counts': self.related_counts(ids),
+            'perms_lacking': perms_needed,
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+            'action': 'bulk_delete_selected',
+        }
+        return TemplateResponse(request, 'admin/polls/bulk_delete_confirmation.html', context)
+
+
+@admin.register(Question)
+class QuestionAdmin(BulkDeleteMixin, admin.ModelAdmin):
+    repository_name = 'question_repository'
+    list_display = ('question_text', 'pub_date', 'status', 'choice_count', 'total_votes')
+    list_filter = ('status', 'pub_date')
+    search_fields = ('question_text',)
+    readonly_fields = ('version', 'closed_at')
+    # evita un COUNT(*) extra sobre toda la tabla en cada página
+    show_full_result_count = False
+    actions = ['bulk_delete_selected', 'close_polls', 'reset_votes']
+
+    def get_queryset(self, request):
+        # totales de la página en la misma consulta del listado; como subconsultas
+        # (no JOIN + GROUP BY) para que el COUNT de la paginación y los filtros no las arrastren
+        choices = Choice.objects.filter(question=OuterRef('pk')).order_by().values('question')
+        return super().get_queryset(request).annotate(
+            _choice_count=Subquery(choices.annotate(total=Count('id')).values('total')),
+            _total_votes=Subquery(choices.annotate(total=Sum('votes')).values('total')),
+        )
+
+    @admin.display(description=_('Choices'), ordering='_choice_count')
+    def choice_count(self, question):
+        return question._choice_count or 0
+
+    @admin.display(description=_('Votes'), ordering='_total_votes')
+    def total_votes(self, question):
+        return question._total_votes or 0
+
+    def related_counts(self, ids):
+        return {Choice._meta.verbose_name_plural: Choice.objects.filter(question_id__in=ids).count()}
+
+    def get_readonly_fields(self, request, obj=None):
+        # las preguntas nuevas empiezan abiertas; se cierran con la acción close_polls
+        return self.readonly_fields if obj is not None else (*self.readonly_fields, 'status')
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        # el alta pasa por el caso de uso: id del IdAllocator con sharding y documento de búsqueda
+        question = create_question_service(QuestionDTO(question_text=obj.question_text, pub_date=obj.pub_date)).execute()
+        obj.pk, obj.status, obj.version = question.id, question.status, question.version
+
+    @admin.action(description=_('Close selected polls'), permissions=['change'])
+    def close_polls(self, request, queryset):
+        closed = container.resolve('question_repository').bulk_close(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, _('%(count)d polls closed.') % {'count': closed}, messages.SUCCESS)
+
+    @admin.action(description=_('Reset votes of selected polls'), permissions=['change'])
+    def reset_votes(self, request, queryset):
+        reset = container.resolve('choice_repository').reset_votes_by_question(
+            list(queryset.values_list('pk', flat=True))
+        )
+        self.message_user(request, _('Votes reset on %(count)d choices.') % {'count': reset}, messages.SUCCESS)
+
+
+@admin.register(Choice)
+class ChoiceAdmin(BulkDeleteMixin, admin.ModelAdmin):
+    repository_name = 'choice_repository'
+    list_display = ('choice_text', 'question', 'votes')
+    list_select_related = ('question',)
+    raw_id_fields = ('question',)
+    search_fields = ('choice_text', 'question__question_text')
+    readonly_fields = ('version',)
+    show_full_result_count = False
+    actions = ['bulk_delete_selected', 'reset_votes']
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        # el alta pasa por el caso de uso: id del IdAllocator y ChoiceLocation con sharding, y reindexado
+        choice = create_choice_service(
+            ChoiceDTO(text=obj.choice_text, question_id=obj.question_id, votes=obj.votes)
+        ).execute()
+        obj.pk, obj.version = choice.id, choice.version
+
+    @admin.action(description=_('Reset votes of selected choices'), permissions=['change'])
+    def reset_votes(self, request, queryset):
+        reset = container.resolve('choice_repository').bulk_reset_votes(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, _('Votes reset on %(count)d choices.') % {'count': reset}, messages.SUCCESS)
@@ -1,15 +1,62 @@
 # polls/choice_service.py
+from dataclasses import dataclass
 from typing import Any
 
-from django.db.models import F
-from .models import Choice
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    IntegrityError,
+    connections,
+    transaction,
+)
+from django.db.models import (
+    Case,
+    F,
+    Value,
+    When,
+)
+from .models import (
+    AppliedVoteBatch,
+    ArchivedChoice,
+    Choice,
+    VoteBucket,
+)
 
 from business_logic.dtos import ChoiceDTO
-from business_logic.exceptions import ChoiceNotFound, ChoiceDataError
-from business_logic.use_cases import CreateChoice, Vote
+from business_logic.exceptions import (
+    ChoiceDataError,
+    ChoiceNotFound,
+    ConcurrentModificationError,
+)
 
+# las fábricas viven en services.py, se reexportan aquí por compatibilidad
+from .services import create_choice_service, update_choice_service, vote_service  # noqa: F401
 
+BULK_VOTES_BATCH_SIZE = 300 # sqlite limita el número de parámetros por consulta
+KNOWN_CHOICES = 100_000  # ids de opciones que recuerda cada decorador en choice_exists
+
+
+def chunked(ids, size: int = BULK_VOTES_BATCH_SIZE):
+    """
+        >>> list(chunked([1, 2, 3, 4, 5], 2))
+        [[1, 2], [3, 4], [5]]
+    """
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+@dataclass
 class DjangoChoiceRepository:
+    # alias de la base; polls/sharding.py usa uno por shard
+    using: str = DEFAULT_DB_ALIAS
+    search_index: Any = None
+
+    def __post_init__(self):
+        if self.search_index is None:
+            # polls/search.py importa chunked de este módulo
+            from .search import DjangoSearchIndex
+            self.search_index = DjangoSearchIndex(self.using)
+
     def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
         """Obtiene un DTO de un Choice por su ID.
             
@@ -34,14 +81,16 @@ class DjangoChoiceRepository:
             >>> assert result is None
         """
         try:
-            # Traer los datos directamente como un diccionario
-            choice = (
-                Choice.objects.filter(id=choice_id)
-                .annotate(text=F('choice_text'))
-                .values('id', 'text', 'votes', 'question_id').first()
-            )
-            if choice:
-                return ChoiceDTO(**choice)
+            # Traer los datos directamente como un diccionario; si no está en la
+            # tabla caliente puede ser de una pregunta archivada
+            for model in (Choice, ArchivedChoice):
+                choice = (
+                    model.objects.using(self.using).filter(id=choice_id)
+                    .annotate(text=F('choice_text'))
+                    .values('id', 'text', 'votes', 'question_id', 'version').first()
+                )
+                if choice:
+                    return ChoiceDTO(**choice)
             return None
         except Choice.DoesNotExist:
             raise ChoiceNotFound(f"El 'Choice' con ID {choice_id} no existe.")
@@ -71,12 +120,53 @@ class DjangoChoiceRepository:
         """
         # Se obtienen todos los objetos Choice y se transforman en una lista de DTOs
         choices = (
-            Choice.objects.all()
+            Choice.objects.using(self.using).all()
             .annotate(text=F('choice_text'))
-            .values('id', 'text', 'votes', 'question_id')
+            .values('id', 'text', 'votes', 'question_id', 'version')
         )
         return [ChoiceDTO(**choice) for choice in choices]
 
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        """Obtiene los DTOs de los Choice de una pregunta en una sola consulta.
+
+        >>> from polls.models import Choice, Question
+        >>> from django.utils.timezone import now
+        >>> question = Question.objects.create(question_text="¿Frío o calor?", pub_date=now())
+        >>> _ = Choice.objects.create(question=question, choice_text="frío", votes=2)
+        >>> _ = Choice.objects.create(question=question, choice_text="calor", votes=3)
+        >>> repo = DjangoChoiceRepository()
+        >>> [(dto.text, dto.votes) for dto in repo.get_by_question(question.id)]
+        [('frío', 2), ('calor', 3)]
+        """
+        for model in (Choice, ArchivedChoice):
+            choices = list(
+                model.objects.using(self.using).filter(question_id=question_id)
+                .annotate(text=F('choice_text'))
+                .values('id', 'text', 'votes', 'question_id', 'version')
+                .order_by('id')
+            )
+            if choices:
+                break
+        return [ChoiceDTO(**choice) for choice in choices]
+
+    def get_question_ids(self, choice_ids: list[int]) -> dict[int, int]:
+        """
+        La pregunta de cada opción que existe, con una consulta por lote de ids.
+
+            >>> from django.utils.timezone import now
+            >>> from .models import Question
+            >>> question = Question.objects.create(question_text="¿Día o noche?", pub_date=now())
+            >>> dia = Choice.objects.create(question=question, choice_text='día')
+            >>> DjangoChoiceRepository().get_question_ids([dia.id, 999999]) == {dia.id: question.id}
+            True
+        """
+        question_ids: dict[int, int] = {}
+        for batch in chunked(choice_ids):
+            question_ids.update(
+                Choice.objects.using(self.using).filter(id__in=batch).values_list('id', 'question_id')
+            )
+        return question_ids
+
     def update_votes(self, choice_id: int) -> int:
         """
         Incrementa el contador de votos de una opción.
@@ -97,9 +187,98 @@ class DjangoChoiceRepository:
             >>> assert choice.votes == votes + 1
         """
         # Lógica para actualizar los votos directamente en la base de datos
-        rows_affected = Choice.objects.filter(id=choice_id).update(votes=F('votes') + 1)
+        rows_affected = Choice.objects.using(self.using).filter(id=choice_id).update(
+            votes=F('votes') + 1,
+            version=F('version') + 1,
+        )
+        return rows_affected
+
+    def bulk_update_votes(self, deltas: dict[int, int]) -> int:
+        """
+        Suma votos a varias opciones con un UPDATE ... CASE por lote.
+
+            >>> from django.utils.timezone import now
+            >>> from .models import Question
+            >>> question = Question.objects.create(question_text="¿Té o café?", pub_date=now())
+            >>> te = Choice.objects.create(question=question, choice_text='té', votes=1)
+            >>> cafe = Choice.objects.create(question=question, choice_text='café')
+            >>> repo = DjangoChoiceRepository()
+            >>> repo.bulk_update_votes({te.id: 2, cafe.id: 5, 999999: 1})
+            2
+            >>> te.refresh_from_db(); cafe.refresh_from_db()
+            >>> (te.votes, cafe.votes)
+            (3, 5)
+        """
+        rows_affected = 0
+        items = [(choice_id, delta) for choice_id, delta in deltas.items() if delta]
+        for start in range(0, len(items), BULK_VOTES_BATCH_SIZE):
+            batch = items[start:start + BULK_VOTES_BATCH_SIZE]
+            rows_affected += (
+                Choice.objects.using(self.using)
+                .filter(id__in=[choice_id for choice_id, _ in batch])
+                .update(
+                    votes=Case(
+                        *(When(id=choice_id, then=F('votes') + Value(delta)) for choice_id, delta in batch),
+                        default=F('votes'),
+                    ),
+                    version=F('version') + 1,
+                )
+            )
         return rows_affected
 
+    def apply_vote_batch(self, source: str, batch_key: str, deltas: dict[int, int]) -> bool:
+        """
+        Aplica un lote de votos una sola vez por ``(source, batch_key)``.
+
+            >>> from django.utils.timezone import now
+            >>> from .models import Question
+            >>> question = Question.objects.create(question_text="¿Mar o montaña?", pub_date=now())
+            >>> mar = Choice.objects.create(question=question, choice_text='mar')
+            >>> repo = DjangoChoiceRepository()
+            >>> repo.apply_vote_batch('doctest', '1', {mar.id: 4})
+            True
+            >>> repo.apply_vote_batch('doctest', '1', {mar.id: 4})
+            False
+            >>> mar.refresh_from_db()
+            >>> mar.votes
+            4
+        """
+        try:
+            with transaction.atomic(using=self.using):
+                AppliedVoteBatch.objects.using(self.using).create(source=source, batch_key=batch_key)
+                self.bulk_update_votes(deltas)
+        except IntegrityError:
+            return False
+        return True
+
+    def bulk_reset_votes(self, choice_ids: list[int]) -> int:
+        """
+        Pone en cero los votos de varias opciones con un UPDATE por lote.
+
+            >>> from django.utils.timezone import now
+            >>> from .models import Question
+            >>> question = Question.objects.create(question_text="¿Sol o luna?", pub_date=now())
+            >>> sol = Choice.objects.create(question=question, choice_text='sol', votes=4)
+            >>> DjangoChoiceRepository().bulk_reset_votes([sol.id])
+            1
+            >>> sol.refresh_from_db()
+            >>> sol.votes
+            0
+        """
+        with transaction.atomic(using=self.using):
+            return sum(
+                Choice.objects.using(self.using).filter(id__in=batch).update(votes=0, version=F('version') + 1)
+                for batch in chunked(choice_ids)
+            )
+
+    def reset_votes_by_question(self, question_ids: list[int]) -> int:
+        """Pone en cero los votos de todas las opciones de las preguntas indicadas."""
+        with transaction.atomic(using=self.using):
+            return sum(
+                Choice.objects.using(self.using).filter(question_id__in=batch).update(votes=0, version=F('version') + 1)
+                for batch in chunked(question_ids)
+            )
+
     def create(self, choice: ChoiceDTO) -> ChoiceDTO:
         """
         Persiste una opción en la base de datos.
@@ -115,18 +294,54 @@ class DjangoChoiceRepository:
         """
         if not choice.question_id:
             raise ChoiceDataError() # esto no debería pasar por la validación del DTO, pero mypy no perdona
-        new_choice = Choice.objects.create(
+        new_choice = Choice.objects.using(self.using).create(
+            id=choice.id,  # None salvo con sharding, donde lo asigna polls/sharding.py
             question_id=choice.question_id,
             choice_text=choice.text,
             votes=choice.votes or 0
         )
         # Aquí creas y retornas la instancia del DTO con el ID generado por la base de datos
         choice.id = new_choice.id
+        choice.version = new_choice.version
         return choice
 
+    def bulk_create(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        """
+        Persiste varias opciones con un solo INSERT (``bulk_create``).
+
+            >>> from django.utils.timezone import now
+            >>> from .models import Question
+            >>> question = Question.objects.create(question_text="¿Qué fruta?", pub_date=now())
+            >>> repo = DjangoChoiceRepository()
+            >>> created = repo.bulk_create([
+            ...     ChoiceDTO(question_id=question.id, text='pera'),
+            ...     ChoiceDTO(question_id=question.id, text='uva'),
+            ... ])
+            >>> [(dto.text, dto.id is not None) for dto in created]
+            [('pera', True), ('uva', True)]
+        """
+        if any(not choice.question_id for choice in choices):
+            raise ChoiceDataError('es necesario el campo question_id para la creacion de un Choice')
+        new_choices = Choice.objects.using(self.using).bulk_create(
+            Choice(
+                id=choice.id,
+                question_id=choice.question_id,
+                choice_text=choice.text,
+                votes=choice.votes or 0,
+            )
+            for choice in choices
+        )
+        for choice, new_choice in zip(choices, new_choices):
+            choice.id = new_choice.id
+            choice.version = new_choice.version
+        return choices
+
     def update(self, choice: ChoiceDTO) -> ChoiceDTO | None:
         """
-        Actualiza una opción en la base de datos.
+        Actualiza una opción en la base de datos. Si el DTO trae ``version``, la
+        escritura sólo aplica sobre esa versión (``WHERE version = ?``) y lanza
+        ``ConcurrentModificationError`` si alguien la cambió mientras tanto,
+        p.ej. un voto.
 
             >>> from django.utils.timezone import now
             >>> from .models import Question
@@ -138,6 +353,15 @@ class DjangoChoiceRepository:
             >>> dto_choice = ChoiceDTO(id=choice.id, text='sí, lo vamos a hacer')
             >>> updated_choice = repo.update(dto_choice)
             >>> assert updated_choice.id is not None
+
+            # una edición leída antes de un voto ya no aplica
+            >>> leida = repo.get_by_id(choice.id)
+            >>> _ = repo.update_votes(choice.id)
+            >>> try:
+            ...     repo.update(ChoiceDTO(id=choice.id, text='quizás', votes=0, version=leida.version))
+            ... except ConcurrentModificationError as err:
+            ...     err.current_version == leida.version + 1
+            True
         """
         if choice.id is None:
             return None
@@ -146,21 +370,30 @@ class DjangoChoiceRepository:
             data_not_null_for_update.update(choice_text=choice.text)
         if choice.votes is not None:
             data_not_null_for_update.update(votes=choice.votes)
-        rows_affected = Choice.objects.filter(id=choice.id).update(
-            **data_not_null_for_update
+        queryset = Choice.objects.using(self.using).filter(id=choice.id)
+        if choice.version is not None:
+            queryset = queryset.filter(version=choice.version)
+        rows_affected = queryset.update(
+            **data_not_null_for_update,
+            version=F('version') + 1,
         )
         if rows_affected > 0:
             # Aquí creas y retornas la instancia del DTO con la información actualizada.
-            django_choice = Choice.objects.get(id=choice.id)
+            django_choice = Choice.objects.using(self.using).get(id=choice.id)
             return ChoiceDTO(
                 id=choice.id,
-                question_id=django_choice.id,
+                question_id=django_choice.question_id,
                 text=django_choice.choice_text,
-                votes=django_choice.votes
+                votes=django_choice.votes,
+                version=django_choice.version,
+            )
+        current_version = Choice.objects.using(self.using).filter(id=choice.id).values_list('version', flat=True).first()
+        if current_version is not None:
+            raise ConcurrentModificationError(
+                f"El 'Choice' {choice.id} cambió: versión {current_version}, se esperaba {choice.version}.",
+                current_version=current_version,
             )
-        else:
-            # Manejar el caso de que el objeto no exista
-            raise Choice.DoesNotExist
+        raise ChoiceNotFound(f"El 'Choice' con ID {choice.id} no existe.")
 
     def delete(self, choice_id: int) -> None:
         """
@@ -179,14 +412,100 @@ class DjangoChoiceRepository:
 
             >>> assert not Choice.objects.filter(id=choice_instance.id).exists()
         """
-        Choice.objects.filter(id=choice_id).delete()
+        with transaction.atomic(using=self.using):
+            question_ids = self.get_question_ids([choice_id]).values()
+            Choice.objects.using(self.using).filter(id=choice_id).delete()
+            self.search_index.reindex(question_ids)
+
+    def bulk_delete(self, choice_ids: list[int]) -> int:
+        """
+        Borra varias opciones con DELETE directos, sin cargar cada objeto como
+        hace el borrado en cascada del ORM, y reindexa sus preguntas. Retorna
+        cuántas opciones borró.
+
+            >>> from django.utils.timezone import now
+            >>> from .models import Question
+            >>> question = Question.objects.create(question_text="¿Norte o sur?", pub_date=now())
+            >>> norte = Choice.objects.create(question=question, choice_text='norte')
+            >>> DjangoChoiceRepository().bulk_delete([norte.id, 999999])
+            1
+            >>> Choice.objects.filter(id=norte.id).exists()
+            False
+        """
+        deleted = 0
+        with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+            question_ids = set(self.get_question_ids(choice_ids).values())
+            for batch in chunked(choice_ids):
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(f'DELETE FROM {VoteBucket._meta.db_table} WHERE choice_id IN ({placeholders})', batch)
+                cursor.execute(f'DELETE FROM {Choice._meta.db_table} WHERE id IN ({placeholders})', batch)
+                deleted += cursor.rowcount
+            self.search_index.reindex(question_ids)
+        return deleted
 
 
-def create_choice_service(choice_data: ChoiceDTO) -> CreateChoice:
-    choice_repository = DjangoChoiceRepository()
-    return CreateChoice(choice_repository=choice_repository, choice_data=choice_data)
+class ChoiceRepositoryDecorator:
+    """
+    Base para repositorios que sólo cambian parte del comportamiento (p.ej. el
+    conteo de votos) y delegan el resto en otro IChoiceRepository.
+    """
 
+    def __init__(self, repository=None):
+        self.repository = repository if repository is not None else DjangoChoiceRepository()
+        self._known_choice_ids: set[int] = set()
+
+    def choice_exists(self, choice_id: int) -> bool:
+        """
+        Para los decoradores que cuentan votos fuera de la base: consulta una
+        vez por opción y recuerda las que existen.
+        """
+        if choice_id in self._known_choice_ids:
+            return True
+        if self.repository.get_by_id(choice_id) is None:
+            return False
+        if len(self._known_choice_ids) >= KNOWN_CHOICES:
+            self._known_choice_ids.clear()
+        self._known_choice_ids.add(choice_id)
+        return True
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
+        return self.repository.get_by_id(choice_id)
+
+    def get_all(self) -> list[ChoiceDTO]:
+        return self.repository.get_all()
+
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        return self.repository.get_by_question(question_id)
+
+    def get_question_ids(self, choice_ids: list[int]) -> dict[int, int]:
+        return self.repository.get_question_ids(choice_ids)
+
+    def update_votes(self, choice_id: int) -> int:
+        return self.repository.update_votes(choice_id)
+
+    def bulk_update_votes(self, deltas: dict[int, int]) -> int:
+        return self.repository.bulk_update_votes(deltas)
+
+    def apply_vote_batch(self, source: str, batch_key: str, deltas: dict[int, int]) -> bool:
+        return self.repository.apply_vote_batch(source, batch_key, deltas)
+
+    def create(self, choice: ChoiceDTO) -> ChoiceDTO:
+        return self.repository.create(choice)
+
+    def bulk_create(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        return self.repository.bulk_create(choices)
+
+    def update(self, choice: ChoiceDTO) -> ChoiceDTO | None:
+        return self.repository.update(choice)
+
+    def bulk_reset_votes(self, choice_ids: list[int]) -> int:
+        return self.repository.bulk_reset_votes(choice_ids)
+
+    def reset_votes_by_question(self, question_ids: list[int]) -> int:
+        return self.repository.reset_votes_by_question(question_ids)
+
+    def delete(self, choice_id: int) -> None:
+        self.repository.delete(choice_id)
 
-def vote_service(choice_id: int) -> Vote:
-    choice_repository = DjangoChoiceRepository()
-    return Vote(choice_repository=choice_repository, choice_id=choice_id)
+    def bulk_delete(self, choice_ids: list[int]) -> int:
+        return self.repository.bulk_delete(choice_ids)
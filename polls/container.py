@@ -0,0 +1,94 @@
+# polls/container.py
+import threading
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+Provider = str | Callable[[], Any]
+
+DEFAULT_PROVIDERS: dict[str, Provider] = {
+    # comparten las lecturas concurrentes de la misma pregunta (ver polls/single_flight.py)
+    'question_repository': 'polls.single_flight.SingleFlightQuestionRepository',
+    'choice_repository': 'polls.single_flight.SingleFlightChoiceRepository',
+    # el repositorio que usa vote_service, separado para poder cambiar sólo el conteo de votos
+    'vote_repository': 'polls.choice_service.DjangoChoiceRepository',
+    'task_queue': 'polls.tasks.DjangoTaskQueue',
+    'vote_series': 'polls.vote_series.BufferedVoteSeriesWriter',
+    'search_index': 'polls.search.DjangoSearchIndex',
+}
+
+
+class Container:
+    """
+    Contenedor de dependencias mínimo: cada nombre se construye de forma
+    perezosa una sola vez por proceso, a partir de una ruta de importación o
+    de un callable. Los proveedores se cambian por entorno en
+    ``settings.POLLS_PROVIDERS`` sin tocar a quienes los usan.
+
+        >>> container = Container({'lista': list})
+        >>> container.resolve('lista') is container.resolve('lista')
+        True
+        >>> with container.override('lista', lambda: ['otra']):
+        ...     container.resolve('lista')
+        ['otra']
+        >>> container.resolve('lista')
+        []
+    """
+
+    def __init__(self, providers: dict[str, Provider]):
+        self._providers = dict(providers)
+        self._instances: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, name: str) -> Any:
+        try:
+            return self._instances[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._instances:
+                provider = self._providers[name]
+                factory = import_string(provider) if isinstance(provider, str) else provider
+                self._instances[name] = factory()
+            return self._instances[name]
+
+    def register(self, name: str, provider: Provider) -> None:
+        with self._lock:
+            self._providers[name] = provider
+            self._instances.pop(name, None)
+
+    def reset(self) -> None:
+        """Descarta las instancias construidas, cerrando las que tengan ``close()``."""
+        with self._lock:
+            instances, self._instances = self._instances, {}
+        for instance in instances.values():
+            close = getattr(instance, 'close', None)
+            if callable(close):
+                close()
+
+    @contextmanager
+    def override(self, name: str, provider: Provider):
+        """Cambia temporalmente un proveedor, útil en pruebas."""
+        with self._lock:
+            previous_provider = self._providers.get(name)
+            previous_instance = self._instances.pop(name, None)
+            self._providers[name] = provider
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._instances.pop(name, None)
+                if previous_provider is None:
+                    self._providers.pop(name, None)
+                else:
+                    self._providers[name] = previous_provider
+                if previous_instance is not None:
+                    self._instances[name] = previous_instance
+
+
+container = Container({**DEFAULT_PROVIDERS, **getattr(settings, 'POLLS_PROVIDERS', {})})
@@ -2,11 +2,12 @@
 from django import forms
 from django.utils.translation import gettext_lazy as _
 
-from .choice_service import vote_service
+from business_logic.dtos import QuestionDTO
+
 from .models import Question
-from .question_service import (
+from .services import (
     create_question_service,
-    QuestionDTO,
+    vote_service,
 )
 
 
@@ -73,6 +74,12 @@ class FormAnswers(ExtendFormContextMixin, PostInitFormMixin, forms.ModelForm):
             self.fields['choice_text'].label = question.question_text
             self.fields['choice_text'].queryset = question.choice_set.all()
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.context['view'].get_object().status != Question.OPEN:
+            raise forms.ValidationError(_('This poll is closed.'))
+        return cleaned_data
+
     def save(self, commit=True):
         choice = self.cleaned_data['choice_text']
         _vote_service = vote_service(choice.id)
@@ -0,0 +1,338 @@
+# polls/kv_votes.py
+import fcntl
+import logging
+import os
+import secrets
+import struct
+import threading
+from array import array
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+
+from django.conf import settings
+
+from business_logic.dtos import ChoiceDTO
+from business_logic.exceptions import ChoiceNotFound
+
+from .choice_service import ChoiceRepositoryDecorator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KV_VOTES: dict = {
+    'PATH': None,                      # por defecto BASE_DIR / 'kv_votes'
+    'FSYNC': False,                    # True: fsync por voto, sobrevive a una caída del sistema
+    'COMPACT_BYTES': 64 * 1024 * 1024, # tamaño del log a partir del cual se hace un snapshot
+}
+
+# snapshot: magic, generation, número de pares, generación en vuelo, número de pares en
+# vuelo; luego los pares (choice_id, votes) y los pares en vuelo
+SNAPSHOT_MAGIC = b'POLLSKV2'
+SNAPSHOT_HEADER = struct.Struct('<8sqqqq')
+# los snapshots de antes de separar los votos en vuelo: magic, generation, número de pares
+SNAPSHOT_MAGIC_V1 = b'POLLSKV1'
+SNAPSHOT_HEADER_V1 = struct.Struct('<8sqq')
+# cada registro del log: choice_id, delta
+RECORD = struct.Struct('<qq')
+
+
+def kv_votes_settings() -> dict:
+    return {**DEFAULT_KV_VOTES, **getattr(settings, 'POLLS_KV_VOTES', {})}
+
+
+class KeyValueVoteStore:
+    """
+    Almacén clave-valor de votos por choice_id: un snapshot con los conteos
+    absolutos más un log de sólo-agregar con registros ``(choice_id, delta)``
+    de tamaño fijo. Abrir el almacén (o recuperarse de una caída) es cargar el
+    snapshot y reproducir el log encima.
+
+    Varios procesos pueden compartir el directorio: escriben al log con
+    ``O_APPEND`` bajo un lock compartido, y cada lectura primero alcanza lo que
+    los demás agregaron desde la última vez. La compactación toma el lock
+    exclusivo, escribe un snapshot de la siguiente generación y empieza un log
+    vacío.
+
+    ``drain`` aparta los conteos como "en vuelo" en el snapshot antes de
+    entregarlos, igual que polls/shared_counters.py: si el proceso muere a la
+    mitad, el siguiente ``drain`` los reentrega con la misma clave de lote, y
+    los votos nuevos quedan en otra generación, con otra clave.
+
+        >>> import shutil, tempfile
+        >>> path = tempfile.mkdtemp()
+        >>> store = KeyValueVoteStore(path)
+        >>> store.increment(7); store.increment(7); store.increment(8, 5)
+        >>> other = KeyValueVoteStore(path)  # otro proceso, o después de una caída
+        >>> other.get_many([7, 8, 9])
+        {7: 2, 8: 5, 9: 0}
+        >>> other.close()
+        >>> store.compact()
+        1
+        >>> store.increment(7)
+        >>> reopened = KeyValueVoteStore(path)
+        >>> reopened.get(7)
+        3
+        >>> store.close(); reopened.close(); shutil.rmtree(path)
+    """
+
+    def __init__(self, path: str | os.PathLike, fsync: bool = False, compact_bytes: int | None = None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.compact_bytes = compact_bytes
+        self.snapshot_path = self.path / 'snapshot'
+        self.store_id = self._read_store_id()
+        self._lock = threading.RLock()
+        self._lock_fd = os.open(self.path / 'lock', os.O_RDWR | os.O_CREAT, 0o600)
+        self._log_fd: int | None = None
+        self._snapshot_stat: tuple[int, int] | None = None
+        self._generation = 0
+        self._offset = 0
+        self._counts: dict[int, int] = {}
+        self._inflight: dict[int, int] = {}
+        self._inflight_generation = 0
+
+    def _read_store_id(self) -> str:
+        # distingue este directorio de otro recreado en la misma ruta, para las claves de lote
+        id_path = self.path / 'store_id'
+        if not id_path.exists():
+            temporary = self.path / f'store_id.{os.getpid()}.tmp'
+            temporary.write_text(secrets.token_hex(8))
+            try:
+                os.link(temporary, id_path)  # si dos procesos compiten, gana el primero
+            except FileExistsError:
+                pass
+            finally:
+                temporary.unlink()
+        return id_path.read_text()
+
+    def _log_path(self, generation: int) -> Path:
+        return self.path / f'votes-{generation:08d}.log'
+
+    @contextmanager
+    def _file_lock(self, operation: int):
+        with self._lock:
+            fcntl.flock(self._lock_fd, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    # -- lectura y recuperación --------------------------------------------
+
+    def _load_snapshot(self) -> None:
+        try:
+            data = self.snapshot_path.read_bytes()
+        except FileNotFoundError:
+            data = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, 0, 0, 0, 0)
+        if data[:8] == SNAPSHOT_MAGIC_V1:
+            _, generation, length = SNAPSHOT_HEADER_V1.unpack_from(data)
+            start, inflight_generation, inflight_length = SNAPSHOT_HEADER_V1.size, 0, 0
+        elif data[:8] == SNAPSHOT_MAGIC:
+            _, generation, length, inflight_generation, inflight_length = SNAPSHOT_HEADER.unpack_from(data)
+            start = SNAPSHOT_HEADER.size
+        else:
+            raise RuntimeError(f'{self.snapshot_path} no es un snapshot de votos')
+        pairs = array('q')
+        pairs.frombytes(data[start:start + (length + inflight_length) * 16])
+        counts, inflight = pairs[:length * 2], pairs[length * 2:]
+        self._counts = dict(zip(counts[::2], counts[1::2]))
+        self._inflight = dict(zip(inflight[::2], inflight[1::2]))
+        self._inflight_generation = inflight_generation
+        self._generation = generation
+        self._offset = 0
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+        self._log_fd = os.open(self._log_path(generation), os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o600)
+
+    def _refresh(self) -> None:
+        """Carga el snapshot si cambió y reproduce el log desde donde se quedó este proceso."""
+        try:
+            stat = os.stat(self.snapshot_path)
+            snapshot_stat = (stat.st_ino, stat.st_mtime_ns)
+        except FileNotFoundError:
+            snapshot_stat = None
+        if self._log_fd is None or snapshot_stat != self._snapshot_stat:
+            self._load_snapshot()
+            self._snapshot_stat = snapshot_stat
+        size = os.fstat(self._log_fd).st_size
+        # un registro a medio escribir (caída del sistema) se ignora
+        end = size - (size - self._offset) % RECORD.size
+        if end <= self._offset:
+            return
+        records = array('q')
+        records.frombytes(os.pread(self._log_fd, end - self._offset, self._offset))
+        counts = self._counts
+        for choice_id, delta in zip(records[::2], records[1::2]):
+            counts[choice_id] = counts.get(choice_id, 0) + delta
+        self._offset = end
+
+    def get(self, choice_id: int) -> int:
+        """Votos aún no entregados a la base de datos (pendientes más en vuelo)."""
+        with self._file_lock(fcntl.LOCK_SH):
+            self._refresh()
+            return self._counts.get(choice_id, 0) + self._inflight.get(choice_id, 0)
+
+    def get_many(self, choice_ids) -> dict[int, int]:
+        with self._file_lock(fcntl.LOCK_SH):
+            self._refresh()
+            return {
+                choice_id: self._counts.get(choice_id, 0) + self._inflight.get(choice_id, 0)
+                for choice_id in choice_ids
+            }
+
+    # -- escritura ---------------------------------------------------------
+
+    def increment(self, choice_id: int, delta: int = 1) -> None:
+        with self._file_lock(fcntl.LOCK_SH):
+            if self._log_fd is None or self._snapshot_changed():
+                self._refresh()
+            os.write(self._log_fd, RECORD.pack(choice_id, delta))
+            if self.fsync:
+                os.fsync(self._log_fd)
+            log_size = os.fstat(self._log_fd).st_size if self.compact_bytes else 0
+        if self.compact_bytes and log_size >= self.compact_bytes:
+            self.compact(blocking=False)
+
+    def _snapshot_changed(self) -> bool:
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return self._snapshot_stat is not None
+        return (stat.st_ino, stat.st_mtime_ns) != self._snapshot_stat
+
+    # -- compactación --------------------------------------------------------
+
+    def _write_snapshot(self, generation: int, counts: dict[int, int],
+                        inflight: dict[int, int], inflight_generation: int) -> None:
+        pairs, inflight_pairs = array('q'), array('q')
+        for choice_id, votes in counts.items():
+            if votes:
+                pairs.extend((choice_id, votes))
+        for choice_id, votes in inflight.items():
+            inflight_pairs.extend((choice_id, votes))
+        # el log nuevo existe antes de que el snapshot que lo nombra sea visible
+        os.close(os.open(self._log_path(generation), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600))
+        temporary = self.snapshot_path.with_suffix('.tmp')
+        with open(temporary, 'wb') as snapshot:
+            snapshot.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, generation, len(pairs) // 2, inflight_generation, len(inflight_pairs) // 2,
+            ))
+            snapshot.write(pairs.tobytes())
+            snapshot.write(inflight_pairs.tobytes())
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temporary, self.snapshot_path)
+        directory = os.open(self.path, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        for old_log in self.path.glob('votes-*.log'):
+            if old_log != self._log_path(generation):
+                old_log.unlink(missing_ok=True)
+
+    def compact(self, blocking: bool = True) -> int:
+        """
+        Escribe un snapshot con los conteos actuales y empieza un log vacío.
+        Retorna la nueva generación, o 0 si otro proceso está compactando.
+        """
+        operation = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            with self._file_lock(operation):
+                self._refresh()
+                self._write_snapshot(self._generation + 1, self._counts, self._inflight, self._inflight_generation)
+                self._refresh()
+                return self._generation
+        except BlockingIOError:
+            return 0
+
+    def drain(self, apply) -> int:
+        """
+        Entrega los conteos a ``apply(deltas, batch_key)``, que debe ser
+        idempotente por clave y retornar False si la clave ya estaba aplicada,
+        y deja el almacén en cero. Primero reentrega el lote en vuelo de un
+        ``drain`` que no terminó. Retorna los votos que ``apply`` aplicó.
+        """
+        with self._file_lock(fcntl.LOCK_EX):
+            self._refresh()
+            applied = 0
+            if self._inflight:
+                applied += self._apply_inflight(apply)
+            deltas = {choice_id: votes for choice_id, votes in self._counts.items() if votes}
+            if deltas:
+                # la generación siguiente queda escrita, con el lote en vuelo, antes de entregarlo
+                self._write_snapshot(self._generation + 1, {}, deltas, self._generation)
+                self._refresh()
+                applied += self._apply_inflight(apply)
+            return applied
+
+    def _apply_inflight(self, apply) -> int:
+        deltas = dict(self._inflight)
+        applied = apply(deltas, f'{self.store_id}:{self._inflight_generation}')
+        self._write_snapshot(self._generation + 1, self._counts, {}, 0)
+        self._refresh()
+        return sum(deltas.values()) if applied else 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+
+class KeyValueChoiceRepository(ChoiceRepositoryDecorator):
+    """
+    IChoiceRepository que cuenta los votos en un KeyValueVoteStore local; el
+    texto y la pregunta de cada opción siguen en Django. Los votos que se leen
+    son los de la columna ``votes`` más los del almacén.
+    Se activa con ``POLLS_PROVIDERS['vote_repository']``; ``manage.py
+    kv_votes --export`` pasa los conteos a la base de datos.
+    """
+
+    def __init__(self, repository=None, store: KeyValueVoteStore | None = None):
+        super().__init__(repository)
+        if store is None:
+            config = kv_votes_settings()
+            store = KeyValueVoteStore(
+                config['PATH'] or Path(settings.BASE_DIR) / 'kv_votes',
+                fsync=config['FSYNC'],
+                compact_bytes=config['COMPACT_BYTES'],
+            )
+        self.store = store
+
+    @property
+    def source(self) -> str:
+        return f'kv:{self.store.path}'
+
+    def _with_votes(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        counts = self.store.get_many(choice.id for choice in choices)
+        return [replace(choice, votes=(choice.votes or 0) + counts[choice.id]) for choice in choices]
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
+        choice = self.repository.get_by_id(choice_id)
+        if isinstance(choice, ChoiceDTO):
+            return replace(choice, votes=(choice.votes or 0) + self.store.get(choice_id))
+        return choice
+
+    def get_all(self) -> list[ChoiceDTO]:
+        return self._with_votes(self.repository.get_all())
+
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        return self._with_votes(self.repository.get_by_question(question_id))
+
+    def update_votes(self, choice_id: int) -> int:
+        if not self.choice_exists(choice_id):
+            return 0
+        self.store.increment(choice_id)
+        return 1
+
+    def export(self) -> int:
+        """Pasa los conteos del almacén a la columna ``votes``; reintentarlo es seguro."""
+        return self.store.drain(lambda deltas, batch_key: self.repository.apply_vote_batch(self.source, batch_key, deltas))
+
+    def close(self) -> None:
+        self.store.close()
@@ -0,0 +1,219 @@
+# polls/live_results.py
+import asyncio
+import json
+import re
+import threading
+from contextlib import aclosing
+from dataclasses import (
+    dataclass,
+    field,
+)
+from functools import cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+)
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .container import container
+
+SnapshotLoader = Callable[[int], Awaitable[dict[int, int]]]
+
+
+@dataclass
+class _Channel:
+    """Estado compartido por todos los suscriptores de una pregunta."""
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    totals: dict[int, int] | None = None
+    loading: asyncio.Future | None = None
+    seq: int = 0
+    last_deltas: dict[int, int] = field(default_factory=dict)
+    subscribers: int = 0
+
+
+class ResultsBroadcaster:
+    """
+    Difusor en proceso de deltas de votos por pregunta.
+
+    ``publish`` es seguro entre hilos (lo llaman los workers de tareas) y sólo
+    acumula; un único flusher en el event loop agrupa los deltas cada
+    ``interval_ms`` y despierta a todos los suscriptores con un solo Event, así
+    el costo por actualización no depende de consultas por suscriptor.
+    """
+
+    def __init__(self, interval_ms: int = 250, heartbeat: float = 15.0):
+        self.interval = interval_ms / 1000
+        self.heartbeat = heartbeat
+        self._lock = threading.Lock()
+        self._pending: dict[int, dict[int, int]] = {}
+        self._channels: dict[int, _Channel] = {}
+        self._flusher: asyncio.Task | None = None
+
+    def publish(self, question_id: int, choice_id: int, delta: int = 1) -> None:
+        if question_id not in self._channels:
+            return  # nadie escucha, no se acumula nada
+        with self._lock:
+            deltas = self._pending.setdefault(question_id, {})
+            deltas[choice_id] = deltas.get(choice_id, 0) + delta
+
+    def subscribers(self, question_id: int) -> int:
+        channel = self._channels.get(question_id)
+        return channel.subscribers if channel else 0
+
+    def flush(self) -> None:
+        """Entrega los deltas acumulados; se ejecuta dentro del event loop."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for question_id, deltas in pending.items():
+            channel = self._channels.get(question_id)
+            if channel is None or channel.totals is None:
+                continue  # el snapshot que se está cargando ya incluye estos votos
+            for choice_id, delta in deltas.items():
+                channel.totals[choice_id] = channel.totals.get(choice_id, 0) + delta
+            channel.seq += 1
+            channel.last_deltas = deltas
+            event, channel.changed = channel.changed, asyncio.Event()
+            event.set()
+
+    async def _flush_forever(self) -> None:
+        while self._channels:
+            await asyncio.sleep(self.interval)
+            self.flush()
+        self._flusher = None
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.get_running_loop().create_task(self._flush_forever())
+
+    async def _load_totals(self, channel: _Channel, question_id: int, load_snapshot: SnapshotLoader) -> dict[int, int]:
+        if channel.totals is not None:
+            return channel.totals
+        if channel.loading is None:
+            # sólo el primer suscriptor consulta la base de datos
+            channel.loading = asyncio.ensure_future(load_snapshot(question_id))
+        totals = await asyncio.shield(channel.loading)
+        if channel.totals is None:
+            channel.totals = dict(totals)
+        return channel.totals
+
+    async def subscribe(self, question_id: int, load_snapshot: SnapshotLoader) -> AsyncIterator[dict[str, Any] | None]:
+        """
+        Genera un snapshot inicial y luego los deltas agrupados.
+        Genera ``None`` cuando toca mandar un heartbeat.
+        """
+        channel = self._channels.setdefault(question_id, _Channel())
+        channel.subscribers += 1
+        self._ensure_flusher()
+        try:
+            totals = await self._load_totals(channel, question_id, load_snapshot)
+            seq = channel.seq
+            yield {'type': 'snapshot', 'votes': dict(totals)}
+            while True:
+                if channel.seq == seq:
+                    try:
+                        await asyncio.wait_for(channel.changed.wait(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        yield None
+                        continue
+                if channel.seq == seq + 1:
+                    yield {'type': 'delta', 'votes': dict(channel.last_deltas)}
+                else:
+                    # el suscriptor se atrasó, se le manda el total ya coalescido
+                    yield {'type': 'snapshot', 'votes': dict(channel.totals or {})}
+                seq = channel.seq
+        finally:
+            channel.subscribers -= 1
+            if channel.subscribers == 0 and self._channels.get(question_id) is channel:
+                del self._channels[question_id]
+
+
+@cache
+def get_broadcaster() -> ResultsBroadcaster:
+    config = getattr(settings, 'POLLS_LIVE_RESULTS', {})
+    return ResultsBroadcaster(
+        interval_ms=config.get('INTERVAL_MS', 250),
+        heartbeat=config.get('HEARTBEAT', 15.0),
+    )
+
+
+@sync_to_async
+def load_votes_snapshot(question_id: int) -> dict[int, int]:
+    # el mismo repositorio que las vistas: el shard de la pregunta y los votos aún no persistidos
+    return {
+        choice.id: choice.votes or 0
+        for choice in container.resolve('choice_repository').get_by_question(question_id)
+        if choice.id is not None
+    }
+
+
+def encode_event(message: dict[str, Any] | None) -> bytes:
+    """
+        >>> encode_event({'type': 'delta', 'votes': {1: 2}})
+        b'event: delta\\ndata: {"1": 2}\\n\\n'
+        >>> encode_event(None)
+        b': ping\\n\\n'
+    """
+    if message is None:
+        return b': ping\n\n'
+    data = json.dumps(message['votes'], separators=(', ', ': '))
+    return f"event: {message['type']}\ndata: {data}\n\n".encode()
+
+
+class LiveResultsApp:
+    """
+    Envoltorio ASGI: atiende ``/polls/<pk>/live/`` como Server-Sent Events sin
+    pasar por el stack de Django y delega el resto a la aplicación de Django.
+    """
+    path_pattern = re.compile(r'^/polls/(?P<pk>\d+)/live/$')
+
+    def __init__(
+        self,
+        django_application,
+        broadcaster: ResultsBroadcaster | None = None,
+        load_snapshot: SnapshotLoader = load_votes_snapshot,
+    ):
+        self.django_application = django_application
+        self.broadcaster = broadcaster
+        self.load_snapshot = load_snapshot
+
+    async def __call__(self, scope, receive, send):
+        match = self.path_pattern.match(scope.get('path', '')) if scope['type'] == 'http' else None
+        if match is None:
+            return await self.django_application(scope, receive, send)
+        await self.stream(int(match['pk']), receive, send)
+
+    async def stream(self, question_id: int, receive, send) -> None:
+        broadcaster = self.broadcaster or get_broadcaster()
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ],
+        })
+
+        async def pump():
+            async with aclosing(broadcaster.subscribe(question_id, self.load_snapshot)) as messages:
+                async for message in messages:
+                    await send({'type': 'http.response.body', 'body': encode_event(message), 'more_body': True})
+
+        async def wait_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        pumping = asyncio.ensure_future(pump())
+        disconnecting = asyncio.ensure_future(wait_disconnect())
+        try:
+            await asyncio.wait([pumping, disconnecting], return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (pumping, disconnecting):
+                task.cancel()
+            await asyncio.gather(pumping, disconnecting, return_exceptions=True)
+        if not pumping.cancelled() and pumping.exception() is not None:
+            raise pumping.exception()
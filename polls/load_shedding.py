@@ -0,0 +1,199 @@
+# polls/load_shedding.py
+"""
+Límite de concurrencia adaptativo para las rutas que escriben. Con SQLite
+sólo hay un escritor a la vez: si entran más POST de los que la base puede
+atender, se forman en el lock de escritura hasta que todos vencen. Aquí se
+forman antes, con un plazo, y lo que no cabe se rechaza con 503 +
+Retry-After, así las lecturas y los votos ya admitidos mantienen su latencia.
+
+El límite de cada ruta sigue AIMD sobre la latencia observada: sube de a poco
+(+1 por cada ``limit`` respuestas a tiempo) y se multiplica por ``BACKOFF``
+cuando una respuesta pasa de ``TARGET_LATENCY`` o falla con 5xx. Los límites
+son por proceso; con varios workers cada uno regula su parte.
+"""
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.urls import (
+    Resolver404,
+    resolve,
+)
+from django.utils.translation import gettext as _
+
+DEFAULT_LOAD_SHEDDING: dict[str, Any] = {
+    'INITIAL_LIMIT': 4,
+    'MIN_LIMIT': 1,
+    'MAX_LIMIT': 32,
+    'TARGET_LATENCY': 0.1,  # segundos que se consideran una respuesta sana
+    'BACKOFF': 0.7,
+    'MAX_QUEUE': 64,        # peticiones esperando turno por ruta
+    'QUEUE_TIMEOUT': 0.5,   # segundos que una petición espera turno antes del 503
+    'RETRY_AFTER': 1,
+    # nombre de la ruta -> ajustes propios (los que falten se toman de arriba)
+    'ROUTES': {
+        'polls:index': {},
+        'polls:detail': {},
+        'polls:vote': {},
+        # una subida aplica cientos de opciones: su latencia sana es otra
+        'polls:vote_upload': {'TARGET_LATENCY': 1.0},
+        'polls:add_choice': {},
+        'polls:add_choices': {},
+        'polls:create_question_with_choices': {},
+    },
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+def load_shedding_settings() -> dict[str, Any]:
+    return {**DEFAULT_LOAD_SHEDDING, **getattr(settings, 'POLLS_LOAD_SHEDDING', {})}
+
+
+class AdaptiveLimiter:
+    """
+    Semáforo con cola acotada y plazo cuyo tamaño ajusta AIMD.
+
+        >>> limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=0)
+        >>> limiter.acquire(), limiter.acquire()
+        (True, False)
+        >>> limiter.release(time.monotonic())
+        >>> limiter.limit
+        2.0
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        target_latency: float = 0.1,
+        backoff: float = 0.7,
+        max_queue: int = 64,
+        queue_timeout: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.clock = clock
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._queued = 0
+        self._last_decrease = float('-inf')
+        self.accepted = 0
+        self.rejected = 0
+
+    def _has_room(self) -> bool:
+        return self._in_flight < int(self.limit)
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """Espera turno hasta ``timeout`` (por defecto ``queue_timeout``); False si hay que rechazar."""
+        timeout = self.queue_timeout if timeout is None else timeout
+        with self._condition:
+            # si ya hay una cola no se la salta quien recién llega
+            if not self._queued and self._has_room():
+                self._in_flight += 1
+                self.accepted += 1
+                return True
+            if self._queued >= self.max_queue or timeout <= 0:
+                self.rejected += 1
+                return False
+            deadline = self.clock() + timeout
+            self._queued += 1
+            try:
+                while not self._has_room():
+                    remaining = deadline - self.clock()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self._condition.wait(remaining)
+                self._in_flight += 1
+                self.accepted += 1
+                return True
+            finally:
+                self._queued -= 1
+
+    def release(self, started: float, overloaded: bool = False) -> None:
+        """``started`` es el ``clock()`` de cuando se obtuvo el turno."""
+        with self._condition:
+            self._in_flight -= 1
+            finished = self.clock()
+            if overloaded or finished - started > self.target_latency:
+                # sólo reduce quien empezó después de la última reducción: las
+                # que ya estaban en curso con el límite anterior no cuentan dos veces
+                if started >= self._last_decrease:
+                    self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                    self._last_decrease = finished
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._condition.notify(max(1, int(self.limit) - self._in_flight))
+
+    def stats(self) -> dict[str, Any]:
+        with self._condition:
+            return {
+                'limit': round(self.limit, 2),
+                'in_flight': self._in_flight,
+                'queued': self._queued,
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+            }
+
+
+class ConcurrencyLimitMiddleware:
+    """
+    Aplica un AdaptiveLimiter por ruta de ``POLLS_LOAD_SHEDDING['ROUTES']`` a
+    los métodos que escriben; GET y HEAD pasan sin tocarlo. Va al final de
+    MIDDLEWARE para que sólo cuente el tiempo de la vista.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = load_shedding_settings()
+        self.retry_after = config['RETRY_AFTER']
+        self.limiters = {
+            route: AdaptiveLimiter(**{
+                name.lower(): value
+                for name, value in {**config, **overrides}.items()
+                if name not in ('ROUTES', 'RETRY_AFTER')
+            })
+            for route, overrides in config['ROUTES'].items()
+        }
+
+    def limiter_for(self, request) -> AdaptiveLimiter | None:
+        if request.method in SAFE_METHODS or not self.limiters:
+            return None
+        # StatelessRoutesMiddleware ya la deja resuelta
+        match = request.resolver_match
+        if match is None:
+            try:
+                match = resolve(request.path_info)
+            except Resolver404:
+                return None
+        return self.limiters.get(match.view_name)
+
+    def __call__(self, request):
+        limiter = self.limiter_for(request)
+        if limiter is None:
+            return self.get_response(request)
+        if not limiter.acquire():
+            response = HttpResponse(_('Server is busy, try again later.'), status=503)
+            response['Retry-After'] = str(self.retry_after)
+            return response
+        started = limiter.clock()
+        overloaded = True
+        try:
+            response = self.get_response(request)
+            overloaded = response.status_code >= 500
+            return response
+        finally:
+            limiter.release(started, overloaded)
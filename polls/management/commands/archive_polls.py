@@ -0,0 +1,28 @@
+# polls/management/commands/archive_polls.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from polls.question_service import archive_settings
+from polls.sharding import ShardedQuestionRepository
+
+
+class Command(BaseCommand):
+    help = 'Mueve por lotes las encuestas cerradas hace más de --retention-days días a las tablas de archivo.'
+
+    def add_arguments(self, parser):
+        config = archive_settings()
+        parser.add_argument('--retention-days', type=int, default=config['RETENTION_DAYS'],
+                            help='días que una encuesta cerrada se queda en las tablas calientes')
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'],
+                            help='preguntas por transacción')
+
+    def handle(self, *args, **options):
+        repository = ShardedQuestionRepository()  # con un solo shard, sólo default
+        closed_before = now() - timedelta(days=options['retention_days'])
+        total = 0
+        # una transacción corta por lote para no bloquear los votos mientras tanto
+        while archived := repository.archive_closed(closed_before, options['batch_size']):
+            total += archived
+        self.stdout.write(f'{total} encuestas archivadas')
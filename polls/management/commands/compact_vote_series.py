@@ -0,0 +1,26 @@
+# polls/management/commands/compact_vote_series.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from polls.models import VoteBucket
+from polls.sharding import ShardedVoteSeriesRepository
+from polls.vote_series import vote_series_settings
+
+
+class Command(BaseCommand):
+    help = 'Compacta la serie de votos: minutos viejos a horas y horas viejas a días.'
+
+    def add_arguments(self, parser):
+        config = vote_series_settings()
+        parser.add_argument('--minute-retention', type=int, default=config['MINUTE_RETENTION'],
+                            help='segundos que se conservan los intervalos por minuto')
+        parser.add_argument('--hour-retention', type=int, default=config['HOUR_RETENTION'],
+                            help='segundos que se conservan los intervalos por hora')
+
+    def handle(self, *args, **options):
+        repository = ShardedVoteSeriesRepository()
+        current = int(time.time())
+        minutes = repository.compact(VoteBucket.MINUTE, VoteBucket.HOUR, current - options['minute_retention'])
+        hours = repository.compact(VoteBucket.HOUR, VoteBucket.DAY, current - options['hour_retention'])
+        self.stdout.write(f'{minutes} intervalos de minuto y {hours} de hora compactados')
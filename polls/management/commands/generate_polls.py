@@ -0,0 +1,94 @@
+# polls/management/commands/generate_polls.py
+import time
+from datetime import datetime
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+)
+from django.core.management.color import no_style
+from django.db import (
+    connection,
+    transaction,
+)
+from django.db.models import Max
+
+from polls.models import (
+    Choice,
+    Question,
+)
+from polls.sharding import sharding_settings
+from polls.synthetic import (
+    PollDataset,
+    bulk_insert,
+)
+
+
+class Command(BaseCommand):
+    help = 'Genera preguntas, opciones y votos sintéticos (reproducibles con --seed) para pruebas de escala.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=1000)
+        parser.add_argument('--choices', type=int, nargs=2, default=[2, 5], metavar=('MIN', 'MAX'),
+                            help='opciones por pregunta, uniforme entre MIN y MAX')
+        parser.add_argument('--votes-scale', type=float, default=100.0,
+                            help='escala de los votos por pregunta (Pareto)')
+        parser.add_argument('--skew', type=float, default=1.2,
+                            help='sesgo de la popularidad de preguntas y opciones; menor es más sesgado')
+        parser.add_argument('--days', type=int, default=365, help='días que abarcan las fechas de publicación')
+        parser.add_argument('--end', type=datetime.fromisoformat, default=None,
+                            help='fecha de la pregunta más nueva (ISO 8601, con zona); por defecto hoy')
+        parser.add_argument('--closed-ratio', type=float, default=0.0,
+                            help='fracción de las preguntas (las más viejas) que quedan cerradas')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=10_000, help='preguntas por transacción')
+
+    def handle(self, *args, **options):
+        if len(sharding_settings()['SHARDS']) > 1:
+            # los INSERT directos a default no pasan por IdAllocator ni ChoiceLocation
+            raise CommandError('generate_polls sólo escribe en default; no se puede usar con varios SHARDS')
+        try:
+            dataset = PollDataset(
+                questions=options['questions'],
+                choices_min=options['choices'][0],
+                choices_max=options['choices'][1],
+                votes_scale=options['votes_scale'],
+                skew=options['skew'],
+                days=options['days'],
+                closed_ratio=options['closed_ratio'],
+                seed=options['seed'],
+                end=options['end'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        adapt = connection.ops.adapt_datetimefield_value
+        # ids explícitos para que las opciones apunten a sus preguntas sin leerlas de vuelta
+        first_id = (Question.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        started = time.perf_counter()
+        questions = choices = 0
+        for question_rows, choice_rows in dataset.batches(first_id, options['batch_size']):
+            with transaction.atomic():
+                bulk_insert(
+                    connection, Question._meta.db_table,
+                    ['id', 'question_text', 'pub_date', 'status', 'closed_at', 'version'],
+                    [(pk, text, adapt(pub_date), status, adapt(closed_at), 1)
+                     for pk, text, pub_date, status, closed_at in question_rows],
+                )
+                bulk_insert(
+                    connection, Choice._meta.db_table,
+                    ['question_id', 'choice_text', 'votes', 'version'],
+                    [(*row, 1) for row in choice_rows],
+                )
+            questions += len(question_rows)
+            choices += len(choice_rows)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  {questions:,} preguntas, {choices:,} opciones')
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Question, Choice]):
+                cursor.execute(sql)
+        self.stdout.write(
+            f'{questions} preguntas y {choices} opciones generadas en {time.perf_counter() - started:.1f} s; '
+            'corre rebuild_search_index para poder buscarlas'
+        )
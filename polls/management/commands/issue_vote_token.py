@@ -0,0 +1,21 @@
+# polls/management/commands/issue_vote_token.py
+from django.core.management.base import BaseCommand
+
+from polls.vote_tokens import (
+    issue_vote_token,
+    vote_tokens_settings,
+)
+
+
+class Command(BaseCommand):
+    help = 'Firma un token para votar por POST /polls/<id>/vote/ sin sesión (ver polls/vote_tokens.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('subject', help='identificador del cliente')
+        parser.add_argument('--question', type=int, default=None,
+                            help='pregunta para la que vale el token (por defecto cualquiera)')
+        parser.add_argument('--ttl', type=int, default=vote_tokens_settings()['TTL'],
+                            help='segundos de validez')
+
+    def handle(self, *args, **options):
+        self.stdout.write(issue_vote_token(options['subject'], options['question'], options['ttl']))
@@ -0,0 +1,24 @@
+# polls/management/commands/kv_votes.py
+from django.core.management.base import BaseCommand
+
+from polls.kv_votes import KeyValueChoiceRepository
+
+
+class Command(BaseCommand):
+    help = 'Compacta el almacén clave-valor de votos o pasa sus conteos a la base de datos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--export', action='store_true',
+                            help='suma los conteos a Choice.votes y deja el almacén en cero')
+
+    def handle(self, *args, **options):
+        repository = KeyValueChoiceRepository()
+        try:
+            if options['export']:
+                votes = repository.export()
+                self.stdout.write(f'{votes} votos exportados desde {repository.store.path}')
+            else:
+                generation = repository.store.compact()
+                self.stdout.write(f'{repository.store.path} compactado, generación {generation}')
+        finally:
+            repository.close()
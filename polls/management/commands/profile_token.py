@@ -0,0 +1,17 @@
+# polls/management/commands/profile_token.py
+from django.core.management.base import BaseCommand
+
+from polls.profiling import (
+    issue_profile_token,
+    profiling_settings,
+)
+
+
+class Command(BaseCommand):
+    help = 'Firma un token para perfilar peticiones y leer /polls/profiler/ (ver polls/profiling.py).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ttl', type=int, default=profiling_settings()['TTL'], help='segundos de validez')
+
+    def handle(self, *args, **options):
+        self.stdout.write(issue_profile_token(options['ttl']))
@@ -0,0 +1,22 @@
+# polls/management/commands/rebalance_shards.py
+from django.core.management.base import BaseCommand
+
+from polls.sharding import (
+    rebalance,
+    ring,
+)
+
+
+class Command(BaseCommand):
+    help = 'Mueve a su shard (según POLLS_SHARDING["SHARDS"]) las encuestas que quedaron en otro.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='preguntas por transacción')
+        parser.add_argument('--drain', nargs='+', default=(), metavar='ALIAS',
+                            help='shards que ya no están en SHARDS y hay que vaciar')
+
+    def handle(self, *args, **options):
+        moved = rebalance([*ring().shards, *options['drain']], options['batch_size'])
+        for (source, target), count in sorted(moved.items()):
+            self.stdout.write(f'{source} -> {target}: {count} encuestas')
+        self.stdout.write(f'{sum(moved.values())} encuestas movidas')
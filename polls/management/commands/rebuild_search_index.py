@@ -0,0 +1,15 @@
+# polls/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from polls.sharding import ShardedSearchIndex
+
+
+class Command(BaseCommand):
+    help = 'Regenera el índice de búsqueda de preguntas y opciones desde las tablas.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='preguntas por transacción')
+
+    def handle(self, *args, **options):
+        indexed = ShardedSearchIndex().rebuild(options['batch_size'])
+        self.stdout.write(f'{indexed} preguntas indexadas')
@@ -0,0 +1,27 @@
+# polls/management/commands/replay_vote_journal.py
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from polls.vote_journal import (
+    VoteJournalReplayer,
+    vote_journal_settings,
+)
+
+
+class Command(BaseCommand):
+    help = 'Aplica a la base de datos los segmentos sellados del diario de votos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='directorio del diario; por defecto POLLS_VOTE_JOURNAL["PATH"]')
+        parser.add_argument('--compact', action='store_true',
+                            help='antes de aplicar, junta los segmentos pendientes en uno solo')
+
+    def handle(self, *args, **options):
+        path = options['path'] or vote_journal_settings()['PATH'] or Path(settings.BASE_DIR) / 'vote_journal'
+        replayer = VoteJournalReplayer(path)
+        if options['compact']:
+            self.stdout.write(f'{replayer.compact()} segmentos compactados')
+        votes = replayer.replay(blocking=True)
+        self.stdout.write(f'{votes} votos aplicados desde {path}')
@@ -0,0 +1,47 @@
+# polls/management/commands/run_workers.py
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from polls.tasks import (
+    pending_task_ids,
+    run_task,
+)
+
+
+def _run_and_close(task_id: int) -> float | None:
+    try:
+        return run_task(task_id)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Ejecuta fuera del proceso web las tareas pendientes del outbox (reintentos incluidos).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=4, help='0 para ejecutar en el hilo principal')
+        parser.add_argument('--batch', type=int, default=100)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true', help='procesa lo pendiente y termina')
+
+    def handle(self, *args, **options):
+        processed = 0
+        pool = ThreadPoolExecutor(max_workers=options['threads']) if options['threads'] else None
+        execute = pool.map if pool else map
+        try:
+            while True:
+                task_ids = pending_task_ids(limit=options['batch'])
+                if task_ids:
+                    list(execute(run_task if pool is None else _run_and_close, task_ids))
+                    processed += len(task_ids)
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        finally:
+            if pool:
+                pool.shutdown()
+        self.stdout.write(f'{processed} tareas procesadas')
@@ -0,0 +1,66 @@
+# polls/management/commands/startup_profile.py
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+ENTRY_POINTS = {
+    'wsgi': 'settings.wsgi',
+    'asgi': 'settings.asgi',
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """
+    Convierte la salida de ``python -X importtime`` en (self_us, cumulative_us, módulo).
+
+        >>> parse_importtime('import time: self [us] | cumulative | imported package\\n'
+        ...                  'import time:       120 |        450 |   django.conf\\n')
+        [(120, 450, 'django.conf')]
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((int(self_us), int(cumulative_us), module.strip()))
+    return rows
+
+
+class Command(BaseCommand):
+    help = 'Mide el costo de arranque en frío (imports) de los entry points WSGI y ASGI.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry', choices=[*ENTRY_POINTS, 'all'], default='all')
+        parser.add_argument('--top', type=int, default=15, help='módulos más costosos a mostrar')
+
+    def handle(self, *args, **options):
+        entries = ENTRY_POINTS if options['entry'] == 'all' else {options['entry']: ENTRY_POINTS[options['entry']]}
+        for name, module in entries.items():
+            self.profile(name, module, options['top'])
+
+    def profile(self, name: str, module: str, top: int) -> None:
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'settings.settings')}
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall_ms = (time.perf_counter() - started) * 1000
+        if completed.returncode != 0:
+            self.stderr.write(f'{name}: no se pudo importar {module}\n{completed.stderr[-2000:]}')
+            return
+        rows = parse_importtime(completed.stderr)
+        total_ms = sum(self_us for self_us, _, _ in rows) / 1000
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f'{name} ({module}): {wall_ms:.1f} ms de proceso, {total_ms:.1f} ms en imports, {len(rows)} módulos'
+        ))
+        self.stdout.write(f'  {"acumulado ms":>12} {"propio ms":>10}  módulo')
+        for self_us, cumulative_us, imported in sorted(rows, key=lambda row: row[1], reverse=True)[:top]:
+            self.stdout.write(f'  {cumulative_us / 1000:>12.1f} {self_us / 1000:>10.1f}  {imported}')
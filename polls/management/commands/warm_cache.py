@@ -0,0 +1,23 @@
+# polls/management/commands/warm_cache.py
+from django.core.management.base import BaseCommand
+
+from polls.warmup import (
+    warm_cache,
+    warmup_settings,
+)
+
+
+class Command(BaseCommand):
+    help = ('Precarga los templates, los recientes y las encuestas más votadas (ver polls/warmup.py); '
+            'desde otro proceso sólo sirve con un CACHES compartido.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--budget', type=float, default=warmup_settings()['BUDGET'],
+                            help='segundos como máximo')
+
+    def handle(self, *args, **options):
+        report = warm_cache(options['budget'])
+        self.stdout.write(
+            f"{report['templates']} templates, {report['recent']} recientes y {report['polls']} encuestas precargadas"
+            + ('' if report['complete'] else ' (se acabó el presupuesto)')
+        )
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0002_task_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppliedVoteBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('batch_key', models.CharField(max_length=100)),
+                ('applied_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'batch_key'), name='unique_vote_batch')],
+            },
+        ),
+    ]
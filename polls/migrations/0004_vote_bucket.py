@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0003_applied_vote_batch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField(choices=[(60, 'minute'), (3600, 'hour'), (86400, 'day')])),
+                ('bucket', models.BigIntegerField()),
+                ('votes', models.PositiveIntegerField(default=0)),
+                ('choice', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('choice', 'resolution', 'bucket'), name='unique_vote_bucket')],
+            },
+        ),
+    ]
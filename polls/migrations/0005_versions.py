@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_vote_bucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='choice',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='version',
+            field=models.PositiveIntegerField(default=1),
+        ),
+    ]
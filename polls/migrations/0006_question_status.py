@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='status',
+            field=models.CharField(choices=[('open', 'open'), ('closed', 'closed')], default='open', max_length=10),
+        ),
+    ]
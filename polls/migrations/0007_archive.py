@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_question_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedChoice',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('choice_text', models.CharField(max_length=200)),
+                ('votes', models.IntegerField(default=0)),
+                ('version', models.PositiveIntegerField(default=1)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedQuestion',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('question_text', models.CharField(max_length=200)),
+                ('pub_date', models.DateTimeField(verbose_name='date published')),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('status', models.CharField(choices=[('open', 'open'), ('closed', 'closed'), ('archived', 'archived')], default='archived', max_length=10)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='status',
+            field=models.CharField(choices=[('open', 'open'), ('closed', 'closed'), ('archived', 'archived')], default='open', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['status', 'closed_at'], name='polls_quest_status_504666_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedchoice',
+            name='question',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='choice_set', to='polls.archivedquestion'),
+        ),
+    ]
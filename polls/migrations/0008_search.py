@@ -0,0 +1,59 @@
+from django.db import migrations
+
+from business_logic.search import search_terms
+
+BATCH_SIZE = 300
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE polls_search USING fts5("
+            "document, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE polls_search (question_id bigint PRIMARY KEY, document tsvector NOT NULL)'
+        )
+        schema_editor.execute('CREATE INDEX polls_search_document ON polls_search USING gin (document)')
+
+
+def index_existing_questions(apps, schema_editor):
+    # las preguntas que ya existían; las nuevas las indexan los casos de uso (ver polls/search.py)
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        insert = 'INSERT INTO polls_search (rowid, document) VALUES (%s, %s)'
+    elif connection.vendor == 'postgresql':
+        insert = "INSERT INTO polls_search (question_id, document) VALUES (%s, to_tsvector('simple', %s))"
+    else:
+        return
+    questions = apps.get_model('polls', 'Question').objects.using(connection.alias).order_by('id')
+    choices = apps.get_model('polls', 'Choice').objects.using(connection.alias).order_by('id')
+    last_id = 0
+    with connection.cursor() as cursor:
+        while batch := list(questions.filter(id__gt=last_id).values_list('id', 'question_text')[:BATCH_SIZE]):
+            texts = {question_id: [question_text] for question_id, question_text in batch}
+            for question_id, choice_text in choices.filter(question_id__in=texts).values_list('question_id', 'choice_text'):
+                texts[question_id].append(choice_text)
+            cursor.executemany(insert, [
+                (question_id, ' '.join(search_terms(' '.join(parts)))) for question_id, parts in texts.items()
+            ])
+            last_id = batch[-1][0]
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute('DROP TABLE polls_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(index_existing_questions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-19 13:48
+
+from django.db import migrations, models
+
+
+def locate_existing_choices(apps, schema_editor):
+    # las opciones creadas antes del sharding quedan ubicadas en la base donde ya estaban
+    table = apps.get_model('polls', 'ChoiceLocation')._meta.db_table
+    for model_name in ('Choice', 'ArchivedChoice'):
+        source = apps.get_model('polls', model_name)._meta.db_table
+        schema_editor.execute(f'INSERT INTO {table} (choice_id, question_id) SELECT id, question_id FROM {source}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChoiceLocation',
+            fields=[
+                ('choice_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('question_id', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ShardSequence',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('next_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AppliedVoteBatchQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100)),
+                ('batch_key', models.CharField(max_length=100)),
+                ('question_id', models.BigIntegerField(db_index=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'batch_key', 'question_id'), name='unique_vote_batch_question')],
+            },
+        ),
+        migrations.RunPython(locate_existing_choices, migrations.RunPython.noop),
+    ]
@@ -2,8 +2,28 @@
 from django.db import models
 
 class Question(models.Model):
+    # ciclo de vida: open -> closed -> archived (ya fuera de esta tabla, ver ArchivedQuestion)
+    OPEN = 'open'
+    CLOSED = 'closed'
+    ARCHIVED = 'archived'
+    STATUS_CHOICES = [
+        (OPEN, 'open'),
+        (CLOSED, 'closed'),
+        (ARCHIVED, 'archived'),
+    ]
+
     question_text = models.CharField(max_length=200)
     pub_date = models.DateTimeField('date published')
+    # se incrementa en cada escritura, para las actualizaciones optimistas
+    version = models.PositiveIntegerField(default=1)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=OPEN)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # candidatas a archivar: cerradas hace más de la retención
+            models.Index(fields=['status', 'closed_at']),
+        ]
 
     def __str__(self):
         return self.question_text
@@ -12,6 +32,138 @@ class Choice(models.Model):
     question = models.ForeignKey(Question, on_delete=models.CASCADE)
     choice_text = models.CharField(max_length=200)
     votes = models.IntegerField(default=0)
+    # se incrementa en cada escritura, incluidos los votos
+    version = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return self.choice_text
+
+
+class TaskOutbox(models.Model):
+    """Bandeja de salida durable para las tareas posteriores a un caso de uso"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'pending'),
+        (RUNNING, 'running'),
+        (DONE, 'done'),
+        (FAILED, 'failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField()
+    last_error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+
+class AppliedVoteBatch(models.Model):
+    """Registro de lotes de votos ya aplicados, para que reaplicarlos sea idempotente"""
+    source = models.CharField(max_length=100)
+    batch_key = models.CharField(max_length=100)
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'batch_key'], name='unique_vote_batch'),
+        ]
+
+    def __str__(self):
+        return f'{self.source}:{self.batch_key}'
+
+
+class AppliedVoteBatchQuestion(models.Model):
+    """Preguntas que tocó un lote aplicado, para mudar su registro con ellas al rebalancear shards"""
+    source = models.CharField(max_length=100)
+    batch_key = models.CharField(max_length=100)
+    question_id = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'batch_key', 'question_id'], name='unique_vote_batch_question'),
+        ]
+
+    def __str__(self):
+        return f'{self.source}:{self.batch_key} -> {self.question_id}'
+
+
+class VoteBucket(models.Model):
+    """Votos de una opción agregados por intervalo (minuto, hora o día)"""
+    MINUTE = 60
+    HOUR = 3600
+    DAY = 86400
+    RESOLUTION_CHOICES = [
+        (MINUTE, 'minute'),
+        (HOUR, 'hour'),
+        (DAY, 'day'),
+    ]
+
+    # el índice único (choice, resolution, bucket) ya cubre las búsquedas por choice
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE, db_index=False)
+    resolution = models.PositiveIntegerField(choices=RESOLUTION_CHOICES)
+    bucket = models.BigIntegerField() # inicio del intervalo en segundos epoch
+    votes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['choice', 'resolution', 'bucket'], name='unique_vote_bucket'),
+        ]
+
+    def __str__(self):
+        return f'{self.choice_id}@{self.bucket}/{self.resolution}: {self.votes}'
+
+
+class ArchivedQuestion(models.Model):
+    """Pregunta cerrada que salió de la tabla caliente; conserva su id"""
+    id = models.BigIntegerField(primary_key=True)
+    question_text = models.CharField(max_length=200)
+    pub_date = models.DateTimeField('date published')
+    version = models.PositiveIntegerField(default=1)
+    status = models.CharField(max_length=10, choices=Question.STATUS_CHOICES, default=Question.ARCHIVED)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.question_text
+
+
+class ArchivedChoice(models.Model):
+    """Opción de una pregunta archivada; ``choice_set`` igual que en Question para reusar los templates"""
+    id = models.BigIntegerField(primary_key=True)
+    question = models.ForeignKey(ArchivedQuestion, on_delete=models.CASCADE, related_name='choice_set')
+    choice_text = models.CharField(max_length=200)
+    votes = models.IntegerField(default=0)
+    version = models.PositiveIntegerField(default=1)
 
     def __str__(self):
         return self.choice_text
+
+
+class ShardSequence(models.Model):
+    """Próximo id libre de una secuencia global (ver polls/sharding.py); sólo en la base catálogo"""
+    name = models.CharField(max_length=50, primary_key=True)
+    next_id = models.BigIntegerField()
+
+    def __str__(self):
+        return f'{self.name}: {self.next_id}'
+
+
+class ChoiceLocation(models.Model):
+    """A qué pregunta pertenece cada opción, para ubicar su shard por el id de la opción; sólo en la base catálogo"""
+    choice_id = models.BigIntegerField(primary_key=True)
+    question_id = models.BigIntegerField(db_index=True)  # para limpiar al borrar preguntas
+
+    def __str__(self):
+        return f'{self.choice_id} -> {self.question_id}'
@@ -0,0 +1,66 @@
+# polls/parsers.py
+"""
+Parsers de la subida de votos en lote (ver ``VoteUploadView``). Los dos
+aceptan el cuerpo comprimido con ``Content-Encoding: gzip``; lo descomprimido
+no puede pasar de ``MAX_UPLOAD_BYTES``.
+
+- ``GzipJSONParser``: ``{"votes": {"<choice_id>": votos, ...}}``.
+- ``VoteEventsParser`` (``text/plain``): un voto por línea con el id de la
+  opción, tal como los registra el kiosco; se cuentan en el mismo
+  ``{"votes": {...}}``.
+"""
+import gzip
+import zlib
+from collections import Counter
+from io import BytesIO
+
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import (
+    ParseError,
+    UnsupportedMediaType,
+)
+from rest_framework.parsers import (
+    BaseParser,
+    JSONParser,
+)
+
+MAX_UPLOAD_BYTES = 4 * 1024 * 1024
+
+
+def read_body(stream, parser_context, limit: int = MAX_UPLOAD_BYTES) -> bytes:
+    """El cuerpo ya descomprimido; ParseError si pasa de ``limit`` bytes o el gzip está roto."""
+    if stream is None:
+        return b''
+    encoding = parser_context['request'].headers.get('Content-Encoding', 'identity').strip().lower()
+    if encoding == 'gzip':
+        stream = gzip.GzipFile(fileobj=stream)
+    elif encoding != 'identity':
+        raise UnsupportedMediaType(encoding)
+    try:
+        body = stream.read(limit + 1)
+    except (OSError, EOFError, zlib.error):
+        raise ParseError(_('Invalid gzip body.'))
+    if len(body) > limit:
+        raise ParseError(_('Upload too large.'))
+    return body
+
+
+class GzipJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        body = read_body(stream, parser_context)
+        return super().parse(BytesIO(body), media_type, parser_context)
+
+
+class VoteEventsParser(BaseParser):
+    media_type = 'text/plain'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        votes: Counter[int] = Counter()
+        for number, line in enumerate(read_body(stream, parser_context).splitlines(), 1):
+            line = line.strip()
+            if not line:
+                continue
+            if not line.isdigit():
+                raise ParseError(_('Line %(number)d is not a choice id.') % {'number': number})
+            votes[int(line)] += 1
+        return {'votes': dict(votes)}
@@ -0,0 +1,259 @@
+# polls/profiling.py
+"""
+Perfilado en producción sin redeploy.
+
+- ``SamplingProfiler``: un hilo que cada ``INTERVAL`` segundos toma el stack
+  de los hilos que están atendiendo una petición (``sys._current_frames``) y
+  cuenta cada stack. ``GET /polls/profiler/`` devuelve los conteos en formato
+  "collapsed" (``modulo:funcion;modulo:funcion N`` por línea), la entrada de
+  flamegraph.pl o speedscope. Es por proceso: con varios workers cada uno
+  tiene el suyo. ``?reset=1`` empieza de cero después de leer. Está apagado
+  salvo ``POLLS_PROFILING['SAMPLER'] = True``: muestrea todos los hilos de
+  cada worker cada ``INTERVAL``.
+- Perfilado de una petición: con ``X-Polls-Profile: <token>`` (firmado, ver
+  ``manage.py profile_token``) la petición corre bajo cProfile y queda en
+  ``DIR`` como ``<nombre>.pstats`` junto a ``<nombre>.json`` con el método, la
+  ruta, la vista, el status y la duración. Se conservan los ``KEEP`` más nuevos.
+
+    python manage.py profile_token --ttl 600
+    curl -H "X-Polls-Profile: $TOKEN" http://localhost:8000/polls/3/results/
+    python -m pstats profiles/<nombre>.pstats
+    curl -H "X-Polls-Profile: $TOKEN" http://localhost:8000/polls/profiler/ | flamegraph.pl > votos.svg
+
+El mismo token autoriza ``/polls/profiler/``. ``ProfilingMiddleware`` va
+primero en MIDDLEWARE para cubrir también la ruta de votos con token.
+"""
+import cProfile
+import json
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import (
+    datetime,
+    timezone,
+)
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core import signing
+
+DEFAULT_PROFILING: dict[str, Any] = {
+    'SAMPLER': False,        # muestreo continuo desde los entry points WSGI/ASGI; se enciende al desplegar
+    'INTERVAL': 0.01,        # segundos entre muestras
+    'MAX_STACKS': 20_000,    # stacks distintos; los que sobran se cuentan en OVERFLOW_STACK
+    'HEADER': 'X-Polls-Profile',
+    'SALT': 'polls.profiling',
+    'TTL': 600,              # segundos de validez de un token nuevo
+    'DIR': None,             # por defecto BASE_DIR / 'profiles'
+    'KEEP': 100,             # perfiles por petición que se conservan
+}
+
+OVERFLOW_STACK = '[otros]'
+
+
+def profiling_settings() -> dict[str, Any]:
+    return {**DEFAULT_PROFILING, **getattr(settings, 'POLLS_PROFILING', {})}
+
+
+class InvalidProfileToken(Exception):
+    """Token de perfilado mal formado, con firma inválida o vencido."""
+
+
+def issue_profile_token(ttl: int | None = None) -> str:
+    """
+    Firma un token que habilita el perfilado por petición y el endpoint.
+
+        >>> verify_profile_token(issue_profile_token())
+        >>> verify_profile_token(issue_profile_token(ttl=-1))
+        Traceback (most recent call last):
+        ...
+        polls.profiling.InvalidProfileToken: expired token
+    """
+    config = profiling_settings()
+    expires = int(time.time()) + (config['TTL'] if ttl is None else ttl)
+    return signing.dumps({'exp': expires}, salt=config['SALT'])
+
+
+def verify_profile_token(token: str) -> None:
+    try:
+        claims = signing.loads(token, salt=profiling_settings()['SALT'])
+    except signing.BadSignature:
+        raise InvalidProfileToken('bad signature')
+    if claims['exp'] < time.time():
+        raise InvalidProfileToken('expired token')
+
+
+def profile_requested(request) -> bool:
+    """True si la petición trae un token de perfilado válido."""
+    token = request.headers.get(profiling_settings()['HEADER'])
+    if not token:
+        return False
+    try:
+        verify_profile_token(token)
+    except InvalidProfileToken:
+        return False
+    return True
+
+
+class SamplingProfiler:
+    """
+    Muestrea sólo los hilos registrados con ``track`` (los que atienden una
+    petición): los workers ociosos no ensucian el perfil y sin peticiones en
+    curso cada muestra no cuesta casi nada.
+    """
+
+    def __init__(self, interval: float = 0.01, max_stacks: int = 20_000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.counts: Counter[str] = Counter()
+        self.samples = 0
+        self._threads: set[int] = set()
+        self._labels: dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='polls-sampler', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def track(self, thread_id: int) -> None:
+        self._threads.add(thread_id)
+
+    def untrack(self, thread_id: int) -> None:
+        self._threads.discard(thread_id)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        if not self._threads:
+            return
+        frames = sys._current_frames()
+        stacks = [self.collapse(frames[thread_id]) for thread_id in list(self._threads) if thread_id in frames]
+        with self._lock:
+            self.samples += 1
+            for stack in stacks:
+                if stack not in self.counts and len(self.counts) >= self.max_stacks:
+                    stack = OVERFLOW_STACK
+                self.counts[stack] += 1
+
+    def collapse(self, frame) -> str:
+        """
+        El stack de ``frame`` de la raíz a la hoja, separado por ``;``.
+
+            >>> def hoja(): return SamplingProfiler().collapse(sys._getframe())
+            >>> hoja().rsplit(';', 1)[-1]
+            'polls.profiling:hoja'
+        """
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_qualname}"
+            labels.append(label)
+            frame = frame.f_back
+        return ';'.join(reversed(labels))
+
+    def collapsed(self, reset: bool = False) -> str:
+        """Una línea ``stack conteo`` por stack, de la más frecuente a la menos."""
+        with self._lock:
+            counts = self.counts.most_common()
+            if reset:
+                self.counts, self.samples = Counter(), 0
+        return ''.join(f'{stack} {count}\n' for stack, count in counts)
+
+
+sampler = SamplingProfiler()
+
+
+def start_sampler() -> bool:
+    """Arranca el muestreo continuo si ``SAMPLER`` está encendido; lo llaman los entry points."""
+    config = profiling_settings()
+    if not config['SAMPLER']:
+        return False
+    sampler.interval, sampler.max_stacks = config['INTERVAL'], config['MAX_STACKS']
+    sampler.start()
+    return True
+
+
+def profiles_dir() -> Path:
+    return Path(profiling_settings()['DIR'] or Path(settings.BASE_DIR) / 'profiles')
+
+
+def save_profile(profile: cProfile.Profile, metadata: dict[str, Any]) -> str:
+    """
+    Escribe ``<nombre>.pstats`` y ``<nombre>.json`` y borra los más viejos que
+    ``KEEP``. El nombre empieza con la fecha, así el orden alfabético es el de
+    llegada. Retorna el nombre.
+    """
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    started = datetime.fromtimestamp(metadata['started_at'], timezone.utc)
+    slug = re.sub(r'[^A-Za-z0-9]+', '-', metadata['path']).strip('-')[:60] or 'root'
+    name = f"{started:%Y%m%dT%H%M%S%fZ}-{metadata['method']}-{slug}-{threading.get_ident()}"
+    profile.dump_stats(directory / f'{name}.pstats')
+    (directory / f'{name}.json').write_text(json.dumps(metadata, indent=2))
+    prune_profiles(directory, profiling_settings()['KEEP'])
+    return name
+
+
+def prune_profiles(directory: Path, keep: int) -> None:
+    for stale in sorted(directory.glob('*.pstats'))[:-keep or None]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix('.json').unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """Registra el hilo de cada petición para el muestreo y perfila las que traen el token."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        thread_id = threading.get_ident()
+        sampler.track(thread_id)
+        try:
+            if profile_requested(request):
+                return self.profiled(request)
+            return self.get_response(request)
+        finally:
+            sampler.untrack(thread_id)
+
+    def profiled(self, request):
+        profile = cProfile.Profile()
+        started_at, started = time.time(), time.perf_counter()
+        profile.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.disable()
+        match = getattr(request, 'resolver_match', None)
+        response['X-Polls-Profile-Name'] = save_profile(profile, {
+            'method': request.method,
+            'path': request.path,
+            'query_string': request.META.get('QUERY_STRING', ''),
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'started_at': started_at,
+        })
+        return response
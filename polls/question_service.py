@@ -1,17 +1,60 @@
 # polls/question_service.py
 from dataclasses import dataclass
+from datetime import datetime
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+    transaction,
+)
+from django.db.models import F
 from django.utils.timezone import now
 from functools import partial
 
-from business_logic.dtos import QuestionDTO
-from business_logic.exceptions import QuestionNotFound
-from business_logic.use_cases import CreateQuestion
+from business_logic.dtos import (
+    QuestionDTO,
+    QuestionPageDTO,
+)
+from business_logic.exceptions import (
+    ConcurrentModificationError,
+    QuestionNotFound,
+)
 
-from .models import Question
+from .choice_service import (
+    BULK_VOTES_BATCH_SIZE as BULK_BATCH_SIZE,
+    chunked,
+)
+from .models import (
+    ArchivedChoice,
+    ArchivedQuestion,
+    Choice,
+    Question,
+    VoteBucket,
+)
+from .search import DjangoSearchIndex
+# la fábrica vive en services.py, se reexporta aquí por compatibilidad
+from .services import create_question_service, update_question_service  # noqa: F401
+
+DEFAULT_ARCHIVE = {
+    'RETENTION_DAYS': 30,
+    'BATCH_SIZE': 500,
+}
+
+
+def archive_settings() -> dict:
+    return {**DEFAULT_ARCHIVE, **getattr(settings, 'POLLS_ARCHIVE', {})}
 
 
 @dataclass  
 class DjangoQuestionRepository:
+    # alias de la base; polls/sharding.py usa uno por shard
+    using: str = DEFAULT_DB_ALIAS
+    search_index: DjangoSearchIndex | None = None
+
+    def __post_init__(self):
+        if self.search_index is None:
+            self.search_index = DjangoSearchIndex(self.using)
+
     def create(self, question: QuestionDTO) -> QuestionDTO:
         """
         Persiste la pregunta en la base de datos. 
@@ -22,49 +65,226 @@ class DjangoQuestionRepository:
             >>> assert created_question.id is not None
             >>> assert isinstance(created_question, QuestionDTO)
         """
-        es_para_nueva_creacion_y_no_tiene_fecha = (
-            not question.id and not question.pub_date
-        )
-        if es_para_nueva_creacion_y_no_tiene_fecha:
+        if not question.pub_date:
             question.pub_date = now()
         create_question_args = {
             'question_text': question.question_text,
             'pub_date': question.pub_date
         }
-        django_question = Question.objects.create(**create_question_args)
+        if question.id:
+            # con sharding el id lo asigna polls/sharding.py antes de elegir la base
+            create_question_args['id'] = question.id
+        django_question = Question.objects.using(self.using).create(**create_question_args)
         question_dto = (
             QuestionDTO(
                 id=django_question.id,
                 question_text=question.question_text,
-                pub_date=django_question.pub_date
+                pub_date=django_question.pub_date,
+                version=django_question.version,
+                status=django_question.status,
             )
         )
         return question_dto
 
     def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound:
-        try:
-            django_question = (
-                Question.objects
-                .values('id', 'question_text', 'pub_date')
-                .get(id=question_id)
-            )
-        except Question.DoesNotExist as err:
+        """
+        Busca primero en la tabla caliente y después en el archivo.
+
+            >>> from datetime import timedelta
+            >>> repo = DjangoQuestionRepository()
+            >>> question = repo.create(QuestionDTO(question_text="¿Archivada?"))
+            >>> _ = repo.bulk_close([question.id])
+            >>> repo.archive_closed(closed_before=now() + timedelta(seconds=1))
+            1
+            >>> repo.get_by_id(question.id).status
+            'archived'
+        """
+        fields = ('id', 'question_text', 'pub_date', 'version', 'status')
+        django_question = Question.objects.using(self.using).values(*fields).filter(id=question_id).first()
+        if django_question is None:
+            django_question = ArchivedQuestion.objects.using(self.using).values(*fields).filter(id=question_id).first()
+        if django_question is None:
             raise QuestionNotFound(f"El 'Question' con ID {question_id} no existe.")
         return QuestionDTO(**django_question)
 
     def get_recent(self, limit: int=5) -> list[QuestionDTO]:
         django_recent_questions = (
-            Question.objects
-            .values('id', 'question_text', 'pub_date')
+            Question.objects.using(self.using)
+            .values('id', 'question_text', 'pub_date', 'version', 'status')
             .order_by('-pub_date')[:limit]
         )
         return [QuestionDTO(**choice) for choice in django_recent_questions]
 
+    def search(self, query: str, limit: int = 20, cursor: int | None = None) -> QuestionPageDTO:
+        """
+        Busca en el índice (ver polls/search.py) y trae sólo las preguntas de la página.
+
+            >>> repo = DjangoQuestionRepository()
+            >>> ids = [repo.create(QuestionDTO(question_text=f'¿Color {i}?')).id for i in range(3)]
+            >>> repo.search_index.reindex(ids)
+            3
+            >>> page = repo.search('color', limit=2)
+            >>> [question.question_text for question in page.questions]
+            ['¿Color 2?', '¿Color 1?']
+            >>> [question.question_text for question in repo.search('color', 2, page.next_cursor).questions]
+            ['¿Color 0?']
+        """
+        ids = self.search_index.match(query, limit, cursor)
+        questions = {
+            question['id']: QuestionDTO(**question)
+            for question in Question.objects.using(self.using).filter(id__in=ids).values(
+                'id', 'question_text', 'pub_date', 'version', 'status',
+            )
+        }
+        return QuestionPageDTO(
+            questions=[questions[question_id] for question_id in ids if question_id in questions],
+            next_cursor=ids[-1] if len(ids) == limit else None,
+        )
+
+    def update(self, question: QuestionDTO) -> QuestionDTO:
+        """
+        Actualiza el texto y la fecha de una pregunta; con ``version`` la
+        escritura es condicional y no pisa cambios concurrentes.
+
+            >>> repo = DjangoQuestionRepository()
+            >>> question = repo.create(QuestionDTO(question_text="¿Antes?"))
+            >>> question.question_text = "¿Después?"
+            >>> updated = repo.update(question)
+            >>> (updated.question_text, updated.version)
+            ('¿Después?', 2)
+            >>> try:
+            ...     repo.update(question)  # todavía trae la versión 1
+            ... except ConcurrentModificationError as err:
+            ...     err.current_version
+            2
+        """
+        changes = {'question_text': question.question_text}
+        if question.pub_date is not None:
+            changes['pub_date'] = question.pub_date
+        queryset = Question.objects.using(self.using).filter(id=question.id)
+        if question.version is not None:
+            queryset = queryset.filter(version=question.version)
+        if not queryset.update(**changes, version=F('version') + 1):
+            current_version = Question.objects.using(self.using).filter(id=question.id).values_list('version', flat=True).first()
+            if current_version is None:
+                raise QuestionNotFound(f"El 'Question' con ID {question.id} no existe.")
+            raise ConcurrentModificationError(
+                f"El 'Question' {question.id} cambió: versión {current_version}, se esperaba {question.version}.",
+                current_version=current_version,
+            )
+        return self.get_by_id(question.id)
+
+    def bulk_close(self, question_ids: list[int]) -> int:
+        """
+        Cierra las preguntas abiertas indicadas con un UPDATE por lote.
+
+            >>> repo = DjangoQuestionRepository()
+            >>> question = repo.create(QuestionDTO(question_text="¿Se cierra?"))
+            >>> repo.bulk_close([question.id]), repo.bulk_close([question.id])
+            (1, 0)
+        """
+        closed_at = now()
+        with transaction.atomic(using=self.using):
+            return sum(
+                Question.objects.using(self.using)
+                .filter(id__in=batch, status=Question.OPEN)
+                .update(status=Question.CLOSED, closed_at=closed_at, version=F('version') + 1)
+                for batch in chunked(question_ids)
+            )
+
+    def bulk_delete(self, question_ids: list[int]) -> int:
+        """
+        Borra preguntas con sus opciones e intervalos de votos en DELETE
+        directos, sin que el ORM cargue cada Choice para la cascada.
+        Retorna cuántas preguntas borró.
+
+            >>> repo = DjangoQuestionRepository()
+            >>> question = repo.create(QuestionDTO(question_text="¿Se borra?"))
+            >>> _ = Choice.objects.create(question_id=question.id, choice_text='sí')
+            >>> repo.bulk_delete([question.id])
+            1
+            >>> Choice.objects.filter(question_id=question.id).exists()
+            False
+        """
+        deleted = 0
+        with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+            for batch in chunked(question_ids):
+                deleted += self._delete_batch(cursor, batch)
+        return deleted
+
+    def _delete_batch(self, cursor, batch: list[int]) -> int:
+        placeholders = ', '.join(['%s'] * len(batch))
+        choices = Choice._meta.db_table
+        cursor.execute(
+            f'DELETE FROM {VoteBucket._meta.db_table} WHERE choice_id IN '
+            f'(SELECT id FROM {choices} WHERE question_id IN ({placeholders}))',
+            batch,
+        )
+        cursor.execute(f'DELETE FROM {choices} WHERE question_id IN ({placeholders})', batch)
+        cursor.execute(f'DELETE FROM {Question._meta.db_table} WHERE id IN ({placeholders})', batch)
+        deleted = cursor.rowcount
+        self.search_index.remove(batch, cursor)
+        return deleted
+
+    def archive_closed(self, closed_before: datetime, batch_size: int = 500) -> int:
+        """
+        Mueve un lote de preguntas cerradas antes de ``closed_before`` (y sus
+        opciones) a las tablas de archivo, con INSERT ... SELECT y DELETE en
+        una transacción. La serie de votos por intervalo de esas opciones se
+        descarta. Retorna cuántas preguntas archivó; 0 cuando ya no quedan.
+        """
+        batch = list(
+            Question.objects.using(self.using)
+            .filter(status=Question.CLOSED, closed_at__lt=closed_before)
+            .order_by('closed_at')
+            .values_list('id', flat=True)[:min(batch_size, BULK_BATCH_SIZE)]
+        )
+        if not batch:
+            return 0
+        placeholders = ', '.join(['%s'] * len(batch))
+        with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {ArchivedQuestion._meta.db_table} '
+                '(id, question_text, pub_date, version, status, closed_at, archived_at) '
+                'SELECT id, question_text, pub_date, version, %s, closed_at, %s '
+                f'FROM {Question._meta.db_table} WHERE id IN ({placeholders})',
+                [Question.ARCHIVED, now(), *batch],
+            )
+            cursor.execute(
+                f'INSERT INTO {ArchivedChoice._meta.db_table} (id, question_id, choice_text, votes, version) '
+                'SELECT id, question_id, choice_text, votes, version '
+                f'FROM {Choice._meta.db_table} WHERE question_id IN ({placeholders})',
+                batch,
+            )
+            return self._delete_batch(cursor, batch)
+
+
+class QuestionRepositoryDecorator:
+    """
+    Igual que ChoiceRepositoryDecorator: delega todo en otro IQuestionRepository
+    para que las subclases sólo cambien lo que necesitan.
+    """
+
+    def __init__(self, repository=None):
+        self.repository = repository if repository is not None else DjangoQuestionRepository()
+
+    def create(self, question: QuestionDTO) -> QuestionDTO:
+        return self.repository.create(question)
+
+    def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound:
+        return self.repository.get_by_id(question_id)
+
+    def get_recent(self, limit: int=5) -> list[QuestionDTO]:
+        return self.repository.get_recent(limit)
+
+    def search(self, query: str, limit: int = 20, cursor: int | None = None) -> QuestionPageDTO:
+        return self.repository.search(query, limit, cursor)
+
+    def update(self, question: QuestionDTO) -> QuestionDTO:
+        return self.repository.update(question)
+
+    def bulk_close(self, question_ids: list[int]) -> int:
+        return self.repository.bulk_close(question_ids)
 
-def create_question_service(question: QuestionDTO) -> CreateQuestion:
-    question_repository = DjangoQuestionRepository()
-    
-    return CreateQuestion(
-        question_repository=question_repository,
-        question=question
-    )
+    def bulk_delete(self, question_ids: list[int]) -> int:
+        return self.repository.bulk_delete(question_ids)
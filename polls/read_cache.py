@@ -0,0 +1,205 @@
+# polls/read_cache.py
+"""
+Caché de lecturas con vencimiento corto (``TTL`` segundos) sobre el caché de
+Django (``CACHES[ALIAS]``; sin CACHES es un LocMemCache por proceso): la lista
+de recientes, cada pregunta y las opciones con sus votos de cada pregunta, que
+es lo que piden el índice y los resultados.
+
+Las escrituras que pasan por estos repositorios borran lo que tocan. Los
+votos no (van por ``vote_repository`` y no se sabe la pregunta de cada
+opción sin consultarla): los resultados se ven con hasta ``TTL`` segundos de
+atraso. Las lecturas dentro de una transacción van directo a la base, igual
+que en polls/single_flight.py.
+
+Se activa con POLLS_PROVIDERS['question_repository'] = 'polls.read_cache.cached_question_repository'
+y POLLS_PROVIDERS['choice_repository'] = 'polls.read_cache.cached_choice_repository';
+polls/warmup.py lo llena al arrancar, dentro de ``warming()``: lo precargado
+dura ``WARM_TTL`` para que siga ahí cuando llegan las primeras peticiones.
+"""
+import threading
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Callable,
+    TypeVar,
+)
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.exceptions import QuestionNotFound
+
+from .choice_service import ChoiceRepositoryDecorator
+from .question_service import QuestionRepositoryDecorator
+from .single_flight import (
+    SingleFlightChoiceRepository,
+    SingleFlightQuestionRepository,
+)
+
+T = TypeVar('T')
+
+DEFAULT_READ_CACHE: dict[str, Any] = {
+    'ALIAS': 'default',  # alias de CACHES
+    'TTL': 2.0,          # segundos; también el atraso máximo de los votos en los resultados
+    'WARM_TTL': 30.0,    # segundos que dura lo que guarda la precarga (y su atraso de votos)
+    'PREFIX': 'polls',
+}
+
+_warming = threading.local()
+
+
+def read_cache_settings() -> dict[str, Any]:
+    return {**DEFAULT_READ_CACHE, **getattr(settings, 'POLLS_READ_CACHE', {})}
+
+
+@contextmanager
+def warming():
+    """Lo que este hilo guarde en el caché dentro del bloque dura ``WARM_TTL`` en lugar de ``TTL``."""
+    _warming.active = True
+    try:
+        yield
+    finally:
+        _warming.active = False
+
+
+class ReadCache:
+    """Claves con prefijo y TTL comunes; ``fetch`` es read-through."""
+
+    def __init__(self, alias: str | None = None, ttl: float | None = None, prefix: str | None = None,
+                 warm_ttl: float | None = None):
+        config = read_cache_settings()
+        self.cache = caches[alias or config['ALIAS']]
+        self.ttl = config['TTL'] if ttl is None else ttl
+        self.warm_ttl = max(self.ttl, config['WARM_TTL'] if warm_ttl is None else warm_ttl)
+        self.prefix = config['PREFIX'] if prefix is None else prefix
+
+    def key(self, *parts) -> str:
+        return ':'.join(map(str, (self.prefix, *parts)))
+
+    def get(self, key: str) -> Any:
+        return None if connection.in_atomic_block else self.cache.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        if not connection.in_atomic_block:
+            self.cache.set(key, value, self.warm_ttl if getattr(_warming, 'active', False) else self.ttl)
+
+    def fetch(self, key: str, fn: Callable[[], T]) -> T:
+        value = self.get(key)
+        if value is None:
+            value = fn()
+            self.set(key, value)
+        return value
+
+    def forget(self, *keys: str) -> None:
+        self.cache.delete_many(keys)
+
+
+class CachedQuestionRepository(QuestionRepositoryDecorator):
+    """
+    Guarda ``get_by_id`` y ``get_recent``. De recientes se guarda una sola
+    lista, la más larga pedida, y los pedidos más cortos se sirven de ella.
+
+        >>> repo = CachedQuestionRepository()
+        >>> question = repo.create(QuestionDTO(question_text='¿En caché?'))
+        >>> repo.get_by_id(question.id).question_text
+        '¿En caché?'
+        >>> question.question_text = '¿Editada?'
+        >>> repo.update(question).question_text, repo.get_by_id(question.id).question_text
+        ('¿Editada?', '¿Editada?')
+    """
+
+    def __init__(self, repository=None, cache: ReadCache | None = None):
+        super().__init__(repository)
+        self.cache = cache or ReadCache()
+
+    def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound:
+        # las inexistentes no se guardan: QuestionNotFound sale antes del set
+        return self.cache.fetch(self.cache.key('question', question_id), lambda: self.repository.get_by_id(question_id))
+
+    def get_recent(self, limit: int=5) -> list[QuestionDTO]:
+        key = self.cache.key('recent')
+        cached = self.cache.get(key)
+        if cached is not None and cached[0] >= limit:
+            return cached[1][:limit]
+        recent = self.repository.get_recent(limit)
+        self.cache.set(key, (limit, recent))
+        return recent
+
+    def create(self, question: QuestionDTO) -> QuestionDTO:
+        created = self.repository.create(question)
+        self.cache.forget(self.cache.key('recent'))
+        return created
+
+    def update(self, question: QuestionDTO) -> QuestionDTO:
+        try:
+            return self.repository.update(question)
+        finally:
+            self.forget([question.id])
+
+    def bulk_close(self, question_ids: list[int]) -> int:
+        closed = self.repository.bulk_close(question_ids)
+        self.forget(question_ids)
+        return closed
+
+    def bulk_delete(self, question_ids: list[int]) -> int:
+        deleted = self.repository.bulk_delete(question_ids)
+        self.forget(question_ids)
+        return deleted
+
+    def forget(self, question_ids: list[int]) -> None:
+        self.cache.forget(
+            self.cache.key('recent'),
+            *(self.cache.key(kind, question_id) for question_id in question_ids for kind in ('question', 'choices')),
+        )
+
+
+class CachedChoiceRepository(ChoiceRepositoryDecorator):
+    """
+    Guarda ``get_by_question`` (las opciones con sus votos). Lo que se escribe
+    por pregunta borra su entrada; lo que se escribe por id de opción vence con el TTL.
+    """
+
+    def __init__(self, repository=None, cache: ReadCache | None = None):
+        super().__init__(repository)
+        self.cache = cache or ReadCache()
+
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        return self.cache.fetch(self.cache.key('choices', question_id), lambda: self.repository.get_by_question(question_id))
+
+    def create(self, choice: ChoiceDTO) -> ChoiceDTO:
+        created = self.repository.create(choice)
+        self.forget([created.question_id])
+        return created
+
+    def bulk_create(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        created = self.repository.bulk_create(choices)
+        self.forget({choice.question_id for choice in created})
+        return created
+
+    def update(self, choice: ChoiceDTO) -> ChoiceDTO | None:
+        updated = self.repository.update(choice)
+        if updated is not None:
+            self.forget([updated.question_id])
+        return updated
+
+    def reset_votes_by_question(self, question_ids: list[int]) -> int:
+        reset = self.repository.reset_votes_by_question(question_ids)
+        self.forget(question_ids)
+        return reset
+
+    def forget(self, question_ids) -> None:
+        self.cache.forget(*(self.cache.key('choices', question_id) for question_id in question_ids))
+
+
+def cached_question_repository() -> CachedQuestionRepository:
+    # los fallos que coinciden se resuelven con una sola consulta
+    return CachedQuestionRepository(SingleFlightQuestionRepository())
+
+
+def cached_choice_repository() -> CachedChoiceRepository:
+    return CachedChoiceRepository(SingleFlightChoiceRepository())
@@ -0,0 +1,239 @@
+# polls/renderers.py
+"""
+Camino rápido de solo lectura para las APIs: convierte QuestionDTO/ChoiceDTO
+directo a JSON sin pasar por los campos de un Serializer ni por
+``json.dumps`` con el encoder de DRF.
+
+Para cada DTO registrado se compila (como hace ``dataclasses``) una función
+que arma el JSON concatenando los campos, con el conversor de cada uno ya
+elegido según su anotación. La salida es la misma que la de los serializers
+equivalentes con ``JSONRenderer`` (compacta, sin escapar unicode, fechas ISO
+8601 en la zona actual con ``Z`` para UTC).
+
+Una vista lo usa con ``renderer_classes = [DTOJSONRenderer, ...]`` y
+devolviendo ``DTOResponse`` con DTOs, listas y diccionarios de ellos.
+"""
+import json
+from dataclasses import fields as dataclass_fields
+from datetime import (
+    datetime,
+    timezone as dt_timezone,
+)
+from itertools import repeat
+from json.encoder import (
+    encode_basestring,
+    encode_basestring_ascii,
+)
+from types import (
+    NoneType,
+    UnionType,
+)
+from typing import (
+    Any,
+    Callable,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+
+quote = encode_basestring if api_settings.UNICODE_JSON else encode_basestring_ascii
+
+
+def current_timezone():
+    """La zona a la que ``serializers.DateTimeField`` lleva las fechas; ``None`` sin USE_TZ."""
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+
+def format_datetime(value: datetime, current=None) -> str:
+    """
+    Como ``serializers.DateTimeField``. ``current`` es ``current_timezone()``,
+    que se resuelve una vez por respuesta: cuesta más que el resto del formato.
+
+        >>> from datetime import timezone as tz
+        >>> format_datetime(datetime(2024, 5, 1, 12, 30, tzinfo=tz.utc), current_timezone())
+        '2024-05-01T12:30:00Z'
+    """
+    if current is not None:
+        value = value.astimezone(current) if value.tzinfo is not None else timezone.make_aware(value, current)
+    elif value.tzinfo is not None:
+        value = timezone.make_naive(value, dt_timezone.utc)
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def encode(value: Any) -> str:
+    """
+    JSON de cualquier valor; los DTOs registrados usan su función compilada.
+
+        >>> encode({'results': [ChoiceDTO(id=1, question_id=2, text='Piña', votes=3)], 'next': None})
+        '{"results":[{"id":1,"question_id":2,"choice_text":"Piña","votes":3}],"next":null}'
+    """
+    return _encode(value, current_timezone())
+
+
+def to_primitive(value: Any) -> Any:
+    """Lo mismo que ``encode`` pero a dicts y listas, para los renderers que no conocen los DTOs."""
+    return _to_primitive(value, current_timezone())
+
+
+def _encode(value: Any, tz) -> str:
+    encoder = _encoders.get(type(value))
+    if encoder is not None:
+        return encoder(value, tz)
+    if isinstance(value, (list, tuple)):
+        if value:
+            first = type(value[0])
+            encoder = _encoders.get(first)
+            # lo común: una lista de DTOs del mismo tipo, sin despachar elemento por elemento
+            if encoder is not None and all(type(item) is first for item in value):
+                return '[' + ','.join(map(encoder, value, repeat(tz))) + ']'
+        return '[' + ','.join(map(_encode, value, repeat(tz))) + ']'
+    if isinstance(value, dict):
+        return '{' + ','.join(quote(str(key)) + ':' + _encode(item, tz) for key, item in value.items()) + '}'
+    if isinstance(value, str):
+        return quote(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if type(value) is int:
+        return int.__repr__(value)
+    if isinstance(value, datetime):
+        return quote(format_datetime(value, tz))
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=quote is encode_basestring_ascii,
+                      allow_nan=not api_settings.STRICT_JSON, separators=(',', ':'))
+
+
+def _to_primitive(value: Any, tz) -> Any:
+    converter = _converters.get(type(value))
+    if converter is not None:
+        return converter(value, tz)
+    if isinstance(value, (list, tuple)):
+        return [_to_primitive(item, tz) for item in value]
+    if isinstance(value, dict):
+        return {key: _to_primitive(item, tz) for key, item in value.items()}
+    if isinstance(value, datetime):
+        return format_datetime(value, tz)
+    return value
+
+
+# tipo de la anotación -> (expresión que lo convierte a JSON, expresión que lo convierte a primitivo)
+_FIELD_CONVERTERS = {
+    str: ('_quote({})', '{}'),
+    int: ('_int({})', '{}'),
+    datetime: ('_quote(_datetime({}, tz))', '_datetime({}, tz)'),
+}
+_encoders: dict[type, Callable[[Any, Any], str]] = {}
+_converters: dict[type, Callable[[Any, Any], Any]] = {}
+
+
+def register(dto_class: type, fields: tuple[str | tuple[str, str], ...]) -> None:
+    """
+    Compila las funciones de ``dto_class``. ``fields`` son los atributos a
+    incluir, en orden; ``('nombre_json', 'atributo')`` para renombrar uno.
+
+        >>> from dataclasses import dataclass
+        >>> @dataclass
+        ... class Punto:
+        ...     x: int
+        ...     etiqueta: str | None = None
+        >>> register(Punto, ('x', ('label', 'etiqueta')))
+        >>> encode([Punto(1), Punto(2, 'dos')])
+        '[{"x":1,"label":null},{"x":2,"label":"dos"}]'
+        >>> to_primitive(Punto(3))
+        {'x': 3, 'label': None}
+    """
+    hints = get_type_hints(dto_class)
+    known = {field.name for field in dataclass_fields(dto_class)}
+    json_parts, dict_parts = [], []
+    for spec in fields:
+        name, attribute = spec if isinstance(spec, tuple) else (spec, spec)
+        if attribute not in known:
+            raise ValueError(f'{dto_class.__name__} no tiene el campo {attribute!r}')
+        annotation, optional = _unwrap_optional(hints[attribute])
+        to_json, to_dict = _FIELD_CONVERTERS.get(annotation, ('_encode({}, tz)', '_to_primitive({}, tz)'))
+        value = f'obj.{attribute}'
+        if optional and annotation in _FIELD_CONVERTERS:
+            to_json = f"('null' if {value} is None else {to_json.format(value)})"
+            to_dict = f'(None if {value} is None else {to_dict.format(value)})'
+        else:
+            to_json, to_dict = to_json.format(value), to_dict.format(value)
+        json_parts += [repr((',' if json_parts else '{') + quote(name) + ':'), to_json]
+        dict_parts.append(f'{name!r}: {to_dict}')
+    if not json_parts:
+        json_parts.append("'{'")
+    source = (
+        'def encode(obj, tz):\n'
+        f"    return {' + '.join(json_parts)} + '}}'\n"
+        'def to_primitive(obj, tz):\n'
+        f"    return {{{', '.join(dict_parts)}}}\n"
+    )
+    namespace = {
+        '_quote': quote,
+        '_int': int.__repr__,
+        '_datetime': format_datetime,
+        '_encode': _encode,
+        '_to_primitive': _to_primitive,
+    }
+    exec(compile(source, f'<encoder {dto_class.__qualname__}>', 'exec'), namespace)
+    _encoders[dto_class] = namespace['encode']
+    _converters[dto_class] = namespace['to_primitive']
+
+
+def _unwrap_optional(annotation) -> tuple[Any, bool]:
+    if get_origin(annotation) in (Union, UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not NoneType]
+        if len(args) == 1:
+            return args[0], True
+    return annotation, False
+
+
+# los mismos campos que QuestionSearchSerializer y ChoiceBatchSerializer
+register(QuestionDTO, ('id', 'question_text', 'pub_date', 'status'))
+register(ChoiceDTO, ('id', 'question_id', ('choice_text', 'text'), 'votes'))
+
+
+class DTOJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` con el camino rápido. Si se pide indentación (la API
+    navegable, ``; indent=4``) o ``COMPACT_JSON`` está apagado, convierte a
+    primitivos y deja el resto a ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not self.compact or self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(to_primitive(data), accepted_media_type, renderer_context)
+        # igual que JSONRenderer: la salida tiene que ser un subconjunto estricto de javascript
+        return encode(data).replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+
+
+class DTOResponse(Response):
+    """
+    Respuesta con DTOs en ``data``. Si la negociación eligió un renderer que
+    no es ``DTOJSONRenderer`` (la API navegable, por ejemplo), los convierte
+    antes a primitivos.
+    """
+
+    @property
+    def rendered_content(self):
+        renderer = getattr(self, 'accepted_renderer', None)
+        if renderer is not None and not isinstance(renderer, DTOJSONRenderer):
+            self.data = to_primitive(self.data)
+        return super().rendered_content
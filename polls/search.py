@@ -0,0 +1,182 @@
+# polls/search.py
+"""
+Índice de búsqueda de preguntas: una fila por pregunta con su texto y el de
+sus opciones ya normalizados (``business_logic.search.search_terms``).
+
+- SQLite: tabla virtual FTS5 ``polls_search`` con ``rowid`` = id de la pregunta.
+- PostgreSQL: tabla ``polls_search`` con un tsvector e índice GIN.
+- Otros motores: sin índice; ``match`` cae a ``icontains`` sobre las tablas.
+
+La tabla la crea y la llena con las preguntas existentes la migración
+0008_search. CreateQuestion/CreateChoice (y los Update*) la mantienen al día a
+través de ISearchIndex, y los borrados de los repositorios de Django también;
+lo que se cargue directo con el ORM sólo aparece tras
+``manage.py rebuild_search_index``.
+Los resultados van de la pregunta más nueva a la más vieja y se paginan por
+id, así una página cuesta lo mismo sin importar cuántas coincidencias haya.
+"""
+from collections import defaultdict
+from functools import reduce
+from operator import and_
+from typing import Iterable
+
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+    transaction,
+)
+from django.db.models import Q
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.search import (
+    query_terms,
+    search_terms,
+)
+
+from .choice_service import chunked
+from .models import Question
+
+SEARCH_TABLE = 'polls_search'
+INDEXED_VENDORS = ('sqlite', 'postgresql')
+
+
+def fts5_query(terms: list[str]) -> str:
+    """
+        >>> fts5_query(['color', 'fav'])
+        '"color" "fav"'
+    """
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+def tsquery(terms: list[str]) -> str:
+    """
+        >>> tsquery(['color', 'fav'])
+        'color & fav'
+    """
+    return ' & '.join(terms)
+
+
+class DjangoSearchIndex:
+    """
+    Implementa ISearchIndex sobre la tabla ``polls_search``.
+
+        >>> from polls.question_service import DjangoQuestionRepository
+        >>> question = DjangoQuestionRepository().create(QuestionDTO(question_text='¿Canción favorita?'))
+        >>> index = DjangoSearchIndex()
+        >>> index.index_question(question)
+        >>> index.match('CANCION favorita') == [question.id]
+        True
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+
+    @property
+    def vendor(self) -> str:
+        return connections[self.using].vendor
+
+    def index_question(self, question: QuestionDTO) -> None:
+        self.reindex([question.id])
+
+    def index_choices(self, choices: list[ChoiceDTO]) -> None:
+        self.reindex({choice.question_id for choice in choices if choice.question_id})
+
+    def reindex(self, question_ids: Iterable[int]) -> int:
+        """Vuelve a escribir el documento de cada pregunta desde las tablas; retorna cuántos escribió."""
+        if self.vendor not in INDEXED_VENDORS:
+            return 0
+        written = 0
+        # savepoint=False: casi siempre corre dentro de la transacción de quien creó la pregunta
+        with transaction.atomic(using=self.using, savepoint=False), connections[self.using].cursor() as cursor:
+            for batch in chunked(sorted(set(question_ids))):
+                documents = self._documents(batch)
+                self.remove(batch, cursor)
+                if documents:
+                    cursor.executemany(self._insert_sql(), documents)
+                written += len(documents)
+        return written
+
+    def _documents(self, question_ids: list[int]) -> list[tuple[int, str]]:
+        # una sola consulta con LEFT JOIN: el texto de la pregunta seguido del de sus opciones
+        texts = defaultdict(list)
+        for question_id, question_text, choice_text in (
+            Question.objects.using(self.using)
+            .filter(id__in=question_ids)
+            .order_by('id', 'choice__id')
+            .values_list('id', 'question_text', 'choice__choice_text')
+        ):
+            if not texts[question_id]:
+                texts[question_id].append(question_text)
+            if choice_text is not None:
+                texts[question_id].append(choice_text)
+        return [(question_id, ' '.join(search_terms(' '.join(parts)))) for question_id, parts in texts.items()]
+
+    def _insert_sql(self) -> str:
+        if self.vendor == 'sqlite':
+            return f'INSERT INTO {SEARCH_TABLE} (rowid, document) VALUES (%s, %s)'
+        return f"INSERT INTO {SEARCH_TABLE} (question_id, document) VALUES (%s, to_tsvector('simple', %s))"
+
+    def remove(self, question_ids: list[int], cursor=None) -> None:
+        """Quita preguntas del índice; ``cursor`` permite hacerlo en la transacción de quien borra."""
+        if self.vendor not in INDEXED_VENDORS or not question_ids:
+            return
+        key = 'rowid' if self.vendor == 'sqlite' else 'question_id'
+        if cursor is None:
+            with connections[self.using].cursor() as cursor:
+                return self.remove(question_ids, cursor)
+        for batch in chunked(list(question_ids)):
+            placeholders = ', '.join(['%s'] * len(batch))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE {key} IN ({placeholders})', batch)
+
+    def match(self, query: str, limit: int = 20, cursor: int | None = None) -> list[int]:
+        """IDs de las preguntas que coinciden, de mayor a menor, menores que ``cursor``."""
+        terms = query_terms(query)
+        if not terms or limit < 1:
+            return []
+        before = cursor if cursor is not None else 2 ** 63 - 1
+        if self.vendor == 'sqlite':
+            sql = (
+                f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s AND rowid < %s '
+                'ORDER BY rowid DESC LIMIT %s'
+            )
+            params = [fts5_query(terms), before, limit]
+        elif self.vendor == 'postgresql':
+            sql = (
+                f"SELECT question_id FROM {SEARCH_TABLE} WHERE document @@ to_tsquery('simple', %s) "
+                'AND question_id < %s ORDER BY question_id DESC LIMIT %s'
+            )
+            params = [tsquery(terms), before, limit]
+        else:
+            condition = reduce(and_, [
+                Q(question_text__icontains=term) | Q(choice__choice_text__icontains=term) for term in terms
+            ])
+            return list(
+                Question.objects.using(self.using)
+                .filter(condition, id__lt=before)
+                .order_by('-id')
+                .values_list('id', flat=True)
+                .distinct()[:limit]
+            )
+        with connections[self.using].cursor() as db_cursor:
+            db_cursor.execute(sql, params)
+            return [row[0] for row in db_cursor.fetchall()]
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Vacía el índice y lo vuelve a llenar desde las tablas, por lotes de ``batch_size`` preguntas."""
+        if self.vendor not in INDEXED_VENDORS:
+            return 0
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        written, last_id = 0, 0
+        questions = Question.objects.using(self.using).order_by('id').values_list('id', flat=True)
+        while batch := list(questions.filter(id__gt=last_id)[:batch_size]):
+            written += self.reindex(batch)
+            last_id = batch[-1]
+        if self.vendor == 'sqlite':
+            with connections[self.using].cursor() as cursor:
+                # junta los segmentos del índice que dejaron los lotes
+                cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+        return written
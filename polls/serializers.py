@@ -1,11 +1,32 @@
 # polls/serializers.py
 from rest_framework import serializers
 
-from .choice_service import (
-    create_choice_service,
+from django.utils.translation import gettext_lazy as _
+
+from business_logic.dtos import (
     ChoiceDTO,
+    QuestionDTO,
+)
+
+from .models import (
+    AppliedVoteBatch,
+    Choice,
+    Question,
+)
+from .services import (
+    create_choice_service,
+    create_choices_service,
+    create_question_with_choices_service,
 )
-from .models import Choice
+
+MAX_CHOICES_PER_BATCH = 100
+MAX_SEARCH_LIMIT = 100
+MAX_RECENT_LIMIT = 1000
+MAX_CHOICES_PER_UPLOAD = 1000
+MAX_VOTES_PER_CHOICE = 1_000_000
+CHOICE_TEXT_MAX_LENGTH = Choice._meta.get_field('choice_text').max_length
+QUESTION_TEXT_MAX_LENGTH = Question._meta.get_field('question_text').max_length
+UPLOAD_ID_MAX_LENGTH = AppliedVoteBatch._meta.get_field('batch_key').max_length
 
 
 class HolaSerializer(serializers.Serializer):
@@ -25,3 +46,95 @@ class ChoiceSerializer(serializers.ModelSerializer):
         choice_dto = _create_choice_service.execute()
         choice_dto.choice_text = choice_dto.text
         return choice_dto
+
+
+class ChoiceBatchListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        texts = [item['text'] for item in attrs]
+        if len(set(texts)) != len(texts):
+            raise serializers.ValidationError(_('Choices must be unique.'))
+        return attrs
+
+    def create(self, validated_data):
+        question_id = self.context.get('request').parser_context.get('kwargs').get('pk')
+        choices_data = [ChoiceDTO(question_id=question_id, text=item['text']) for item in validated_data]
+        return create_choices_service(choices_data).execute()
+
+
+class ChoiceBatchSerializer(serializers.Serializer):
+    """Lectura/escritura de ChoiceDTO, pensado para usarse con ``many=True``"""
+    id = serializers.IntegerField(read_only=True)
+    question_id = serializers.IntegerField(read_only=True)
+    choice_text = serializers.CharField(source='text', max_length=CHOICE_TEXT_MAX_LENGTH)
+    votes = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        list_serializer_class = ChoiceBatchListSerializer
+
+
+class QuestionWithChoicesSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    question_text = serializers.CharField(max_length=QUESTION_TEXT_MAX_LENGTH)
+    pub_date = serializers.DateTimeField(read_only=True)
+    choices = ChoiceBatchSerializer(many=True, max_length=MAX_CHOICES_PER_BATCH)
+
+    def create(self, validated_data):
+        question_dto = QuestionDTO(question_text=validated_data['question_text'])
+        choice_texts = [item['text'] for item in validated_data['choices']]
+        question, choices = create_question_with_choices_service(question_dto, choice_texts).execute()
+        return {
+            'id': question.id,
+            'question_text': question.question_text,
+            'pub_date': question.pub_date,
+            'choices': choices,
+        }
+
+
+class SearchParamsSerializer(serializers.Serializer):
+    """Parámetros de ``?q=...&limit=...&cursor=...``, con los nombres de IQuestionRepository.search"""
+    q = serializers.CharField(source='query', max_length=QUESTION_TEXT_MAX_LENGTH)
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_SEARCH_LIMIT, default=20)
+    cursor = serializers.IntegerField(min_value=1, required=False)
+
+
+class RecentParamsSerializer(serializers.Serializer):
+    """``?limit=...`` de IQuestionRepository.get_recent"""
+    limit = serializers.IntegerField(min_value=1, max_value=MAX_RECENT_LIMIT, default=5)
+
+
+class QuestionSearchSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    question_text = serializers.CharField(read_only=True)
+    pub_date = serializers.DateTimeField(read_only=True)
+    status = serializers.CharField(read_only=True)
+
+
+class VoteUploadSerializer(serializers.Serializer):
+    """
+    ``{"votes": {"<choice_id>": votos, ...}}`` de una subida en lote; el id de
+    la subida viene en la URL y se pasa en el contexto como ``upload_id``.
+    """
+    votes = serializers.DictField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_VOTES_PER_CHOICE),
+        allow_empty=False,
+    )
+
+    def validate_votes(self, votes):
+        if len(votes) > MAX_CHOICES_PER_UPLOAD:
+            raise serializers.ValidationError(
+                _('At most %(limit)d choices per upload.') % {'limit': MAX_CHOICES_PER_UPLOAD}
+            )
+        # isdigit solo acepta también dígitos Unicode como "²", que int() rechaza
+        if not all(key.isascii() and key.isdigit() for key in votes):
+            raise serializers.ValidationError(_('Keys must be choice ids.'))
+        deltas: dict[int, int] = {}
+        for key, count in votes.items():
+            deltas[int(key)] = deltas.get(int(key), 0) + count  # "7" y "07" son la misma opción
+        return deltas
+
+    def validate(self, attrs):
+        if len(self.context['upload_id']) > UPLOAD_ID_MAX_LENGTH:
+            raise serializers.ValidationError(
+                {'upload_id': _('At most %(limit)d characters.') % {'limit': UPLOAD_ID_MAX_LENGTH}}
+            )
+        return attrs
@@ -0,0 +1,97 @@
+# polls/services.py
+"""
+Fábricas de casos de uso. No importan los repositorios de Django al cargar el
+módulo; los obtienen del contenedor la primera vez que se necesitan.
+"""
+from typing import Callable
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.use_cases import (
+    CreateChoice,
+    CreateChoices,
+    CreateQuestion,
+    CreateQuestionWithChoices,
+    UpdateChoice,
+    UpdateQuestion,
+    Vote,
+    VoteBatch,
+)
+
+from .container import container
+
+
+def create_question_service(question: QuestionDTO) -> CreateQuestion:
+    return CreateQuestion(
+        question_repository=container.resolve('question_repository'),
+        question=question,
+        search_index=container.resolve('search_index'),
+    )
+
+
+def create_choice_service(choice_data: ChoiceDTO) -> CreateChoice:
+    return CreateChoice(
+        choice_repository=container.resolve('choice_repository'),
+        choice_data=choice_data,
+        search_index=container.resolve('search_index'),
+    )
+
+
+def create_choices_service(choices_data: list[ChoiceDTO]) -> CreateChoices:
+    return CreateChoices(
+        choice_repository=container.resolve('choice_repository'),
+        choices_data=choices_data,
+        search_index=container.resolve('search_index'),
+    )
+
+
+def create_question_with_choices_service(question: QuestionDTO, choice_texts: list[str]) -> CreateQuestionWithChoices:
+    return CreateQuestionWithChoices(
+        question_repository=container.resolve('question_repository'),
+        choice_repository=container.resolve('choice_repository'),
+        question=question,
+        choice_texts=choice_texts,
+        search_index=container.resolve('search_index'),
+    )
+
+
+def vote_service(choice_id: int) -> Vote:
+    return Vote(
+        choice_repository=container.resolve('vote_repository'),
+        choice_id=choice_id,
+        task_queue=container.resolve('task_queue'),
+        vote_series=container.resolve('vote_series'),
+    )
+
+
+def vote_batch_service(source: str, upload_id: str, deltas: dict[int, int], question_id: int | None = None) -> VoteBatch:
+    return VoteBatch(
+        choice_repository=container.resolve('vote_repository'),
+        question_repository=container.resolve('question_repository'),
+        source=source,
+        upload_id=upload_id,
+        deltas=deltas,
+        question_id=question_id,
+        task_queue=container.resolve('task_queue'),
+        vote_series=container.resolve('vote_series'),
+    )
+
+
+def update_choice_service(choice_id: int, changes: Callable[[ChoiceDTO], ChoiceDTO]) -> UpdateChoice:
+    return UpdateChoice(
+        choice_repository=container.resolve('choice_repository'),
+        choice_id=choice_id,
+        changes=changes,
+        search_index=container.resolve('search_index'),
+    )
+
+
+def update_question_service(question_id: int, changes: Callable[[QuestionDTO], QuestionDTO]) -> UpdateQuestion:
+    return UpdateQuestion(
+        question_repository=container.resolve('question_repository'),
+        question_id=question_id,
+        changes=changes,
+        search_index=container.resolve('search_index'),
+    )
@@ -0,0 +1,615 @@
+# polls/sharding.py
+"""
+Encuestas repartidas en varias bases de datos (shards) por id de pregunta.
+
+- Cada pregunta vive en el shard que le toca en un anillo de hashing
+  consistente (``HashRing``) y sus opciones (y su serie de votos, su archivo y
+  su documento de búsqueda) viven con ella. Agregar un shard sólo mueve
+  ~1/N de las encuestas.
+- Los ids son globales: ``IdAllocator`` los reserva de a bloques en
+  ``ShardSequence`` de la base catálogo (``CATALOG``), antes de elegir el shard.
+- Una opción se ubica por su id a través de ``ChoiceLocation`` (opción ->
+  pregunta, también en el catálogo), con un caché en memoria: esa relación
+  nunca cambia, aunque la encuesta se mueva de shard.
+- Los listados (``get_recent``, ``search``) consultan todos los shards y
+  mezclan los resultados ya ordenados de cada uno (k-way merge).
+- ``manage.py rebalance_shards`` mueve las encuestas que quedaron en un shard
+  que ya no les corresponde tras cambiar ``SHARDS``. Mientras tanto las
+  lecturas y los votos que no encuentran la fila en su shard la buscan en los
+  demás.
+
+Se activa con POLLS_SHARDING y los proveedores que se indican junto a ese
+bloque en settings; con un solo shard (el valor por defecto) todo sigue en
+``default``. El admin (salvo sus altas y borrados, que pasan por los
+repositorios) y las tablas que no son de encuestas (outbox de tareas,
+sesiones, usuarios) siguen en ``default``; ``generate_polls`` se niega a
+correr con varios shards.
+"""
+import bisect
+import hashlib
+import heapq
+import threading
+from collections import defaultdict
+from functools import cache
+from itertools import islice
+from typing import (
+    Any,
+    Iterable,
+)
+
+from django.conf import settings
+from django.db import (
+    IntegrityError,
+    connections,
+    transaction,
+)
+from django.db.models import Max
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+    QuestionPageDTO,
+)
+from business_logic.exceptions import (
+    ChoiceDataError,
+    ChoiceNotFound,
+    QuestionNotFound,
+)
+
+from .choice_service import (
+    DjangoChoiceRepository,
+    chunked,
+)
+from .models import (
+    AppliedVoteBatch,
+    AppliedVoteBatchQuestion,
+    ArchivedChoice,
+    ArchivedQuestion,
+    Choice,
+    ChoiceLocation,
+    Question,
+    ShardSequence,
+    VoteBucket,
+)
+from .question_service import DjangoQuestionRepository
+from .search import DjangoSearchIndex
+from .single_flight import (
+    SingleFlightChoiceRepository,
+    SingleFlightQuestionRepository,
+)
+from .vote_series import (
+    BufferedVoteSeriesWriter,
+    DjangoVoteSeriesRepository,
+)
+
+DEFAULT_SHARDING: dict[str, Any] = {
+    'SHARDS': ('default',),     # alias de DATABASES, cada uno con las migraciones aplicadas
+    'CATALOG': 'default',       # secuencias de ids y ubicación de las opciones
+    'VNODES': 64,               # puntos por shard en el anillo
+    'ID_BLOCK': 100,            # ids que reserva cada proceso por viaje al catálogo
+    'LOCATION_CACHE': 100_000,  # opciones cuya pregunta se recuerda en memoria
+}
+
+
+def sharding_settings() -> dict[str, Any]:
+    return {**DEFAULT_SHARDING, **getattr(settings, 'POLLS_SHARDING', {})}
+
+
+class HashRing:
+    """
+    Anillo de hashing consistente con ``vnodes`` puntos por shard.
+
+        >>> before, after = HashRing(['a', 'b', 'c']), HashRing(['a', 'b', 'c', 'd'])
+        >>> moved = [i for i in range(10_000) if before.shard_for(i) != after.shard_for(i)]
+        >>> 0.15 < len(moved) / 10_000 < 0.35  # ~1/4, y todas hacia el shard nuevo
+        True
+        >>> {after.shard_for(i) for i in moved}
+        {'d'}
+    """
+
+    def __init__(self, shards: Iterable[str], vnodes: int = 64):
+        self.shards = tuple(shards)
+        points = sorted((self._hash(f'{shard}#{replica}'), shard) for shard in self.shards for replica in range(vnodes))
+        self._points = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big')
+
+    def shard_for(self, question_id: int) -> str:
+        if len(self.shards) == 1:
+            return self.shards[0]
+        index = bisect.bisect(self._points, self._hash(str(question_id))) % len(self._points)
+        return self._owners[index]
+
+
+@cache
+def _ring(shards: tuple[str, ...], vnodes: int) -> HashRing:
+    return HashRing(shards, vnodes)
+
+
+def ring() -> HashRing:
+    config = sharding_settings()
+    return _ring(tuple(config['SHARDS']), config['VNODES'])
+
+
+def db_for_question(question_id: int) -> str:
+    """Alias de la base donde vive la pregunta; ``default`` sin sharding."""
+    return ring().shard_for(question_id)
+
+
+class IdAllocator:
+    """
+    Ids globales para las tablas repartidas. Cada proceso reserva bloques de
+    ``block`` ids con un UPDATE en el catálogo y los entrega desde memoria.
+    Los ids son únicos pero no siguen el orden de creación entre procesos.
+    """
+
+    def __init__(self, catalog: str, block: int = 100):
+        self.catalog = catalog
+        self.block = block
+        self._blocks: dict[str, tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, name: str, count: int = 1) -> list[int]:
+        ids: list[int] = []
+        with self._lock:
+            while len(ids) < count:
+                next_id, end = self._blocks.get(name, (0, 0))
+                if next_id >= end:
+                    next_id, end = self._reserve(name, max(self.block, count - len(ids)))
+                taken = min(end - next_id, count - len(ids))
+                ids.extend(range(next_id, next_id + taken))
+                self._blocks[name] = (next_id + taken, end)
+        return ids
+
+    def _reserve(self, name: str, size: int) -> tuple[int, int]:
+        sequences = ShardSequence.objects.using(self.catalog)
+        with transaction.atomic(using=self.catalog):
+            sequence = sequences.select_for_update().filter(name=name).first()
+            if sequence is None:
+                # la primera vez sigue después de lo que ya haya en cualquier shard
+                sequence = sequences.create(name=name, next_id=self._highest_id(name) + 1)
+            start = sequence.next_id
+            sequences.filter(name=name).update(next_id=start + size)
+        return start, start + size
+
+    @staticmethod
+    def _highest_id(name: str) -> int:
+        models = SEQUENCE_MODELS[name]
+        return max(
+            model.objects.using(alias).aggregate(highest=Max('id'))['highest'] or 0
+            for alias in sharding_settings()['SHARDS']
+            for model in models
+        )
+
+
+SEQUENCE_MODELS = {
+    'question': (Question, ArchivedQuestion),
+    'choice': (Choice, ArchivedChoice),
+}
+
+
+@cache
+def _allocator(catalog: str, block: int) -> IdAllocator:
+    return IdAllocator(catalog, block)
+
+
+def id_allocator() -> IdAllocator:
+    config = sharding_settings()
+    return _allocator(config['CATALOG'], config['ID_BLOCK'])
+
+
+class ChoiceLocations:
+    """``ChoiceLocation`` del catálogo con un caché acotado (se vacía al llenarse)."""
+
+    def __init__(self, catalog: str, cache_size: int = 100_000):
+        self.catalog = catalog
+        self.cache_size = cache_size
+        self._cache: dict[int, int] = {}
+
+    def question_ids(self, choice_ids: Iterable[int]) -> dict[int, int]:
+        found = {choice_id: self._cache[choice_id] for choice_id in choice_ids if choice_id in self._cache}
+        missing = [choice_id for choice_id in choice_ids if choice_id not in found]
+        for batch in chunked(missing):
+            rows = dict(
+                ChoiceLocation.objects.using(self.catalog)
+                .filter(choice_id__in=batch)
+                .values_list('choice_id', 'question_id')
+            )
+            found.update(rows)
+            self._remember(rows)
+        return found
+
+    def add(self, locations: dict[int, int]) -> None:
+        ChoiceLocation.objects.using(self.catalog).bulk_create(
+            [ChoiceLocation(choice_id=choice_id, question_id=question_id) for choice_id, question_id in locations.items()],
+            ignore_conflicts=True,
+        )
+        self._remember(locations)
+
+    def remove(self, choice_ids: list[int]) -> None:
+        for batch in chunked(choice_ids):
+            ChoiceLocation.objects.using(self.catalog).filter(choice_id__in=batch).delete()
+        for choice_id in choice_ids:
+            self._cache.pop(choice_id, None)
+
+    def remove_questions(self, question_ids: list[int]) -> None:
+        for batch in chunked(question_ids):
+            ChoiceLocation.objects.using(self.catalog).filter(question_id__in=batch).delete()
+        # las entradas viejas del caché apuntan a preguntas borradas: no encuentran nada y no hacen daño
+
+    def _remember(self, locations: dict[int, int]) -> None:
+        if len(self._cache) + len(locations) > self.cache_size:
+            self._cache.clear()
+        self._cache.update(locations)
+
+
+class ShardedRepositoryMixin:
+    """Routing común: un repositorio de Django por shard y el anillo de la configuración."""
+
+    def __init__(self):
+        config = sharding_settings()
+        self.ring = _ring(tuple(config['SHARDS']), config['VNODES'])
+        self.ids = _allocator(config['CATALOG'], config['ID_BLOCK'])
+
+    def owner(self, question_id: int):
+        return self.shards[self.ring.shard_for(question_id)]
+
+    def others(self, repository) -> list:
+        """Los demás shards, donde puede estar una encuesta que todavía no se rebalanceó."""
+        return [other for other in self.shards.values() if other is not repository]
+
+    def group(self, items: Iterable[tuple[int, Any]]) -> list[tuple[Any, list]]:
+        """Pares ``(question_id, item)`` agrupados por el repositorio del shard de la pregunta."""
+        groups = defaultdict(list)
+        for question_id, item in items:
+            groups[self.ring.shard_for(question_id)].append(item)
+        return [(self.shards[alias], group) for alias, group in groups.items()]
+
+    def by_owner(self, question_ids: Iterable[int]) -> list[tuple[Any, list[int]]]:
+        return self.group((question_id, question_id) for question_id in question_ids)
+
+
+class ShardedQuestionRepository(ShardedRepositoryMixin):
+    """IQuestionRepository sobre varios DjangoQuestionRepository, uno por shard."""
+
+    def __init__(self):
+        super().__init__()
+        config = sharding_settings()
+        self.shards = {alias: DjangoQuestionRepository(alias) for alias in self.ring.shards}
+        self.locations = ChoiceLocations(config['CATALOG'], config['LOCATION_CACHE'])
+
+    def create(self, question: QuestionDTO) -> QuestionDTO:
+        question.id = self.ids.allocate('question')[0]
+        return self.owner(question.id).create(question)
+
+    def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound:
+        owner = self.owner(question_id)
+        for repository in (owner, *self.others(owner)):
+            try:
+                return repository.get_by_id(question_id)
+            except QuestionNotFound as error:
+                not_found = error
+        raise not_found
+
+    def get_recent(self, limit: int=5) -> list[QuestionDTO]:
+        # cada shard ya devuelve sus ``limit`` más recientes en orden: basta mezclar
+        recent = [repository.get_recent(limit) for repository in self.shards.values()]
+        return list(islice(heapq.merge(*recent, key=lambda question: question.pub_date, reverse=True), limit))
+
+    def search(self, query: str, limit: int = 20, cursor: int | None = None) -> QuestionPageDTO:
+        pages = [repository.search(query, limit, cursor).questions for repository in self.shards.values()]
+        questions = list(islice(heapq.merge(*pages, key=lambda question: question.id, reverse=True), limit))
+        return QuestionPageDTO(
+            questions=questions,
+            next_cursor=questions[-1].id if len(questions) == limit else None,
+        )
+
+    def update(self, question: QuestionDTO) -> QuestionDTO:
+        owner = self.owner(question.id)
+        for repository in (owner, *self.others(owner)):
+            try:
+                return repository.update(question)
+            except QuestionNotFound as error:
+                not_found = error
+        raise not_found
+
+    def bulk_close(self, question_ids: list[int]) -> int:
+        return sum(repository.bulk_close(ids) for repository, ids in self.by_owner(question_ids))
+
+    def bulk_delete(self, question_ids: list[int]) -> int:
+        deleted = sum(repository.bulk_delete(ids) for repository, ids in self.by_owner(question_ids))
+        self.locations.remove_questions(question_ids)
+        return deleted
+
+    def archive_closed(self, closed_before, batch_size: int = 500) -> int:
+        return sum(repository.archive_closed(closed_before, batch_size) for repository in self.shards.values())
+
+
+class ShardedChoiceRepository(ShardedRepositoryMixin):
+    """IChoiceRepository sobre varios DjangoChoiceRepository; cada opción va al shard de su pregunta."""
+
+    def __init__(self):
+        super().__init__()
+        config = sharding_settings()
+        self.shards = {alias: DjangoChoiceRepository(alias) for alias in self.ring.shards}
+        self.locations = ChoiceLocations(config['CATALOG'], config['LOCATION_CACHE'])
+
+    def by_choice_owner(self, choice_ids: Iterable[int]) -> list[tuple[Any, list[int]]]:
+        """Opciones agrupadas por el shard de su pregunta; las que no están en el catálogo no existen."""
+        return self.group(
+            (question_id, choice_id)
+            for choice_id, question_id in self.locations.question_ids(list(choice_ids)).items()
+        )
+
+    def in_transit(self, repository, choice_ids: list[int]) -> list[tuple[Any, list[int]]]:
+        """Las opciones que no están en ``repository``, agrupadas por el shard donde sí están."""
+        present = set(
+            Choice.objects.using(repository.using).filter(id__in=choice_ids).values_list('id', flat=True)
+        )
+        missing = [choice_id for choice_id in choice_ids if choice_id not in present]
+        groups = []
+        for other in self.others(repository) if missing else []:
+            found = set(Choice.objects.using(other.using).filter(id__in=missing).values_list('id', flat=True))
+            if moved := [choice_id for choice_id in missing if choice_id in found]:
+                groups.append((other, moved))
+        return groups
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None:
+        groups = self.by_choice_owner([choice_id])
+        if not groups:
+            return None
+        owner = groups[0][0]
+        for repository in (owner, *self.others(owner)):
+            choice = repository.get_by_id(choice_id)
+            if choice is not None:
+                return choice
+        return None
+
+    def get_all(self) -> list[ChoiceDTO]:
+        return sorted(
+            (choice for repository in self.shards.values() for choice in repository.get_all()),
+            key=lambda choice: choice.id,
+        )
+
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        owner = self.owner(question_id)
+        for repository in (owner, *self.others(owner)):
+            choices = repository.get_by_question(question_id)
+            if choices:
+                return choices
+        return []
+
+    def get_question_ids(self, choice_ids: list[int]) -> dict[int, int]:
+        return self.locations.question_ids(choice_ids)
+
+    def update_votes(self, choice_id: int) -> int:
+        for repository, ids in self.by_choice_owner([choice_id]):
+            for candidate in (repository, *self.others(repository)):
+                if rows := candidate.update_votes(choice_id):
+                    return rows
+        return 0
+
+    def bulk_update_votes(self, deltas: dict[int, int]) -> int:
+        return sum(
+            self._update_votes(repository, {choice_id: deltas[choice_id] for choice_id in ids})
+            for repository, ids in self.by_choice_owner(deltas)
+        )
+
+    def apply_vote_batch(self, source: str, batch_key: str, deltas: dict[int, int]) -> bool:
+        """
+        Aplica la parte de cada shard con el registro de lotes de ese shard:
+        si un reintento llega después de un fallo parcial, sólo se aplica lo
+        que faltó. El registro anota las preguntas de esa parte, para que
+        ``move_questions`` lo lleve con ellas. Retorna True si algún shard
+        aplicó su parte.
+        """
+        question_ids = self.locations.question_ids(list(deltas))
+        applied = False
+        for repository, ids in self.group((question_ids[choice_id], choice_id) for choice_id in question_ids):
+            try:
+                with transaction.atomic(using=repository.using):
+                    AppliedVoteBatch.objects.using(repository.using).create(source=source, batch_key=batch_key)
+                    AppliedVoteBatchQuestion.objects.using(repository.using).bulk_create([
+                        AppliedVoteBatchQuestion(source=source, batch_key=batch_key, question_id=question_id)
+                        for question_id in {question_ids[choice_id] for choice_id in ids}
+                    ])
+                    self._update_votes(repository, {choice_id: deltas[choice_id] for choice_id in ids})
+            except IntegrityError:
+                continue
+            applied = True
+        return applied
+
+    def _update_votes(self, repository, deltas: dict[int, int]) -> int:
+        updated = repository.bulk_update_votes(deltas)
+        if updated < len(deltas):
+            for other, moved in self.in_transit(repository, list(deltas)):
+                updated += other.bulk_update_votes({choice_id: deltas[choice_id] for choice_id in moved})
+        return updated
+
+    def bulk_reset_votes(self, choice_ids: list[int]) -> int:
+        return sum(repository.bulk_reset_votes(ids) for repository, ids in self.by_choice_owner(choice_ids))
+
+    def reset_votes_by_question(self, question_ids: list[int]) -> int:
+        return sum(repository.reset_votes_by_question(ids) for repository, ids in self.by_owner(question_ids))
+
+    def create(self, choice: ChoiceDTO) -> ChoiceDTO:
+        return self.bulk_create([choice])[0]
+
+    def bulk_create(self, choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+        if any(not choice.question_id for choice in choices):
+            raise ChoiceDataError('es necesario el campo question_id para la creacion de un Choice')
+        for choice, choice_id in zip(choices, self.ids.allocate('choice', len(choices))):
+            choice.id = choice_id
+        # primero la ubicación: una ubicación sin opción no encuentra nada, una opción sin ubicación se pierde
+        self.locations.add({choice.id: choice.question_id for choice in choices})
+        for repository, group in self.group((choice.question_id, choice) for choice in choices):
+            repository.bulk_create(group)
+        return choices
+
+    def update(self, choice: ChoiceDTO) -> ChoiceDTO | None:
+        if choice.id is None:
+            return None
+        for repository, ids in self.by_choice_owner([choice.id]):
+            for candidate in (repository, *self.others(repository)):
+                try:
+                    return candidate.update(choice)
+                except ChoiceNotFound:
+                    pass
+        raise ChoiceNotFound(f"El 'Choice' con ID {choice.id} no existe.")
+
+    def delete(self, choice_id: int) -> None:
+        self.bulk_delete([choice_id])
+
+    def bulk_delete(self, choice_ids: list[int]) -> int:
+        deleted = sum(repository.bulk_delete(ids) for repository, ids in self.by_choice_owner(choice_ids))
+        self.locations.remove(choice_ids)
+        return deleted
+
+
+class ShardedSearchIndex(ShardedRepositoryMixin):
+    """ISearchIndex que escribe cada documento en el shard de su pregunta."""
+
+    def __init__(self):
+        super().__init__()
+        self.shards = {alias: DjangoSearchIndex(alias) for alias in self.ring.shards}
+
+    def index_question(self, question: QuestionDTO) -> None:
+        self.owner(question.id).index_question(question)
+
+    def index_choices(self, choices: list[ChoiceDTO]) -> None:
+        self.reindex({choice.question_id for choice in choices if choice.question_id})
+
+    def reindex(self, question_ids: Iterable[int]) -> int:
+        return sum(index.reindex(ids) for index, ids in self.by_owner(question_ids))
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        return sum(index.rebuild(batch_size) for index in self.shards.values())
+
+
+class ShardedVoteSeriesRepository(ShardedRepositoryMixin):
+    """La serie de votos de cada opción en el shard de su pregunta (``VoteBucket`` apunta a ``Choice``)."""
+
+    def __init__(self):
+        super().__init__()
+        config = sharding_settings()
+        self.shards = {alias: DjangoVoteSeriesRepository(alias) for alias in self.ring.shards}
+        self.locations = ChoiceLocations(config['CATALOG'], config['LOCATION_CACHE'])
+
+    def add_buckets(self, rows: dict[tuple[int, int], int], resolution: int) -> None:
+        question_ids = self.locations.question_ids(list({choice_id for choice_id, _ in rows}))
+        # sin ubicación la opción ya no existe: se descarta como en DjangoVoteSeriesRepository
+        groups = self.group(
+            (question_ids[key[0]], (key, votes)) for key, votes in rows.items() if key[0] in question_ids
+        )
+        for repository, group in groups:
+            repository.add_buckets(dict(group), resolution)
+
+    def get_range(self, choice_id: int, start, end, resolution: int = VoteBucket.MINUTE):
+        question_id = self.locations.question_ids([choice_id]).get(choice_id)
+        repository = self.owner(question_id) if question_id else next(iter(self.shards.values()))
+        return repository.get_range(choice_id, start, end, resolution)
+
+    def compact(self, source: int, target: int, older_than: int) -> int:
+        return sum(repository.compact(source, target, older_than) for repository in self.shards.values())
+
+
+def single_flight_question_repository() -> SingleFlightQuestionRepository:
+    return SingleFlightQuestionRepository(ShardedQuestionRepository())
+
+
+def single_flight_choice_repository() -> SingleFlightChoiceRepository:
+    return SingleFlightChoiceRepository(ShardedChoiceRepository())
+
+
+def buffered_vote_series() -> BufferedVoteSeriesWriter:
+    return BufferedVoteSeriesWriter(ShardedVoteSeriesRepository())
+
+
+# tablas que se mueven con cada pregunta: (modelo, columna que apunta a la pregunta)
+MOVED_TABLES = (
+    (Question, 'id'),
+    (Choice, 'question_id'),
+    (VoteBucket, 'choice__question_id'),
+    (ArchivedQuestion, 'id'),
+    (ArchivedChoice, 'question_id'),
+)
+# su id autoincremental es de cada shard (los de preguntas y opciones son globales): se copian sin
+# id y lo que evita duplicados es su restricción única
+SHARD_LOCAL_IDS = (VoteBucket,)
+
+
+def misplaced(alias: str, batch_size: int = 500) -> Iterable[tuple[str, list[int]]]:
+    """Lotes ``(shard destino, ids)`` de preguntas de ``alias`` que el anillo ubica en otro shard."""
+    current = ring()
+    for model in (Question, ArchivedQuestion):
+        last_id = 0
+        while ids := list(
+            model.objects.using(alias).filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        ):
+            last_id = ids[-1]
+            targets = defaultdict(list)
+            for question_id in ids:
+                if (target := current.shard_for(question_id)) != alias:
+                    targets[target].append(question_id)
+            yield from targets.items()
+
+
+def move_questions(source: str, target: str, question_ids: list[int]) -> int:
+    """
+    Copia las preguntas (con todo lo que vive con ellas) de ``source`` a
+    ``target`` y las borra de ``source``, junto con el registro de los lotes
+    de votos que las tocaron. Las dos transacciones quedan
+    abiertas durante la copia, así nadie escribe en las filas que se están
+    moviendo; si la segunda falla al confirmar, la copia ignora lo que ya
+    existe en ``target`` y se puede volver a correr.
+    """
+    with transaction.atomic(using=source), transaction.atomic(using=target):
+        for model, question_field in MOVED_TABLES:
+            rows = list(
+                model.objects.using(source)
+                .select_for_update()
+                .filter(**{f'{question_field}__in': question_ids})
+                .values()
+            )
+            if model in SHARD_LOCAL_IDS:
+                for row in rows:
+                    del row[model._meta.pk.attname]
+            model.objects.using(target).bulk_create([model(**row) for row in rows], ignore_conflicts=True)
+        batches = AppliedVoteBatchQuestion.objects.using(source).filter(question_id__in=question_ids)
+        links = list(batches.values_list('source', 'batch_key', 'question_id'))
+        AppliedVoteBatch.objects.using(target).bulk_create(
+            [AppliedVoteBatch(source=batch_source, batch_key=batch_key) for batch_source, batch_key in
+             {(batch_source, batch_key) for batch_source, batch_key, _ in links}],
+            ignore_conflicts=True,
+        )
+        AppliedVoteBatchQuestion.objects.using(target).bulk_create(
+            [AppliedVoteBatchQuestion(source=batch_source, batch_key=batch_key, question_id=question_id)
+             for batch_source, batch_key, question_id in links],
+            ignore_conflicts=True,
+        )
+        batches.delete()
+        with connections[source].cursor() as cursor:
+            moved = DjangoQuestionRepository(source)._delete_batch(cursor, question_ids)
+        ArchivedChoice.objects.using(source).filter(question_id__in=question_ids).delete()
+        moved += ArchivedQuestion.objects.using(source).filter(id__in=question_ids).delete()[1].get(
+            ArchivedQuestion._meta.label, 0
+        )
+        DjangoSearchIndex(target).reindex(question_ids)
+    return moved
+
+
+def rebalance(sources: Iterable[str] | None = None, batch_size: int = 500) -> dict[tuple[str, str], int]:
+    """
+    Mueve a su shard las preguntas que están en otro. ``sources`` permite
+    vaciar un shard que ya se quitó de ``SHARDS``. Retorna cuántas preguntas
+    se movieron por ``(origen, destino)``.
+    """
+    moved: dict[tuple[str, str], int] = defaultdict(int)
+    for source in sources or ring().shards:
+        # cada lote se lee entero antes de mover: lo que se mueve ya quedó atrás del último id
+        for target, question_ids in misplaced(source, batch_size):
+            moved[source, target] += move_questions(source, target, question_ids)
+    return dict(moved)
@@ -0,0 +1,327 @@
+# polls/shared_counters.py
+import atexit
+import fcntl
+import logging
+import os
+import secrets
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import replace
+from multiprocessing import (
+    resource_tracker,
+    shared_memory,
+)
+from pathlib import Path
+from typing import Callable
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from business_logic.dtos import ChoiceDTO
+from business_logic.exceptions import ChoiceNotFound
+
+from .choice_service import ChoiceRepositoryDecorator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SHARED_COUNTERS: dict = {
+    'NAME': 'polls_votes',
+    'SLOTS': 16384,
+    'STRIPES': 64,
+    'FLUSH_INTERVAL': 1.0,
+    'LOCK_DIR': None,   # por defecto el directorio temporal del sistema
+}
+
+MAGIC = 0x504F4C4C53  # 'POLLS'
+# encabezado: magic, slots, epoch, generation, inflight_generation
+HEADER = 5
+_MAGIC, _SLOTS, _EPOCH, _GENERATION, _INFLIGHT_GENERATION = range(HEADER)
+# cada slot: choice_id, pending, inflight
+SLOT = 3
+_CHOICE_ID, _PENDING, _INFLIGHT = range(SLOT)
+ITEM_SIZE = 8
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+ApplyBatch = Callable[[dict[int, int], str], object]
+
+
+class SharedVoteCounters:
+    """
+    Tabla hash de contadores en memoria compartida, común a todos los workers
+    de un nodo. Es un arreglo de int64 con direccionamiento abierto por
+    choice_id; los incrementos usan locks por franja (``fcntl`` sobre rangos de
+    bytes de un archivo, que el sistema libera si el proceso muere).
+
+    Un solo proceso a la vez (el que obtiene el lock de flusher) mueve los
+    pendientes a ``inflight`` y los persiste con una clave de lote
+    ``epoch:generation``; si muere a la mitad, el siguiente flusher reaplica el
+    mismo lote y la base de datos lo descarta si ya estaba confirmado.
+    """
+
+    def __init__(self, name: str, slots: int = 16384, stripes: int = 64, lock_dir: str | None = None):
+        self.name = name
+        self.slots = slots
+        self.stripes = stripes
+        self.lock_path = Path(lock_dir or tempfile.gettempdir()) / f'{name}.lock'
+        self._thread_locks = [threading.Lock() for _ in range(stripes + 2)]
+        self._insert_lock = stripes
+        self._flusher_lock = stripes + 1
+        self._pid: int | None = None
+        self._is_flusher = False
+
+    # -- conexión al segmento --------------------------------------------
+
+    def _attach(self) -> None:
+        if self._pid == os.getpid():
+            return
+        if self._pid is not None:
+            # después de un fork se abre de nuevo: los locks fcntl no se heredan
+            self._array.release()
+            self._shm.close()
+            os.close(self._fd)
+        self._is_flusher = False
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = (HEADER + self.slots * SLOT) * ITEM_SIZE
+        try:
+            self._shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+            created = True
+        except FileExistsError:
+            self._shm = shared_memory.SharedMemory(name=self.name)
+            created = False
+        # el segmento debe sobrevivir a la salida de cualquier worker
+        resource_tracker.unregister(self._shm._name, 'shared_memory')  # type: ignore[attr-defined]
+        self._array = self._shm.buf.cast('q')
+        if created:
+            self._array[_SLOTS] = self.slots
+            self._array[_EPOCH] = secrets.randbits(62)
+            self._array[_MAGIC] = MAGIC
+        else:
+            deadline = time.monotonic() + 5
+            while self._array[_MAGIC] != MAGIC:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f'el segmento {self.name} no se inicializó')
+                time.sleep(0.001)
+            self.slots = self._array[_SLOTS]
+        self._pid = os.getpid()
+
+    @property
+    def attached(self) -> bool:
+        return self._pid == os.getpid()
+
+    @contextmanager
+    def _locked(self, index: int):
+        with self._thread_locks[index]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, index)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, index)
+
+    def _base(self, index: int) -> int:
+        return HEADER + index * SLOT
+
+    def _find_slot(self, choice_id: int, create: bool) -> int | None:
+        array = self._array
+        home = (choice_id * HASH_MULTIPLIER) % (1 << 64) % self.slots
+        for probe in range(self.slots):
+            index = (home + probe) % self.slots
+            base = self._base(index)
+            current = array[base + _CHOICE_ID]
+            if current == choice_id:
+                return index
+            if current == 0:
+                if not create:
+                    return None
+                # las claves nunca se borran, sólo la inserción necesita exclusión global
+                with self._locked(self._insert_lock):
+                    current = array[base + _CHOICE_ID]
+                    if current == 0:
+                        array[base + _CHOICE_ID] = choice_id
+                        return index
+                if current == choice_id:
+                    return index
+        return None
+
+    # -- contadores --------------------------------------------------------
+
+    def increment(self, choice_id: int, delta: int = 1) -> bool:
+        """Retorna False si la tabla está llena y el voto no se registró."""
+        if choice_id <= 0:
+            raise ValueError('choice_id debe ser positivo')
+        self._attach()
+        index = self._find_slot(choice_id, create=True)
+        if index is None:
+            return False
+        base = self._base(index)
+        with self._locked(index % self.stripes):
+            self._array[base + _PENDING] += delta
+        return True
+
+    def unflushed(self, choice_id: int) -> int:
+        """Votos aún no persistidos (pendientes más en vuelo)."""
+        self._attach()
+        index = self._find_slot(choice_id, create=False)
+        if index is None:
+            return 0
+        base = self._base(index)
+        return self._array[base + _PENDING] + self._array[base + _INFLIGHT]
+
+    # -- flush -------------------------------------------------------------
+
+    def try_become_flusher(self) -> bool:
+        self._attach()
+        if self._is_flusher:
+            return True
+        try:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, self._flusher_lock)
+        except OSError:
+            return False
+        self._is_flusher = True
+        return True
+
+    def _batch_key(self, generation: int) -> str:
+        return f'{self._array[_EPOCH]}:{generation}'
+
+    def _apply_inflight(self, apply: ApplyBatch) -> int:
+        array = self._array
+        generation = array[_INFLIGHT_GENERATION]
+        deltas = {}
+        for index in range(self.slots):
+            base = self._base(index)
+            if array[base + _INFLIGHT]:
+                deltas[array[base + _CHOICE_ID]] = array[base + _INFLIGHT]
+        if deltas:
+            apply(deltas, self._batch_key(generation))
+        for stripe in range(self.stripes):
+            with self._locked(stripe):
+                for index in range(stripe, self.slots, self.stripes):
+                    array[self._base(index) + _INFLIGHT] = 0
+        array[_INFLIGHT_GENERATION] = 0
+        return sum(deltas.values())
+
+    def flush(self, apply: ApplyBatch) -> int:
+        """
+        Persiste los votos pendientes con ``apply(deltas, batch_key)``, que debe
+        ser idempotente por ``batch_key``. Sólo lo debe llamar el flusher.
+        Retorna el número de votos persistidos.
+        """
+        self._attach()
+        array = self._array
+        flushed = 0
+        if array[_INFLIGHT_GENERATION]:
+            # un flusher anterior murió antes de terminar su lote
+            flushed += self._apply_inflight(apply)
+        for stripe in range(self.stripes):
+            with self._locked(stripe):
+                for index in range(stripe, self.slots, self.stripes):
+                    base = self._base(index)
+                    pending = array[base + _PENDING]
+                    if pending:
+                        array[base + _INFLIGHT] += pending
+                        array[base + _PENDING] = 0
+        generation = array[_GENERATION] + 1
+        array[_GENERATION] = generation
+        array[_INFLIGHT_GENERATION] = generation
+        flushed += self._apply_inflight(apply)
+        return flushed
+
+    def close(self) -> None:
+        if self._pid == os.getpid():
+            self._array.release()
+            self._shm.close()
+            os.close(self._fd)
+            self._pid = None
+
+    def unlink(self) -> None:
+        self._attach()
+        shm = self._shm
+        self.close()
+        # SharedMemory.unlink lo vuelve a quitar del resource tracker
+        resource_tracker.register(shm._name, 'shared_memory')  # type: ignore[attr-defined]
+        shm.unlink()
+        self.lock_path.unlink(missing_ok=True)
+
+
+def shared_counters_settings() -> dict:
+    return {**DEFAULT_SHARED_COUNTERS, **getattr(settings, 'POLLS_SHARED_COUNTERS', {})}
+
+
+class SharedMemoryChoiceRepository(ChoiceRepositoryDecorator):
+    """
+    IChoiceRepository cuyo ``update_votes`` incrementa la tabla compartida del
+    nodo; un hilo flusher (sólo uno por nodo a la vez) persiste los deltas a
+    través de ``apply_vote_batch`` del repositorio de Django.
+    Se activa con ``POLLS_PROVIDERS['vote_repository']``.
+    """
+
+    def __init__(self, repository=None, counters: SharedVoteCounters | None = None, flush_interval: float | None = None):
+        super().__init__(repository)
+        config = shared_counters_settings()
+        self.counters = counters or SharedVoteCounters(
+            name=config['NAME'],
+            slots=config['SLOTS'],
+            stripes=config['STRIPES'],
+            lock_dir=config['LOCK_DIR'],
+        )
+        self.flush_interval = flush_interval if flush_interval is not None else config['FLUSH_INTERVAL']
+        self._flusher: threading.Thread | None = None
+        self._flusher_pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def source(self) -> str:
+        return f'shm:{self.counters.name}'
+
+    def apply(self, deltas: dict[int, int], batch_key: str) -> bool:
+        return self.repository.apply_vote_batch(self.source, batch_key, deltas)
+
+    def flush(self) -> int:
+        return self.counters.flush(self.apply)
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
+        choice = self.repository.get_by_id(choice_id)
+        if isinstance(choice, ChoiceDTO):
+            return replace(choice, votes=(choice.votes or 0) + self.counters.unflushed(choice_id))
+        return choice
+
+    def update_votes(self, choice_id: int) -> int:
+        if not self.choice_exists(choice_id):
+            return 0
+        self._ensure_flusher()
+        if self.counters.increment(choice_id):
+            return 1
+        logger.warning('tabla de votos compartida llena, se escribe directo a la base de datos')
+        return self.repository.update_votes(choice_id)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, name='polls-vote-flusher', daemon=True)
+            self._flusher.start()
+            self._flusher_pid = os.getpid()
+            atexit.register(self._flush_at_exit)
+
+    def _flush_forever(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            if not self.counters.try_become_flusher():
+                continue  # otro worker del nodo es el flusher; si muere tomamos su lugar
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('error al persistir los votos compartidos')
+            finally:
+                close_old_connections()
+
+    def _flush_at_exit(self) -> None:
+        if self.counters.attached and self.counters.try_become_flusher():
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('error al persistir los votos compartidos al salir')
@@ -0,0 +1,156 @@
+# polls/single_flight.py
+"""
+Coalescencia de lecturas concurrentes ("single-flight"): si varios hilos o
+corrutinas piden la misma clave mientras su consulta está en curso, sólo el
+primero la ejecuta y los demás esperan y reciben el mismo resultado. No es un
+caché: al terminar la consulta la clave se olvida y la siguiente lectura vuelve
+a la base de datos, así que nunca se entrega algo más viejo que una consulta
+en curso.
+
+Las lecturas hechas dentro de una transacción (``in_atomic_block``) no se
+comparten: podrían necesitar ver sus propias escrituras sin confirmar.
+
+Se activa con los repositorios de este módulo, que son los de
+``DEFAULT_PROVIDERS``; ``reads.stats()`` dice cuántas consultas se ahorraron.
+"""
+import asyncio
+import threading
+import weakref
+from collections import Counter
+from copy import copy
+from typing import (
+    Awaitable,
+    Callable,
+    Hashable,
+    TypeVar,
+)
+
+from django.db import connection
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.exceptions import (
+    ChoiceNotFound,
+    QuestionNotFound,
+)
+
+from .choice_service import ChoiceRepositoryDecorator
+from .question_service import QuestionRepositoryDecorator
+
+T = TypeVar('T')
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    ``do`` coalesce entre hilos y ``ado`` entre corrutinas del mismo event loop.
+
+        >>> flight = SingleFlight()
+        >>> flight.do('clave', lambda: 42)
+        42
+        >>> flight.stats()
+        {'calls': 1, 'executions': 1, 'collapsed': 0}
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self._tasks: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._counts: Counter = Counter()
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self._counts['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counts['executions'] += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._counts['calls'] += 1
+            tasks = self._tasks.setdefault(loop, {})
+            task = tasks.get(key)
+            if task is None:
+                task = tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: tasks.pop(key, None))
+                self._counts['executions'] += 1
+        # shield: si quien lanzó la consulta se cancela, los demás siguen esperándola
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            calls, executions = self._counts['calls'], self._counts['executions']
+        return {'calls': calls, 'executions': executions, 'collapsed': calls - executions}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+reads = SingleFlight()
+
+
+def shared_read(key: Hashable, fn: Callable[[], T], flight: SingleFlight = reads) -> T:
+    """``flight.do`` salvo dentro de una transacción, donde se lee directo."""
+    if connection.in_atomic_block:
+        return fn()
+    return flight.do(key, fn)
+
+
+def _copy_choices(choices: list[ChoiceDTO]) -> list[ChoiceDTO]:
+    return [copy(choice) for choice in choices]
+
+
+class SingleFlightQuestionRepository(QuestionRepositoryDecorator):
+    """Comparte ``get_by_id`` en curso; cada quien recibe su propia copia del DTO."""
+
+    def __init__(self, repository=None, flight: SingleFlight = reads):
+        super().__init__(repository)
+        self.flight = flight
+
+    def get_by_id(self, question_id: int) -> QuestionDTO | None | QuestionNotFound:
+        return copy(shared_read(('question', question_id), lambda: self.repository.get_by_id(question_id), self.flight))
+
+
+class SingleFlightChoiceRepository(ChoiceRepositoryDecorator):
+    """Comparte ``get_by_id`` y ``get_by_question`` en curso."""
+
+    def __init__(self, repository=None, flight: SingleFlight = reads):
+        super().__init__(repository)
+        self.flight = flight
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
+        return copy(shared_read(('choice', choice_id), lambda: self.repository.get_by_id(choice_id), self.flight))
+
+    def get_by_question(self, question_id: int) -> list[ChoiceDTO]:
+        return _copy_choices(shared_read(
+            ('choices', question_id), lambda: self.repository.get_by_question(question_id), self.flight,
+        ))
@@ -0,0 +1,139 @@
+# polls/synthetic.py
+"""
+Datos sintéticos para pruebas de escala (``manage.py generate_polls``).
+
+Todo sale de un ``random.Random(seed)``: la misma semilla y los mismos
+parámetros producen las mismas preguntas, opciones y votos.
+
+- Opciones por pregunta: uniforme entre ``choices_min`` y ``choices_max``.
+- Votos por pregunta: Pareto con índice ``skew`` (pocas encuestas virales,
+  muchas casi vacías), repartidos entre sus opciones según Zipf (la opción de
+  rango k recibe una parte proporcional a 1/k^skew).
+- ``pub_date``: crece con el id a lo largo de ``days`` días que terminan en
+  ``end``, como en producción; las más viejas pueden quedar cerradas.
+- Textos: palabras de un vocabulario fijo con frecuencias Zipf, para que la
+  búsqueda tenga términos comunes y raros.
+"""
+import csv
+import io
+import random
+from dataclasses import dataclass
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from itertools import (
+    accumulate,
+    product,
+)
+from typing import (
+    Iterable,
+    Iterator,
+)
+
+from .models import Question
+
+SYLLABLES = ['ba', 'ce', 'di', 'fo', 'gu', 'la', 'me', 'ni', 'po', 'ru', 'sa', 'te', 'vi', 'zo', 'cha', 'lle', 'ro']
+VOCABULARY = [''.join(parts) for size in (2, 3) for parts in product(SYLLABLES, repeat=size)]
+WORD_WEIGHTS = list(accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+MAX_QUESTION_VOTES = 10 ** 9
+
+
+@dataclass
+class PollDataset:
+    """
+        >>> dataset = PollDataset(questions=3, seed=7, end=datetime(2025, 1, 1, tzinfo=timezone.utc))
+        >>> questions, choices = next(dataset.batches(first_id=1, batch_size=10))
+        >>> [row[0] for row in questions]
+        [1, 2, 3]
+        >>> all(2 <= sum(1 for choice in choices if choice[0] == row[0]) <= 5 for row in questions)
+        True
+        >>> next(PollDataset(questions=3, seed=7, end=dataset.end).batches(1, 10)) == (questions, choices)
+        True
+    """
+    questions: int
+    choices_min: int = 2
+    choices_max: int = 5
+    votes_scale: float = 100.0
+    skew: float = 1.2
+    days: int = 365
+    closed_ratio: float = 0.0
+    seed: int = 42
+    end: datetime | None = None
+
+    def __post_init__(self):
+        if not 1 <= self.choices_min <= self.choices_max:
+            raise ValueError('se necesita 1 <= choices_min <= choices_max')
+        if self.end is None:
+            # el inicio del día, para que dos corridas del mismo día den las mismas fechas
+            self.end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._rank_weights = {
+            size: [1 / rank ** self.skew for rank in range(1, size + 1)]
+            for size in range(self.choices_min, self.choices_max + 1)
+        }
+
+    def _text(self, rng: random.Random, words: int) -> str:
+        return ' '.join(rng.choices(VOCABULARY, cum_weights=WORD_WEIGHTS, k=words))
+
+    def _votes(self, rng: random.Random, size: int) -> list[int]:
+        total = min(MAX_QUESTION_VOTES, int(self.votes_scale * (rng.paretovariate(self.skew) - 1)))
+        weights = self._rank_weights[size][:]
+        rng.shuffle(weights)
+        scale = total / sum(weights)
+        return [int(weight * scale) for weight in weights]
+
+    def batches(self, first_id: int, batch_size: int = 10_000) -> Iterator[tuple[list[tuple], list[tuple]]]:
+        """
+        Filas ``(id, question_text, pub_date, status, closed_at)`` y
+        ``(question_id, choice_text, votes)`` por lotes de ``batch_size`` preguntas.
+        """
+        rng = random.Random(self.seed)
+        span = timedelta(days=self.days)
+        start = self.end - span
+        step = span / max(self.questions, 1)
+        closed_until = int(self.questions * self.closed_ratio)
+        for batch_start in range(0, self.questions, batch_size):
+            questions, choices = [], []
+            for index in range(batch_start, min(batch_start + batch_size, self.questions)):
+                question_id = first_id + index
+                pub_date = start + step * index
+                closed_at = None
+                if index < closed_until:
+                    closed_at = min(self.end, pub_date + timedelta(seconds=rng.randrange(7 * 24 * 3600)))
+                questions.append((
+                    question_id,
+                    f'¿{self._text(rng, rng.randint(3, 8))}?',
+                    pub_date,
+                    Question.CLOSED if closed_at else Question.OPEN,
+                    closed_at,
+                ))
+                size = rng.randint(self.choices_min, self.choices_max)
+                for votes in self._votes(rng, size):
+                    choices.append((question_id, self._text(rng, rng.randint(1, 3)), votes))
+            yield questions, choices
+
+
+def bulk_insert(connection, table: str, columns: list[str], rows: Iterable[tuple]) -> None:
+    """
+    Inserta ``rows`` con lo más rápido que tenga el motor: COPY en PostgreSQL
+    y ``executemany`` en el resto (sqlite3 lo recorre en C y los drivers de
+    MySQL lo convierten en un INSERT de varias filas).
+    """
+    column_list = ', '.join(columns)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            sql = f'COPY {table} ({column_list}) FROM STDIN'
+            raw = cursor.cursor
+            if hasattr(raw, 'copy'):  # psycopg 3
+                with raw.copy(sql) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+            else:  # psycopg2
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(rows)
+                buffer.seek(0)
+                raw.copy_expert(f'{sql} WITH (FORMAT csv)', buffer)
+            return
+        placeholders = ', '.join(['%s'] * len(columns))
+        cursor.executemany(f'INSERT INTO {table} ({column_list}) VALUES ({placeholders})', rows)
@@ -0,0 +1,248 @@
+# polls/tasks.py
+import logging
+import queue
+import threading
+from datetime import timedelta
+from functools import cache
+from typing import (
+    Any,
+    Callable,
+)
+
+from django.conf import settings
+from django.db import (
+    close_old_connections,
+    transaction,
+)
+from django.db.models import (
+    F,
+    Q,
+)
+from django.utils.timezone import now
+
+from business_logic.exceptions import TaskQueueFull
+
+from .live_results import get_broadcaster
+from .models import TaskOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASK_SETTINGS: dict[str, Any] = {
+    'IN_PROCESS': True,   # despachar en hilos del propio proceso web al confirmar
+    'WORKERS': 2,         # hilos del pool en proceso
+    'MAX_QUEUE': 1000,    # tamaño máximo de la cola en memoria (backpressure)
+    'PUT_TIMEOUT': 0,     # segundos que se espera por lugar en la cola antes de desbordar
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 1.0, # segundos, se duplica en cada intento
+    'LEASE': 60,          # segundos que un worker se queda con una tarea reclamada
+}
+
+TASK_HANDLERS: dict[str, Callable[[dict[str, Any]], None]] = {}
+
+
+def task_settings() -> dict[str, Any]:
+    return {**DEFAULT_TASK_SETTINGS, **getattr(settings, 'POLLS_TASK_QUEUE', {})}
+
+
+def register_task(name: str):
+    """
+    Registra un manejador de tareas por nombre.
+
+        >>> @register_task('doctest_noop')
+        ... def noop(payload):
+        ...     pass
+        >>> assert TASK_HANDLERS['doctest_noop'] is noop
+    """
+    def decorator(func: Callable[[dict[str, Any]], None]):
+        TASK_HANDLERS[name] = func
+        return func
+    return decorator
+
+
+@register_task('vote_registered')
+def vote_registered(payload: dict[str, Any]) -> None:
+    # punto de extensión: agregados, invalidación de cache, notificaciones...
+    logger.debug('voto registrado %s', payload)
+    if payload.get('question_id') is not None:
+        get_broadcaster().publish(payload['question_id'], payload['choice_id'])
+
+
+@register_task('vote_batch_applied')
+def vote_batch_applied(payload: dict[str, Any]) -> None:
+    # lo encola VoteBatch: ``votes`` son ternas [question_id, choice_id, votos]
+    logger.debug('lote de votos aplicado: %d opciones', len(payload['votes']))
+    broadcaster = get_broadcaster()
+    for question_id, choice_id, votes in payload['votes']:
+        broadcaster.publish(question_id, choice_id, votes)
+
+
+def claim_task(task_id: int) -> bool:
+    """
+    Reclama una tarea de forma condicional, así varios workers (en proceso o
+    fuera de él) nunca ejecutan la misma tarea a la vez. Las tareas en
+    ``running`` cuyo lease expiró se consideran abandonadas y se pueden reclamar.
+    """
+    current = now()
+    claimed = (
+        TaskOutbox.objects
+        .filter(
+            Q(status=TaskOutbox.PENDING) | Q(status=TaskOutbox.RUNNING),
+            id=task_id,
+            available_at__lte=current,
+        )
+        .update(
+            status=TaskOutbox.RUNNING,
+            attempts=F('attempts') + 1,
+            available_at=current + timedelta(seconds=task_settings()['LEASE']),
+        )
+    )
+    return claimed == 1
+
+
+def run_task(task_id: int) -> float | None:
+    """
+    Ejecuta una tarea de la bandeja de salida.
+    Retorna los segundos a esperar para reintentar, o None si no hay reintento.
+
+        >>> from django.utils.timezone import now
+        >>> calls = []
+        >>> _ = register_task('doctest_append')(lambda payload: calls.append(payload['x']))
+        >>> row = TaskOutbox.objects.create(name='doctest_append', payload={'x': 1}, available_at=now())
+        >>> run_task(row.id)
+        >>> calls
+        [1]
+        >>> row.refresh_from_db()
+        >>> row.status
+        'done'
+    """
+    if not claim_task(task_id):
+        return None
+    row = TaskOutbox.objects.get(id=task_id)
+    config = task_settings()
+    try:
+        handler = TASK_HANDLERS[row.name]
+        handler(row.payload)
+    except Exception as err:
+        logger.exception('falló la tarea %s (%s)', row.id, row.name)
+        if row.attempts >= config['MAX_ATTEMPTS']:
+            TaskOutbox.objects.filter(id=task_id).update(
+                status=TaskOutbox.FAILED, last_error=repr(err)
+            )
+            return None
+        delay = config['RETRY_BACKOFF'] * 2 ** (row.attempts - 1)
+        TaskOutbox.objects.filter(id=task_id).update(
+            status=TaskOutbox.PENDING,
+            last_error=repr(err),
+            available_at=now() + timedelta(seconds=delay),
+        )
+        return delay
+    TaskOutbox.objects.filter(id=task_id).update(status=TaskOutbox.DONE, last_error='')
+    return None
+
+
+def pending_task_ids(limit: int = 100) -> list[int]:
+    """Ids de tareas listas para ejecutarse, incluidas las de leases vencidos."""
+    return list(
+        TaskOutbox.objects
+        .filter(
+            Q(status=TaskOutbox.PENDING) | Q(status=TaskOutbox.RUNNING),
+            available_at__lte=now(),
+        )
+        .order_by('available_at')
+        .values_list('id', flat=True)[:limit]
+    )
+
+
+class InProcessDispatcher:
+    """
+    Pool de hilos con cola acotada. Si la cola está llena la tarea no se pierde,
+    se queda en la bandeja de salida para que la levante ``manage.py run_workers``.
+    """
+
+    def __init__(self, workers: int, max_queue: int, put_timeout: float = 0):
+        self.workers = workers
+        self.put_timeout = put_timeout
+        self._queue: queue.Queue[int] = queue.Queue(maxsize=max_queue)
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(
+                    target=self._work, name=f'polls-task-{number}', daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, task_id: int) -> None:
+        self._ensure_started()
+        try:
+            if self.put_timeout:
+                self._queue.put(task_id, timeout=self.put_timeout)
+            else:
+                self._queue.put_nowait(task_id)
+        except queue.Full:
+            raise TaskQueueFull(f'la cola en proceso está llena, tarea {task_id} queda en el outbox')
+
+    def _retry_later(self, task_id: int, delay: float) -> None:
+        def resubmit():
+            try:
+                self.submit(task_id)
+            except TaskQueueFull:
+                logger.warning('reintento de la tarea %s desbordado al outbox', task_id)
+        timer = threading.Timer(delay, resubmit)
+        timer.daemon = True
+        timer.start()
+
+    def _work(self) -> None:
+        while True:
+            task_id = self._queue.get()
+            try:
+                close_old_connections()
+                delay = run_task(task_id)
+                if delay is not None:
+                    self._retry_later(task_id, delay)
+            except Exception:
+                logger.exception('error inesperado del worker con la tarea %s', task_id)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+@cache
+def get_dispatcher() -> InProcessDispatcher:
+    config = task_settings()
+    return InProcessDispatcher(
+        workers=config['WORKERS'],
+        max_queue=config['MAX_QUEUE'],
+        put_timeout=config['PUT_TIMEOUT'],
+    )
+
+
+class DjangoTaskQueue:
+    """
+    Implementación de ITaskQueue: escribe la tarea en el outbox dentro de la
+    transacción actual y la despacha a los hilos sólo al confirmarse.
+    """
+
+    def enqueue(self, name: str, payload: dict[str, Any]) -> None:
+        """
+            >>> from django.test import override_settings
+            >>> queue = DjangoTaskQueue()
+            >>> with override_settings(POLLS_TASK_QUEUE={'IN_PROCESS': False}):
+            ...     queue.enqueue('vote_registered', {'choice_id': 1})
+            >>> assert TaskOutbox.objects.filter(name='vote_registered', status='pending').exists()
+        """
+        row = TaskOutbox.objects.create(name=name, payload=payload, available_at=now())
+        if task_settings()['IN_PROCESS']:
+            transaction.on_commit(lambda: self._dispatch(row.id))
+
+    def _dispatch(self, task_id: int) -> None:
+        try:
+            get_dispatcher().submit(task_id)
+        except TaskQueueFull as err:
+            logger.warning('%s', err)
+
@@ -0,0 +1,48 @@
+# polls/templatetags/polls_fragments.py
+from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+
+def prerender_enabled() -> bool:
+    return getattr(settings, 'POLLS_TEMPLATES', {}).get('PRERENDER', True)
+
+
+class PrerenderNode(template.Node):
+    """
+    Fragmento estático: se renderiza una sola vez con un contexto vacío y el
+    resultado queda guardado en el nodo. Como el loader cacheado conserva el
+    template compilado, el fragmento se renderiza una vez por proceso (o cada
+    vez que el autoreload descarta los templates).
+    """
+
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+        self.rendered = None
+
+    def render(self, context):
+        if not prerender_enabled():
+            return self.nodelist.render(context.new())
+        if self.rendered is None:
+            # contexto vacío: nada del request se puede colar en el fragmento
+            self.rendered = mark_safe(self.nodelist.render(context.new()))
+        return self.rendered
+
+
+@register.tag
+def prerender(parser, token):
+    """
+    Uso::
+
+        {% prerender %}<script>...</script>{% endprerender %}
+
+    El contenido no debe depender de variables del contexto; sólo de cosas
+    fijas por proceso como ``{% url 'polls:index' %}``.
+    """
+    if len(token.split_contents()) != 1:
+        raise template.TemplateSyntaxError("'prerender' no recibe argumentos")
+    nodelist = parser.parse(('endprerender',))
+    parser.delete_first_token()
+    return PrerenderNode(nodelist)
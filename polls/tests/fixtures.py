@@ -0,0 +1,23 @@
+# polls/tests/fixtures.py
+"""
+Datos de partida para ``SeededTestCase.seed``. Al cambiar este módulo se
+vuelven a generar los snapshots que dependen de él.
+"""
+from django.contrib.auth.models import User
+from django.utils.timezone import now
+
+from polls.models import (
+    Choice,
+    Question,
+)
+
+
+def admin_polls():
+    """Un superusuario ``admin`` y 3 preguntas con 50 opciones cada una (votos 0..49)."""
+    # sin contraseña: el hash de create_superuser domina el tiempo de la prueba
+    User.objects.create_user('admin', is_staff=True, is_superuser=True)
+    for i in range(3):
+        question = Question.objects.create(question_text=f'pregunta {i}', pub_date=now())
+        Choice.objects.bulk_create(
+            Choice(question=question, choice_text=f'opción {i}', votes=i) for i in range(50)
+        )
@@ -0,0 +1,110 @@
+# polls/tests/test_admin.py
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import (
+    Permission,
+    User,
+)
+from django.urls import reverse
+
+from polls.container import container
+from polls.models import (
+    Choice,
+    Question,
+    VoteBucket,
+)
+from settings.test_runner import SeededTestCase
+
+
+class PollsAdminTest(SeededTestCase):
+    seed = 'polls.tests.fixtures.admin_polls'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.get(username='admin')
+        cls.questions = list(Question.objects.order_by('id'))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.changelist = reverse('admin:polls_question_changelist')
+
+    def test_listado_con_totales_en_una_consulta(self):
+        with self.assertNumQueries(4):  # sesión, usuario, conteo y listado con los totales
+            response = self.client.get(self.changelist)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<td class="field-total_votes">1225</td>', count=3)
+
+    def test_listado_de_opciones(self):
+        response = self.client.get(reverse('admin:polls_choice_changelist'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_cerrar_y_reiniciar_votos(self):
+        ids = [self.questions[0].id, self.questions[1].id]
+        self.client.post(self.changelist, {'action': 'close_polls', ACTION_CHECKBOX_NAME: ids})
+        self.assertEqual(
+            list(Question.objects.order_by('id').values_list('status', flat=True)),
+            ['closed', 'closed', 'open'],
+        )
+        with self.assertNumQueries(7):  # sesión, usuario, conteo, ids, savepoint, UPDATE y liberación
+            self.client.post(self.changelist, {'action': 'reset_votes', ACTION_CHECKBOX_NAME: ids})
+        self.assertEqual(Choice.objects.filter(question_id__in=ids, votes__gt=0).count(), 0)
+        self.assertEqual(Choice.objects.filter(question=self.questions[2], votes__gt=0).count(), 49)
+
+    def test_borrado_por_lote(self):
+        question = self.questions[0]
+        choice = question.choice_set.first()
+        VoteBucket.objects.create(choice=choice, resolution=VoteBucket.MINUTE, bucket=60, votes=1)
+        data = {'action': 'bulk_delete_selected', ACTION_CHECKBOX_NAME: [question.id]}
+        confirmation = self.client.post(self.changelist, data)
+        self.assertContains(confirmation, '50')
+        self.assertTrue(Question.objects.filter(id=question.id).exists())
+        self.client.post(self.changelist, {**data, 'post': 'yes'})
+        self.assertFalse(Question.objects.filter(id=question.id).exists())
+        self.assertFalse(Choice.objects.filter(question_id=question.id).exists())
+        self.assertFalse(VoteBucket.objects.exists())
+        self.assertEqual(Question.objects.count(), 2)
+
+    def test_borrar_desde_la_pagina_del_objeto(self):
+        question = self.questions[1]
+        url = reverse('admin:polls_question_delete', args=[question.id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.post(url, {'post': 'yes'})
+        self.assertFalse(Question.objects.filter(id=question.id).exists())
+
+    def test_borrado_sin_permiso_sobre_la_cascada(self):
+        """
+        Prueba que quien puede borrar preguntas pero no opciones no puede
+        borrar una pregunta con opciones, ni por lote ni desde su página.
+        """
+        editor = User.objects.create_user('editor', is_staff=True)
+        editor.user_permissions.add(*Permission.objects.filter(codename__in=['view_question', 'delete_question']))
+        self.client.force_login(editor)
+        question = self.questions[0]
+        data = {'action': 'bulk_delete_selected', ACTION_CHECKBOX_NAME: [question.id]}
+        confirmation = self.client.post(self.changelist, {**data, 'post': 'yes'})
+        self.assertContains(confirmation, 'permission to delete')
+        self.assertNotContains(confirmation, 'name="post"')
+        url = reverse('admin:polls_question_delete', args=[question.id])
+        self.assertContains(self.client.get(url), 'permission to delete')
+        self.assertEqual(self.client.post(url, {'post': 'yes'}).status_code, 403)
+        self.assertTrue(Question.objects.filter(id=question.id).exists())
+        self.assertEqual(Choice.objects.filter(question_id=question.id).count(), 50)
+
+    def test_altas_por_los_casos_de_uso(self):
+        """
+        Prueba que las altas del admin pasan por los casos de uso: la pregunta
+        y la opción nuevas quedan en el índice de búsqueda.
+        """
+        response = self.client.post(reverse('admin:polls_question_add'), {
+            'question_text': '¿Creada desde el admin?', 'pub_date_0': '2026-01-01', 'pub_date_1': '10:00:00',
+        })
+        self.assertEqual(response.status_code, 302)
+        question = Question.objects.get(question_text='¿Creada desde el admin?')
+        self.assertEqual(question.status, Question.OPEN)
+        response = self.client.post(reverse('admin:polls_choice_add'), {
+            'question': question.id, 'choice_text': 'desde el admin', 'votes': 0,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Choice.objects.filter(question=question, choice_text='desde el admin').exists())
+        self.assertEqual(container.resolve('search_index').match('creada admin'), [question.id])
+        self.assertEqual(container.resolve('search_index').match('desde admin'), [question.id])
@@ -0,0 +1,79 @@
+# polls/tests/test_archive.py
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from polls.choice_service import DjangoChoiceRepository
+from polls.models import (
+    ArchivedChoice,
+    ArchivedQuestion,
+    Choice,
+    Question,
+)
+from polls.question_service import DjangoQuestionRepository
+
+
+class ArchivePollsTest(TestCase):
+    def setUp(self):
+        self.vieja = Question.objects.create(
+            question_text='¿Vieja?', pub_date=now(), status=Question.CLOSED, closed_at=now() - timedelta(days=40),
+        )
+        self.reciente = Question.objects.create(
+            question_text='¿Reciente?', pub_date=now(), status=Question.CLOSED, closed_at=now() - timedelta(days=1),
+        )
+        self.abierta = Question.objects.create(question_text='¿Abierta?', pub_date=now())
+        for question in (self.vieja, self.reciente, self.abierta):
+            Choice.objects.bulk_create(
+                Choice(question=question, choice_text=f'opción {i}', votes=i) for i in range(3)
+            )
+
+    def archive(self, *args):
+        out = StringIO()
+        call_command('archive_polls', *args, stdout=out)
+        return out.getvalue()
+
+    def test_mueve_solo_las_cerradas_viejas(self):
+        self.assertIn('1 encuestas archivadas', self.archive('--retention-days', '30'))
+        self.assertFalse(Question.objects.filter(pk=self.vieja.pk).exists())
+        self.assertFalse(Choice.objects.filter(question_id=self.vieja.pk).exists())
+        archived = ArchivedQuestion.objects.get(pk=self.vieja.pk)
+        self.assertEqual((archived.status, archived.question_text), (Question.ARCHIVED, '¿Vieja?'))
+        self.assertEqual(ArchivedChoice.objects.filter(question=archived).count(), 3)
+        self.assertEqual(Question.objects.count(), 2)
+
+    def test_por_lotes(self):
+        self.assertIn('2 encuestas archivadas', self.archive('--retention-days', '0', '--batch-size', '1'))
+        self.assertEqual(list(Question.objects.values_list('pk', flat=True)), [self.abierta.pk])
+
+    def test_lectura_transparente_por_id(self):
+        self.archive()
+        question = DjangoQuestionRepository().get_by_id(self.vieja.pk)
+        self.assertEqual((question.question_text, question.status), ('¿Vieja?', Question.ARCHIVED))
+        choices = DjangoChoiceRepository().get_by_question(self.vieja.pk)
+        self.assertEqual([choice.votes for choice in choices], [0, 1, 2])
+        self.assertEqual(DjangoChoiceRepository().get_by_id(choices[0].id).text, 'opción 0')
+
+    def test_el_listado_solo_ve_las_calientes(self):
+        self.archive()
+        recent = DjangoQuestionRepository().get_recent(10)
+        self.assertNotIn(self.vieja.pk, [question.id for question in recent])
+
+    def test_resultados_de_una_archivada(self):
+        self.archive()
+        response = self.client.get(reverse('polls:results', kwargs={'pk': self.vieja.pk}))
+        self.assertContains(response, '¿Vieja?')
+        self.assertContains(response, 'opción 2 -- ')
+
+    def test_no_se_vota_en_una_cerrada(self):
+        choice = self.reciente.choice_set.first()
+        response = self.client.post(
+            reverse('polls:detail', kwargs={'pk': self.reciente.pk}), {'choice_text': choice.id},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'This poll is closed.')
+        choice.refresh_from_db()
+        self.assertEqual(choice.votes, 0)
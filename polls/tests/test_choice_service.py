@@ -1,4 +1,7 @@
 # polls/tests/test_choice_service.py
+from unittest.mock import MagicMock
+
+from django.db.models import F
 from django.test import TestCase
 from django.utils.timezone import now
 from polls.models import (
@@ -8,8 +11,12 @@ from polls.models import (
 from polls.choice_service import (
     ChoiceDTO,
     create_choice_service,
+    update_choice_service,
     vote_service,
 )
+from polls.container import container
+
+from business_logic.exceptions import ConcurrentModificationError
 
 
 class CreateChoiceTest(TestCase):
@@ -51,3 +58,53 @@ class VoteTest(TestCase):
         # Verificar que el contador de votos se incrementó correctamente
         choice.refresh_from_db()
         self.assertEqual(choice.votes, 3)
+
+
+class VoteServiceContainerTest(TestCase):
+    def test_vote_service_usa_el_repositorio_del_contenedor(self):
+        """
+        Prueba que vote_service toma el repositorio del contenedor, construido una sola vez.
+        """
+        repository = MagicMock()
+        with container.override('vote_repository', lambda: repository):
+            first = vote_service(choice_id=1)
+            second = vote_service(choice_id=2)
+        self.assertIs(first.choice_repository, repository)
+        self.assertIs(second.choice_repository, repository)
+        self.assertIsNot(vote_service(choice_id=3).choice_repository, repository)
+
+
+class UpdateChoiceTest(TestCase):
+    def setUp(self):
+        question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+        self.choice = Choice.objects.create(choice_text='Rojo', question=question, votes=10)
+
+    def test_no_pierde_votos_concurrentes(self):
+        """
+        Prueba que un voto entre la lectura y la escritura provoca un reintento
+        en lugar de sobrescribir el conteo.
+        """
+        lecturas = []
+
+        def sumar_bono(choice: ChoiceDTO) -> ChoiceDTO:
+            lecturas.append(choice.votes)
+            if len(lecturas) == 1:
+                vote_service(self.choice.id).execute()  # llega un voto a mitad de la edición
+            choice.votes += 100
+            return choice
+
+        updated = update_choice_service(self.choice.id, sumar_bono).execute()
+        self.assertEqual(lecturas, [10, 11])
+        self.assertEqual(updated.votes, 111)
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 111)
+
+    def test_agota_los_reintentos(self):
+        def siempre_en_conflicto(choice: ChoiceDTO) -> ChoiceDTO:
+            Choice.objects.filter(id=self.choice.id).update(version=F('version') + 1)
+            return choice
+
+        with self.assertRaises(ConcurrentModificationError):
+            update_choice_service(self.choice.id, siempre_en_conflicto).execute()
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 10)
@@ -0,0 +1,83 @@
+# polls/tests/test_generate_polls.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import (
+    Count,
+    Max,
+    Min,
+)
+from django.test import (
+    TestCase,
+    override_settings,
+)
+
+from polls.models import (
+    Choice,
+    Question,
+)
+
+
+class GeneratePollsTest(TestCase):
+    def generate(self, *args):
+        out = StringIO()
+        call_command(
+            'generate_polls', '--questions', '200', '--end', '2025-01-01T00:00:00+00:00',
+            '--batch-size', '64', *args, stdout=out,
+        )
+        return out.getvalue()
+
+    def snapshot(self, questions):
+        return [
+            (question.question_text, question.pub_date, [choice.votes for choice in question.choice_set.order_by('id')])
+            for question in questions.order_by('id')
+        ]
+
+    def test_genera_segun_los_parametros(self):
+        self.assertIn('200 preguntas', self.generate('--choices', '3', '4', '--days', '10', '--closed-ratio', '0.25'))
+        self.assertEqual(Question.objects.count(), 200)
+        counts = Question.objects.annotate(total=Count('choice')).aggregate(low=Min('total'), high=Max('total'))
+        self.assertEqual((counts['low'], counts['high']), (3, 4))
+        dates = Question.objects.aggregate(first=Min('pub_date'), last=Max('pub_date'))
+        self.assertLessEqual((dates['last'] - dates['first']).days, 10)
+        self.assertEqual(Question.objects.filter(status=Question.CLOSED, closed_at__isnull=False).count(), 50)
+        # las cerradas son las más viejas
+        self.assertLess(
+            Question.objects.filter(status=Question.CLOSED).aggregate(last=Max('id'))['last'],
+            Question.objects.filter(status=Question.OPEN).aggregate(first=Min('id'))['first'],
+        )
+
+    def test_votos_sesgados(self):
+        self.generate('--choices', '5', '5', '--votes-scale', '1000')
+        per_question = sorted(
+            (sum(question.choice_set.values_list('votes', flat=True)) for question in Question.objects.all()),
+            reverse=True,
+        )
+        # el 10% más votado junta más que el 50% menos votado
+        self.assertGreater(sum(per_question[:20]), sum(per_question[100:]))
+
+    def test_reproducible_con_la_misma_semilla(self):
+        self.generate('--seed', '7')
+        first = self.snapshot(Question.objects.all())
+        Question.objects.all().delete()
+        self.generate('--seed', '7')
+        self.assertEqual(self.snapshot(Question.objects.all()), first)
+        Question.objects.all().delete()
+        self.generate('--seed', '8')
+        self.assertNotEqual(self.snapshot(Question.objects.all()), first)
+        # se pueden seguir creando preguntas con el ORM después de los ids explícitos
+        self.assertGreater(
+            Question.objects.create(question_text='¿Nueva?', pub_date=first[0][1]).id,
+            Choice.objects.aggregate(last=Max('question_id'))['last'],
+        )
+
+    def test_parametros_invalidos(self):
+        with self.assertRaises(CommandError):
+            self.generate('--choices', '5', '2')
+
+    @override_settings(POLLS_SHARDING={'SHARDS': ('default', 'shard1')})
+    def test_no_corre_con_varios_shards(self):
+        with self.assertRaisesMessage(CommandError, 'SHARDS'):
+            self.generate()
+        self.assertFalse(Question.objects.exists())
@@ -0,0 +1,140 @@
+# polls/tests/test_kv_votes.py
+import os
+import shutil
+import tempfile
+
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.utils.timezone import now
+
+from polls.kv_votes import (
+    RECORD,
+    KeyValueChoiceRepository,
+    KeyValueVoteStore,
+)
+from polls.models import (
+    Choice,
+    Question,
+)
+
+
+def _fork_voter(path: str, choice_id: int, times: int) -> int:
+    pid = os.fork()
+    if pid == 0:
+        try:
+            store = KeyValueVoteStore(path)
+            for _ in range(times):
+                store.increment(choice_id)
+        finally:
+            os._exit(0)
+    return pid
+
+
+class KeyValueVoteStoreTest(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = KeyValueVoteStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.path)
+
+    def test_varios_procesos_escriben_el_mismo_log(self):
+        workers = [_fork_voter(self.path, 3, 200) for _ in range(4)]
+        for pid in workers:
+            os.waitpid(pid, 0)
+        self.assertEqual(self.store.get(3), 800)
+
+    def test_registro_a_medias_se_ignora_al_recuperar(self):
+        """
+        Prueba que un registro incompleto al final del log (caída a mitad de
+        una escritura) no altera los conteos al reproducir el log.
+        """
+        self.store.increment(1, 4)
+        with open(os.path.join(self.path, 'votes-00000000.log'), 'ab') as log:
+            log.write(RECORD.pack(1, 100)[:7])
+        recovered = KeyValueVoteStore(self.path)
+        self.assertEqual(recovered.get(1), 4)
+        recovered.close()
+
+    def test_compactacion_automatica(self):
+        store = KeyValueVoteStore(self.path, compact_bytes=RECORD.size * 10)
+        for _ in range(25):
+            store.increment(5)
+        logs = [name for name in os.listdir(self.path) if name.endswith('.log')]
+        self.assertEqual(len(logs), 1)
+        self.assertLess(os.path.getsize(os.path.join(self.path, logs[0])), RECORD.size * 10)
+        self.assertEqual(self.store.get(5), 25)
+        store.close()
+
+
+class KeyValueChoiceRepositoryTest(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.repo = KeyValueChoiceRepository(store=KeyValueVoteStore(self.path))
+        question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+        self.choice = Choice.objects.create(choice_text='Rojo', question=question, votes=2)
+
+    def tearDown(self):
+        self.repo.close()
+        shutil.rmtree(self.path)
+
+    def test_votos_en_el_almacen(self):
+        for _ in range(3):
+            self.assertEqual(self.repo.update_votes(self.choice.id), 1)
+        self.assertEqual(self.repo.get_by_id(self.choice.id).votes, 5)
+        self.assertEqual([choice.votes for choice in self.repo.get_by_question(self.choice.question_id)], [5])
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 2)
+
+    def test_opcion_inexistente(self):
+        self.assertEqual(self.repo.update_votes(999999), 0)
+        self.assertEqual(self.repo.store.get(999999), 0)
+        self.assertEqual(self.repo.export(), 0)
+
+    def test_export_idempotente(self):
+        """
+        Prueba que si el export se interrumpe después de confirmar en la base
+        de datos, repetirlo no cuenta dos veces.
+        """
+        self.repo.update_votes(self.choice.id)
+        store = self.repo.store
+        applied = []
+
+        def commit_then_crash(deltas, batch_key):
+            self.repo.repository.apply_vote_batch(self.repo.source, batch_key, deltas)
+            applied.append(batch_key)
+            raise RuntimeError('el proceso murió')
+
+        with self.assertRaises(RuntimeError):
+            store.drain(commit_then_crash)
+        self.assertEqual(self.repo.export(), 0)
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 3)
+        self.assertEqual(self.repo.get_by_id(self.choice.id).votes, 3)
+
+    def test_votos_despues_de_un_export_interrumpido(self):
+        """
+        Prueba que los votos que llegan después de un export interrumpido (ya
+        confirmado en la base de datos) se exportan con otra clave de lote,
+        también desde otro proceso que abre el mismo directorio.
+        """
+        for _ in range(3):
+            self.repo.update_votes(self.choice.id)
+
+        def commit_then_crash(deltas, batch_key):
+            self.repo.repository.apply_vote_batch(self.repo.source, batch_key, deltas)
+            raise RuntimeError('el proceso murió')
+
+        with self.assertRaises(RuntimeError):
+            self.repo.store.drain(commit_then_crash)
+        restarted = KeyValueChoiceRepository(store=KeyValueVoteStore(self.path))
+        for _ in range(5):
+            restarted.update_votes(self.choice.id)
+        self.assertEqual(restarted.export(), 5)
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 10)
+        self.assertEqual(restarted.get_by_id(self.choice.id).votes, 10)
+        restarted.close()
@@ -0,0 +1,128 @@
+# polls/tests/test_live_results.py
+import asyncio
+import time
+from contextlib import aclosing
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.in_memory import (
+    InMemoryChoiceRepository,
+    InMemoryQuestionRepository,
+)
+from polls.container import container
+from polls.live_results import (
+    LiveResultsApp,
+    ResultsBroadcaster,
+    load_votes_snapshot,
+)
+
+
+async def fake_snapshot(question_id):
+    fake_snapshot.calls += 1
+    return {1: 10, 2: 5}
+
+fake_snapshot.calls = 0
+
+
+class BroadcasterTest(SimpleTestCase):
+    def setUp(self):
+        fake_snapshot.calls = 0
+
+    def test_deltas_coalescidos(self):
+        """
+        Prueba que varios votos dentro de un intervalo llegan como un solo delta.
+        """
+        async def scenario():
+            broadcaster = ResultsBroadcaster(interval_ms=10)
+            async with aclosing(broadcaster.subscribe(7, fake_snapshot)) as messages:
+                self.assertEqual(await anext(messages), {'type': 'snapshot', 'votes': {1: 10, 2: 5}})
+                for _ in range(3):
+                    broadcaster.publish(7, 1)
+                broadcaster.publish(7, 2)
+                broadcaster.publish(8, 1)  # otra pregunta sin suscriptores se ignora
+                self.assertEqual(await anext(messages), {'type': 'delta', 'votes': {1: 3, 2: 1}})
+            self.assertEqual(broadcaster.subscribers(7), 0)
+
+        asyncio.run(scenario())
+
+    def test_carga_5k_suscriptores_ociosos(self):
+        """
+        Prueba de carga: 5k suscriptores ociosos de una encuesta comparten un
+        solo snapshot y una sola notificación por intervalo.
+        """
+        subscribers = 5000
+
+        async def scenario():
+            broadcaster = ResultsBroadcaster(interval_ms=20, heartbeat=60)
+            ready = asyncio.Event()
+            connected = 0
+            received = []
+
+            async def subscriber():
+                nonlocal connected
+                async with aclosing(broadcaster.subscribe(1, fake_snapshot)) as messages:
+                    await anext(messages)
+                    connected += 1
+                    if connected == subscribers:
+                        ready.set()
+                    received.append(await anext(messages))
+
+            tasks = [asyncio.create_task(subscriber()) for _ in range(subscribers)]
+            await ready.wait()
+            started = time.perf_counter()
+            broadcaster.publish(1, 2, 4)
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - started
+            return received, elapsed, broadcaster.subscribers(1)
+
+        received, elapsed, remaining = asyncio.run(scenario())
+        self.assertEqual(fake_snapshot.calls, 1)  # una sola consulta para 5k suscriptores
+        self.assertEqual(len(received), subscribers)
+        self.assertTrue(all(message == {'type': 'delta', 'votes': {2: 4}} for message in received))
+        self.assertEqual(remaining, 0)
+        self.assertLess(elapsed, 5)
+
+
+class LiveResultsAppTest(SimpleTestCase):
+    def test_stream_sse(self):
+        async def scenario():
+            broadcaster = ResultsBroadcaster(interval_ms=10)
+            app = LiveResultsApp(django_application=None, broadcaster=broadcaster, load_snapshot=fake_snapshot)
+            sent = []
+            disconnect = asyncio.Event()
+
+            async def receive():
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if len(sent) == 2:
+                    broadcaster.publish(3, 1)
+                if len(sent) == 3:
+                    disconnect.set()
+
+            scope = {'type': 'http', 'path': '/polls/3/live/'}
+            await asyncio.wait_for(app(scope, receive, send), 5)
+            return sent
+
+        sent = asyncio.run(scenario())
+        self.assertEqual(sent[0]['status'], 200)
+        self.assertIn((b'content-type', b'text/event-stream'), sent[0]['headers'])
+        self.assertEqual(sent[1]['body'], b'event: snapshot\ndata: {"1": 10, "2": 5}\n\n')
+        self.assertEqual(sent[2]['body'], b'event: delta\ndata: {"1": 1}\n\n')
+
+
+class LoadVotesSnapshotTest(SimpleTestCase):
+    def test_usa_el_repositorio_del_contenedor(self):
+        questions, choices = InMemoryQuestionRepository(), InMemoryChoiceRepository()
+        question = questions.create(QuestionDTO(question_text='¿Sol o luna?'))
+        sol = choices.create(ChoiceDTO(question_id=question.id, text='sol'))
+        choices.update_votes(sol.id)
+        with container.override('choice_repository', lambda: choices):
+            self.assertEqual(async_to_sync(load_votes_snapshot)(question.id), {sol.id: 1})
@@ -0,0 +1,107 @@
+# polls/tests/test_load_shedding.py
+import threading
+import time
+
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from polls.load_shedding import (
+    AdaptiveLimiter,
+    ConcurrencyLimitMiddleware,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class AdaptiveLimiterTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = AdaptiveLimiter(
+            initial_limit=4, max_limit=6, target_latency=0.1, backoff=0.5, queue_timeout=0, clock=self.clock,
+        )
+
+    def test_aumento_aditivo_hasta_el_maximo(self):
+        for _ in range(100):
+            self.assertTrue(self.limiter.acquire())
+            self.limiter.release(self.clock())
+        self.assertEqual(self.limiter.limit, 6)
+
+    def test_reduccion_multiplicativa_una_vez_por_ventana(self):
+        started = [self.clock() for _ in range(4) if self.limiter.acquire()]
+        self.assertFalse(self.limiter.acquire())
+        self.clock.now = 1.0  # todas tardaron más que target_latency
+        for start in started:
+            self.limiter.release(start)
+        # las cuatro empezaron con el límite anterior: sólo la primera reduce
+        self.assertEqual(self.limiter.limit, 2)
+        self.assertTrue(self.limiter.acquire())
+        self.limiter.release(self.clock(), overloaded=True)
+        self.assertEqual(self.limiter.limit, 1)
+        self.assertEqual(self.limiter.stats()['rejected'], 1)
+
+    def test_cola_con_plazo(self):
+        limiter = AdaptiveLimiter(initial_limit=1, queue_timeout=5)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=0.01))
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(limiter.acquire()))
+        waiter.start()
+        while limiter.stats()['queued'] == 0:
+            time.sleep(0.001)
+        limiter.release(limiter.clock())
+        waiter.join()
+        self.assertEqual(admitted, [True])
+
+    def test_cola_llena(self):
+        limiter = AdaptiveLimiter(initial_limit=1, max_queue=0, queue_timeout=5)
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+
+
+@override_settings(POLLS_LOAD_SHEDDING={'INITIAL_LIMIT': 1, 'QUEUE_TIMEOUT': 0, 'RETRY_AFTER': 3})
+class ConcurrencyLimitMiddlewareTest(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.entered = threading.Event()
+        self.release = threading.Event()
+
+        def slow_view(request):
+            self.entered.set()
+            self.release.wait(5)
+            return HttpResponse('ok')
+
+        self.middleware = ConcurrencyLimitMiddleware(slow_view)
+        self.vote_url = reverse('polls:detail', kwargs={'pk': 1})
+
+    def test_rechaza_con_503_y_retry_after(self):
+        first = []
+        thread = threading.Thread(target=lambda: first.append(self.middleware(self.factory.post(self.vote_url))))
+        thread.start()
+        self.entered.wait(5)
+        try:
+            response = self.middleware(self.factory.post(self.vote_url))
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response['Retry-After'], '3')
+            # otra ruta tiene su propio límite
+            index_limiter = self.middleware.limiter_for(self.factory.post(reverse('polls:index')))
+            self.assertEqual(index_limiter.stats()['in_flight'], 0)
+        finally:
+            self.release.set()
+            thread.join()
+        self.assertEqual(first[0].status_code, 200)
+
+    def test_las_lecturas_no_se_limitan(self):
+        self.assertIsNone(self.middleware.limiter_for(self.factory.get(self.vote_url)))
+        self.assertIsNone(self.middleware.limiter_for(self.factory.post(reverse('polls:results', kwargs={'pk': 1}))))
+        self.assertIsNone(self.middleware.limiter_for(self.factory.post('/no-existe/')))
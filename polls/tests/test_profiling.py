@@ -0,0 +1,137 @@
+# polls/tests/test_profiling.py
+import json
+import pstats
+import shutil
+import tempfile
+import threading
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils.timezone import now
+
+from polls.models import Question
+from polls.profiling import (
+    OVERFLOW_STACK,
+    SamplingProfiler,
+    issue_profile_token,
+    sampler,
+    start_sampler,
+    verify_profile_token,
+)
+
+
+def esperando(event):
+    event.wait()
+
+
+class SamplingProfilerTest(SimpleTestCase):
+    def setUp(self):
+        self.event = threading.Event()
+        self.worker = threading.Thread(target=esperando, args=(self.event,))
+        self.worker.start()
+        self.addCleanup(self.worker.join)
+        self.addCleanup(self.event.set)
+
+    def test_solo_los_hilos_registrados(self):
+        profiler = SamplingProfiler()
+        profiler.sample()
+        self.assertEqual((profiler.samples, profiler.collapsed()), (0, ''))
+        profiler.track(self.worker.ident)
+        profiler.sample()
+        profiler.sample()
+        stack, count = profiler.collapsed().strip().rsplit(' ', 1)
+        self.assertEqual(count, '2')
+        self.assertIn('polls.tests.test_profiling:esperando;threading:Event.wait', stack)
+        self.assertTrue(stack.startswith('threading:Thread._bootstrap'))
+        profiler.untrack(self.worker.ident)
+        profiler.sample()
+        self.assertEqual(profiler.samples, 2)
+        self.assertTrue(profiler.collapsed(reset=True))
+        self.assertEqual((profiler.samples, profiler.collapsed()), (0, ''))
+
+    def test_muestreo_apagado_por_defecto(self):
+        self.assertFalse(start_sampler())
+
+    def test_stacks_acotados(self):
+        profiler = SamplingProfiler(max_stacks=1)
+        profiler.counts['otro;stack'] = 1
+        profiler.track(self.worker.ident)
+        profiler.sample()
+        self.assertEqual(profiler.counts[OVERFLOW_STACK], 1)
+
+
+class RequestProfilingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.question = Question.objects.create(question_text='¿Dónde se va el tiempo?', pub_date=now())
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        settings = override_settings(POLLS_PROFILING={'DIR': self.directory, 'KEEP': 2})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get(self, url, token=None):
+        return self.client.get(url, HTTP_X_POLLS_PROFILE=token) if token else self.client.get(url)
+
+    def test_perfil_con_metadatos(self):
+        url = reverse('polls:results', args=[self.question.id])
+        response = self.get(url, issue_profile_token())
+        name = response['X-Polls-Profile-Name']
+        metadata = json.loads((self.directory / f'{name}.json').read_text())
+        self.assertEqual(
+            {key: metadata[key] for key in ('method', 'path', 'view', 'status')},
+            {'method': 'GET', 'path': url, 'view': 'polls:results', 'status': 200},
+        )
+        self.assertGreater(metadata['duration_ms'], 0)
+        functions = {function for _, _, function in pstats.Stats(str(self.directory / f'{name}.pstats')).stats}
+        self.assertIn('get_context_data', functions)
+
+    def test_sin_token_valido_no_perfila(self):
+        url = reverse('polls:results', args=[self.question.id])
+        self.assertNotIn('X-Polls-Profile-Name', self.get(url))
+        self.assertNotIn('X-Polls-Profile-Name', self.get(url, 'basura'))
+        self.assertNotIn('X-Polls-Profile-Name', self.get(url, issue_profile_token(ttl=-1)))
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_retencion(self):
+        token = issue_profile_token()
+        names = [self.get(reverse('polls:index'), token)['X-Polls-Profile-Name'] for _ in range(3)]
+        self.assertEqual(
+            sorted(path.name for path in self.directory.iterdir()),
+            sorted(f'{name}.{suffix}' for name in names[1:] for suffix in ('json', 'pstats')),
+        )
+
+    def test_endpoint_del_muestreo(self):
+        url = reverse('polls:profiler')
+        self.assertEqual(self.get(url).status_code, 401)
+        token = issue_profile_token()
+        self.assertEqual(self.get(url, token).status_code, 409)
+        # sin muestras del hilo del muestreo: la prueba las toma a mano
+        interval, sampler.interval = sampler.interval, 3600
+        sampler.start()
+        self.addCleanup(setattr, sampler, 'interval', interval)
+        self.addCleanup(sampler.collapsed, reset=True)
+        self.addCleanup(sampler.stop)
+        # una muestra del hilo de la prueba, como si atendiera una petición
+        sampler.track(threading.get_ident())
+        sampler.sample()
+        sampler.untrack(threading.get_ident())
+        response = self.get(url + '?reset=1', token)
+        self.assertEqual(response['Content-Type'], 'text/plain')
+        self.assertIn('polls.tests.test_profiling:RequestProfilingTest.test_endpoint_del_muestreo',
+                      response.content.decode())
+        self.assertEqual(sampler.samples, 0)
+
+    def test_comando(self):
+        out = StringIO()
+        call_command('profile_token', '--ttl', '60', stdout=out)
+        verify_profile_token(out.getvalue().strip())
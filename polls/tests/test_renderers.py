@@ -0,0 +1,93 @@
+# polls/tests/test_renderers.py
+import json
+from datetime import (
+    datetime,
+    timezone,
+)
+
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.urls import reverse
+from django.utils import timezone as django_timezone
+from rest_framework.renderers import JSONRenderer
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from polls.models import (
+    Choice,
+    Question,
+)
+from polls.renderers import (
+    DTOJSONRenderer,
+    to_primitive,
+)
+from polls.serializers import (
+    ChoiceBatchSerializer,
+    QuestionSearchSerializer,
+)
+
+
+class DTOJSONRendererTest(SimpleTestCase):
+    def setUp(self):
+        self.questions = [
+            QuestionDTO(id=1, question_text='¿Qué "opinas"?\n ñ', status='open',
+                        pub_date=datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)),
+            QuestionDTO(id=2, question_text='sin fecha ni estado'),
+        ]
+        self.choices = [ChoiceDTO(id=i, question_id=1, text=f'opción {i}', votes=i) for i in range(3)]
+
+    def assertSameAsSerializers(self, data, expected, **kwargs):
+        self.assertEqual(DTOJSONRenderer().render(data, **kwargs), JSONRenderer().render(expected, **kwargs))
+
+    def test_igual_que_los_serializers(self):
+        self.assertSameAsSerializers(self.questions, QuestionSearchSerializer(self.questions, many=True).data)
+        self.assertSameAsSerializers(
+            {'choices': self.choices, 'total': 3, 'ratio': 0.5},
+            {'choices': ChoiceBatchSerializer(self.choices, many=True).data, 'total': 3, 'ratio': 0.5},
+        )
+
+    def test_zona_horaria_actual(self):
+        with django_timezone.override('America/Santiago'):
+            self.assertSameAsSerializers(self.questions[:1], QuestionSearchSerializer(self.questions[:1], many=True).data)
+            self.assertIn(b'"2024-05-01T08:30:15.123456-04:00"', DTOJSONRenderer().render(self.questions[:1]))
+
+    def test_con_indentacion_usa_json_renderer(self):
+        expected = QuestionSearchSerializer(self.questions, many=True).data
+        self.assertSameAsSerializers(self.questions, expected, accepted_media_type='application/json; indent=4')
+        self.assertEqual(to_primitive(self.questions), json.loads(json.dumps(expected)))
+
+    def test_sin_datos(self):
+        self.assertEqual(DTOJSONRenderer().render(None), b'')
+
+
+class ReadAPIViewsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.question = Question.objects.create(question_text='¿Color?', pub_date=django_timezone.now())
+        Choice.objects.bulk_create(Choice(question=cls.question, choice_text=text, votes=votes)
+                                   for text, votes in (('Rojo', 2), ('Azul', 5)))
+
+    def test_preguntas_recientes(self):
+        Question.objects.create(question_text='¿Otra?', pub_date=django_timezone.now())
+        response = self.client.get(reverse('polls:recent'), {'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual([row['question_text'] for row in response.json()], ['¿Otra?'])
+        self.assertEqual(self.client.get(reverse('polls:recent'), {'limit': 0}).status_code, 400)
+
+    def test_resultados(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('polls:results_json', args=[self.question.id]))
+        self.assertEqual(response.json()['question']['id'], self.question.id)
+        self.assertEqual([(row['choice_text'], row['votes']) for row in response.json()['choices']],
+                         [('Rojo', 2), ('Azul', 5)])
+        self.assertEqual(self.client.get(reverse('polls:results_json', args=[999999])).status_code, 404)
+
+    def test_api_navegable(self):
+        response = self.client.get(reverse('polls:results_json', args=[self.question.id]), HTTP_ACCEPT='text/html')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '&quot;choice_text&quot;: &quot;Azul&quot;')
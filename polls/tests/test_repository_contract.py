@@ -0,0 +1,257 @@
+# polls/tests/test_repository_contract.py
+"""
+Las mismas pruebas contra cada implementación de IQuestionRepository e
+IChoiceRepository, para que la de memoria se comporte como la de Django.
+"""
+from abc import (
+    ABC,
+    abstractmethod,
+)
+from datetime import (
+    datetime,
+    timezone,
+)
+
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.exceptions import (
+    ChoiceNotFound,
+    ConcurrentModificationError,
+    InvalidVoteBatch,
+    QuestionNotFound,
+)
+from business_logic.in_memory import (
+    InMemoryChoiceRepository,
+    InMemoryQuestionRepository,
+)
+from business_logic.use_cases import (
+    CreateQuestionWithChoices,
+    UpdateChoice,
+    Vote,
+    VoteBatch,
+)
+from polls.choice_service import DjangoChoiceRepository
+from polls.question_service import DjangoQuestionRepository
+from polls.search import DjangoSearchIndex
+from polls.sharding import (
+    ShardedChoiceRepository,
+    ShardedQuestionRepository,
+    ShardedSearchIndex,
+    id_allocator,
+)
+
+
+class RepositoryContract(ABC):
+    """Se mezcla con un TestCase que define ``make_repositories`` y ``make_search_index``."""
+
+    @abstractmethod
+    def make_repositories(self):
+        """Un par nuevo (IQuestionRepository, IChoiceRepository)."""
+
+    @abstractmethod
+    def make_search_index(self):
+        """El ISearchIndex que va con los repositorios de ``make_repositories``."""
+
+    def setUp(self):
+        self.questions, self.choices = self.make_repositories()
+        self.question = self.questions.create(QuestionDTO(question_text='¿Cuál es tu color favorito?'))
+
+    def test_get_recent_ordena_por_fecha(self):
+        for day in (3, 1, 2):
+            self.questions.create(QuestionDTO(
+                question_text=f'día {day}',
+                pub_date=datetime(2000, 1, day, tzinfo=timezone.utc),
+            ))
+        recent = self.questions.get_recent(4)
+        self.assertEqual(
+            [question.question_text for question in recent],
+            ['¿Cuál es tu color favorito?', 'día 3', 'día 2', 'día 1'],
+        )
+
+    def test_pregunta_inexistente(self):
+        with self.assertRaises(QuestionNotFound):
+            self.questions.get_by_id(999999)
+
+    def test_update_de_pregunta_con_version(self):
+        question = self.questions.get_by_id(self.question.id)
+        question.question_text = '¿Otro color?'
+        self.assertEqual(self.questions.update(question).version, question.version + 1)
+        with self.assertRaises(ConcurrentModificationError):
+            self.questions.update(question)
+
+    def test_create_y_get_by_id(self):
+        created = self.choices.create(ChoiceDTO(question_id=self.question.id, text='Rojo'))
+        self.assertIsNotNone(created.id)
+        fetched = self.choices.get_by_id(created.id)
+        self.assertEqual((fetched.text, fetched.votes, fetched.question_id), ('Rojo', 0, self.question.id))
+        self.assertIsNone(self.choices.get_by_id(999999))
+
+    def test_bulk_create_y_get_by_question(self):
+        created = self.choices.bulk_create([
+            ChoiceDTO(question_id=self.question.id, text=text) for text in ('Rojo', 'Verde', 'Azul')
+        ])
+        self.assertTrue(all(choice.id for choice in created))
+        self.assertEqual(
+            [choice.text for choice in self.choices.get_by_question(self.question.id)],
+            ['Rojo', 'Verde', 'Azul'],
+        )
+        self.assertEqual(self.choices.get_by_question(999999), [])
+
+    def test_votos(self):
+        rojo, verde = self.choices.bulk_create([
+            ChoiceDTO(question_id=self.question.id, text='Rojo'),
+            ChoiceDTO(question_id=self.question.id, text='Verde'),
+        ])
+        self.assertEqual(self.choices.update_votes(rojo.id), 1)
+        self.assertEqual(self.choices.update_votes(999999), 0)
+        self.assertEqual(self.choices.bulk_update_votes({rojo.id: 2, verde.id: 5, 999999: 1}), 2)
+        self.assertTrue(self.choices.apply_vote_batch('contrato', '1', {verde.id: 1}))
+        self.assertFalse(self.choices.apply_vote_batch('contrato', '1', {verde.id: 1}))
+        self.assertEqual(self.choices.get_by_id(rojo.id).votes, 3)
+        self.assertEqual(self.choices.get_by_id(verde.id).votes, 6)
+
+    def test_update_con_version(self):
+        choice = self.choices.create(ChoiceDTO(question_id=self.question.id, text='Rojo'))
+        stale = self.choices.get_by_id(choice.id)
+        self.choices.update_votes(choice.id)
+        with self.assertRaises(ConcurrentModificationError):
+            self.choices.update(ChoiceDTO(id=choice.id, text='Rosa', votes=0, version=stale.version))
+        updated = UpdateChoice(self.choices, choice.id, lambda dto: replace_text(dto, 'Rosa')).execute()
+        self.assertEqual((updated.text, updated.votes), ('Rosa', 1))
+
+    def test_update_de_opcion_inexistente(self):
+        with self.assertRaises(ChoiceNotFound):
+            self.choices.update(ChoiceDTO(id=999999, text='Rosa'))
+        with self.assertRaises(ChoiceNotFound):
+            self.choices.update(ChoiceDTO(id=999999, text='Rosa', version=1))
+
+    def test_delete(self):
+        choice = self.choices.create(ChoiceDTO(question_id=self.question.id, text='Rojo'))
+        self.choices.delete(choice.id)
+        self.assertIsNone(self.choices.get_by_id(choice.id))
+        self.assertEqual(self.choices.get_by_question(self.question.id), [])
+
+    def test_operaciones_por_lote(self):
+        otra = self.questions.create(QuestionDTO(question_text='¿Otra?'))
+        rojo, verde, azul = self.choices.bulk_create([
+            ChoiceDTO(question_id=self.question.id, text='Rojo', votes=3),
+            ChoiceDTO(question_id=self.question.id, text='Verde', votes=2),
+            ChoiceDTO(question_id=otra.id, text='Azul', votes=1),
+        ])
+        self.assertEqual(self.choices.bulk_reset_votes([rojo.id, 999999]), 1)
+        self.assertEqual(self.choices.get_by_id(verde.id).votes, 2)
+        self.assertEqual(self.choices.reset_votes_by_question([self.question.id]), 2)
+        self.assertEqual([choice.votes for choice in self.choices.get_by_question(self.question.id)], [0, 0])
+        self.assertEqual(self.choices.get_by_id(azul.id).votes, 1)
+        self.assertEqual(self.choices.bulk_delete([verde.id, 999999]), 1)
+        self.assertEqual([choice.text for choice in self.choices.get_by_question(self.question.id)], ['Rojo'])
+
+        self.assertEqual(self.questions.bulk_close([self.question.id, otra.id]), 2)
+        self.assertEqual(self.questions.bulk_close([self.question.id]), 0)
+        self.assertEqual(self.questions.get_by_id(otra.id).status, 'closed')
+        self.assertEqual(self.questions.bulk_delete([otra.id]), 1)
+        with self.assertRaises(QuestionNotFound):
+            self.questions.get_by_id(otra.id)
+        self.assertEqual([question.id for question in self.questions.get_recent()], [self.question.id])
+
+    def test_busqueda(self):
+        search_index = self.make_search_index()
+        created = [
+            CreateQuestionWithChoices(self.questions, self.choices, QuestionDTO(question_text=text), choices, search_index)
+            .execute()[0]
+            for text, choices in [
+                ('¿Qué canción prefieres?', ['Rock', 'Jazz']),
+                ('¿Cuál es tu color favorito?', ['Rojo', 'Azul']),
+                ('¿Qué fruta prefieres?', ['Mango', 'Piña']),
+            ]
+        ]
+        cancion, color, fruta = [question.id for question in created]
+
+        self.assertEqual([q.id for q in self.questions.search('prefieres').questions], [fruta, cancion])
+        self.assertEqual([q.id for q in self.questions.search('CANCION jazz').questions], [cancion])
+        self.assertEqual([q.id for q in self.questions.search('pina').questions], [fruta])
+        self.assertEqual(self.questions.search('rojo mango').questions, [])
+        self.assertEqual(self.questions.search('¿?').questions, [])
+
+        first = self.questions.search('que', limit=1)
+        self.assertEqual(([q.id for q in first.questions], first.next_cursor), ([fruta], fruta))
+        second = self.questions.search('que', limit=1, cursor=first.next_cursor)
+        self.assertEqual([q.id for q in second.questions], [cancion])
+        self.assertEqual(self.questions.search('que', limit=1, cursor=second.next_cursor).questions, [])
+
+        self.questions.bulk_delete([color])
+        self.assertEqual(self.questions.search('rojo').questions, [])
+
+    def test_caso_de_uso_vote(self):
+        choice = self.choices.create(ChoiceDTO(question_id=self.question.id, text='Rojo'))
+        for _ in range(3):
+            Vote(self.choices, choice.id).execute()
+        self.assertEqual(self.choices.get_by_id(choice.id).votes, 3)
+
+    def test_caso_de_uso_vote_batch(self):
+        otra = self.questions.create(QuestionDTO(question_text='¿Otra?'))
+        rojo, verde, ajena = self.choices.bulk_create([
+            ChoiceDTO(question_id=self.question.id, text='Rojo'),
+            ChoiceDTO(question_id=self.question.id, text='Verde'),
+            ChoiceDTO(question_id=otra.id, text='Ajena'),
+        ])
+        self.assertEqual(self.choices.get_question_ids([rojo.id, ajena.id, 999999]),
+                         {rojo.id: self.question.id, ajena.id: otra.id})
+
+        def batch(upload_id, deltas, question_id=None):
+            return VoteBatch(self.choices, self.questions, 'kiosco', upload_id, deltas, question_id).execute()
+
+        self.assertTrue(batch('1', {rojo.id: 5, verde.id: 2, ajena.id: 1}))
+        self.assertFalse(batch('1', {rojo.id: 5, verde.id: 2, ajena.id: 1}))
+        with self.assertRaises(InvalidVoteBatch) as error:
+            batch('2', {rojo.id: 1, ajena.id: 1, 999999: 1}, question_id=self.question.id)
+        self.assertEqual(error.exception.choice_ids, [ajena.id, 999999])
+        self.questions.bulk_close([otra.id])
+        with self.assertRaises(InvalidVoteBatch):
+            batch('3', {rojo.id: 1, ajena.id: 1})
+        self.assertEqual(
+            [self.choices.get_by_id(choice.id).votes for choice in (rojo, verde, ajena)],
+            [5, 2, 1],
+        )
+
+
+def replace_text(choice: ChoiceDTO, text: str) -> ChoiceDTO:
+    choice.text = text
+    return choice
+
+
+class DjangoRepositoryContractTest(RepositoryContract, TestCase):
+    def make_repositories(self):
+        return DjangoQuestionRepository(), DjangoChoiceRepository()
+
+    def make_search_index(self):
+        return DjangoSearchIndex()
+
+
+@override_settings(POLLS_SHARDING={'SHARDS': ('default', 'shard1', 'shard2')})
+class ShardedRepositoryContractTest(RepositoryContract, TestCase):
+    databases = {'default', 'shard1', 'shard2'}
+
+    def make_repositories(self):
+        # los bloques de ids reservados en una prueba anterior se deshicieron con su transacción
+        id_allocator()._blocks.clear()
+        return ShardedQuestionRepository(), ShardedChoiceRepository()
+
+    def make_search_index(self):
+        return ShardedSearchIndex()
+
+
+class InMemoryRepositoryContractTest(RepositoryContract, SimpleTestCase):
+    def make_repositories(self):
+        return InMemoryQuestionRepository(), InMemoryChoiceRepository()
+
+    def make_search_index(self):
+        return self.questions
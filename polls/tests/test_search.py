@@ -0,0 +1,81 @@
+# polls/tests/test_search.py
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from polls.choice_service import DjangoChoiceRepository
+from polls.models import (
+    Choice,
+    Question,
+)
+
+
+class QuestionSearchViewTest(TestCase):
+    def create(self, text, choices):
+        response = self.client.post(
+            reverse('polls:create_question_with_choices'),
+            {'question_text': text, 'choices': [{'choice_text': choice} for choice in choices]},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def search(self, **params):
+        return self.client.get(reverse('polls:search'), params)
+
+    def test_busqueda_paginada(self):
+        ids = [self.create(f'¿Qué opinas del tema {i}?', ['bien', 'mal']) for i in range(3)]
+        response = self.search(q='opinas', limit=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()['results']], [ids[2], ids[1]])
+        response = self.search(q='opinas', limit=2, cursor=response.json()['next_cursor'])
+        self.assertEqual(response.json(), {
+            'results': [{'id': ids[0], 'question_text': '¿Qué opinas del tema 0?',
+                         'pub_date': response.json()['results'][0]['pub_date'], 'status': 'open'}],
+            'next_cursor': None,
+        })
+
+    def test_opciones_agregadas_despues(self):
+        question_id = self.create('¿Dónde vacacionar?', ['playa'])
+        self.client.post(
+            reverse('polls:add_choices', kwargs={'pk': question_id}),
+            [{'choice_text': 'montaña'}],
+            content_type='application/json',
+        )
+        self.assertEqual([row['id'] for row in self.search(q='MONTANA').json()['results']], [question_id])
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.search().status_code, 400)
+        self.assertEqual(self.search(q='x', limit=1000).status_code, 400)
+
+    def test_rebuild(self):
+        question = Question.objects.create(question_text='¿Creada con el ORM?', pub_date=now())
+        Choice.objects.create(question=question, choice_text='sin indexar')
+        self.assertEqual(self.search(q='indexar').json()['results'], [])
+        out = StringIO()
+        call_command('rebuild_search_index', '--batch-size', '1', stdout=out)
+        self.assertIn('1 preguntas indexadas', out.getvalue())
+        self.assertEqual([row['id'] for row in self.search(q='indexar').json()['results']], [question.id])
+
+    def test_borrar_opciones_reindexa(self):
+        question_id = self.create('¿Qué fruta?', ['mango', 'kiwi', 'uva'])
+        mango, kiwi, _ = Choice.objects.filter(question_id=question_id).order_by('id')
+        repository = DjangoChoiceRepository()
+        repository.delete(mango.id)
+        self.assertEqual(self.search(q='mango').json()['results'], [])
+        repository.bulk_delete([kiwi.id])
+        self.assertEqual(self.search(q='kiwi').json()['results'], [])
+        self.assertEqual([row['id'] for row in self.search(q='uva').json()['results']], [question_id])
+
+    def test_la_migracion_indexa_las_preguntas_existentes(self):
+        question = Question.objects.create(question_text='¿Creada antes del índice?', pub_date=now())
+        Choice.objects.create(question=question, choice_text='histórica')
+        migration = import_module('polls.migrations.0008_search')
+        migration.index_existing_questions(apps, connection.schema_editor())
+        self.assertEqual([row['id'] for row in self.search(q='historica').json()['results']], [question.id])
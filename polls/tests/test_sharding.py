@@ -0,0 +1,183 @@
+# polls/tests/test_sharding.py
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils.timezone import now
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from polls.container import container
+from polls.models import (
+    AppliedVoteBatchQuestion,
+    ArchivedQuestion,
+    Choice,
+    ChoiceLocation,
+    Question,
+    VoteBucket,
+)
+from polls.sharding import (
+    ShardedChoiceRepository,
+    ShardedQuestionRepository,
+    ShardedVoteSeriesRepository,
+    db_for_question,
+    id_allocator,
+)
+
+TWO_SHARDS = {'SHARDS': ('default', 'shard1')}
+THREE_SHARDS = {'SHARDS': ('default', 'shard1', 'shard2')}
+
+
+class ShardingTest(TestCase):
+    databases = {'default', 'shard1', 'shard2'}
+
+    def setUp(self):
+        # los bloques de ids reservados en una prueba anterior se deshicieron con su transacción
+        id_allocator()._blocks.clear()
+
+    def create_polls(self, count, choices=('sí', 'no')):
+        questions, repository = ShardedQuestionRepository(), ShardedChoiceRepository()
+        polls = []
+        for i in range(count):
+            question = questions.create(QuestionDTO(
+                question_text=f'¿Pregunta {i}?', pub_date=datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(hours=i),
+            ))
+            polls.append((question, repository.bulk_create([ChoiceDTO(question_id=question.id, text=text) for text in choices])))
+        return polls
+
+    def where(self, question_id):
+        return [alias for alias in sorted(self.databases) if Question.objects.using(alias).filter(id=question_id).exists()]
+
+    @override_settings(POLLS_SHARDING=THREE_SHARDS)
+    def test_cada_encuesta_vive_entera_en_su_shard(self):
+        polls = self.create_polls(30)
+        self.assertEqual({db_for_question(question.id) for question, _ in polls}, set(THREE_SHARDS['SHARDS']))
+        for question, choices in polls:
+            shard = db_for_question(question.id)
+            self.assertEqual(self.where(question.id), [shard])
+            self.assertEqual(
+                set(Choice.objects.using(shard).filter(question_id=question.id).values_list('id', flat=True)),
+                {choice.id for choice in choices},
+            )
+        # ids globales: ninguno se repite entre shards
+        question_ids = [question.id for question, _ in polls]
+        self.assertEqual(len(set(question_ids)), 30)
+        self.assertEqual(ChoiceLocation.objects.count(), 60)
+
+    @override_settings(POLLS_SHARDING=THREE_SHARDS)
+    def test_get_recent_mezcla_los_shards(self):
+        polls = self.create_polls(12)
+        recent = ShardedQuestionRepository().get_recent(5)
+        self.assertEqual([question.id for question in recent], [question.id for question, _ in reversed(polls)][:5])
+
+    @override_settings(POLLS_SHARDING=THREE_SHARDS)
+    def test_votos_por_lote_en_varios_shards(self):
+        polls = self.create_polls(9)
+        repository = ShardedChoiceRepository()
+        deltas = {choices[0].id: i + 1 for i, (_, choices) in enumerate(polls)}
+        self.assertTrue(repository.apply_vote_batch('prueba', 'lote-1', deltas))
+        self.assertFalse(repository.apply_vote_batch('prueba', 'lote-1', deltas))
+        self.assertEqual({choice_id: repository.get_by_id(choice_id).votes for choice_id in deltas}, deltas)
+
+    def test_lote_reaplicado_despues_de_mover_la_encuesta(self):
+        """
+        Prueba que el registro de un lote se muda con sus preguntas: reenviarlo
+        después de rebalancear no vuelve a sumar en el shard nuevo.
+        """
+        with override_settings(POLLS_SHARDING=TWO_SHARDS):
+            polls = self.create_polls(12)
+            deltas = {choices[0].id: 2 for _, choices in polls}
+            self.assertTrue(ShardedChoiceRepository().apply_vote_batch('kiosco', 'lote-1', deltas))
+        with override_settings(POLLS_SHARDING=THREE_SHARDS):
+            moving = [question.id for question, _ in polls if db_for_question(question.id) == 'shard2']
+            self.assertTrue(moving)
+            call_command('rebalance_shards', stdout=StringIO())
+            repository = ShardedChoiceRepository()
+            self.assertFalse(repository.apply_vote_batch('kiosco', 'lote-1', deltas))
+            self.assertEqual({choice_id: repository.get_by_id(choice_id).votes for choice_id in deltas}, deltas)
+            self.assertEqual(
+                set(AppliedVoteBatchQuestion.objects.using('shard2').values_list('question_id', flat=True)),
+                set(moving),
+            )
+
+    def test_los_ids_siguen_despues_de_los_existentes(self):
+        existing = Question.objects.create(question_text='¿De antes?', pub_date=now())
+        ArchivedQuestion.objects.create(id=existing.id + 10, question_text='¿Archivada?', pub_date=now(), archived_at=now())
+        with override_settings(POLLS_SHARDING=TWO_SHARDS):
+            question = ShardedQuestionRepository().create(QuestionDTO(question_text='¿Nueva?'))
+        self.assertEqual(question.id, existing.id + 11)
+
+    def test_rebalanceo_al_agregar_un_shard(self):
+        with override_settings(POLLS_SHARDING=TWO_SHARDS):
+            polls = self.create_polls(30)
+            ShardedChoiceRepository().bulk_update_votes({choices[1].id: 3 for _, choices in polls})
+            closed = polls[0][0].id
+            repository = ShardedQuestionRepository()
+            repository.bulk_close([closed])
+            repository.archive_closed(now() + timedelta(seconds=1))
+
+        with override_settings(POLLS_SHARDING=THREE_SHARDS):
+            moving = [(question, choices) for question, choices in polls if db_for_question(question.id) == 'shard2']
+            self.assertTrue(moving)
+            question, choices = moving[0]
+            # antes de rebalancear se lee y se vota donde todavía está
+            self.assertEqual(ShardedQuestionRepository().get_by_id(question.id).question_text, question.question_text)
+            self.assertEqual(ShardedChoiceRepository().update_votes(choices[0].id), 1)
+
+            out = StringIO()
+            call_command('rebalance_shards', '--batch-size', '7', stdout=out)
+            self.assertIn(f'{len(moving)} encuestas movidas', out.getvalue())
+
+            for question, choices in polls:
+                shard = db_for_question(question.id)
+                model = ArchivedQuestion if question.id == closed else Question
+                self.assertTrue(model.objects.using(shard).filter(id=question.id).exists())
+                self.assertEqual(
+                    [model.objects.using(alias).filter(id=question.id).exists() for alias in sorted(self.databases)].count(True),
+                    1,
+                )
+                if question.id != closed:
+                    self.assertEqual(
+                        [choice.votes for choice in ShardedChoiceRepository().get_by_question(question.id)],
+                        [1 if question.id == moving[0][0].id else 0, 3],
+                    )
+            # la búsqueda también se mudó
+            self.assertEqual(ShardedQuestionRepository().search(moving[0][0].question_text).questions[0].id, moving[0][0].id)
+            out = StringIO()
+            call_command('rebalance_shards', stdout=out)
+            self.assertIn('0 encuestas movidas', out.getvalue())
+
+    @override_settings(POLLS_SHARDING=THREE_SHARDS)
+    def test_serie_de_votos_en_el_shard_de_la_opcion(self):
+        polls = self.create_polls(6, choices=('sí',))
+        ShardedVoteSeriesRepository().add_buckets({(choices[0].id, 60): 2 for _, choices in polls}, VoteBucket.MINUTE)
+        for question, choices in polls:
+            self.assertEqual(
+                list(VoteBucket.objects.using(db_for_question(question.id)).filter(choice_id=choices[0].id)
+                     .values_list('votes', flat=True)),
+                [2],
+            )
+
+    @override_settings(POLLS_SHARDING=THREE_SHARDS)
+    def test_detalle_y_voto_de_una_encuesta_en_otro_shard(self):
+        polls = self.create_polls(9)
+        question, choices = next(poll for poll in polls if db_for_question(poll[0].id) != 'default')
+        url = reverse('polls:detail', args=[question.id])
+        with container.override('choice_repository', ShardedChoiceRepository), \
+                container.override('vote_repository', ShardedChoiceRepository):
+            response = self.client.get(url)
+            self.assertContains(response, question.question_text)
+            self.assertContains(response, 'sí')
+            self.client.post(url, {'choice_text': choices[0].id})
+        self.assertEqual(Choice.objects.using(db_for_question(question.id)).get(id=choices[0].id).votes, 1)
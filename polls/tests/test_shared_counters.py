@@ -0,0 +1,139 @@
+# polls/tests/test_shared_counters.py
+import itertools
+import os
+import tempfile
+
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.utils.timezone import now
+
+from polls.choice_service import DjangoChoiceRepository
+from polls.models import (
+    Choice,
+    Question,
+)
+from polls.shared_counters import (
+    SharedMemoryChoiceRepository,
+    SharedVoteCounters,
+)
+
+_names = itertools.count()
+
+
+def make_counters(**kwargs) -> SharedVoteCounters:
+    return SharedVoteCounters(
+        name=f'polls_test_{os.getpid()}_{next(_names)}',
+        lock_dir=tempfile.gettempdir(),
+        **kwargs,
+    )
+
+
+def _fork_voter(counters: SharedVoteCounters, choice_id: int, times: int) -> int:
+    # fork directo: los workers de ``test --parallel`` son daemon y multiprocessing no les permite hijos
+    pid = os.fork()
+    if pid == 0:
+        try:
+            for _ in range(times):
+                counters.increment(choice_id)
+        finally:
+            os._exit(0)
+    return pid
+
+
+class SharedVoteCountersTest(SimpleTestCase):
+    def setUp(self):
+        self.counters = make_counters(slots=64, stripes=8)
+
+    def tearDown(self):
+        self.counters.unlink()
+
+    def test_varios_procesos_incrementan_el_mismo_contador(self):
+        """
+        Prueba que los incrementos de varios procesos sobre el mismo segmento no se pierden.
+        """
+        self.counters.increment(7, 0)  # crea el segmento antes del fork
+        workers = [_fork_voter(self.counters, 7, 250) for _ in range(4)]
+        for pid in workers:
+            os.waitpid(pid, 0)
+        self.assertEqual(self.counters.unflushed(7), 1000)
+
+    def test_tabla_llena(self):
+        counters = make_counters(slots=2, stripes=1)
+        try:
+            self.assertTrue(counters.increment(1))
+            self.assertTrue(counters.increment(2))
+            self.assertFalse(counters.increment(3))
+        finally:
+            counters.unlink()
+
+    def test_flush_reaplica_el_lote_de_un_flusher_caido(self):
+        """
+        Prueba que si el flusher muere antes de confirmar, el siguiente reaplica el mismo lote.
+        """
+        applied = {}
+        self.counters.increment(1, 5)
+
+        def crash(deltas, batch_key):
+            raise RuntimeError('el worker murió')
+
+        def apply(deltas, batch_key):
+            applied.setdefault(batch_key, deltas)  # idempotente por clave
+
+        with self.assertRaises(RuntimeError):
+            self.counters.flush(crash)
+        self.counters.increment(1, 2)
+        self.assertEqual(self.counters.unflushed(1), 7)
+
+        restarted = SharedVoteCounters(name=self.counters.name, lock_dir=tempfile.gettempdir())
+        self.assertEqual(restarted.flush(apply), 7)
+        self.assertEqual(sum(sum(deltas.values()) for deltas in applied.values()), 7)
+        self.assertEqual(restarted.unflushed(1), 0)
+        restarted.close()
+
+
+class SharedMemoryChoiceRepositoryTest(TestCase):
+    def setUp(self):
+        self.counters = make_counters(slots=64, stripes=8)
+        self.repo = SharedMemoryChoiceRepository(counters=self.counters, flush_interval=3600)
+        question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+        self.choice = Choice.objects.create(choice_text='Rojo', question=question, votes=1)
+
+    def tearDown(self):
+        self.counters.unlink()
+
+    def test_update_votes_y_flush(self):
+        for _ in range(3):
+            self.assertEqual(self.repo.update_votes(self.choice.id), 1)
+        self.assertEqual(self.repo.get_by_id(self.choice.id).votes, 4)  # incluye lo no persistido
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 1)
+        self.assertEqual(self.repo.flush(), 3)
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 4)
+
+    def test_opcion_inexistente(self):
+        self.assertEqual(self.repo.update_votes(999999), 0)
+        self.assertEqual(self.counters.unflushed(999999), 0)
+        # una consulta por opción: las que existen se recuerdan
+        self.repo.update_votes(self.choice.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.repo.update_votes(self.choice.id), 1)
+
+    def test_lote_confirmado_no_se_cuenta_dos_veces(self):
+        """
+        Prueba que si el flusher muere después de confirmar en la base de datos, no hay doble conteo.
+        """
+        self.repo.update_votes(self.choice.id)
+        django_repo = DjangoChoiceRepository()
+
+        def commit_then_crash(deltas, batch_key):
+            django_repo.apply_vote_batch(self.repo.source, batch_key, deltas)
+            raise RuntimeError('el worker murió')
+
+        with self.assertRaises(RuntimeError):
+            self.counters.flush(commit_then_crash)
+        self.repo.flush()
+        self.choice.refresh_from_db()
+        self.assertEqual(self.choice.votes, 2)
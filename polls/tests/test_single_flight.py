@@ -0,0 +1,122 @@
+# polls/tests/test_single_flight.py
+import asyncio
+import threading
+import time
+
+from django.db import transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.in_memory import (
+    InMemoryChoiceRepository,
+    InMemoryQuestionRepository,
+)
+from polls.single_flight import (
+    SingleFlight,
+    SingleFlightChoiceRepository,
+    SingleFlightQuestionRepository,
+    shared_read,
+)
+
+READERS = 20
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError('la condición no se cumplió a tiempo')
+        time.sleep(0.001)
+
+
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        self.flight = SingleFlight()
+        self.release = threading.Event()
+        self.executions = 0
+
+    def slow_read(self):
+        self.executions += 1
+        self.release.wait(5)
+        return {'votos': 10}
+
+    def read_concurrently(self, fn):
+        results, errors = [], []
+
+        def reader():
+            try:
+                results.append(self.flight.do('pregunta:1', fn))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=reader) for _ in range(READERS)]
+        for thread in threads:
+            thread.start()
+        # el primero queda dentro de la consulta hasta que todos se hayan sumado
+        wait_until(lambda: self.flight.stats()['calls'] == READERS)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_hilos_comparten_una_consulta(self):
+        results, errors = self.read_concurrently(self.slow_read)
+        self.assertEqual((len(results), errors, self.executions), (READERS, [], 1))
+        self.assertEqual(self.flight.stats(), {'calls': READERS, 'executions': 1, 'collapsed': READERS - 1})
+        # al terminar la clave se olvida: la siguiente lectura vuelve a consultar
+        self.flight.do('pregunta:1', self.slow_read)
+        self.assertEqual(self.executions, 2)
+
+    def test_el_error_llega_a_todos(self):
+        def failing_read():
+            self.release.wait(5)
+            raise LookupError('no existe')
+
+        results, errors = self.read_concurrently(failing_read)
+        self.assertEqual(results, [])
+        self.assertEqual([type(error) for error in errors], [LookupError] * READERS)
+
+    def test_corrutinas_comparten_una_consulta(self):
+        async def slow_read():
+            self.executions += 1
+            await asyncio.sleep(0.01)
+            return {'votos': 10}
+
+        async def main():
+            return await asyncio.gather(*(self.flight.ado('pregunta:1', slow_read) for _ in range(READERS)))
+
+        results = asyncio.run(main())
+        self.assertEqual(results, [{'votos': 10}] * READERS)
+        self.assertEqual(self.executions, 1)
+        self.assertEqual(self.flight.stats()['collapsed'], READERS - 1)
+
+
+class SingleFlightRepositoryTest(SimpleTestCase):
+    def test_cada_lector_recibe_su_copia(self):
+        questions = InMemoryQuestionRepository()
+        choices = InMemoryChoiceRepository()
+        question = questions.create(QuestionDTO(question_text='¿Sí o no?'))
+        choices.create(ChoiceDTO(question_id=question.id, text='sí'))
+        flight = SingleFlight()
+        question_repo = SingleFlightQuestionRepository(questions, flight)
+        choice_repo = SingleFlightChoiceRepository(choices, flight)
+
+        first = choice_repo.get_by_question(question.id)
+        first[0].votes = 100
+        self.assertEqual(choice_repo.get_by_question(question.id)[0].votes, 0)
+        self.assertEqual(question_repo.get_by_id(question.id).question_text, '¿Sí o no?')
+        self.assertEqual(flight.stats()['executions'], 3)
+
+
+class SharedReadTransactionTest(TestCase):
+    def test_dentro_de_una_transaccion_no_se_comparte(self):
+        flight = SingleFlight()
+        with transaction.atomic():
+            self.assertEqual(shared_read('clave', lambda: 1, flight), 1)
+        self.assertEqual(flight.stats()['calls'], 0)
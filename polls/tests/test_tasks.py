@@ -0,0 +1,82 @@
+# polls/tests/test_tasks.py
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.utils.timezone import now
+
+from business_logic.exceptions import TaskQueueFull
+from polls.choice_service import vote_service
+from polls.models import (
+    Choice,
+    Question,
+    TaskOutbox,
+)
+from polls.tasks import (
+    InProcessDispatcher,
+    TASK_HANDLERS,
+    run_task,
+)
+
+
+@override_settings(POLLS_TASK_QUEUE={'IN_PROCESS': True})
+class VoteEnqueueTest(TestCase):
+    def test_vote_encola_tarea_al_confirmar(self):
+        """
+        Prueba que el voto deja la tarea en el outbox y sólo la despacha al hacer commit.
+        """
+        question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+        choice = Choice.objects.create(choice_text='Rojo', question=question)
+        with patch('polls.tasks.get_dispatcher') as mock_dispatcher:
+            with self.captureOnCommitCallbacks(execute=False) as callbacks:
+                vote_service(choice_id=choice.id).execute()
+            mock_dispatcher.assert_not_called()  # aún no se confirma la transacción
+            for callback in callbacks:
+                callback()
+        task = TaskOutbox.objects.get(name='vote_registered')
+        self.assertEqual(task.payload, {'choice_id': choice.id, 'question_id': question.id})
+        mock_dispatcher.return_value.submit.assert_called_once_with(task.id)
+
+
+@override_settings(POLLS_TASK_QUEUE={'IN_PROCESS': False, 'MAX_ATTEMPTS': 2, 'RETRY_BACKOFF': 0})
+class RunTaskTest(TestCase):
+    def setUp(self):
+        TASK_HANDLERS['test_falla'] = self._falla
+
+    def tearDown(self):
+        TASK_HANDLERS.pop('test_falla')
+
+    def _falla(self, payload):
+        raise ValueError('boom')
+
+    def test_reintenta_y_marca_fallida(self):
+        task = TaskOutbox.objects.create(name='test_falla', available_at=now())
+        with self.assertLogs('polls.tasks', 'ERROR'):
+            self.assertEqual(run_task(task.id), 0)  # primer intento, se reintenta
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskOutbox.PENDING)
+        with self.assertLogs('polls.tasks', 'ERROR'):
+            self.assertIsNone(run_task(task.id))  # segundo intento, se agota
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskOutbox.FAILED)
+        self.assertEqual(task.attempts, 2)
+        self.assertIn('boom', task.last_error)
+
+    def test_run_workers_once(self):
+        task = TaskOutbox.objects.create(name='vote_registered', available_at=now())
+        out = StringIO()
+        call_command('run_workers', '--once', '--threads=0', stdout=out)
+        task.refresh_from_db()
+        self.assertEqual(task.status, TaskOutbox.DONE)
+
+
+class InProcessDispatcherTest(TestCase):
+    def test_backpressure(self):
+        dispatcher = InProcessDispatcher(workers=0, max_queue=1)
+        dispatcher.submit(1)
+        with self.assertRaises(TaskQueueFull):
+            dispatcher.submit(2)
@@ -0,0 +1,34 @@
+# polls/tests/test_templatetags.py
+from django.template import (
+    Context,
+    Engine,
+    TemplateSyntaxError,
+)
+from django.test import (
+    SimpleTestCase,
+    override_settings,
+)
+
+ENGINE = Engine(libraries={'polls_fragments': 'polls.templatetags.polls_fragments'})
+
+
+class PrerenderTagTest(SimpleTestCase):
+    def test_se_renderiza_una_sola_vez(self):
+        """
+        Prueba que el fragmento se guarda en el nodo y no ve el contexto del request.
+        """
+        template = ENGINE.from_string(
+            '{% load polls_fragments %}{{ name }}|{% prerender %}<b>{{ name }}</b>{% endprerender %}'
+        )
+        self.assertEqual(template.render(Context({'name': 'a'})), 'a|<b></b>')
+        self.assertEqual(template.render(Context({'name': 'b'})), 'b|<b></b>')
+
+    @override_settings(POLLS_TEMPLATES={'PRERENDER': False})
+    def test_desactivado(self):
+        template = ENGINE.from_string('{% load polls_fragments %}{% prerender %}<i>x</i>{% endprerender %}')
+        self.assertEqual(template.render(Context()), '<i>x</i>')
+        self.assertIsNone(template.nodelist[-1].rendered)
+
+    def test_no_recibe_argumentos(self):
+        with self.assertRaises(TemplateSyntaxError):
+            ENGINE.from_string('{% load polls_fragments %}{% prerender x %}{% endprerender %}')
@@ -0,0 +1,128 @@
+# polls/tests/test_test_runner.py
+import pickle
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+
+from polls.models import Question
+from polls.tasks import task_settings
+from settings import test_runner
+from settings.test_runner import (
+    SeededTestCase,
+    SnapshotDatabaseCreation,
+    UnifiedTestRunner,
+    _make_doctest_case,
+    restore_sqlite_snapshot,
+    save_sqlite_snapshot,
+    schema_fingerprint,
+)
+
+
+class UnifiedTestRunnerTest(SimpleTestCase):
+    def test_descubre_solo_modulos_del_proyecto(self):
+        """
+        Prueba que el descubrimiento de doctests no importa manage.py, settings ni migraciones.
+        """
+        modules = UnifiedTestRunner().get_doctest_modules()
+        self.assertIn('polls.choice_service', modules)
+        self.assertNotIn('manage', modules)
+        self.assertFalse([name for name in modules if name.startswith('settings')])
+        self.assertFalse([name for name in modules if '.migrations' in name or '.tests' in name])
+
+    def test_sin_despacho_en_proceso(self):
+        self.assertFalse(task_settings()['IN_PROCESS'])
+
+    def test_doctest_por_etiqueta(self):
+        modules = UnifiedTestRunner().get_doctest_modules('polls.choice_service')
+        self.assertEqual(modules, ['polls.choice_service'])
+
+    def test_doctest_picklable(self):
+        """
+        Prueba que los doctests se pueden mandar a los procesos de --parallel.
+        """
+        case = _make_doctest_case('polls.choice_service', 'polls.choice_service.DjangoChoiceRepository.create')
+        clone = pickle.loads(pickle.dumps(case))
+        self.assertEqual(clone, case)
+        self.assertIs(type(clone), type(case))
+
+
+class SnapshotDatabaseCreationTest(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_fingerprint_cambia_con_las_migraciones(self):
+        before = schema_fingerprint()
+        migration = Path(__file__).resolve().parent.parent / 'migrations' / '9999_prueba.py'
+        try:
+            migration.write_text('# sin operaciones\n')
+            schema_fingerprint.cache_clear()
+            self.assertNotEqual(schema_fingerprint(), before)
+        finally:
+            migration.unlink()
+            schema_fingerprint.cache_clear()
+        self.assertEqual(schema_fingerprint(), before)
+
+    def test_snapshot_de_la_base_migrada(self):
+        path = test_runner._migrated_snapshots.get('default')
+        if path is None:
+            self.skipTest('corrida con --no-snapshots o --keepdb')
+        snapshot = sqlite3.connect(path)
+        self.addCleanup(snapshot.close)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM django_migrations')
+            applied = cursor.fetchone()[0]
+        self.assertEqual(snapshot.execute('SELECT COUNT(*) FROM django_migrations').fetchone()[0], applied)
+
+    def test_guardar_y_restaurar(self):
+        wrapper = connection.copy('snapshot')
+        wrapper.settings_dict['NAME'] = str(self.directory / 'db.sqlite3')
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE prueba (id INTEGER PRIMARY KEY)')
+            cursor.execute('INSERT INTO prueba VALUES (1)')
+        stale = self.directory / 'snapshot-migrated-viejo.sqlite3'
+        stale.touch()
+        path = self.directory / 'snapshot-migrated-nuevo.sqlite3'
+        save_sqlite_snapshot(wrapper, path)
+        self.assertFalse(stale.exists())
+
+        with wrapper.cursor() as cursor:
+            cursor.execute('INSERT INTO prueba VALUES (2)')
+        restore_sqlite_snapshot(wrapper, path)
+        with wrapper.cursor() as cursor:
+            cursor.execute('SELECT id FROM prueba')
+            self.assertEqual(cursor.fetchall(), [(1,)])
+
+    def test_keepdb_no_usa_snapshots(self):
+        creation = mock.Mock(connection=connection)
+        SnapshotDatabaseCreation(creation).create_test_db(verbosity=0, keepdb=True)
+        creation.create_test_db.assert_called_once_with(0, False, True, True)
+        creation._create_test_db.assert_not_called()
+
+
+class SeededTestCaseTest(SeededTestCase):
+    seed = 'polls.tests.fixtures.admin_polls'
+
+    def test_datos_sembrados(self):
+        self.assertTrue(User.objects.filter(username='admin').exists())
+        self.assertEqual(Question.objects.count(), 3)
+
+
+class BaseSinSembrarTest(TestCase):
+    """Corre después de PollsAdminTest: la base vuelve a quedar como recién migrada."""
+
+    def test_la_base_vuelve_a_quedar_vacia(self):
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Question.objects.exists())
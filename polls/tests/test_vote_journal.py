@@ -0,0 +1,160 @@
+# polls/tests/test_vote_journal.py
+import os
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+)
+from django.utils.timezone import now
+
+from polls.models import (
+    Choice,
+    Question,
+)
+from polls.vote_journal import (
+    RECORD,
+    JournaledChoiceRepository,
+    VoteJournal,
+    VoteJournalReplayer,
+    read_segment,
+)
+
+
+class VoteJournalTest(SimpleTestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_group_commit(self):
+        """
+        Prueba que los votos concurrentes comparten fsync y ninguno se pierde.
+        """
+        journal = VoteJournal(self.path, group_commit_delay=0.002, segment_seconds=3600)
+        barrier = threading.Barrier(8)
+
+        def votar():
+            barrier.wait()
+            for _ in range(25):
+                journal.append(1)
+
+        with mock.patch('polls.vote_journal.os.fsync', wraps=os.fsync) as fsync:
+            threads = [threading.Thread(target=votar) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertLess(fsync.call_count, 200)
+        self.assertEqual(read_segment(journal.rotate()), {1: 200})
+        journal.close()
+
+    def test_rotacion_por_tamano(self):
+        journal = VoteJournal(self.path, fsync=False, segment_bytes=RECORD.size * 10, segment_seconds=3600)
+        for _ in range(25):
+            journal.append(2)
+        journal.close()
+        segments = VoteJournalReplayer(self.path, repository=mock.Mock()).sealed_segments()
+        self.assertEqual([sum(read_segment(segment).values()) for segment in segments], [10, 10, 5])
+
+    def test_segmento_de_un_proceso_muerto(self):
+        """
+        Prueba que el segmento abierto de un worker que murió sin sellarlo se
+        recupera, ignorando el registro que quedó a medias.
+        """
+        pid = os.fork()
+        if pid == 0:
+            try:
+                journal = VoteJournal(self.path, segment_seconds=3600)
+                journal.append(3, delta=4)
+                os.write(journal._fd, RECORD.pack(3, 0, 100)[:10])
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        replayer = VoteJournalReplayer(self.path, repository=mock.Mock())
+        [segment] = replayer.seal_orphans()
+        self.assertEqual(read_segment(segment), {3: 4})
+
+    def test_segmento_sellado_mientras_tanto(self):
+        """
+        Prueba que un segmento que su escritor sella entre el listado y el
+        rename se salta en lugar de romper el replay.
+        """
+        pid = os.fork()
+        if pid == 0:
+            try:
+                VoteJournal(self.path, fsync=False, segment_seconds=3600).append(3)
+            finally:
+                os._exit(0)
+        os.waitpid(pid, 0)
+        replayer = VoteJournalReplayer(self.path, repository=mock.Mock())
+        with mock.patch('os.rename', side_effect=FileNotFoundError):
+            self.assertEqual(replayer.seal_orphans(), [])
+        with mock.patch('os.open', side_effect=FileNotFoundError):
+            self.assertEqual(replayer.seal_orphans(), [])
+
+    def test_segmento_de_un_proceso_vivo_no_se_toca(self):
+        journal = VoteJournal(self.path, fsync=False, segment_seconds=3600)
+        journal.append(4)
+        self.assertEqual(VoteJournalReplayer(self.path, repository=mock.Mock()).seal_orphans(), [])
+        journal.close()
+
+
+class VoteJournalReplayerTest(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+        self.rojo = Choice.objects.create(choice_text='Rojo', question=question)
+        self.verde = Choice.objects.create(choice_text='Verde', question=question)
+        self.journal = VoteJournal(self.path, fsync=False, segment_seconds=3600)
+        self.replayer = VoteJournalReplayer(self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.path)
+
+    def test_replay_idempotente(self):
+        """
+        Prueba que si el replayer muere después de aplicar un segmento y antes
+        de borrarlo, volver a aplicarlo no cuenta dos veces.
+        """
+        self.journal.append(self.rojo.id)
+        self.journal.append(self.rojo.id)
+        self.journal.rotate()
+        with mock.patch('pathlib.Path.unlink', side_effect=RuntimeError('el proceso murió')):
+            with self.assertRaises(RuntimeError):
+                self.replayer.replay()
+        self.assertEqual(self.replayer.replay(), 0)
+        self.assertEqual(self.replayer.sealed_segments(), [])
+        self.rojo.refresh_from_db()
+        self.assertEqual(self.rojo.votes, 2)
+
+    def test_compact(self):
+        for choice in (self.rojo, self.verde, self.rojo):
+            self.journal.append(choice.id)
+            self.journal.rotate()
+        self.assertEqual(self.replayer.compact(), 3)
+        [segment] = self.replayer.sealed_segments()
+        self.assertEqual(read_segment(segment), {self.rojo.id: 2, self.verde.id: 1})
+        self.assertEqual(self.replayer.replay(), 3)
+
+    def test_repositorio(self):
+        repo = JournaledChoiceRepository(journal=self.journal, replay_interval=3600)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(repo.update_votes(self.verde.id), 1)
+        with self.captureOnCommitCallbacks(execute=False):
+            repo.update_votes(self.verde.id)  # nunca se confirma
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertEqual(repo.update_votes(999999), 0)
+        self.assertEqual(callbacks, [])
+        with mock.patch('polls.vote_journal.read_segment') as read_segment_mock:
+            self.assertEqual(repo.get_by_id(self.verde.id).votes, 1)
+        read_segment_mock.assert_not_called()
+        self.assertEqual(repo.replay(), 1)
+        self.verde.refresh_from_db()
+        self.assertEqual(self.verde.votes, 1)
+        self.assertEqual(repo.get_by_id(self.verde.id).votes, 1)
@@ -0,0 +1,93 @@
+# polls/tests/test_vote_series.py
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+import time
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import (
+    TestCase,
+    TransactionTestCase,
+)
+from django.utils.timezone import now
+
+from polls.container import container
+from polls.models import (
+    Choice,
+    Question,
+    VoteBucket,
+)
+from polls.services import vote_service
+from polls.vote_series import (
+    BufferedVoteSeriesWriter,
+    DjangoVoteSeriesRepository,
+    to_bucket,
+)
+
+
+class VoteSeriesTest(TestCase):
+    def setUp(self):
+        question = Question.objects.create(question_text='¿Cuál es tu color favorito?', pub_date=now())
+        self.choice = Choice.objects.create(choice_text='Rojo', question=question)
+        self.repository = DjangoVoteSeriesRepository()
+
+    def test_vote_registra_en_la_serie_al_confirmar(self):
+        """
+        Prueba que el caso de uso Vote registra el voto en la serie sólo al confirmarse.
+        """
+        writer = BufferedVoteSeriesWriter(self.repository, flush_interval=3600)
+        with container.override('vote_series', lambda: writer):
+            with self.captureOnCommitCallbacks(execute=True):
+                vote_service(choice_id=self.choice.id).execute()
+        self.assertFalse(VoteBucket.objects.exists())
+        writer.close()
+        bucket = VoteBucket.objects.get(choice=self.choice)
+        self.assertEqual(bucket.resolution, VoteBucket.MINUTE)
+        self.assertEqual(bucket.votes, 1)
+
+    def test_buffer_agrupa_por_minuto(self):
+        writer = BufferedVoteSeriesWriter(self.repository, flush_interval=3600)
+        self.addCleanup(writer.close)
+        at = datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc)
+        with self.captureOnCommitCallbacks(execute=True):
+            for seconds in (0, 10, 59, 60):
+                writer.record(self.choice.id, at=at + timedelta(seconds=seconds))
+        self.assertFalse(VoteBucket.objects.exists())  # aún en el buffer
+        self.assertEqual(writer.flush(), 2)
+        series = self.repository.get_range(self.choice.id, at, at + timedelta(hours=1), VoteBucket.MINUTE)
+        self.assertEqual(series.buckets.tolist(), [to_bucket(at, 60), to_bucket(at, 60) + 60])
+        self.assertEqual(series.votes.tolist(), [3, 1])
+
+    def test_compactacion(self):
+        old = datetime(2020, 1, 1, 0, 0, tzinfo=timezone.utc)
+        minute = to_bucket(old, VoteBucket.MINUTE)
+        self.repository.add_buckets(
+            {(self.choice.id, minute + offset * 60): 1 for offset in range(120)},
+            VoteBucket.MINUTE,
+        )
+        call_command('compact_vote_series', stdout=StringIO())
+        self.assertEqual(
+            list(VoteBucket.objects.values_list('resolution', 'bucket', 'votes')),
+            [(VoteBucket.DAY, to_bucket(old, VoteBucket.DAY), 120)],
+        )
+        series = self.repository.get_range(self.choice.id, old, old + timedelta(days=1), VoteBucket.DAY)
+        self.assertEqual(series.votes.tolist(), [120])
+        # por minuto, lo compactado sale como un punto al inicio de su día
+        series = self.repository.get_range(self.choice.id, old, old + timedelta(hours=2), VoteBucket.MINUTE)
+        self.assertEqual((series.buckets.tolist(), series.votes.tolist()), ([to_bucket(old, VoteBucket.DAY)], [120]))
+
+
+class BufferedVoteSeriesFlusherTest(TransactionTestCase):
+    def test_un_voto_solo_se_escribe_dentro_del_intervalo(self):
+        question = Question.objects.create(question_text='¿Alguien más?', pub_date=now())
+        choice = Choice.objects.create(choice_text='nadie', question=question)
+        writer = BufferedVoteSeriesWriter(DjangoVoteSeriesRepository(), flush_interval=0.2)
+        self.addCleanup(writer.close)
+        writer.record(choice.id)  # fuera de una transacción entra al buffer en el acto
+        deadline = time.monotonic() + writer.flush_interval + 2
+        while not VoteBucket.objects.exists() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(VoteBucket.objects.get().votes, 1)
@@ -0,0 +1,106 @@
+# polls/tests/test_vote_tokens.py
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils.timezone import now
+
+from polls.models import (
+    Choice,
+    Question,
+)
+from polls.vote_tokens import (
+    InvalidVoteToken,
+    issue_vote_token,
+    verify_vote_token,
+)
+
+
+def tagging_middleware(get_response):
+    def middleware(request):
+        response = get_response(request)
+        response['X-Stack'] = 'stateless'
+        return response
+    return middleware
+
+
+class VoteTokenTest(SimpleTestCase):
+    def test_token_sin_pregunta_vale_para_cualquiera(self):
+        token = issue_vote_token('cliente')
+        self.assertEqual(verify_vote_token(token, 1), 'cliente')
+        self.assertEqual(verify_vote_token(token, 2), 'cliente')
+
+    def test_token_vencido_o_alterado(self):
+        with self.assertRaisesMessage(InvalidVoteToken, 'expired'):
+            verify_vote_token(issue_vote_token('cliente', ttl=-1), 1)
+        token = issue_vote_token('cliente', 1)
+        with self.assertRaisesMessage(InvalidVoteToken, 'bad signature'):
+            verify_vote_token(token[:-1] + ('A' if token[-1] != 'A' else 'B'), 1)
+        with override_settings(POLLS_VOTE_TOKENS={'SALT': 'otra'}):
+            with self.assertRaises(InvalidVoteToken):
+                verify_vote_token(token, 1)
+
+
+class TokenVoteViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.question = Question.objects.create(question_text='¿Mar o montaña?', pub_date=now())
+        cls.mar, cls.montana = Choice.objects.bulk_create(
+            Choice(question=cls.question, choice_text=text) for text in ('mar', 'montaña')
+        )
+        cls.url = reverse('polls:vote', args=[cls.question.id])
+
+    def vote(self, choice, token=None, url=None):
+        token = token or issue_vote_token('cliente', self.question.id)
+        return self.client.post(url or self.url, {'choice': choice}, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_vota_sin_sesion_ni_csrf(self):
+        self.client = self.client_class(enforce_csrf_checks=True)
+        # pregunta, opción, el caso de uso Vote (lectura, UPDATE y tarea) y el savepoint de atomic
+        with self.assertNumQueries(7):
+            response = self.vote(self.mar.id)
+        self.assertEqual(response.status_code, 204)
+        self.mar.refresh_from_db()
+        self.assertEqual(self.mar.votes, 1)
+        # no pasó por el stack completo: ni cookies ni XFrameOptionsMiddleware
+        self.assertFalse(response.cookies)
+        self.assertNotIn('X-Frame-Options', response)
+
+    def test_token_invalido(self):
+        response = self.client.post(self.url, {'choice': self.mar.id})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response['WWW-Authenticate'], 'Bearer')
+        self.assertEqual(self.vote(self.mar.id, token='basura').status_code, 401)
+        self.assertEqual(self.vote(self.mar.id, token=issue_vote_token('cliente', self.question.id + 1)).status_code, 401)
+
+    def test_opcion_invalida_o_encuesta_cerrada(self):
+        otra = Question.objects.create(question_text='¿Otra?', pub_date=now())
+        ajena = Choice.objects.create(question=otra, choice_text='ajena')
+        self.assertEqual(self.vote('x').status_code, 400)
+        self.assertEqual(self.vote(ajena.id).status_code, 400)
+        self.assertEqual(self.vote(self.mar.id, url=reverse('polls:vote', args=[999999]),
+                                   token=issue_vote_token('cliente')).status_code, 404)
+        Question.objects.filter(id=self.question.id).update(status=Question.CLOSED)
+        self.assertEqual(self.vote(self.mar.id).status_code, 409)
+        self.assertFalse(Choice.objects.filter(votes__gt=0).exists())
+
+    def test_solo_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    @override_settings(POLLS_VOTE_TOKENS={'MIDDLEWARE': ('polls.tests.test_vote_tokens.tagging_middleware',)})
+    def test_stack_propio_configurable(self):
+        client = self.client_class()
+        response = client.post(self.url, {'choice': self.mar.id},
+                               HTTP_AUTHORIZATION=f'Bearer {issue_vote_token("cliente")}')
+        self.assertEqual((response.status_code, response['X-Stack']), (204, 'stateless'))
+        self.assertNotIn('X-Stack', client.get(reverse('polls:index')))
+
+    def test_comando(self):
+        out = StringIO()
+        call_command('issue_vote_token', 'cliente', '--question', str(self.question.id), stdout=out)
+        self.assertEqual(verify_vote_token(out.getvalue().strip(), self.question.id), 'cliente')
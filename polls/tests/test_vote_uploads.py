@@ -0,0 +1,103 @@
+# polls/tests/test_vote_uploads.py
+import gzip
+import json
+from unittest import mock
+
+from django.db import DatabaseError
+from django.test import (
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils.timezone import now
+
+from polls.models import (
+    Choice,
+    Question,
+    TaskOutbox,
+)
+from polls.vote_tokens import issue_vote_token
+
+
+class VoteUploadViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.question = Question.objects.create(question_text='¿Mar o montaña?', pub_date=now())
+        cls.mar, cls.montana = Choice.objects.bulk_create(
+            Choice(question=cls.question, choice_text=text) for text in ('mar', 'montaña')
+        )
+        cls.otra = Question.objects.create(question_text='¿Otra?', pub_date=now())
+        cls.ajena = Choice.objects.create(question=cls.otra, choice_text='ajena')
+
+    def upload(self, body, upload_id='kiosco-1', token=None, content_type='application/json', **extra):
+        token = token or issue_vote_token('kiosco')
+        if content_type == 'application/json' and not isinstance(body, bytes):
+            body = json.dumps(body)
+        return self.client.post(
+            reverse('polls:vote_upload', args=[upload_id]), body, content_type=content_type,
+            HTTP_AUTHORIZATION=f'Bearer {token}', **extra,
+        )
+
+    def votes(self):
+        return list(Choice.objects.order_by('id').values_list('votes', flat=True))
+
+    def test_aplica_el_mapa_una_sola_vez(self):
+        self.client = self.client_class(enforce_csrf_checks=True)
+        body = {'votes': {str(self.mar.id): 30, str(self.montana.id): 4}}
+        response = self.upload(body)
+        self.assertEqual(response.json(), {'upload_id': 'kiosco-1', 'applied': True, 'votes': 34})
+        self.assertEqual(self.upload(body).json()['applied'], False)
+        self.assertEqual(self.votes(), [30, 4, 0])
+        # el mismo id de otro cliente es otra subida
+        self.assertTrue(self.upload(body, token=issue_vote_token('otro-kiosco')).json()['applied'])
+        self.assertEqual(self.votes(), [60, 8, 0])
+        self.assertEqual(
+            TaskOutbox.objects.filter(name='vote_batch_applied').first().payload,
+            {'votes': [[self.question.id, self.mar.id, 30], [self.question.id, self.montana.id, 4]]},
+        )
+        self.assertFalse(response.cookies)
+
+    def test_una_lectura_de_opciones_y_un_update(self):
+        body = {'votes': {str(self.mar.id): 1, str(self.montana.id): 2, str(self.ajena.id): 3}}
+        # opciones, sus dos preguntas, el registro de la subida y el UPDATE en un savepoint, la tarea
+        # y el savepoint de atomic
+        with self.assertNumQueries(10):
+            self.upload(body)
+        self.assertEqual(self.votes(), [1, 2, 3])
+
+    def test_sin_la_tarea_no_se_aplica_nada(self):
+        with mock.patch('polls.tasks.DjangoTaskQueue.enqueue', side_effect=DatabaseError('outbox caído')):
+            with self.assertRaises(DatabaseError):
+                self.upload({'votes': {str(self.mar.id): 1}})
+        self.assertEqual(self.votes(), [0, 0, 0])
+        self.assertTrue(self.upload({'votes': {str(self.mar.id): 1}}).json()['applied'])
+
+    def test_eventos_comprimidos(self):
+        events = '\n'.join([str(self.mar.id)] * 3 + [str(self.montana.id), '']).encode()
+        response = self.upload(gzip.compress(events), content_type='text/plain', HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(response.json()['votes'], 4)
+        self.assertEqual(self.votes(), [3, 1, 0])
+        self.assertEqual(self.upload(b'12\nx\n', 'otra', content_type='text/plain').status_code, 400)
+        self.assertEqual(self.upload(b'no es gzip', 'rota', content_type='text/plain',
+                                     HTTP_CONTENT_ENCODING='gzip').status_code, 400)
+
+    def test_rechaza_todo_el_lote(self):
+        token = issue_vote_token('kiosco', self.question.id)
+        response = self.upload({'votes': {str(self.mar.id): 1, str(self.ajena.id): 1}}, token=token)
+        self.assertEqual((response.status_code, response.json()['choices']), (400, [self.ajena.id]))
+        Question.objects.filter(id=self.otra.id).update(status=Question.CLOSED)
+        response = self.upload({'votes': {str(self.mar.id): 1, str(self.ajena.id): 1}})
+        self.assertEqual((response.status_code, response.json()['choices']), (400, [self.ajena.id]))
+        self.assertEqual(self.upload({'votes': {'x': 1}}).status_code, 400)
+        self.assertEqual(self.upload({'votes': {'²': 1}}).status_code, 400)
+        self.assertEqual(self.upload({'votes': {str(self.mar.id): 0}}).status_code, 400)
+        self.assertEqual(self.upload({'votes': {str(self.mar.id): 1}}, upload_id='x' * 101).status_code, 400)
+        self.assertEqual(self.votes(), [0, 0, 0])
+
+    def test_token(self):
+        url = reverse('polls:vote_upload', args=['kiosco-1'])
+        response = self.client.post(url, {'votes': {}}, content_type='application/json')
+        self.assertEqual((response.status_code, response['WWW-Authenticate']), (401, 'Bearer'))
+        self.assertEqual(self.upload({'votes': {str(self.mar.id): 1}}, token='basura').status_code, 401)
+        self.assertEqual(self.upload({'votes': {str(self.mar.id): 1}},
+                                     token=issue_vote_token('kiosco', ttl=-1)).status_code, 401)
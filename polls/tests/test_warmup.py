@@ -0,0 +1,140 @@
+# polls/tests/test_warmup.py
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import (
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils.timezone import now
+
+from business_logic.dtos import (
+    ChoiceDTO,
+    QuestionDTO,
+)
+from business_logic.in_memory import (
+    InMemoryChoiceRepository,
+    InMemoryQuestionRepository,
+)
+from polls.container import container
+from polls.models import (
+    Choice,
+    Question,
+    VoteBucket,
+)
+from polls.read_cache import (
+    CachedChoiceRepository,
+    CachedQuestionRepository,
+    cached_choice_repository,
+    cached_question_repository,
+)
+from polls.vote_series import (
+    DjangoVoteSeriesRepository,
+    to_bucket,
+)
+from polls.warmup import (
+    popular_question_ids,
+    warm_cache,
+    warm_in_background,
+)
+
+
+class ReadCacheTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.questions = mock.Mock(wraps=InMemoryQuestionRepository())
+        self.choices = mock.Mock(wraps=InMemoryChoiceRepository())
+        self.cached_questions = CachedQuestionRepository(self.questions)
+        self.cached_choices = CachedChoiceRepository(self.choices)
+
+    def test_recientes_de_la_lista_mas_larga(self):
+        for i in range(4):
+            self.cached_questions.create(QuestionDTO(question_text=f'¿{i}?'))
+        self.assertEqual(len(self.cached_questions.get_recent(3)), 3)
+        self.assertEqual([q.question_text for q in self.cached_questions.get_recent(2)], ['¿3?', '¿2?'])
+        self.assertEqual(self.questions.get_recent.call_count, 1)
+        self.assertEqual(len(self.cached_questions.get_recent(4)), 4)
+        self.assertEqual(self.questions.get_recent.call_count, 2)
+        self.cached_questions.create(QuestionDTO(question_text='¿nueva?'))
+        self.assertEqual(self.cached_questions.get_recent(1)[0].question_text, '¿nueva?')
+
+    def test_las_escrituras_borran_lo_que_tocan(self):
+        question = self.cached_questions.create(QuestionDTO(question_text='¿Antes?'))
+        choice = self.cached_choices.create(ChoiceDTO(question_id=question.id, text='sí'))
+        self.cached_questions.get_by_id(question.id)
+        self.assertEqual(self.cached_choices.get_by_question(question.id)[0].votes, 0)
+        self.cached_choices.get_by_question(question.id)
+        self.assertEqual(self.choices.get_by_question.call_count, 1)
+
+        # por id de opción: vence con el TTL
+        self.choices.update_votes(choice.id)
+        self.assertEqual(self.cached_choices.get_by_question(question.id)[0].votes, 0)
+        self.cached_choices.reset_votes_by_question([question.id])
+        self.assertEqual(self.choices.get_by_question.call_count, 1)
+        self.assertEqual(self.cached_choices.get_by_question(question.id)[0].votes, 0)
+        self.assertEqual(self.choices.get_by_question.call_count, 2)
+
+        self.cached_questions.bulk_close([question.id])
+        self.assertEqual(self.cached_questions.get_by_id(question.id).status, 'closed')
+
+    @override_settings(POLLS_READ_CACHE={'TTL': 0.001})
+    def test_vence_con_el_ttl(self):
+        questions = CachedQuestionRepository(self.questions)
+        question = questions.create(QuestionDTO(question_text='¿Vence?'))
+        questions.get_by_id(question.id)
+        with mock.patch('time.time', return_value=time.time() + 1):
+            questions.get_by_id(question.id)
+        self.assertEqual(self.questions.get_by_id.call_count, 2)
+
+
+class WarmupTest(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.quiet = Question.objects.create(question_text='¿Nadie vota?', pub_date=now())
+        self.popular = Question.objects.create(question_text='¿Todos votan?', pub_date=now().replace(year=2000))
+        Choice.objects.create(question=self.quiet, choice_text='no')
+        choice = Choice.objects.create(question=self.popular, choice_text='sí', votes=7)
+        DjangoVoteSeriesRepository().add_buckets({(choice.id, to_bucket(now(), VoteBucket.MINUTE)): 7}, VoteBucket.MINUTE)
+
+    def test_las_mas_votadas_primero(self):
+        self.assertEqual(popular_question_ids(10, 3600), [self.popular.id])
+
+    def test_precarga_y_las_paginas_salen_del_cache(self):
+        with container.override('question_repository', cached_question_repository), \
+                container.override('choice_repository', cached_choice_repository):
+            report = warm_cache()
+            self.assertEqual(report, {'templates': 3, 'recent': 2, 'polls': 2, 'complete': True})
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse('polls:results', args=[self.popular.id]))
+            self.assertContains(response, '¿Todos votan?')
+            with self.assertNumQueries(0):
+                self.client.get(reverse('polls:index'))
+
+    def test_lo_precargado_dura_warm_ttl(self):
+        with container.override('question_repository', cached_question_repository), \
+                container.override('choice_repository', cached_choice_repository):
+            warm_cache()
+            # pasado el TTL de 2 s de las lecturas normales
+            with mock.patch('time.time', return_value=time.time() + 10), self.assertNumQueries(0):
+                self.client.get(reverse('polls:results', args=[self.popular.id]))
+            with mock.patch('time.time', return_value=time.time() + 60):
+                with self.assertNumQueries(2):  # la pregunta y sus opciones, otra vez de la base
+                    self.client.get(reverse('polls:results', args=[self.popular.id]))
+
+    def test_presupuesto(self):
+        self.assertEqual(warm_cache(budget=0), {'templates': 0, 'recent': 0, 'polls': 0, 'complete': False})
+        out = StringIO()
+        call_command('warm_cache', '--budget', '0', stdout=out)
+        self.assertIn('se acabó el presupuesto', out.getvalue())
+
+    def test_en_segundo_plano(self):
+        with override_settings(POLLS_WARMUP={'ON_STARTUP': False}):
+            self.assertIsNone(warm_in_background())
+        with self.assertLogs('polls.warmup', 'INFO') as logs:
+            warm_in_background().join()
+        self.assertIn("'complete': True", logs.output[0])
@@ -1,12 +1,16 @@
 # polls/tests/tests_integration.py
+from datetime import timedelta
+
 from django.test import TestCase
 from django.urls import reverse
+from django.utils.timezone import now
 from rest_framework.test import APITestCase
 
 from polls.models import (
     Choice,
     Question,
 )
+from polls.question_service import DjangoQuestionRepository
 
 
 class QuestionTests(TestCase):
@@ -80,3 +84,50 @@ class AjaxTests(APITestCase):
         response = self.client.get(endpoint)
         self.assertEqual(response.data, {'hola': 'mundo'})
         self.assertEqual(response.status_code, 200)
+
+
+class BatchChoicesTests(APITestCase):
+    def test_agregar_varias_opciones(self):
+        question = Question.objects.create(question_text='pregunta', pub_date='2024-01-01T00:00:00-06')
+        endpoint = reverse('polls:add_choices', kwargs={'pk': question.id})
+        payload = [{'choice_text': f'opcion {i}'} for i in range(20)]
+        # savepoint, la pregunta, un solo INSERT, liberación del savepoint y el índice de búsqueda (SELECT, DELETE, INSERT)
+        with self.assertNumQueries(7):
+            response = self.client.post(endpoint, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['choice_text'] for item in response.data], [item['choice_text'] for item in payload])
+        self.assertTrue(all(item['id'] and item['question_id'] == question.id for item in response.data))
+        self.assertEqual(question.choice_set.count(), 20)
+
+    def test_pregunta_inexistente_o_archivada(self):
+        payload = [{'choice_text': 'a'}]
+        for name in ('polls:add_choices', 'polls:add_choice'):
+            data = payload if name == 'polls:add_choices' else payload[0]
+            response = self.client.post(reverse(name, kwargs={'pk': 999999}), data, format='json')
+            self.assertEqual(response.status_code, 404)
+        question = Question.objects.create(question_text='pregunta', pub_date='2024-01-01T00:00:00-06')
+        repository = DjangoQuestionRepository()
+        repository.bulk_close([question.id])
+        self.assertEqual(repository.archive_closed(closed_before=now() + timedelta(seconds=1)), 1)
+        response = self.client.post(reverse('polls:add_choices', kwargs={'pk': question.id}), payload, format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Choice.objects.exists())
+
+    def test_opciones_repetidas(self):
+        question = Question.objects.create(question_text='pregunta', pub_date='2024-01-01T00:00:00-06')
+        endpoint = reverse('polls:add_choices', kwargs={'pk': question.id})
+        response = self.client.post(endpoint, [{'choice_text': 'a'}, {'choice_text': 'a'}], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(question.choice_set.exists())
+
+    def test_pregunta_con_opciones(self):
+        endpoint = reverse('polls:create_question_with_choices')
+        payload = {'question_text': '¿sí o no?', 'choices': [{'choice_text': 'sí'}, {'choice_text': 'no'}]}
+        response = self.client.post(endpoint, payload, format='json')
+        self.assertEqual(response.status_code, 201)
+        question = Question.objects.get(id=response.data['id'])
+        self.assertEqual(
+            list(question.choice_set.order_by('id').values_list('choice_text', flat=True)),
+            ['sí', 'no'],
+        )
+        self.assertEqual(len(response.data['choices']), 2)
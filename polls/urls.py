@@ -9,7 +9,15 @@ urlpatterns = [
     path('', views.QuestionListCreateIndexView.as_view(), name='index'),
     path('ajax/', views.AjaxView.as_view(), name='ajax'),
     path('me/', views.Me.as_view(), name='me'),
+    path('recent/', views.RecentQuestionsView.as_view(), name='recent'),
+    path('search/', views.QuestionSearchView.as_view(), name='search'),
+    path('uploads/<slug:upload_id>/', views.VoteUploadView.as_view(), name='vote_upload'),
+    path('profiler/', views.ProfilerView.as_view(), name='profiler'),
+    path('questions/', views.QuestionWithChoicesCreateView.as_view(), name='create_question_with_choices'),
     path('<int:pk>/', views.QuestionDetailView.as_view(), name='detail'),
+    path('<int:pk>/vote/', views.TokenVoteView.as_view(), name='vote'),
     path('<int:pk>/add-choice/', views.AddChoiceView.as_view(), name='add_choice'),
+    path('<int:pk>/add-choices/', views.AddChoicesView.as_view(), name='add_choices'),
     path('<int:pk>/results/', views.ResultsView.as_view(), name='results'),
+    path('<int:pk>/results.json', views.QuestionResultsAPIView.as_view(), name='results_json'),
 ]
\ No newline at end of file
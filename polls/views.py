@@ -1,20 +1,77 @@
 # polls/views.py
 from django.db.transaction import atomic
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+)
 from django.urls import reverse_lazy
 from django.utils.decorators import method_decorator
+from django.utils.translation import gettext as _
+from django.views.decorators.csrf import csrf_exempt
 from django.views import generic
 from rest_framework import generics
+from rest_framework.renderers import (
+    BrowsableAPIRenderer,
+    JSONRenderer,
+)
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from business_logic.exceptions import (
+    InvalidVoteBatch,
+    QuestionNotFound,
+)
 
 from .forms import (
     FormAnswers,
     FormQuestion,
 )
-from .models import Question
+from .models import (
+    AppliedVoteBatch,
+    Question,
+)
+from .parsers import (
+    GzipJSONParser,
+    VoteEventsParser,
+)
 from .serializers import (
+    ChoiceBatchSerializer,
     ChoiceSerializer,
     HolaSerializer,
+    MAX_CHOICES_PER_BATCH,
+    QuestionSearchSerializer,
+    QuestionWithChoicesSerializer,
+    RecentParamsSerializer,
+    SearchParamsSerializer,
+    VoteUploadSerializer,
+)
+from .container import container
+from .renderers import (
+    DTOJSONRenderer,
+    DTOResponse,
+)
+from .profiling import (
+    InvalidProfileToken,
+    profiling_settings,
+    sampler,
+    verify_profile_token,
+)
+from .services import (
+    vote_batch_service,
+    vote_service,
+)
+from .sharding import db_for_question
+from .single_flight import shared_read
+from .vote_tokens import (
+    HasVoteToken,
+    InvalidVoteToken,
+    VoteTokenAuthentication,
+    bearer_token,
+    verify_vote_token,
 )
-from .question_service import DjangoQuestionRepository
+
+UPLOAD_SOURCE_MAX_LENGTH = AppliedVoteBatch._meta.get_field('source').max_length
 
 
 class AddViewNRequestToContextFormMixin:
@@ -36,13 +93,12 @@ class QuestionListCreateIndexView(generic.CreateView):
     template_name = 'polls/index.html'
     form_class = FormQuestion
     success_url = reverse_lazy('polls:index')
-    repo = DjangoQuestionRepository()
 
     def get_context_data(self, **kwargs):
         context =  super().get_context_data(**kwargs)
         latest_question_list = (
             # Question.objects.order_by('-pub_date')[:5]
-            self.repo.get_recent()
+            container.resolve('question_repository').get_recent()
         )
         context.update(latest_question_list=latest_question_list)
         return context
@@ -57,19 +113,41 @@ class QuestionDetailView(AddViewNRequestToContextFormMixin, generic.CreateView):
     template_name = 'polls/detail.html'
     form_class = FormAnswers
 
+    def get_queryset(self):
+        # la pregunta y sus opciones (por question.choice_set) se leen en su shard
+        return super().get_queryset().using(db_for_question(self.kwargs['pk']))
+
+    def get_object(self, queryset=None):
+        # la vista, el formulario y su validación la piden varias veces por petición
+        if not hasattr(self, '_question'):
+            self._question = shared_read(
+                ('question_model', self.kwargs['pk']),
+                lambda: super(QuestionDetailView, self).get_object(queryset),
+            )
+        return self._question
+
     def get_context_data(self, **kwargs):
         context =  super().get_context_data(**kwargs)
-        context.update(question=self.get_object())
+        question = self.get_object()
+        context.update(question=question, choices=container.resolve('choice_repository').get_by_question(question.id))
         return context
 
     def get_success_url(self):
         return reverse_lazy('polls:results', kwargs=self.kwargs)
 
 
-class ResultsView(generic.DetailView):
-    model = Question
+class ResultsView(generic.TemplateView):
     template_name = 'polls/results.html'
-    context_object_name = 'question'
+
+    def get_context_data(self, **kwargs):
+        # por los repositorios: incluyen las encuestas archivadas y comparten las lecturas en curso
+        context = super().get_context_data(**kwargs)
+        try:
+            question = container.resolve('question_repository').get_by_id(self.kwargs['pk'])
+        except QuestionNotFound:
+            raise Http404
+        context.update(question=question, choices=container.resolve('choice_repository').get_by_question(question.id))
+        return context
 
 
 class AjaxView(generics.RetrieveAPIView):
@@ -79,5 +157,177 @@ class AjaxView(generics.RetrieveAPIView):
         return {'hola': 'mundo'}
 
 
-class AddChoiceView(generics.CreateAPIView):
+class ExistingQuestionMixin:
+    """
+    Responde 404 antes de insertar si la pregunta ``pk`` no existe o está
+    archivada: la FK de Choice sólo se revisa al confirmar y sería un 500.
+    """
+
+    def create(self, request, *args, **kwargs):
+        try:
+            question = container.resolve('question_repository').get_by_id(kwargs['pk'])
+        except QuestionNotFound:
+            raise Http404
+        if question.status == Question.ARCHIVED:
+            raise Http404
+        return super().create(request, *args, **kwargs)
+
+
+class AddChoiceView(ExistingQuestionMixin, generics.CreateAPIView):
     serializer_class = ChoiceSerializer
+
+
+@method_decorator(
+    [atomic],
+    'post'
+)
+class AddChoicesView(ExistingQuestionMixin, generics.CreateAPIView):
+    """Recibe una lista de ``{"choice_text": ...}`` y las crea en un solo INSERT"""
+    serializer_class = ChoiceBatchSerializer
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.update(many=True, allow_empty=False, max_length=MAX_CHOICES_PER_BATCH)
+        return super().get_serializer(*args, **kwargs)
+
+
+@method_decorator(
+    [atomic],
+    'post'
+)
+class QuestionWithChoicesCreateView(generics.CreateAPIView):
+    """Crea una pregunta junto con sus opciones en una sola petición"""
+    serializer_class = QuestionWithChoicesSerializer
+
+
+class QuestionSearchView(generics.GenericAPIView):
+    """``?q=...&limit=...&cursor=...``; la siguiente página se pide con ``next_cursor`` (null en la última)"""
+    serializer_class = QuestionSearchSerializer
+
+    def get(self, request, *args, **kwargs):
+        params = SearchParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        page = container.resolve('question_repository').search(**params.validated_data)
+        return Response({
+            'results': self.get_serializer(page.questions, many=True).data,
+            'next_cursor': page.next_cursor,
+        })
+
+
+class RecentQuestionsView(APIView):
+    """``?limit=...``; las preguntas más recientes, serializadas por el camino rápido de polls/renderers.py"""
+    renderer_classes = [DTOJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, *args, **kwargs):
+        params = RecentParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return DTOResponse(container.resolve('question_repository').get_recent(**params.validated_data))
+
+
+class QuestionResultsAPIView(APIView):
+    """Los resultados de ``ResultsView`` en JSON: ``{"question": {...}, "choices": [...]}``"""
+    renderer_classes = [DTOJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request, *args, **kwargs):
+        try:
+            question = container.resolve('question_repository').get_by_id(kwargs['pk'])
+        except QuestionNotFound:
+            raise Http404
+        return DTOResponse({
+            'question': question,
+            'choices': container.resolve('choice_repository').get_by_question(question.id),
+        })
+
+
+@method_decorator(csrf_exempt, 'dispatch')
+@method_decorator(
+    [atomic],
+    'post'
+)
+class TokenVoteView(generic.View):
+    """
+    ``POST`` con ``Authorization: Bearer <token>`` (ver polls/vote_tokens.py) y
+    ``choice=<id>``; responde 204 sin cuerpo. La atiende StatelessRoutesMiddleware,
+    sin sesión, CSRF ni usuario.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, pk):
+        try:
+            verify_vote_token(bearer_token(request), pk)
+        except InvalidVoteToken as error:
+            response = JsonResponse({'detail': str(error)}, status=401)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+        try:
+            choice_id = int(request.POST['choice'])
+        except (KeyError, ValueError):
+            return JsonResponse({'detail': _('A valid choice is required.')}, status=400)
+        try:
+            question = container.resolve('question_repository').get_by_id(pk)
+        except QuestionNotFound:
+            raise Http404
+        if question.status != Question.OPEN:
+            return JsonResponse({'detail': _('This poll is closed.')}, status=409)
+        choice = container.resolve('choice_repository').get_by_id(choice_id)
+        if choice is None or choice.question_id != question.id:
+            return JsonResponse({'detail': _('A valid choice is required.')}, status=400)
+        vote_service(choice_id).execute()
+        return HttpResponse(status=204)
+
+
+@method_decorator(
+    [atomic],
+    'post'
+)
+class VoteUploadView(APIView):
+    """
+    Votos que un kiosco o agregador juntó fuera de línea, en una sola
+    petición: ``POST /polls/uploads/<upload_id>/`` con ``Authorization:
+    Bearer <token>`` (el de polls/vote_tokens.py; si es de una pregunta, la
+    subida sólo puede traer opciones de esa pregunta) y el cuerpo
+
+    - ``application/json``: ``{"votes": {"<choice_id>": votos, ...}}``, o
+    - ``text/plain``: un id de opción por línea, un voto por línea,
+
+    cualquiera de los dos con ``Content-Encoding: gzip`` si se quiere.
+    Responde ``{"upload_id", "applied", "votes"}``; reenviar el mismo
+    ``upload_id`` con el mismo token responde ``applied: false`` sin sumar de
+    nuevo. Si alguna opción no se puede votar responde 400 con las opciones
+    rechazadas y no aplica nada.
+    """
+    authentication_classes = [VoteTokenAuthentication]
+    permission_classes = [HasVoteToken]
+    parser_classes = [GzipJSONParser, VoteEventsParser]
+    renderer_classes = [JSONRenderer]
+
+    def post(self, request, upload_id):
+        params = VoteUploadSerializer(data=request.data, context={'upload_id': upload_id})
+        params.is_valid(raise_exception=True)
+        deltas = params.validated_data['votes']
+        # el id de la subida es del cliente: el mismo id de dos clientes son dos subidas
+        source = f"upload:{request.auth['sub']}"[:UPLOAD_SOURCE_MAX_LENGTH]
+        try:
+            applied = vote_batch_service(source, upload_id, deltas, question_id=request.auth['q']).execute()
+        except InvalidVoteBatch as error:
+            return Response({'detail': str(error), 'choices': error.choice_ids}, status=400)
+        return Response({'upload_id': upload_id, 'applied': applied, 'votes': sum(deltas.values())})
+
+
+class ProfilerView(generic.View):
+    """
+    ``GET`` con el token de perfilado en ``X-Polls-Profile`` (ver
+    polls/profiling.py): los stacks muestreados de este proceso en formato
+    collapsed, para flamegraph.pl o speedscope. ``?reset=1`` los borra después de leerlos.
+    """
+    http_method_names = ['get']
+
+    def get(self, request):
+        try:
+            verify_profile_token(request.headers.get(profiling_settings()['HEADER'], ''))
+        except InvalidProfileToken as error:
+            return JsonResponse({'detail': str(error)}, status=401)
+        if not sampler.running:
+            return JsonResponse({'detail': 'the sampling profiler is not running'}, status=409)
+        response = HttpResponse(sampler.collapsed(reset='reset' in request.GET), content_type='text/plain')
+        response['X-Polls-Profile-Samples'] = sampler.samples
+        return response
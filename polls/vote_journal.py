@@ -0,0 +1,397 @@
+# polls/vote_journal.py
+import fcntl
+import logging
+import os
+import secrets
+import struct
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+
+from django.conf import settings
+from django.db import (
+    close_old_connections,
+    transaction,
+)
+
+from business_logic.dtos import ChoiceDTO
+from business_logic.exceptions import ChoiceNotFound
+
+from .choice_service import (
+    ChoiceRepositoryDecorator,
+    DjangoChoiceRepository,
+)
+from .models import AppliedVoteBatch
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOTE_JOURNAL: dict = {
+    'PATH': None,                    # por defecto BASE_DIR / 'vote_journal'
+    'FSYNC': True,
+    'GROUP_COMMIT_DELAY': 0.0,       # segundos que el líder espera para juntar más votos en su fsync
+    'SEGMENT_BYTES': 4 * 1024 * 1024,
+    'SEGMENT_SECONDS': 1.0,          # un segmento con votos se sella a lo más tras este tiempo
+    'REPLAY_INTERVAL': 1.0,
+}
+
+# cada registro: choice_id, timestamp en microsegundos epoch, delta
+RECORD = struct.Struct('<qqq')
+OPEN_SUFFIX = '.open'
+SEALED_SUFFIX = '.wal'
+SOURCE = 'journal'
+
+
+def vote_journal_settings() -> dict:
+    return {**DEFAULT_VOTE_JOURNAL, **getattr(settings, 'POLLS_VOTE_JOURNAL', {})}
+
+
+def read_segment(path: Path) -> dict[int, int]:
+    """Suma los deltas por choice_id de un segmento; un registro final incompleto se ignora."""
+    data = path.read_bytes()
+    records = array('q')
+    records.frombytes(data[:len(data) - len(data) % RECORD.size])
+    deltas: dict[int, int] = {}
+    for choice_id, delta in zip(records[::3], records[2::3]):
+        deltas[choice_id] = deltas.get(choice_id, 0) + delta
+    return deltas
+
+
+def _fsync_directory(path: Path) -> None:
+    directory = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class VoteJournal:
+    """
+    Diario de votos de sólo-agregar con registros binarios de tamaño fijo.
+    ``append`` regresa cuando el registro ya está en disco; los hilos que
+    votan al mismo tiempo comparten un solo ``fsync`` (group commit): el
+    primero en llegar lo hace por todos los que escribieron antes que él.
+
+    Cada proceso escribe su propio segmento ``*.open`` y lo mantiene con un
+    ``flock``; al crecer o envejecer se sella renombrándolo a ``*.wal``. El
+    segmento abierto de un proceso muerto se reconoce porque su lock quedó libre.
+
+    También lleva en memoria los votos que este proceso escribió por segmento,
+    para ``unreplayed`` sin leer los segmentos de vuelta.
+
+        >>> import shutil, tempfile
+        >>> path = tempfile.mkdtemp()
+        >>> journal = VoteJournal(path, fsync=False)
+        >>> journal.append(7); journal.append(7); journal.append(8, delta=3)
+        >>> segment = journal.rotate()
+        >>> read_segment(segment)
+        {7: 2, 8: 3}
+        >>> journal.close(); shutil.rmtree(path)
+    """
+
+    def __init__(self, path: str | os.PathLike, fsync: bool = True, group_commit_delay: float = 0.0,
+                 segment_bytes: int = 4 * 1024 * 1024, segment_seconds: float = 1.0):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.group_commit_delay = group_commit_delay
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self._cond = threading.Condition(threading.Lock())
+        self._pid: int | None = None
+        self._fd: int | None = None
+        self._segment: Path | None = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        self._pending: dict[str, dict[int, int]] = {}
+
+    def _open_segment(self) -> None:
+        name = f'{time.time_ns() // 1000:016d}-{os.getpid()}-{secrets.token_hex(4)}'
+        temporary = self.path / f'{name}.tmp'
+        fd = os.open(temporary, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_EXCL, 0o600)
+        # el lock se toma antes de que el replayer pueda ver el segmento
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        self._segment = self.path / f'{name}{OPEN_SUFFIX}'
+        os.rename(temporary, self._segment)
+        self._fd = fd
+        self._opened_at = time.monotonic()
+        self._size = 0
+
+    def _ensure_segment(self) -> None:
+        if self._pid != os.getpid():
+            # después de un fork el segmento y su lock siguen siendo del padre
+            if self._pid is not None and self._fd is not None:
+                os.close(self._fd)
+            self._fd = None
+            self._written = self._synced = 0
+            self._syncing = False
+            self._pending = {}
+            self._pid = os.getpid()
+        if self._fd is None:
+            self._open_segment()
+
+    def append(self, choice_id: int, delta: int = 1, at_us: int | None = None) -> None:
+        record = RECORD.pack(choice_id, at_us if at_us is not None else time.time_ns() // 1000, delta)
+        with self._cond:
+            self._ensure_segment()
+            os.write(self._fd, record)
+            self._size += RECORD.size
+            self._written += 1
+            ticket = self._written
+            pending = self._pending.setdefault(self._segment.stem, {})
+            pending[choice_id] = pending.get(choice_id, 0) + delta
+        if self.fsync:
+            self._sync(ticket)
+        if self._size >= self.segment_bytes or time.monotonic() - self._opened_at >= self.segment_seconds:
+            self.rotate()
+
+    def _sync(self, ticket: int) -> None:
+        with self._cond:
+            while self._synced < ticket:
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                # este hilo es el líder: su fsync cubre todo lo escrito hasta ahora
+                self._syncing = True
+                fd = self._fd
+                self._cond.release()
+                try:
+                    if self.group_commit_delay:
+                        time.sleep(self.group_commit_delay)
+                    target = self._written
+                    os.fsync(fd)
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._cond.notify_all()
+                self._synced = max(self._synced, target)
+
+    def unreplayed(self, choice_id: int) -> int:
+        """
+        Votos de ``choice_id`` que este proceso escribió en segmentos que
+        todavía existen, abiertos o sellados; un segmento que ya no existe se
+        aplicó (o se compactó) y se olvida.
+        """
+        with self._cond:
+            if self._pid != os.getpid():
+                return 0
+            total = 0
+            for name in list(self._pending):
+                # primero el abierto: si se sella entre las dos revisiones, el sellado ya existe
+                if not any((self.path / f'{name}{suffix}').exists() for suffix in (OPEN_SUFFIX, SEALED_SUFFIX)):
+                    del self._pending[name]
+                    continue
+                total += self._pending[name].get(choice_id, 0)
+            return total
+
+    def rotate(self) -> Path | None:
+        """Sella el segmento actual si tiene votos. Retorna la ruta sellada."""
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            if self._fd is None or self._pid != os.getpid() or not self._size:
+                return None
+            if self.fsync:
+                os.fsync(self._fd)
+                self._synced = self._written
+            sealed = self._segment.with_suffix(SEALED_SUFFIX)
+            os.rename(self._segment, sealed)
+            os.close(self._fd)
+            self._fd = None
+            if self.fsync:
+                _fsync_directory(self.path)
+            return sealed
+
+    def rotate_if_due(self) -> Path | None:
+        if self._fd is not None and time.monotonic() - self._opened_at >= self.segment_seconds:
+            return self.rotate()
+        return None
+
+    def close(self) -> None:
+        self.rotate()
+        with self._cond:
+            if self._fd is not None and self._pid == os.getpid():
+                # segmento vacío
+                os.close(self._fd)
+                self._segment.unlink(missing_ok=True)
+                self._fd = None
+
+
+class VoteJournalReplayer:
+    """
+    Aplica los segmentos sellados a la base de datos con
+    ``apply_vote_batch(SOURCE, nombre_del_segmento, deltas)`` y luego los
+    borra; si el proceso muere entre ambos pasos, el segmento se vuelve a
+    aplicar y la base de datos lo descarta. Sólo un replayer a la vez por
+    directorio.
+    """
+
+    def __init__(self, path: str | os.PathLike, repository=None):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.repository = repository if repository is not None else DjangoChoiceRepository()
+
+    @contextmanager
+    def _exclusive(self, blocking: bool):
+        fd = os.open(self.path / 'replay.lock', os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            yield True
+        finally:
+            os.close(fd)
+
+    def seal_orphans(self) -> list[Path]:
+        """Sella los segmentos abiertos cuyo proceso escritor ya no existe."""
+        sealed = []
+        for segment in sorted(self.path.glob(f'*{OPEN_SUFFIX}')):
+            try:
+                fd = os.open(segment, os.O_RDONLY)
+            except FileNotFoundError:
+                continue  # se selló mientras tanto
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                continue  # su escritor sigue vivo
+            else:
+                target = segment.with_suffix(SEALED_SUFFIX)
+                try:
+                    os.rename(segment, target)
+                except FileNotFoundError:
+                    continue  # su escritor lo selló entre el open y el flock
+                sealed.append(target)
+            finally:
+                os.close(fd)
+        return sealed
+
+    def sealed_segments(self) -> list[Path]:
+        return sorted(self.path.glob(f'*{SEALED_SUFFIX}'))
+
+    def replay(self, blocking: bool = False) -> int:
+        """Aplica y borra los segmentos sellados. Retorna los votos aplicados."""
+        applied = 0
+        with self._exclusive(blocking) as acquired:
+            if not acquired:
+                return 0
+            self.seal_orphans()
+            for segment in self.sealed_segments():
+                deltas = read_segment(segment)
+                if deltas and self.repository.apply_vote_batch(SOURCE, segment.stem, deltas):
+                    applied += sum(deltas.values())
+                segment.unlink()
+        return applied
+
+    def compact(self) -> int:
+        """
+        Junta los segmentos sellados pendientes en uno solo con un registro por
+        opción (útil si la base de datos estuvo caída y se acumularon); los que
+        ya se habían aplicado sólo se borran. Retorna cuántos segmentos quitó.
+        """
+        with self._exclusive(blocking=True):
+            self.seal_orphans()
+            segments = self.sealed_segments()
+            if len(segments) < 2:
+                return 0
+            already_applied = set(
+                AppliedVoteBatch.objects
+                .filter(source=SOURCE, batch_key__in=[segment.stem for segment in segments])
+                .values_list('batch_key', flat=True)
+            )
+            totals: dict[int, int] = {}
+            for segment in segments:
+                if segment.stem in already_applied:
+                    continue
+                for choice_id, delta in read_segment(segment).items():
+                    totals[choice_id] = totals.get(choice_id, 0) + delta
+            now_us = time.time_ns() // 1000
+            name = f'{now_us:016d}-{os.getpid()}-{secrets.token_hex(4)}'
+            temporary = self.path / f'{name}.tmp'
+            with open(temporary, 'wb') as compacted:
+                for choice_id, delta in totals.items():
+                    if delta:
+                        compacted.write(RECORD.pack(choice_id, now_us, delta))
+                compacted.flush()
+                os.fsync(compacted.fileno())
+            os.rename(temporary, self.path / f'{name}{SEALED_SUFFIX}')
+            _fsync_directory(self.path)
+            for segment in segments:
+                segment.unlink()
+            return len(segments)
+
+
+class JournaledChoiceRepository(ChoiceRepositoryDecorator):
+    """
+    IChoiceRepository cuyo ``update_votes`` escribe el voto al diario local
+    (durable al confirmarse la transacción del voto) en lugar de hacer un
+    UPDATE; un hilo por proceso sella los segmentos y los reproduce en la base
+    de datos, así la columna ``votes`` se actualiza con retraso de
+    ``REPLAY_INTERVAL``; ``get_by_id`` ya suma los votos que este proceso
+    escribió al diario y aún no se reproducen (los de otros workers se ven tras
+    el replay). Se activa con ``POLLS_PROVIDERS['vote_repository']``.
+    """
+
+    def __init__(self, repository=None, journal: VoteJournal | None = None,
+                 replay_interval: float | None = None):
+        super().__init__(repository)
+        config = vote_journal_settings()
+        self.journal = journal or VoteJournal(
+            config['PATH'] or Path(settings.BASE_DIR) / 'vote_journal',
+            fsync=config['FSYNC'],
+            group_commit_delay=config['GROUP_COMMIT_DELAY'],
+            segment_bytes=config['SEGMENT_BYTES'],
+            segment_seconds=config['SEGMENT_SECONDS'],
+        )
+        self.replayer = VoteJournalReplayer(self.journal.path, self.repository)
+        self.replay_interval = config['REPLAY_INTERVAL'] if replay_interval is None else replay_interval
+        self._replayer_pid: int | None = None
+        self._start_lock = threading.Lock()
+
+    def get_by_id(self, choice_id: int) -> ChoiceDTO | None | ChoiceNotFound:
+        choice = self.repository.get_by_id(choice_id)
+        if isinstance(choice, ChoiceDTO):
+            return replace(choice, votes=(choice.votes or 0) + self.journal.unreplayed(choice_id))
+        return choice
+
+    def update_votes(self, choice_id: int) -> int:
+        if not self.choice_exists(choice_id):
+            return 0
+        self._ensure_replayer()
+        # sólo los votos confirmados llegan al diario, antes de responder
+        transaction.on_commit(lambda: self.journal.append(choice_id))
+        return 1
+
+    def replay(self) -> int:
+        self.journal.rotate()
+        return self.replayer.replay(blocking=True)
+
+    def _ensure_replayer(self) -> None:
+        if self._replayer_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._replayer_pid == os.getpid():
+                return
+            threading.Thread(target=self._replay_forever, name='polls-vote-journal', daemon=True).start()
+            self._replayer_pid = os.getpid()
+
+    def _replay_forever(self) -> None:
+        while True:
+            time.sleep(self.replay_interval)
+            try:
+                self.journal.rotate_if_due()
+                close_old_connections()
+                self.replayer.replay()
+            except Exception:
+                logger.exception('error al reproducir el diario de votos')
+            finally:
+                close_old_connections()
+
+    def close(self) -> None:
+        self.journal.close()
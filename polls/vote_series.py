@@ -0,0 +1,272 @@
+# polls/vote_series.py
+import atexit
+import logging
+import math
+import os
+import threading
+from array import array
+from dataclasses import dataclass
+from datetime import (
+    datetime,
+    timezone,
+)
+
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    close_old_connections,
+    connections,
+    transaction,
+)
+
+from business_logic.dtos import VoteSeriesDTO
+
+from .models import (
+    Choice,
+    VoteBucket,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOTE_SERIES: dict = {
+    'FLUSH_INTERVAL': 5.0,   # segundos máximos que un voto espera en el buffer
+    'MAX_BUFFERED': 10000,   # intervalos distintos en el buffer antes de forzar la escritura
+    'MINUTE_RETENTION': 2 * VoteBucket.DAY,   # después se compacta a horas
+    'HOUR_RETENTION': 90 * VoteBucket.DAY,    # después se compacta a días
+}
+
+
+def vote_series_settings() -> dict:
+    return {**DEFAULT_VOTE_SERIES, **getattr(settings, 'POLLS_VOTE_SERIES', {})}
+
+
+def to_bucket(at: datetime, resolution: int) -> int:
+    """
+        >>> to_bucket(datetime(2024, 1, 1, 10, 59, 30, tzinfo=timezone.utc), VoteBucket.MINUTE)
+        1704106740
+        >>> to_bucket(datetime(2024, 1, 1, 10, 59, 30, tzinfo=timezone.utc), VoteBucket.HOUR)
+        1704103200
+    """
+    seconds = int(at.timestamp())
+    return seconds - seconds % resolution
+
+
+@dataclass
+class DjangoVoteSeriesRepository:
+    # alias de la base; con sharding la serie vive en el shard de cada opción
+    using: str = DEFAULT_DB_ALIAS
+    table = VoteBucket._meta.db_table
+
+    def add_buckets(self, rows: dict[tuple[int, int], int], resolution: int) -> None:
+        """
+        Suma votos a los intervalos con un upsert (``ON CONFLICT ... DO UPDATE``).
+
+            >>> from django.utils.timezone import now
+            >>> from polls.models import Choice, Question
+            >>> question = Question.objects.create(question_text="¿Playa?", pub_date=now())
+            >>> choice = Choice.objects.create(question=question, choice_text="sí")
+            >>> repo = DjangoVoteSeriesRepository()
+            >>> repo.add_buckets({(choice.id, 60): 2}, VoteBucket.MINUTE)
+            >>> repo.add_buckets({(choice.id, 60): 3, (choice.id, 120): 1}, VoteBucket.MINUTE)
+            >>> list(VoteBucket.objects.filter(choice=choice).order_by('bucket').values_list('bucket', 'votes'))
+            [(60, 5), (120, 1)]
+        """
+        # las opciones borradas mientras sus votos esperaban en un buffer se descartan
+        existing = set(
+            Choice.objects.using(self.using)
+            .filter(id__in={choice_id for choice_id, _ in rows})
+            .values_list('id', flat=True)
+        )
+        rows = {key: votes for key, votes in rows.items() if key[0] in existing}
+        if not rows:
+            return
+        with connections[self.using].cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (choice_id, resolution, bucket, votes) '
+                'VALUES (%s, %s, %s, %s) '
+                'ON CONFLICT (choice_id, resolution, bucket) '
+                f'DO UPDATE SET votes = {self.table}.votes + excluded.votes',
+                [
+                    (choice_id, resolution, bucket, votes)
+                    for (choice_id, bucket), votes in rows.items()
+                ],
+            )
+
+    def get_range(self, choice_id: int, start: datetime, end: datetime, resolution: int = VoteBucket.MINUTE) -> VoteSeriesDTO:
+        """
+        Lee todas las capas (minutos, horas y días) cuyos intervalos empiezan
+        en el rango y las agrupa en ``resolution``; retorna arreglos compactos
+        ordenados por intervalo. Lo que ya se compactó a una capa más gruesa que
+        ``resolution`` sale con la granularidad con que quedó guardado (p.ej.
+        un solo punto por hora en una serie por minuto).
+
+            >>> from django.utils.timezone import now
+            >>> from polls.models import Choice, Question
+            >>> question = Question.objects.create(question_text="¿Montaña?", pub_date=now())
+            >>> choice = Choice.objects.create(question=question, choice_text="sí")
+            >>> repo = DjangoVoteSeriesRepository()
+            >>> repo.add_buckets({(choice.id, 3600): 4}, VoteBucket.HOUR)
+            >>> repo.add_buckets({(choice.id, 3660): 1, (choice.id, 7200): 2}, VoteBucket.MINUTE)
+            >>> series = repo.get_range(choice.id, datetime.fromtimestamp(0, timezone.utc),
+            ...                         datetime.fromtimestamp(10800, timezone.utc), VoteBucket.HOUR)
+            >>> (series.buckets.tolist(), series.votes.tolist())
+            ([3600, 7200], [5, 2])
+            >>> series = repo.get_range(choice.id, datetime.fromtimestamp(0, timezone.utc),
+            ...                         datetime.fromtimestamp(10800, timezone.utc), VoteBucket.MINUTE)
+            >>> (series.buckets.tolist(), series.votes.tolist())
+            ([3600, 3660, 7200], [4, 1, 2])
+        """
+        lower, upper = int(start.timestamp()), int(end.timestamp())
+        rows = (
+            VoteBucket.objects.using(self.using)
+            .filter(choice_id=choice_id, bucket__gte=lower, bucket__lt=upper)
+            .values_list('bucket', 'votes')
+        )
+        totals: dict[int, int] = {}
+        for bucket, votes in rows:
+            key = bucket - bucket % resolution
+            totals[key] = totals.get(key, 0) + votes
+        ordered = sorted(totals)
+        return VoteSeriesDTO(
+            choice_id=choice_id,
+            resolution=resolution,
+            buckets=array('q', ordered),
+            votes=array('q', (totals[bucket] for bucket in ordered)),
+        )
+
+    def compact(self, source: int, target: int, older_than: int) -> int:
+        """
+        Agrega los intervalos de ``source`` anteriores a ``older_than`` (segundos
+        epoch) en intervalos de ``target`` y borra los originales.
+        Retorna cuántas filas se compactaron.
+
+            >>> from django.utils.timezone import now
+            >>> from polls.models import Choice, Question
+            >>> question = Question.objects.create(question_text="¿Lluvia?", pub_date=now())
+            >>> choice = Choice.objects.create(question=question, choice_text="sí")
+            >>> repo = DjangoVoteSeriesRepository()
+            >>> repo.add_buckets({(choice.id, 0): 1, (choice.id, 60): 2, (choice.id, 3600): 3}, VoteBucket.MINUTE)
+            >>> repo.compact(VoteBucket.MINUTE, VoteBucket.HOUR, older_than=3600)
+            2
+            >>> sorted(VoteBucket.objects.filter(choice=choice).values_list('resolution', 'bucket', 'votes'))
+            [(60, 3600, 3), (3600, 0, 3)]
+        """
+        cutoff = older_than - older_than % target
+        with transaction.atomic(using=self.using), connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.table} (choice_id, resolution, bucket, votes) '
+                'SELECT choice_id, %s, (bucket / %s) * %s, SUM(votes) '
+                f'FROM {self.table} WHERE resolution = %s AND bucket < %s '
+                'GROUP BY choice_id, (bucket / %s) * %s '
+                'ON CONFLICT (choice_id, resolution, bucket) '
+                f'DO UPDATE SET votes = {self.table}.votes + excluded.votes',
+                [target, target, target, source, cutoff, target, target],
+            )
+            cursor.execute(
+                f'DELETE FROM {self.table} WHERE resolution = %s AND bucket < %s',
+                [source, cutoff],
+            )
+            return cursor.rowcount
+
+
+class BufferedVoteSeriesWriter:
+    """
+    Implementación de IVoteSeriesRecorder: acumula en memoria los votos por
+    (choice, minuto) y un hilo los escribe en un solo upsert a más tardar
+    ``FLUSH_INTERVAL`` segundos después del primer voto pendiente, o antes si
+    el buffer crece más de ``MAX_BUFFERED``. Los votos entran al buffer al
+    confirmarse su transacción y la escritura nunca ocurre en la petición.
+    """
+
+    def __init__(self, repository: DjangoVoteSeriesRepository | None = None,
+                 flush_interval: float | None = None, max_buffered: int | None = None):
+        config = vote_series_settings()
+        self.repository = repository or DjangoVoteSeriesRepository()
+        self.flush_interval = config['FLUSH_INTERVAL'] if flush_interval is None else flush_interval
+        self.max_buffered = config['MAX_BUFFERED'] if max_buffered is None else max_buffered
+        self._buffer: dict[tuple[int, int], int] = {}
+        self._lock = threading.Lock()
+        self._pending = threading.Event()  # hay votos en el buffer
+        self._full = threading.Event()     # llegó a MAX_BUFFERED o se está cerrando
+        self._closed = False
+        self._flusher: threading.Thread | None = None
+        self._flusher_pid: int | None = None
+        atexit.register(self._flush_at_exit)
+
+    def record(self, choice_id: int, at: datetime | None = None, count: int = 1) -> None:
+        bucket = to_bucket(at or datetime.now(timezone.utc), VoteBucket.MINUTE)
+        # sólo cuentan los votos cuya transacción se confirma
+        transaction.on_commit(lambda: self._add((choice_id, bucket), count))
+
+    def _add(self, key: tuple[int, int], count: int) -> None:
+        self._ensure_flusher()
+        with self._lock:
+            self._buffer[key] = self._buffer.get(key, 0) + count
+            full = len(self._buffer) >= self.max_buffered
+        self._pending.set()
+        if full:
+            self._full.set()
+
+    def _ensure_flusher(self) -> None:
+        # el hilo no sobrevive a un fork: cada proceso arranca el suyo
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher = threading.Thread(target=self._flush_forever, name='polls-vote-series', daemon=True)
+            self._flusher.start()
+            self._flusher_pid = os.getpid()
+
+    def _flush_forever(self) -> None:
+        wait = None if math.isinf(self.flush_interval) else self.flush_interval
+        while True:
+            self._pending.wait()
+            # deja juntar votos hasta FLUSH_INTERVAL después del primero pendiente
+            self._full.wait(wait)
+            if self._closed:
+                return
+            self._pending.clear()
+            self._full.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception:
+                logger.exception('no se pudo escribir la serie de votos, se reintenta en el siguiente flush')
+                self._pending.set()
+            finally:
+                close_old_connections()
+
+    def flush(self) -> int:
+        with self._lock:
+            rows, self._buffer = self._buffer, {}
+        if not rows:
+            return 0
+        try:
+            self.repository.add_buckets(rows, VoteBucket.MINUTE)
+        except Exception:
+            with self._lock:
+                # se devuelven al buffer para el siguiente intento
+                for key, votes in rows.items():
+                    self._buffer[key] = self._buffer.get(key, 0) + votes
+            raise
+        return len(rows)
+
+    def close(self) -> None:
+        """Detiene el hilo y escribe lo pendiente; después de esto no hace falta el flush al salir."""
+        atexit.unregister(self._flush_at_exit)
+        self._closed = True
+        self._pending.set()
+        self._full.set()
+        if self._flusher is not None and self._flusher_pid == os.getpid():
+            self._flusher.join()
+        if self._buffer:
+            self.flush()
+
+    def _flush_at_exit(self) -> None:
+        if not self._buffer:
+            return
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('no se pudo escribir la serie de votos al salir')
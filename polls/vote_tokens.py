@@ -0,0 +1,160 @@
+# polls/vote_tokens.py
+"""
+Ruta de votos para clientes de alto volumen, sin sesión ni CSRF.
+
+El cliente se autentica con un token firmado (HMAC con SECRET_KEY, ver
+``django.core.signing``) que dice quién es (``sub``), para qué pregunta vale
+(o cualquiera) y hasta cuándo. Se verifica en el proceso, sin consultas: el
+token es una credencial del cliente, no un voto de un solo uso.
+
+``StatelessRoutesMiddleware`` va al principio de MIDDLEWARE y atiende las
+rutas de ``ROUTES`` con sólo los middlewares de ``MIDDLEWARE`` (por defecto
+el límite de concurrencia), sin pasar por SessionMiddleware,
+CsrfViewMiddleware, AuthenticationMiddleware ni MessageMiddleware. El resto
+de las peticiones sigue por el stack completo.
+
+Las vistas de DRF (la subida de votos en lote) usan el mismo token con
+``VoteTokenAuthentication`` y ``HasVoteToken``; ``request.auth`` queda con
+los claims.
+
+    python manage.py issue_vote_token cliente-1 --question 3 --ttl 600
+"""
+import time
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.core.handlers.exception import convert_exception_to_response
+from django.urls import (
+    Resolver404,
+    resolve,
+)
+from django.utils.module_loading import import_string
+from rest_framework import (
+    authentication,
+    exceptions,
+    permissions,
+)
+
+DEFAULT_VOTE_TOKENS: dict[str, Any] = {
+    'TTL': 3600,  # segundos de validez de un token nuevo
+    'SALT': 'polls.vote_tokens',
+    'ROUTES': ('polls:vote', 'polls:vote_upload'),
+    'MIDDLEWARE': ('polls.load_shedding.ConcurrencyLimitMiddleware',),
+}
+
+
+def vote_tokens_settings() -> dict[str, Any]:
+    return {**DEFAULT_VOTE_TOKENS, **getattr(settings, 'POLLS_VOTE_TOKENS', {})}
+
+
+class InvalidVoteToken(Exception):
+    """Token mal formado, con firma inválida, vencido o de otra pregunta."""
+
+
+def issue_vote_token(subject: str, question_id: int | None = None, ttl: int | None = None) -> str:
+    """
+    Firma un token para ``subject``; sin ``question_id`` vale para cualquier pregunta.
+
+        >>> token = issue_vote_token('cliente', question_id=3)
+        >>> verify_vote_token(token, 3)
+        'cliente'
+        >>> verify_vote_token(token, 4)
+        Traceback (most recent call last):
+        ...
+        polls.vote_tokens.InvalidVoteToken: token for another question
+    """
+    config = vote_tokens_settings()
+    expires = int(time.time()) + (config['TTL'] if ttl is None else ttl)
+    return signing.dumps({'sub': subject, 'q': question_id, 'exp': expires}, salt=config['SALT'])
+
+
+def vote_token_claims(token: str) -> dict[str, Any]:
+    """Los claims (``sub``, ``q``, ``exp``) de un token con firma válida y sin vencer; si no, InvalidVoteToken."""
+    try:
+        claims = signing.loads(token, salt=vote_tokens_settings()['SALT'])
+    except signing.BadSignature:
+        raise InvalidVoteToken('bad signature')
+    if claims['exp'] < time.time():
+        raise InvalidVoteToken('expired token')
+    return claims
+
+
+def verify_vote_token(token: str, question_id: int) -> str:
+    """Retorna el ``subject`` del token si vale para ``question_id``; si no, InvalidVoteToken."""
+    claims = vote_token_claims(token)
+    if claims['q'] is not None and claims['q'] != question_id:
+        raise InvalidVoteToken('token for another question')
+    return claims['sub']
+
+
+def bearer_token(request) -> str:
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        raise InvalidVoteToken('missing bearer token')
+    return token.strip()
+
+
+class VoteTokenAuthentication(authentication.BaseAuthentication):
+    """
+    ``Authorization: Bearer <token>`` para vistas de DRF. No hay usuario:
+    ``request.user`` es anónimo y ``request.auth`` son los claims del token.
+    """
+
+    def authenticate(self, request):
+        try:
+            token = bearer_token(request)
+        except InvalidVoteToken:
+            return None
+        try:
+            return AnonymousUser(), vote_token_claims(token)
+        except InvalidVoteToken as error:
+            raise exceptions.AuthenticationFailed(str(error))
+
+    def authenticate_header(self, request):
+        return 'Bearer'
+
+
+class HasVoteToken(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.auth is not None
+
+
+class StatelessRoutesMiddleware:
+    """
+    Atiende las rutas sin estado con su propio stack (``MIDDLEWARE`` de
+    POLLS_VOTE_TOKENS) y la vista, armado igual que lo hace Django con el
+    principal; las demás peticiones siguen a ``get_response``.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        config = vote_tokens_settings()
+        self.routes = frozenset(config['ROUTES'])
+        handler = convert_exception_to_response(self.call_view)
+        for middleware_path in reversed(config['MIDDLEWARE']):
+            handler = convert_exception_to_response(import_string(middleware_path)(handler))
+        self.stateless_handler = handler
+
+    def __call__(self, request):
+        if request.method != 'POST':
+            return self.get_response(request)
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return self.get_response(request)
+        if match.view_name not in self.routes:
+            return self.get_response(request)
+        # lo deja resuelto para el resto del stack y para la vista
+        request.resolver_match = match
+        return self.stateless_handler(request)
+
+    @staticmethod
+    def call_view(request):
+        match = request.resolver_match
+        response = match.func(request, *match.args, **match.kwargs)
+        # como BaseHandler: las respuestas diferidas (las de DRF) se renderizan al salir de la vista
+        if callable(getattr(response, 'render', None)):
+            response = response.render()
+        return response
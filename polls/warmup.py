@@ -0,0 +1,141 @@
+# polls/warmup.py
+"""
+Precarga al arrancar un worker, para que las primeras peticiones después de
+un deploy no lleguen todas en frío a la base de datos a la vez:
+
+1. compila los templates de las páginas (quedan en el loader cacheado),
+2. lee los recientes (la portada y ``/polls/recent/``),
+3. lee las encuestas con más votos en la última ``WINDOW`` (de la serie de
+   votos por minuto, completando con las recientes) con sus opciones y
+   votos, lo que piden el detalle y los resultados.
+
+Las lecturas pasan por los repositorios del contenedor: con los de
+polls/read_cache.py quedan en el caché por ``POLLS_READ_CACHE['WARM_TTL']``;
+con los demás (el default) sólo se abren las conexiones y las páginas de la
+base quedan en memoria. Cada paso revisa el
+presupuesto de ``BUDGET`` segundos antes de empezar (una consulta en curso
+no se corta).
+
+``settings/wsgi.py`` y ``settings/asgi.py`` llaman a ``warm_in_background``:
+sólo los procesos que atienden peticiones se importan desde ahí (no
+``migrate`` ni las pruebas, que también pasan por ``AppConfig.ready``). Con
+``gunicorn --preload`` hay que llamarla en el ``post_fork`` de cada worker.
+
+    python manage.py warm_cache --budget 10
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from typing import Any
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+from django.template.loader import get_template
+
+from business_logic.exceptions import QuestionNotFound
+
+from .container import container
+from .models import VoteBucket
+from .read_cache import warming
+from .sharding import sharding_settings
+from .vote_series import to_bucket
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WARMUP: dict[str, Any] = {
+    'ON_STARTUP': True,   # en segundo plano desde los entry points WSGI/ASGI
+    'BUDGET': 5.0,        # segundos como máximo
+    'RECENT_LIMIT': 20,   # se sirven de esta lista los pedidos de hasta este largo
+    'TOP_POLLS': 20,      # encuestas con opciones y votos
+    'WINDOW': 3600,       # segundos de la serie de votos que definen las más votadas
+    'TEMPLATES': ('polls/index.html', 'polls/detail.html', 'polls/results.html'),
+}
+
+
+def warmup_settings() -> dict[str, Any]:
+    return {**DEFAULT_WARMUP, **getattr(settings, 'POLLS_WARMUP', {})}
+
+
+def popular_question_ids(limit: int, window: int) -> list[int]:
+    """Preguntas con más votos en los últimos ``window`` segundos, en todos los shards."""
+    since = to_bucket(datetime.now(timezone.utc) - timedelta(seconds=window), VoteBucket.MINUTE)
+    totals: Counter[int] = Counter()
+    for alias in sharding_settings()['SHARDS']:
+        totals.update(dict(
+            VoteBucket.objects.using(alias)
+            .filter(resolution=VoteBucket.MINUTE, bucket__gte=since)
+            .values_list('choice__question_id')
+            .annotate(total=Sum('votes'))
+            .order_by('-total')[:limit]
+        ))
+    return [question_id for question_id, _ in totals.most_common(limit)]
+
+
+def warm_cache(budget: float | None = None) -> dict[str, Any]:
+    """
+    Corre los pasos en orden mientras quede presupuesto. Retorna cuánto precargó
+    de cada cosa y si terminó (``complete``).
+    """
+    config = warmup_settings()
+    deadline = time.monotonic() + (config['BUDGET'] if budget is None else budget)
+    report: dict[str, Any] = {'templates': 0, 'recent': 0, 'polls': 0, 'complete': False}
+
+    def out_of_time() -> bool:
+        return time.monotonic() >= deadline
+
+    for name in config['TEMPLATES']:
+        if out_of_time():
+            return report
+        get_template(name)
+        report['templates'] += 1
+
+    with warming():
+        questions, choices = container.resolve('question_repository'), container.resolve('choice_repository')
+        if out_of_time():
+            return report
+        recent = questions.get_recent(config['RECENT_LIMIT'])
+        report['recent'] = len(recent)
+
+        if out_of_time():
+            return report
+        top = popular_question_ids(config['TOP_POLLS'], config['WINDOW'])
+        top += [question.id for question in recent if question.id not in top]
+        for question_id in top[:config['TOP_POLLS']]:
+            if out_of_time():
+                return report
+            try:
+                questions.get_by_id(question_id)
+            except QuestionNotFound:
+                continue  # borrada entre la serie de votos y ahora
+            choices.get_by_question(question_id)
+            report['polls'] += 1
+    report['complete'] = True
+    return report
+
+
+def _warm() -> None:
+    started = time.monotonic()
+    try:
+        report = warm_cache()
+        logger.info('precarga en %.2fs: %s', time.monotonic() - started, report)
+    except Exception:
+        logger.exception('falló la precarga; el worker atiende igual, en frío')
+    finally:
+        # las conexiones son por hilo: las de este no las cierra nadie más
+        connections.close_all()
+
+
+def warm_in_background() -> threading.Thread | None:
+    """Arranca la precarga en un hilo daemon, sin demorar al worker; None si está apagada."""
+    if not warmup_settings()['ON_STARTUP']:
+        return None
+    thread = threading.Thread(target=_warm, name='polls-warmup', daemon=True)
+    thread.start()
+    return thread
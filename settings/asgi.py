@@ -14,4 +14,13 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from polls.live_results import LiveResultsApp  # noqa: E402 (requiere django.setup())
+from polls.profiling import start_sampler  # noqa: E402
+from polls.warmup import warm_in_background  # noqa: E402
+
+warm_in_background()
+start_sampler()
+
+application = LiveResultsApp(django_application)
@@ -45,13 +45,17 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # primero, para que el perfilado cubra también la ruta de votos con token
+    'polls.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'polls.vote_tokens.StatelessRoutesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'polls.load_shedding.ConcurrencyLimitMiddleware',
 ]
 
 ROOT_URLCONF = 'settings.urls'
@@ -60,7 +64,10 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
+        # los loaders se declaran explícitos (con APP_DIRS apagado) para que el
+        # loader cacheado se use igual con DEBUG encendido o apagado; en desarrollo
+        # el autoreload descarta la cache cuando cambia un template
+        'APP_DIRS': False,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -68,6 +75,12 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -82,7 +95,22 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        # los atomic toman el lock de escritura al empezar: así esperan turno (hasta
+        # el timeout) en vez de fallar con 'database is locked' al pasar de leer a escribir
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+    # shards de ejemplo para correr el sharding en local (ver POLLS_SHARDING);
+    # no se usan mientras no estén en SHARDS
+    'shard1': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_shard1.sqlite3',
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
+    'shard2': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_shard2.sqlite3',
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    },
 }
 
 
@@ -133,4 +161,142 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ]
-}
\ No newline at end of file
+}
+
+# Cola de tareas posteriores al voto (ver polls/tasks.py)
+POLLS_TASK_QUEUE = {
+    'IN_PROCESS': True,
+    'WORKERS': 2,
+    'MAX_QUEUE': 1000,
+    'PUT_TIMEOUT': 0,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 1.0,
+    'LEASE': 60,
+}
+
+# Resultados en vivo por SSE, servidos desde settings/asgi.py (ver polls/live_results.py)
+POLLS_LIVE_RESULTS = {
+    'INTERVAL_MS': 250,
+    'HEARTBEAT': 15.0,
+}
+
+# Proveedores del contenedor de dependencias (ver polls/container.py), p.ej.
+# {'vote_repository': 'modulo.OtroRepositorio'}; lo no indicado usa el default
+POLLS_PROVIDERS = {}
+
+# Caché de lecturas con TTL corto sobre CACHES (ver polls/read_cache.py); se activa con
+# POLLS_PROVIDERS['question_repository'] = 'polls.read_cache.cached_question_repository' y
+# POLLS_PROVIDERS['choice_repository'] = 'polls.read_cache.cached_choice_repository'.
+# WARM_TTL es lo que dura lo que guarda POLLS_WARMUP (y cuánto pueden atrasarse esos votos)
+POLLS_READ_CACHE = {
+    'ALIAS': 'default',
+    'TTL': 2.0,
+    'WARM_TTL': 30.0,
+}
+
+# Precarga en segundo plano al arrancar cada worker, desde settings/wsgi.py y settings/asgi.py
+# (ver polls/warmup.py); también ``python manage.py warm_cache``. Sólo llena el caché con los
+# proveedores de POLLS_READ_CACHE activos; sin ellos compila templates y calienta la base
+POLLS_WARMUP = {
+    'ON_STARTUP': True,
+    'BUDGET': 5.0,
+    'TOP_POLLS': 20,
+}
+
+# Contadores de votos en memoria compartida por nodo (ver polls/shared_counters.py);
+# se activan con POLLS_PROVIDERS['vote_repository'] = 'polls.shared_counters.SharedMemoryChoiceRepository'
+POLLS_SHARED_COUNTERS = {
+    'NAME': 'polls_votes',
+    'SLOTS': 16384,
+    'STRIPES': 64,
+    'FLUSH_INTERVAL': 1.0,
+    'LOCK_DIR': None,
+}
+
+# Serie de tiempo de votos (ver polls/vote_series.py y manage.py compact_vote_series)
+POLLS_VOTE_SERIES = {
+    'FLUSH_INTERVAL': 5.0,
+    'MAX_BUFFERED': 10000,
+    'MINUTE_RETENTION': 2 * 86400,
+    'HOUR_RETENTION': 90 * 86400,
+}
+
+# Fragmentos estáticos de los templates ({% prerender %} en polls/templatetags/polls_fragments.py)
+POLLS_TEMPLATES = {
+    'PRERENDER': True,
+}
+
+# Almacén clave-valor local para los votos (ver polls/kv_votes.py y manage.py kv_votes);
+# se activa con POLLS_PROVIDERS['vote_repository'] = 'polls.kv_votes.KeyValueChoiceRepository'
+POLLS_KV_VOTES = {
+    'PATH': None,
+    'FSYNC': False,
+    'COMPACT_BYTES': 64 * 1024 * 1024,
+}
+
+# Diario de votos con group commit (ver polls/vote_journal.py y manage.py replay_vote_journal);
+# se activa con POLLS_PROVIDERS['vote_repository'] = 'polls.vote_journal.JournaledChoiceRepository'
+POLLS_VOTE_JOURNAL = {
+    'PATH': None,
+    'FSYNC': True,
+    'GROUP_COMMIT_DELAY': 0.0,
+    'SEGMENT_BYTES': 4 * 1024 * 1024,
+    'SEGMENT_SECONDS': 1.0,
+    'REPLAY_INTERVAL': 1.0,
+}
+
+# Archivo de encuestas cerradas (ver manage.py archive_polls): las cerradas hace
+# más de RETENTION_DAYS días se mueven por lotes a polls_archivedquestion/polls_archivedchoice
+POLLS_ARCHIVE = {
+    'RETENTION_DAYS': 30,
+    'BATCH_SIZE': 500,
+}
+
+# Límite de concurrencia adaptativo (AIMD) para los POST (ver polls/load_shedding.py);
+# lo que no entra antes de QUEUE_TIMEOUT recibe 503 con Retry-After
+POLLS_LOAD_SHEDDING = {
+    'INITIAL_LIMIT': 4,
+    'MIN_LIMIT': 1,
+    'MAX_LIMIT': 32,
+    'TARGET_LATENCY': 0.1,
+    'BACKOFF': 0.7,
+    'MAX_QUEUE': 64,
+    'QUEUE_TIMEOUT': 0.5,
+    'RETRY_AFTER': 1,
+}
+
+# Rutas de votos (uno a uno y subidas en lote) sin sesión ni CSRF, autenticadas con tokens firmados
+# (ver polls/vote_tokens.py)
+POLLS_VOTE_TOKENS = {
+    'TTL': 3600,
+    'ROUTES': ('polls:vote', 'polls:vote_upload'),
+    'MIDDLEWARE': ('polls.load_shedding.ConcurrencyLimitMiddleware',),
+}
+
+# Encuestas repartidas en varias bases por id de pregunta (ver polls/sharding.py). Se activa con
+# SHARDS = ('default', 'shard1', 'shard2'), ``python manage.py migrate --database <alias>`` en cada
+# shard y POLLS_PROVIDERS = {
+#     'question_repository': 'polls.sharding.single_flight_question_repository',
+#     'choice_repository': 'polls.sharding.single_flight_choice_repository',
+#     'vote_repository': 'polls.sharding.ShardedChoiceRepository',
+#     'search_index': 'polls.sharding.ShardedSearchIndex',
+#     'vote_series': 'polls.sharding.buffered_vote_series',
+# }
+# Después de cambiar SHARDS, ``python manage.py rebalance_shards`` mueve las encuestas a su shard nuevo.
+POLLS_SHARDING = {
+    'SHARDS': ('default',),
+    'CATALOG': 'default',
+    'VNODES': 64,
+    'ID_BLOCK': 100,
+}
+
+# Muestreo continuo de las peticiones en curso y perfilado cProfile de peticiones con un token
+# firmado en X-Polls-Profile (ver polls/profiling.py y ``python manage.py profile_token``).
+# SAMPLER arranca en cada worker WSGI/ASGI un hilo que muestrea cada INTERVAL: encenderlo es una
+# decisión del despliegue, no un default
+POLLS_PROFILING = {
+    'SAMPLER': False,
+    'INTERVAL': 0.01,
+    'DIR': None,
+    'KEEP': 100,
+}
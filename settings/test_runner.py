@@ -1,60 +1,388 @@
 # settings/test_runner.py
 import doctest
+import hashlib
+import importlib
+import inspect
 import os
+import pkgutil
+import sqlite3
 import unittest
-from django.test.runner import DiscoverRunner
+from functools import cache
+from pathlib import Path
+
+import django
 from django.apps import apps
-import importlib
+from django.conf import settings
+from django.db import (
+    DEFAULT_DB_ALIAS,
+    connections,
+    transaction,
+)
+from django.test import TestCase
+from django.test.runner import DiscoverRunner
+from django.utils.module_loading import import_string
+
+# paquetes que no son apps de django pero sí tienen doctests
+EXTRA_DOCTEST_PACKAGES = ('business_logic',)
+EXCLUDED_SUBPACKAGES = {'migrations', 'tests'}
+
+
+def doctest_packages() -> tuple[str, ...]:
+    """Apps instaladas que viven en este proyecto, más los paquetes extra."""
+    base_dir = Path(settings.BASE_DIR).resolve()
+    local_apps = tuple(
+        app_config.name
+        for app_config in apps.get_app_configs()
+        if Path(app_config.path).resolve().is_relative_to(base_dir)
+    )
+    return local_apps + EXTRA_DOCTEST_PACKAGES
+
+
+@cache
+def doctest_modules(packages: tuple[str, ...]) -> tuple[str, ...]:
+    """
+    Nombres de los módulos con doctests dentro de ``packages``.
+    Se calcula una sola vez por proceso.
+    """
+    module_names = []
+    for package_name in packages:
+        package = importlib.import_module(package_name)
+        module_names.append(package_name)
+        for module_info in pkgutil.walk_packages(package.__path__, prefix=f'{package_name}.'):
+            if EXCLUDED_SUBPACKAGES & set(module_info.name.split('.')):
+                continue
+            module_names.append(module_info.name)
+    return tuple(name for name in module_names if doctest_names(name))
+
+
+@cache
+def doctest_names(module_name: str) -> tuple[str, ...]:
+    module = importlib.import_module(module_name)
+    return tuple(
+        test.name
+        for test in doctest.DocTestFinder().find(module)
+        if test.examples
+    )
+
+
+def _make_doctest_case(module_name: str, test_name: str) -> 'ModuleDocTest':
+    return doctest_case_class(module_name)(module_name, test_name)
+
+
+class ModuleDocTest(unittest.TestCase):
+    """
+    Un doctest referenciado por nombre, así se puede mandar a los procesos de
+    ``--parallel`` (los DocTestCase de la stdlib no son picklables). Cada
+    doctest corre dentro de una transacción que se revierte al final.
+    """
+    databases = {'default'}
+
+    def __init__(self, module_name: str, test_name: str):
+        super().__init__('run_doctest')
+        self.module_name = module_name
+        self.test_name = test_name
+
+    def __reduce__(self):
+        return _make_doctest_case, (self.module_name, self.test_name)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.test_name == other.test_name
+
+    def __hash__(self):
+        return hash((type(self), self.test_name))
+
+    def id(self):
+        return self.test_name
+
+    def __str__(self):
+        return f'{self.test_name} (doctest)'
+
+    def run_doctest(self):
+        module = importlib.import_module(self.module_name)
+        test = next(
+            test for test in doctest.DocTestFinder().find(module)
+            if test.name == self.test_name
+        )
+        case = doctest.DocTestCase(test)
+        with transaction.atomic():
+            case.setUp()
+            try:
+                case.runTest()
+            finally:
+                case.tearDown()
+                transaction.set_rollback(True)
+
+
+@cache
+def doctest_case_class(module_name: str) -> type[ModuleDocTest]:
+    # una clase por módulo para que ``--parallel`` reparta los módulos entre procesos
+    class_name = 'DocTest_' + module_name.replace('.', '_')
+    return type(class_name, (ModuleDocTest,), {'__module__': __name__})
+
+
+def snapshot_dir() -> Path:
+    return Path(getattr(settings, 'TEST_SNAPSHOT_DIR', Path(settings.BASE_DIR) / '.test_snapshots'))
+
+
+@cache
+def schema_fingerprint() -> str:
+    """Cambia con la versión de Django o con cualquier archivo de migraciones de las apps instaladas."""
+    digest = hashlib.sha256(django.__version__.encode())
+    for app_config in apps.get_app_configs():
+        for path in sorted((Path(app_config.path) / 'migrations').glob('*.py')):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(alias: str, name: str = 'migrated', fingerprint: str | None = None) -> Path:
+    return snapshot_dir() / f'{alias}-{name}-{fingerprint or schema_fingerprint()}.sqlite3'
+
+
+def save_sqlite_snapshot(connection, path: Path) -> None:
+    """Copia la base con la API de backup de SQLite y borra los snapshots viejos del mismo nombre."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for stale in path.parent.glob(f'{path.name.rsplit("-", 1)[0]}-*.sqlite3'):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+    # a un temporal y luego rename: los procesos de --parallel pueden guardar el mismo a la vez
+    partial = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    target = sqlite3.connect(partial)
+    try:
+        connection.ensure_connection()
+        connection.connection.backup(target)
+    finally:
+        target.close()
+    os.replace(partial, path)
+
+
+def restore_sqlite_snapshot(connection, path: Path) -> None:
+    """Reemplaza todo el contenido de la base de ``connection`` por el del snapshot."""
+    source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        connection.ensure_connection()
+        source.backup(connection.connection)
+    finally:
+        source.close()
+
+
+# alias -> snapshot de la base recién migrada, para que SeededTestCase pueda volver a ella
+_migrated_snapshots: dict[str, Path] = {}
+
+
+class SnapshotDatabaseCreation:
+    """
+    Envuelve ``connection.creation`` mientras el runner crea las bases de
+    pruebas. En lugar de migrar en cada corrida, ``create_test_db`` parte de un
+    snapshot de la base ya migrada si existe uno para las migraciones actuales
+    (``schema_fingerprint``); si no, migra como siempre y lo guarda:
+
+    - SQLite: un archivo en ``TEST_SNAPSHOT_DIR`` que se copia con la API de backup.
+    - PostgreSQL: una base plantilla, y la de pruebas se crea con ``CREATE DATABASE ... TEMPLATE``.
+
+    Los clones de ``--parallel`` se hacen igual que siempre, a partir de la base ya restaurada.
+    """
+
+    def __init__(self, creation):
+        self.creation = creation
+        self.connection = creation.connection
+
+    def __getattr__(self, name):
+        return getattr(self.creation, name)
+
+    def create_test_db(self, verbosity=1, autoclobber=False, serialize=True, keepdb=False):
+        vendor = self.connection.vendor
+        if keepdb or vendor not in ('sqlite', 'postgresql'):
+            return self.creation.create_test_db(verbosity, autoclobber, serialize, keepdb)
+        if vendor == 'sqlite':
+            return self._create_sqlite(verbosity, autoclobber, serialize)
+        return self._create_postgresql(verbosity, autoclobber, serialize)
+
+    def _log_restore(self, verbosity: int, test_database_name: str, source) -> None:
+        if verbosity >= 1:
+            display = self.creation._get_database_display_str(verbosity, test_database_name)
+            self.creation.log(f'Restoring test database for alias {display} from {source}...')
+
+    def _use(self, test_database_name: str) -> None:
+        # lo mismo que hace create_test_db después de migrar
+        self.connection.close()
+        settings.DATABASES[self.connection.alias]['NAME'] = test_database_name
+        self.connection.settings_dict['NAME'] = test_database_name
+        self.connection.ensure_connection()
+
+    def _finish(self, serialize: bool) -> None:
+        if serialize:
+            self.connection._test_serialized_contents = self.creation.serialize_db_to_string()
+
+    def _create_sqlite(self, verbosity, autoclobber, serialize):
+        path = snapshot_path(self.connection.alias)
+        _migrated_snapshots[self.connection.alias] = path
+        if not path.exists():
+            test_database_name = self.creation.create_test_db(verbosity, autoclobber, serialize)
+            save_sqlite_snapshot(self.connection, path)
+            return test_database_name
+        test_database_name = self.creation._get_test_db_name()
+        self._log_restore(verbosity, test_database_name, path.name)
+        self.creation._create_test_db(verbosity, autoclobber, keepdb=False)
+        self._use(test_database_name)
+        restore_sqlite_snapshot(self.connection, path)
+        self._finish(serialize)
+        return test_database_name
+
+    def _create_postgresql(self, verbosity, autoclobber, serialize):
+        test_database_name = self.creation._get_test_db_name()
+        template = f'{test_database_name}_template_{schema_fingerprint()}'
+        quote = self.connection.ops.quote_name
+        with self.creation._nodb_cursor() as cursor:
+            cursor.execute('SELECT 1 FROM pg_database WHERE datname = %s', [template])
+            exists = cursor.fetchone() is not None
+        if not exists:
+            test_database_name = self.creation.create_test_db(verbosity, autoclobber, serialize)
+            # la plantilla no puede tener conexiones abiertas al copiarse
+            self.connection.close()
+            with self.creation._nodb_cursor() as cursor:
+                cursor.execute(f'CREATE DATABASE {quote(template)} TEMPLATE {quote(test_database_name)}')
+            self.connection.ensure_connection()
+            return test_database_name
+        self._log_restore(verbosity, test_database_name, template)
+        with self.creation._nodb_cursor() as cursor:
+            cursor.execute(f'DROP DATABASE IF EXISTS {quote(test_database_name)}')
+            cursor.execute(f'CREATE DATABASE {quote(test_database_name)} TEMPLATE {quote(template)}')
+        self._use(test_database_name)
+        self._finish(serialize)
+        return test_database_name
+
+
+class SeededTestCase(TestCase):
+    """
+    TestCase que arranca con los datos que crea ``seed`` (ruta de importación
+    de una función sin argumentos que los crea con el ORM), reutilizables
+    entre clases y entre corridas:
+
+    - la primera vez se corre la función y la base sembrada se guarda como
+      snapshot (su nombre incluye un hash del módulo de la función);
+    - las siguientes se restaura el snapshot (milisegundos, sin el ORM);
+    - al terminar la clase la base vuelve a quedar como recién migrada.
+
+    Los objetos sembrados se buscan en ``setUpTestData``. Sin snapshots (otro
+    motor, ``--keepdb`` o ``--no-snapshots``) la función se corre dentro de la
+    transacción de la clase, como cualquier ``setUpTestData``.
+    """
+    seed: str = ''
+
+    @classmethod
+    def _seed_snapshot(cls, alias: str) -> Path:
+        module = inspect.getmodule(import_string(cls.seed))
+        digest = hashlib.sha256(Path(inspect.getfile(module)).read_bytes()).hexdigest()[:16]
+        return snapshot_path(alias, f'seed-{cls.seed}', f'{schema_fingerprint()}-{digest}')
+
+    @classmethod
+    def setUpClass(cls):
+        connection = connections[DEFAULT_DB_ALIAS]
+        cls._seeded = False
+        if cls.seed and connection.vendor == 'sqlite' and DEFAULT_DB_ALIAS in _migrated_snapshots:
+            path = cls._seed_snapshot(DEFAULT_DB_ALIAS)
+            if path.exists():
+                restore_sqlite_snapshot(connection, path)
+            else:
+                restore_sqlite_snapshot(connection, _migrated_snapshots[DEFAULT_DB_ALIAS])
+                import_string(cls.seed)()
+                save_sqlite_snapshot(connection, path)
+            cls._seeded = True
+        try:
+            super().setUpClass()
+        except Exception:
+            cls._unseed()
+            raise
+
+    @classmethod
+    def setUpTestData(cls):
+        if cls.seed and not cls._seeded:
+            import_string(cls.seed)()
+
+    @classmethod
+    def tearDownClass(cls):
+        try:
+            super().tearDownClass()
+        finally:
+            cls._unseed()
+
+    @classmethod
+    def _unseed(cls):
+        if cls._seeded:
+            restore_sqlite_snapshot(connections[DEFAULT_DB_ALIAS], _migrated_snapshots[DEFAULT_DB_ALIAS])
+            cls._seeded = False
+
 
 class UnifiedTestRunner(DiscoverRunner):
     """
     Un test runner que ejecuta tanto los tests de Django como los doctests,
-    descubriendo automáticamente los módulos de doctests.
+    descubriendo automáticamente los módulos de doctests. Los doctests forman
+    parte de la misma suite, así que corren con ``--parallel`` (cada proceso con
+    su base de datos de pruebas) y se reportan en el mismo resultado.
     """
 
-    def get_doctest_modules(self):
+    def __init__(self, doctests=True, snapshots=True, **kwargs):
+        super().__init__(**kwargs)
+        self.doctests = doctests
+        self.snapshots = snapshots
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--no-doctests', action='store_false', dest='doctests',
+            help='No ejecuta los doctests de las apps del proyecto.',
+        )
+        parser.add_argument(
+            '--no-snapshots', action='store_false', dest='snapshots',
+            help='Migra la base de pruebas en lugar de restaurarla desde un snapshot.',
+        )
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # los hilos del despachador competirían con las pruebas por la base de pruebas;
+        # las que prueban el despacho lo encienden con override_settings
+        settings.POLLS_TASK_QUEUE = {**getattr(settings, 'POLLS_TASK_QUEUE', {}), 'IN_PROCESS': False}
+
+    def setup_databases(self, **kwargs):
+        if not self.snapshots:
+            return super().setup_databases(**kwargs)
+        originals = {alias: connections[alias].creation for alias in connections}
+        for alias, creation in originals.items():
+            connections[alias].creation = SnapshotDatabaseCreation(creation)
+        try:
+            return super().setup_databases(**kwargs)
+        finally:
+            for alias, creation in originals.items():
+                connections[alias].creation = creation
+
+    def teardown_databases(self, old_config, **kwargs):
+        # los buffers del contenedor se escriben mientras la base de pruebas aún existe
+        from polls.container import container
+        container.reset()
+        super().teardown_databases(old_config, **kwargs)
+
+    def get_doctest_modules(self, label: str = '.') -> list[str]:
         """
-        Descubre automáticamente los módulos de doctest
-        escaneando el sistema de archivos del proyecto.
+        Módulos con doctests que corresponden a la etiqueta de pruebas:
+        todos para ``.``, o los que estén dentro del paquete o módulo indicado.
         """
-        modules = []
-        project_root = os.getcwd() # Obtiene la raíz del proyecto
-        excluded_dirs = ['env', '.venv', 'venv', '__pycache__']
-
-        for dirpath, dirnames, filenames in os.walk(project_root):
-            # Excluye directorios no deseados
-            dirnames[:] = [d for d in dirnames if d not in excluded_dirs]
-            
-            for filename in filenames:
-                if filename.endswith('.py'):
-                    # Construye la ruta del archivo
-                    file_path = os.path.join(dirpath, filename)
-                    
-                    # Convierte la ruta de archivo en un nombre de módulo
-                    module_name = os.path.splitext(os.path.relpath(file_path, project_root))[0]
-                    module_name = module_name.replace(os.sep, '.')
-                    
-                    try:
-                        if not module_name.startswith('.'): # Evita módulos sin nombre de paquete
-                            module = importlib.import_module(module_name)
-                            modules.append(module)
-                    except (ImportError, ModuleNotFoundError) as e:
-                        print(f"No se pudo importar el módulo {module_name}: {e}")
-                        continue
-        return modules
-
-    def run_suite(self, suite):
-        # Primero, ejecuta la suite de tests de Django (unittest)
-        super_result = super().run_suite(suite)
-
-        # Ahora, ejecuta los doctests
-        print("\nRunning doctests...")
-        doctest_runner = unittest.TextTestRunner(verbosity=self.verbosity)
-        doctest_suite = unittest.TestSuite()
-
-        # Agrega los tests de los módulos descubiertos
-        for module in self.get_doctest_modules():
-            doctest_suite.addTest(doctest.DocTestSuite(module))
-
-        doctest_result = doctest_runner.run(doctest_suite)
-        return super_result
\ No newline at end of file
+        modules = doctest_modules(doctest_packages())
+        if label in ('.', ''):
+            return list(modules)
+        return [
+            module_name for module_name in modules
+            if module_name == label or module_name.startswith(f'{label}.')
+        ]
+
+    def load_tests_for_label(self, label, discover_kwargs):
+        tests = super().load_tests_for_label(label, discover_kwargs)
+        if not self.doctests:
+            return tests
+        doctests = [
+            _make_doctest_case(module_name, test_name)
+            for module_name in self.get_doctest_modules(label)
+            for test_name in doctest_names(module_name)
+        ]
+        return unittest.TestSuite([tests, *doctests])
@@ -15,3 +15,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.settings')
 
 application = get_wsgi_application()
+
+from polls.profiling import start_sampler  # noqa: E402 (requiere django.setup())
+from polls.warmup import warm_in_background  # noqa: E402
+
+warm_in_background()
+start_sampler()